@@ -24,9 +24,72 @@ __long_description__ = '''This module provides a Python implementation of the
 J-Link SDK by leveraging the SDK's DLL.
 '''
 
-from .enums import *
-from .errors import *
-from .jlink import *
-from .library import *
-from .structs import *
-from .unlockers import *
+import sys
+
+# Submodules whose public names are exported by the package.  These are only
+# imported when one of their names is first accessed, so that importing the
+# package, e.g. to run the command-line interface, stays fast.  The cheapest
+# submodules are searched first.
+_EXPORTING_SUBMODULES = ('enums', 'errors', 'structs', 'library', 'unlockers', 'jlink')
+
+
+def _import(submodule):
+    """Imports a submodule of the package.
+
+    Args:
+      submodule (str): the name of the submodule
+
+    Returns:
+      The submodule.
+    """
+    name = '%s.%s' % (__name__, submodule)
+    __import__(name)
+    return sys.modules[name]
+
+
+def __getattr__(name):
+    """Returns a name exported by one of the package's submodules.
+
+    The submodule is imported on first access, and the name is then stored
+    in the package, so that later accesses do not go through this function.
+
+    Args:
+      name (str): the name to look up
+
+    Returns:
+      The object with the given name.
+
+    Raises:
+      AttributeError: if no submodule exports the given name.
+    """
+    if name == '__all__':
+        names = set()
+        for submodule in _EXPORTING_SUBMODULES:
+            module = _import(submodule)
+            names.update(n for n in vars(module) if not n.startswith('_'))
+        return sorted(names)
+
+    if not name.startswith('_'):
+        for submodule in _EXPORTING_SUBMODULES:
+            module = _import(submodule)
+            if hasattr(module, name):
+                value = getattr(module, name)
+                globals()[name] = value
+                return value
+
+        try:
+            return _import(name)
+        except ModuleNotFoundError as e:
+            if e.name != '%s.%s' % (__name__, name):
+                raise
+
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
+def __dir__():
+    """Returns the names in the package, including those not yet imported.
+
+    Returns:
+      A list of names.
+    """
+    return sorted(set(globals()) | set(__getattr__('__all__')))
@@ -13,7 +13,6 @@
 # limitations under the License.
 
 import ctypes
-import math
 
 
 BITS_PER_BYTE = 8
@@ -36,7 +35,7 @@ def pack_size(value):
         return 1
     elif value < 0:
         raise ValueError('Expected non-negative integer.')
-    return int(math.log(value, 256)) + 1
+    return (int(value).bit_length() + BITS_PER_BYTE - 1) // BITS_PER_BYTE
 
 
 def pack(value, nbits=None):
@@ -61,10 +60,35 @@ def pack(value, nbits=None):
     elif nbits <= 0:
         raise ValueError('Given number of bits must be greater than 0.')
 
-    buf_size = int(math.ceil(nbits / float(BITS_PER_BYTE)))
-    buf = (ctypes.c_uint8 * buf_size)()
+    buf_size = (nbits + BITS_PER_BYTE - 1) // BITS_PER_BYTE
+    mask = (1 << (buf_size * BITS_PER_BYTE)) - 1
+    data = (value & mask).to_bytes(buf_size, 'little')
+    return (ctypes.c_uint8 * buf_size).from_buffer_copy(data)
 
-    for (idx, _) in enumerate(buf):
-        buf[idx] = (value >> (idx * BITS_PER_BYTE)) & 0xFF
 
-    return buf
+def pack_many(values, nbits):
+    """Packs a sequence of values into one contiguous array of 8-bit unsigned
+    integers.
+
+    Each value is packed as by ``pack()`` into the minimal number of bytes
+    required to represent ``nbits`` bits, and the packed values follow each
+    other in the order given.
+
+    Args:
+      values (list): the integer values to pack
+      nbits (int): number of bits to use to represent each value
+
+    Returns:
+      An array of ``ctypes.c_uint8`` representing the packed ``values``.
+
+    Raises:
+      ValueError: if ``nbits <= 0``.
+      TypeError: if ``nbits`` or any of the ``values`` are not numbers.
+    """
+    if nbits <= 0:
+        raise ValueError('Given number of bits must be greater than 0.')
+
+    size = (nbits + BITS_PER_BYTE - 1) // BITS_PER_BYTE
+    mask = (1 << (size * BITS_PER_BYTE)) - 1
+    data = b''.join([(value & mask).to_bytes(size, 'little') for value in values])
+    return (ctypes.c_uint8 * len(data)).from_buffer_copy(data)
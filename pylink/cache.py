@@ -0,0 +1,333 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+
+
+class MemoryCache(object):
+    """Host-side LRU cache of target memory pages.
+
+    Pages are keyed by memory zone and page address, and are filled from the
+    target through the given ``reader``.  In write-back mode, writes are
+    buffered in the cached pages and written to the target through the given
+    ``writer`` when the cache is flushed, or when a dirty page is evicted.
+
+    Attributes:
+      page_size: size of a page in bytes.
+      max_pages: maximum number of pages held by the cache.
+      write_back: ``True`` if writes are buffered in the cache.
+      excludes: list of ``(addr, num_bytes)`` regions that are never cached.
+      hits: number of page lookups served from the cache.
+      misses: number of page lookups that had to read the target.
+    """
+
+    # Regions of the ARMv7-M / ARMv8-M address map that are of ``Device`` or
+    # ``Strongly-ordered`` memory type, i.e. peripherals, external devices,
+    # and the system control space.  Reads of these may have side effects.
+    DEVICE_REGIONS = [
+        (0x40000000, 0x20000000),
+        (0xA0000000, 0x40000000),
+        (0xE0000000, 0x20000000),
+    ]
+
+    def __init__(self, reader, writer, page_size=1024, max_pages=256, write_back=False, excludes=None):
+        """Initializes the memory cache.
+
+        Args:
+          self (MemoryCache): the ``MemoryCache`` instance
+          reader (function): function called as ``reader(addr, size, zone)``
+            to read a page from the target, returning the bytes read, or
+            ``None`` if the page could not be read in full
+          writer (function): function called as ``writer(addr, data, zone)``
+            to write dirty bytes back to the target
+          page_size (int): size of a page in bytes
+          max_pages (int): maximum number of pages to cache
+          write_back (bool): ``True`` to buffer writes in the cache, otherwise
+            ``False`` to write them through to the target
+          excludes (list): list of ``(addr, num_bytes)`` regions to never
+            cache, defaults to ``DEVICE_REGIONS``
+
+        Returns:
+          ``None``
+
+        Raises:
+          ValueError: if ``page_size`` or ``max_pages`` is not positive.
+        """
+        if page_size <= 0:
+            raise ValueError('Page size must be greater than 0.')
+
+        if max_pages <= 0:
+            raise ValueError('Maximum number of pages must be greater than 0.')
+
+        if excludes is None:
+            excludes = self.DEVICE_REGIONS
+
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.write_back = write_back
+        self.excludes = list(excludes)
+        self.hits = 0
+        self.misses = 0
+
+        self._reader = reader
+        self._writer = writer
+        self._pages = collections.OrderedDict()
+        self._dirty = {}
+
+    def __len__(self):
+        """Returns the number of pages currently cached.
+
+        Args:
+          self (MemoryCache): the ``MemoryCache`` instance
+
+        Returns:
+          The number of cached pages.
+        """
+        return len(self._pages)
+
+    def _page_range(self, addr, size):
+        """Returns the page addresses covering the given region.
+
+        Args:
+          self (MemoryCache): the ``MemoryCache`` instance
+          addr (int): start address of the region
+          size (int): size of the region in bytes
+
+        Returns:
+          A ``range`` of page addresses.
+        """
+        start = addr - (addr % self.page_size)
+        return range(start, addr + size, self.page_size)
+
+    def cacheable(self, addr, size):
+        """Returns whether the pages covering the given region can be cached.
+
+        Args:
+          self (MemoryCache): the ``MemoryCache`` instance
+          addr (int): start address of the region
+          size (int): size of the region in bytes
+
+        Returns:
+          ``True`` if none of the pages overlap an excluded region, otherwise
+          ``False``.
+        """
+        if size <= 0:
+            return False
+
+        pages = self._page_range(addr, size)
+        start, end = pages[0], pages[-1] + self.page_size
+        for (exclude_addr, exclude_size) in self.excludes:
+            if start < exclude_addr + exclude_size and exclude_addr < end:
+                return False
+        return True
+
+    def _page(self, zone, page_addr):
+        """Returns the cached page, reading it from the target on a miss.
+
+        Args:
+          self (MemoryCache): the ``MemoryCache`` instance
+          zone (str): memory zone of the page
+          page_addr (int): address of the page
+
+        Returns:
+          The page as a ``bytearray``, or ``None`` if it could not be read.
+        """
+        key = (zone, page_addr)
+        page = self._pages.get(key)
+        if page is not None:
+            self.hits += 1
+            self._pages.move_to_end(key)
+            return page
+
+        self.misses += 1
+        data = self._reader(page_addr, self.page_size, zone)
+        if data is None or len(data) < self.page_size:
+            return None
+
+        page = bytearray(data)
+        self._pages[key] = page
+        while len(self._pages) > self.max_pages:
+            self._evict(next(iter(self._pages)))
+
+        return page
+
+    def _evict(self, key):
+        """Removes a page from the cache, writing back its dirty bytes.
+
+        Args:
+          self (MemoryCache): the ``MemoryCache`` instance
+          key (tuple): the ``(zone, page_addr)`` of the page
+
+        Returns:
+          ``None``
+        """
+        page = self._pages.pop(key)
+        span = self._dirty.pop(key, None)
+        if span is not None:
+            (zone, page_addr), (lo, hi) = key, span
+            self._writer(page_addr + lo, bytes(page[lo:hi]), zone)
+
+    def _chunks(self, addr, size):
+        """Splits a region into per-page chunks.
+
+        Args:
+          self (MemoryCache): the ``MemoryCache`` instance
+          addr (int): start address of the region
+          size (int): size of the region in bytes
+
+        Returns:
+          A list of ``(page_addr, page_offset, region_offset, num_bytes)``.
+        """
+        chunks = []
+        pos, end = addr, addr + size
+        while pos < end:
+            page_addr = pos - (pos % self.page_size)
+            offset = pos - page_addr
+            num_bytes = min(end - pos, self.page_size - offset)
+            chunks.append((page_addr, offset, pos - addr, num_bytes))
+            pos += num_bytes
+        return chunks
+
+    def read(self, addr, size, zone=None):
+        """Reads a region through the cache.
+
+        Args:
+          self (MemoryCache): the ``MemoryCache`` instance
+          addr (int): start address to read from
+          size (int): number of bytes to read
+          zone (str): optional memory zone name
+
+        Returns:
+          The ``bytearray`` read, or ``None`` if a page could not be read.
+        """
+        data = bytearray(size)
+        for (page_addr, offset, pos, num_bytes) in self._chunks(addr, size):
+            page = self._page(zone, page_addr)
+            if page is None:
+                return None
+            data[pos:pos + num_bytes] = page[offset:offset + num_bytes]
+        return data
+
+    def write(self, addr, data, zone=None):
+        """Buffers a write to a region in the cache.
+
+        All pages covering the region are read into the cache first, so that
+        the write is either buffered in full, or not at all.
+
+        Args:
+          self (MemoryCache): the ``MemoryCache`` instance
+          addr (int): start address to write to
+          data (bytes): data to write
+          zone (str): optional memory zone name
+
+        Returns:
+          ``True`` if the write was buffered, otherwise ``False``.
+        """
+        chunks = self._chunks(addr, len(data))
+        if len(chunks) > self.max_pages:
+            return False
+
+        pages = [self._page(zone, chunk[0]) for chunk in chunks]
+        if any(page is None for page in pages):
+            return False
+
+        for (page, (page_addr, offset, pos, num_bytes)) in zip(pages, chunks):
+            page[offset:offset + num_bytes] = data[pos:pos + num_bytes]
+
+            key = (zone, page_addr)
+            lo, hi = self._dirty.get(key, (offset, offset + num_bytes))
+            self._dirty[key] = (min(lo, offset), max(hi, offset + num_bytes))
+
+        return True
+
+    def update(self, addr, data, zone=None):
+        """Updates any cached pages with data written to the target.
+
+        Args:
+          self (MemoryCache): the ``MemoryCache`` instance
+          addr (int): start address that was written to
+          data (bytes): data that was written
+          zone (str): optional memory zone name
+
+        Returns:
+          ``None``
+        """
+        for (page_addr, offset, pos, num_bytes) in self._chunks(addr, len(data)):
+            page = self._pages.get((zone, page_addr))
+            if page is not None:
+                page[offset:offset + num_bytes] = data[pos:pos + num_bytes]
+
+    def discard(self, addr, size, zone=None):
+        """Removes the pages covering a region, writing back dirty bytes.
+
+        Args:
+          self (MemoryCache): the ``MemoryCache`` instance
+          addr (int): start address of the region
+          size (int): size of the region in bytes
+          zone (str): optional memory zone name
+
+        Returns:
+          ``None``
+        """
+        if size <= 0:
+            return None
+
+        for page_addr in self._page_range(addr, size):
+            key = (zone, page_addr)
+            if key in self._pages:
+                self._evict(key)
+
+        return None
+
+    def flush(self):
+        """Writes all dirty bytes back to the target.
+
+        Args:
+          self (MemoryCache): the ``MemoryCache`` instance
+
+        Returns:
+          ``None``
+        """
+        while self._dirty:
+            (key, (lo, hi)) = self._dirty.popitem()
+            zone, page_addr = key
+            self._writer(page_addr + lo, bytes(self._pages[key][lo:hi]), zone)
+
+        return None
+
+    def invalidate(self):
+        """Flushes the cache and then drops all cached pages.
+
+        Args:
+          self (MemoryCache): the ``MemoryCache`` instance
+
+        Returns:
+          ``None``
+        """
+        try:
+            self.flush()
+        finally:
+            self.clear()
+
+    def clear(self):
+        """Drops all cached pages, including any unflushed writes.
+
+        Args:
+          self (MemoryCache): the ``MemoryCache`` instance
+
+        Returns:
+          ``None``
+        """
+        self._pages.clear()
+        self._dirty.clear()
@@ -0,0 +1,262 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import multiprocessing
+import queue
+import time
+
+
+BoardResult = collections.namedtuple('BoardResult', [
+    'serial_no',
+    'success',
+    'result',
+    'error',
+    'elapsed',
+    'timings',
+])
+BoardResult.__doc__ = """Result of running an operation on a single board.
+
+Attributes:
+  serial_no: serial number of the J-Link the board is attached to.
+  success: ``True`` if the operation succeeded, otherwise ``False``.
+  result: value returned by the operation, or ``None`` if it failed.
+  error: description of the error the operation failed with, or ``None``.
+  elapsed: number of seconds the operation took.
+  timings: dictionary of the number of seconds taken by each phase of the
+    operation.
+"""
+
+# Default number of seconds a board may take before its worker is terminated.
+BOARD_TIMEOUT = 120.0
+
+
+def _worker(func, serial_no, args, results):
+    """Runs an operation on a board in a worker process.
+
+    Args:
+      func (function): the operation, called as ``func(serial_no, *args)``,
+        which returns a tuple of ``(success, result, timings)``
+      serial_no (int): serial number of the J-Link the board is attached to
+      args (tuple): additional arguments to pass to ``func``
+      results (multiprocessing.Queue): queue to put the ``BoardResult`` on
+
+    Returns:
+      ``None``
+    """
+    start = time.monotonic()
+    try:
+        (success, result, timings) = func(serial_no, *args)
+        error = None
+    except Exception as e:
+        (success, result, timings) = (False, None, {})
+        error = '%s: %s' % (e.__class__.__name__, e)
+    elapsed = time.monotonic() - start
+    results.put(BoardResult(serial_no, bool(success), result, error, elapsed, timings))
+
+
+def run(serial_nos, func, args=(), timeout=BOARD_TIMEOUT, max_workers=None, context=None):
+    """Runs an operation on several boards concurrently.
+
+    Each board is handled in its own worker process, as the J-Link DLL keeps
+    per-process state.  A board whose operation raises an exception, whose
+    worker exits without a result, or that does not finish within the timeout
+    fails on its own, and its worker is terminated, without affecting the
+    other boards.
+
+    Args:
+      serial_nos (list): serial numbers of the J-Links the boards are
+        attached to
+      func (function): module-level function called in each worker as
+        ``func(serial_no, *args)``, which returns a tuple of ``(success,
+        result, timings)``
+      args (tuple): additional arguments to pass to ``func``
+      timeout (float): number of seconds each board may take
+      max_workers (int): maximum number of boards to handle at once, defaults
+        to all of them
+      context (str): the ``multiprocessing`` start method, defaults to
+        ``'spawn'``, so that workers do not inherit a loaded DLL
+
+    Returns:
+      A list of ``BoardResult``, in the order of ``serial_nos``.
+
+    Raises:
+      ValueError: if a serial number is repeated, or ``max_workers`` is not
+        positive.
+    """
+    serial_nos = list(serial_nos)
+    if len(set(serial_nos)) != len(serial_nos):
+        raise ValueError('Serial numbers must be unique.')
+
+    if max_workers is None:
+        max_workers = max(len(serial_nos), 1)
+    elif max_workers <= 0:
+        raise ValueError('Maximum number of workers must be greater than 0.')
+
+    ctx = multiprocessing.get_context(context or 'spawn')
+    results_queue = ctx.Queue()
+    pending = collections.deque(serial_nos)
+    running = {}
+    results = {}
+
+    def _fail(serial_no, started, error):
+        results[serial_no] = BoardResult(serial_no, False, None, error, time.monotonic() - started, {})
+
+    while pending or running:
+        while pending and len(running) < max_workers:
+            serial_no = pending.popleft()
+            process = ctx.Process(target=_worker, args=(func, serial_no, tuple(args), results_queue))
+            process.daemon = True
+            process.start()
+            running[serial_no] = (process, time.monotonic())
+
+        try:
+            result = results_queue.get(timeout=0.05)
+            results[result.serial_no] = result
+        except queue.Empty:
+            pass
+
+        for (serial_no, (process, started)) in list(running.items()):
+            if serial_no in results:
+                process.join()
+            elif time.monotonic() - started > timeout:
+                process.terminate()
+                process.join()
+                _fail(serial_no, started, 'Timed out after %.1f seconds.' % timeout)
+            elif not process.is_alive():
+                # The worker may have put its result just before exiting.
+                try:
+                    result = results_queue.get(timeout=0.5)
+                    results[result.serial_no] = result
+                except queue.Empty:
+                    pass
+
+                if serial_no not in results:
+                    _fail(serial_no, started, 'Worker exited with code %s.' % process.exitcode)
+            else:
+                continue
+
+            del running[serial_no]
+
+    results_queue.close()
+    return [results[serial_no] for serial_no in serial_nos]
+
+
+def _open(serial_no, tif, device, timings):
+    """Opens a J-Link and connects to its target device.
+
+    Args:
+      serial_no (int): serial number of the J-Link
+      tif (int): the target interface, an attribute of ``JLinkInterfaces``
+      device (str): the target device name
+      timings (dict): dictionary to record the phase timings in
+
+    Returns:
+      The ``JLink`` instance.
+    """
+    from . import jlink
+
+    start = time.monotonic()
+    link = jlink.JLink()
+    link.open(serial_no)
+    link.set_tif(tif)
+    timings['open'] = time.monotonic() - start
+
+    start = time.monotonic()
+    link.connect(device)
+    timings['connect'] = time.monotonic() - start
+    return link
+
+
+def _unlock_board(serial_no, name, tif, device, kwargs):
+    """Unlocks the target device of a single J-Link.
+
+    Args:
+      serial_no (int): serial number of the J-Link
+      name (str): the MCU name (e.g. Kinetis)
+      tif (int): the target interface, an attribute of ``JLinkInterfaces``
+      device (str): the target device name
+      kwargs (dict): options to pass to the MCU's unlock method
+
+    Returns:
+      A tuple of ``(success, result, timings)``.
+    """
+    from . import unlockers
+
+    timings = {}
+    link = _open(serial_no, tif, device, timings)
+    try:
+        unlocked = unlockers.unlock(link, name, timings=timings, **kwargs)
+    finally:
+        link.close()
+    return (unlocked, unlocked, timings)
+
+
+def _erase_board(serial_no, tif, device):
+    """Erases the target device of a single J-Link.
+
+    Args:
+      serial_no (int): serial number of the J-Link
+      tif (int): the target interface, an attribute of ``JLinkInterfaces``
+      device (str): the target device name
+
+    Returns:
+      A tuple of ``(success, result, timings)``, where the result is the
+      number of bytes erased.
+    """
+    timings = {}
+    link = _open(serial_no, tif, device, timings)
+    try:
+        start = time.monotonic()
+        erased = link.erase()
+        timings['erase'] = time.monotonic() - start
+    finally:
+        link.close()
+    return (True, erased, timings)
+
+
+def unlock(serial_nos, name, tif, device, timeout=BOARD_TIMEOUT, max_workers=None, **kwargs):
+    """Unlocks the target devices of several J-Links concurrently.
+
+    Args:
+      serial_nos (list): serial numbers of the J-Links
+      name (str): the MCU name (e.g. Kinetis), see ``unlockers.unlock()``
+      tif (int): the target interface, an attribute of ``JLinkInterfaces``
+      device (str): the target device name
+      timeout (float): number of seconds each board may take
+      max_workers (int): maximum number of boards to unlock at once
+      kwargs (dict): options to pass to the MCU's unlock method
+
+    Returns:
+      A list of ``BoardResult``, in the order of ``serial_nos``, whose
+      timings include the phases of the unlock.
+    """
+    return run(serial_nos, _unlock_board, (name, tif, device, kwargs), timeout, max_workers)
+
+
+def erase(serial_nos, tif, device, timeout=BOARD_TIMEOUT, max_workers=None):
+    """Erases the target devices of several J-Links concurrently.
+
+    Args:
+      serial_nos (list): serial numbers of the J-Links
+      tif (int): the target interface, an attribute of ``JLinkInterfaces``
+      device (str): the target device name
+      timeout (float): number of seconds each board may take
+      max_workers (int): maximum number of boards to erase at once
+
+    Returns:
+      A list of ``BoardResult``, in the order of ``serial_nos``, whose result
+      is the number of bytes erased.
+    """
+    return run(serial_nos, _erase_board, (tif, device), timeout, max_workers)
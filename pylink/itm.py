@@ -0,0 +1,459 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+
+
+class Sync(collections.namedtuple('Sync', [])):
+    """Synchronization packet."""
+    __slots__ = ()
+
+
+class Overflow(collections.namedtuple('Overflow', [])):
+    """Overflow packet, sent when the ITM or DWT FIFO overflowed."""
+    __slots__ = ()
+
+
+class LocalTimestamp(collections.namedtuple('LocalTimestamp', ['delta', 'relation'])):
+    """Local timestamp packet.
+
+    Attributes:
+      delta: number of timestamp clock cycles since the previous local
+        timestamp.
+      relation: relation of the timestamp to the packet it precedes, ``0`` if
+        synchronous, ``1`` if the timestamp was delayed, ``2`` if the packet
+        was delayed, and ``3`` if both were delayed.
+    """
+    __slots__ = ()
+
+
+class GlobalTimestamp1(collections.namedtuple('GlobalTimestamp1', ['timestamp', 'clock_change', 'wrap'])):
+    """Global timestamp packet holding bits ``[25:0]`` of the timestamp.
+
+    Attributes:
+      timestamp: the low order bits of the global timestamp that were sent.
+      clock_change: ``True`` if the system clock has changed.
+      wrap: ``True`` if the high order bits have changed since the last
+        ``GlobalTimestamp2`` packet.
+    """
+    __slots__ = ()
+
+
+class GlobalTimestamp2(collections.namedtuple('GlobalTimestamp2', ['timestamp'])):
+    """Global timestamp packet holding the high order bits of the timestamp.
+
+    Attributes:
+      timestamp: the high order bits of the global timestamp, shifted into
+        place, i.e. the low 26 bits are zero.
+    """
+    __slots__ = ()
+
+
+class Extension(collections.namedtuple('Extension', ['value', 'hardware'])):
+    """Extension packet.
+
+    Attributes:
+      value: the extension information.
+      hardware: ``True`` if sent by hardware, ``False`` if sent by the ITM,
+        in which case the value is the stimulus port page.
+    """
+    __slots__ = ()
+
+
+class Stimulus(collections.namedtuple('Stimulus', ['port', 'value', 'size'])):
+    """Instrumentation packet written by software to a stimulus port.
+
+    Attributes:
+      port: the stimulus port number, including its page.
+      value: the value written to the port.
+      size: size of the value in bytes.
+    """
+    __slots__ = ()
+
+
+class EventCounter(collections.namedtuple('EventCounter', ['counters'])):
+    """DWT event counter packet.
+
+    Attributes:
+      counters: bit mask of the counters that wrapped, see the ``EVENT_*``
+        constants of ``ITMDecoder``.
+    """
+    __slots__ = ()
+
+
+class ExceptionTrace(collections.namedtuple('ExceptionTrace', ['exception', 'function'])):
+    """DWT exception trace packet.
+
+    Attributes:
+      exception: the exception number.
+      function: ``1`` on entry to the exception, ``2`` on exit from it, and
+        ``3`` on return to it.
+    """
+    __slots__ = ()
+
+
+class PCSample(collections.namedtuple('PCSample', ['pc'])):
+    """DWT periodic PC sample packet.
+
+    Attributes:
+      pc: the sampled program counter, or ``None`` if the processor was
+        asleep.
+    """
+    __slots__ = ()
+
+
+class DataTracePC(collections.namedtuple('DataTracePC', ['comparator', 'pc'])):
+    """DWT data trace packet with the PC of an access that matched.
+
+    Attributes:
+      comparator: index of the DWT comparator that matched.
+      pc: the program counter of the access.
+    """
+    __slots__ = ()
+
+
+class DataTraceAddress(collections.namedtuple('DataTraceAddress', ['comparator', 'address'])):
+    """DWT data trace packet with the address of an access that matched.
+
+    Attributes:
+      comparator: index of the DWT comparator that matched.
+      address: the low 16 bits of the data address.
+    """
+    __slots__ = ()
+
+
+class DataTraceValue(collections.namedtuple('DataTraceValue', ['comparator', 'value', 'size', 'write'])):
+    """DWT data trace packet with the value of an access that matched.
+
+    Attributes:
+      comparator: index of the DWT comparator that matched.
+      value: the data value.
+      size: size of the value in bytes.
+      write: ``True`` for a write access, ``False`` for a read access.
+    """
+    __slots__ = ()
+
+
+# Kinds of packet, by header byte.
+_ZERO = 0
+_OVERFLOW = 1
+_LOCAL_TS = 2
+_LOCAL_TS_SHORT = 3
+_GLOBAL_TS1 = 4
+_GLOBAL_TS2 = 5
+_EXTENSION = 6
+_SOFTWARE = 7
+_HARDWARE = 8
+_RESERVED = 9
+
+
+def _header_kind(header):
+    """Classifies a packet header byte.
+
+    Args:
+      header (int): the header byte
+
+    Returns:
+      The kind of packet that the header starts.
+    """
+    if header == 0x00:
+        return _ZERO
+    elif header == 0x70:
+        return _OVERFLOW
+    elif header & 0x03:
+        return _HARDWARE if header & 0x04 else _SOFTWARE
+    elif header & 0xCF == 0xC0:
+        return _LOCAL_TS
+    elif header & 0x8F == 0x00:
+        return _LOCAL_TS_SHORT
+    elif header == 0x94:
+        return _GLOBAL_TS1
+    elif header == 0xB4:
+        return _GLOBAL_TS2
+    elif header & 0x0B == 0x08:
+        return _EXTENSION
+    return _RESERVED
+
+
+# Kind of packet for each header byte.
+_HEADER_KINDS = tuple(_header_kind(header) for header in range(256))
+
+# Payload size of a source packet, by its size field.
+_SOURCE_SIZES = (0, 1, 2, 4)
+
+# Payload size of a stimulus packet, by its header byte, or ``0`` if the
+# header does not start a stimulus packet.
+_STIMULUS_SIZES = tuple(_SOURCE_SIZES[header & 0x3] if _HEADER_KINDS[header] == _SOFTWARE else 0
+                        for header in range(256))
+
+# Discriminator IDs of the DWT hardware source packets that are not reserved.
+_HARDWARE_DISCRIMINATORS = frozenset([0, 1, 2] + list(range(8, 24)))
+
+# Maximum number of continuation bytes after each kind of header.
+_MAX_CONTINUATION = {
+    _LOCAL_TS: 4,
+    _GLOBAL_TS1: 4,
+    _GLOBAL_TS2: 6,
+    _EXTENSION: 4,
+}
+
+
+class ITMDecoder(object):
+    """Incremental decoder of ITM and DWT packets in SWO data.
+
+    Data is fed to the decoder in chunks, which may split packets anywhere.
+    The bytes of a packet that is incomplete at the end of a chunk are kept
+    until the next chunk, so decoding resumes where it left off.  Each header
+    byte is classified with a lookup table, and the payload of a complete
+    packet is decoded with a single slice.
+
+    The payloads written to stimulus ports are also demultiplexed into a
+    separate byte stream for each port, which can be read with ``read()``.
+
+    Attributes:
+      ports: set of the stimulus ports that are demultiplexed, or ``None`` for
+        all of them.
+      syncs: number of synchronization packets decoded.
+      overflows: number of overflow packets decoded.
+      errors: number of bytes skipped because they were not a valid header.
+    """
+
+    # Bits of an ``EventCounter`` packet.
+    EVENT_CPI = (1 << 0)
+    EVENT_EXC = (1 << 1)
+    EVENT_SLEEP = (1 << 2)
+    EVENT_LSU = (1 << 3)
+    EVENT_FOLD = (1 << 4)
+    EVENT_CYC = (1 << 5)
+
+    # Number of zero bytes that, followed by ``0x80``, form a sync packet.
+    SYNC_ZEROS = 5
+
+    def __init__(self, ports=None):
+        """Initializes the decoder.
+
+        Args:
+          self (ITMDecoder): the ``ITMDecoder`` instance
+          ports (list): stimulus ports to demultiplex, defaults to all
+
+        Returns:
+          ``None``
+        """
+        self.ports = None if ports is None else set(ports)
+        self.reset()
+
+    def reset(self):
+        """Drops any partial packet, demultiplexed data and counters.
+
+        Args:
+          self (ITMDecoder): the ``ITMDecoder`` instance
+
+        Returns:
+          ``None``
+        """
+        self.syncs = 0
+        self.overflows = 0
+        self.errors = 0
+        self._pending = b''
+        self._zeros = 0
+        self._page = 0
+        self._streams = collections.defaultdict(bytearray)
+
+    def read(self, port):
+        """Reads the data demultiplexed from a stimulus port.
+
+        Args:
+          self (ITMDecoder): the ``ITMDecoder`` instance
+          port (int): the stimulus port
+
+        Returns:
+          The ``bytes`` written to the port since it was last read.
+        """
+        stream = self._streams.pop(port, None)
+        return b'' if stream is None else bytes(stream)
+
+    def _hardware(self, discriminator, value, size):
+        """Decodes a DWT hardware source packet.
+
+        Args:
+          self (ITMDecoder): the ``ITMDecoder`` instance
+          discriminator (int): the discriminator ID from the header
+          value (int): the payload
+          size (int): size of the payload in bytes
+
+        Returns:
+          The decoded packet, or ``None`` if the discriminator is reserved.
+        """
+        if discriminator == 0:
+            return EventCounter(value & 0x3F)
+        elif discriminator == 1:
+            return ExceptionTrace(value & 0x1FF, (value >> 12) & 0x3)
+        elif discriminator == 2:
+            return PCSample(value if size == 4 else None)
+        elif 8 <= discriminator <= 15:
+            comparator = (discriminator >> 1) & 0x3
+            if discriminator & 0x1:
+                return DataTraceAddress(comparator, value)
+            return DataTracePC(comparator, value)
+        elif 16 <= discriminator <= 23:
+            return DataTraceValue((discriminator >> 1) & 0x3, value, size, bool(discriminator & 0x1))
+        return None
+
+    def feed(self, data, packets=True):
+        """Decodes a chunk of SWO data.
+
+        Args:
+          self (ITMDecoder): the ``ITMDecoder`` instance
+          data (bytes): the chunk of data
+          packets (bool): ``False`` to only demultiplex the stimulus ports and
+            count the sync and overflow packets, which is faster
+
+        Returns:
+          A list of the packets completed by the chunk, empty if ``packets``
+          is ``False``.
+        """
+        data = self._pending + bytes(data)
+        length = len(data)
+        kinds = _HEADER_KINDS
+        stimulus_sizes = _STIMULUS_SIZES
+        streams = self._streams
+        ports = self.ports
+        zeros = self._zeros
+        page = self._page << 5
+        decoded = []
+        append = decoded.append
+
+        pos = 0
+        while pos < length:
+            header = data[pos]
+
+            # Stimulus packets are by far the most common, so are decoded
+            # first, without classifying the header.
+            size = stimulus_sizes[header]
+            if size:
+                end = pos + 1 + size
+                if end > length:
+                    break
+
+                port = page | (header >> 3)
+                if ports is None or port in ports:
+                    streams[port] += data[pos + 1:end]
+                if packets:
+                    value = data[pos + 1] if size == 1 else int.from_bytes(data[pos + 1:end], 'little')
+                    append(Stimulus(port, value, size))
+                zeros = 0
+                pos = end
+                continue
+
+            kind = kinds[header]
+            if kind == _ZERO:
+                zeros += 1
+                pos += 1
+                continue
+
+            if kind == _HARDWARE:
+                size = _SOURCE_SIZES[header & 0x3]
+                end = pos + 1 + size
+                if end > length:
+                    break
+
+                if packets:
+                    value = int.from_bytes(data[pos + 1:end], 'little')
+                    packet = self._hardware(header >> 3, value, size)
+                    if packet is None:
+                        self.errors += 1
+                    else:
+                        append(packet)
+                elif (header >> 3) not in _HARDWARE_DISCRIMINATORS:
+                    self.errors += 1
+                pos = end
+            elif kind == _OVERFLOW:
+                self.overflows += 1
+                if packets:
+                    append(Overflow())
+                pos += 1
+            elif kind == _LOCAL_TS_SHORT:
+                if packets:
+                    append(LocalTimestamp((header >> 4) & 0x7, 0))
+                pos += 1
+            elif kind == _RESERVED:
+                if header == 0x80 and zeros >= self.SYNC_ZEROS:
+                    self.syncs += 1
+                    page = 0
+                    if packets:
+                        append(Sync())
+                else:
+                    self.errors += 1
+                pos += 1
+            else:
+                # A header followed by continuation bytes, each of which has
+                # its top bit set if another byte follows.
+                end = pos + 1
+                if kind != _EXTENSION or header & 0x80:
+                    limit = min(length, end + _MAX_CONTINUATION[kind])
+                    while end < limit and data[end] & 0x80:
+                        end += 1
+                    if end == limit:
+                        if limit == length:
+                            break
+                        # The packet is too long to be valid.
+                        self.errors += 1
+                        zeros = 0
+                        pos += 1
+                        continue
+                    end += 1
+
+                value = 0
+                for (shift, byte) in enumerate(data[pos + 1:end]):
+                    value |= (byte & 0x7F) << (7 * shift)
+
+                if kind == _EXTENSION:
+                    value = ((header >> 4) & 0x7) | (value << 3)
+                    hardware = bool(header & 0x4)
+                    if not hardware:
+                        page = value << 5
+                    if packets:
+                        append(Extension(value, hardware))
+                elif packets:
+                    if kind == _LOCAL_TS:
+                        append(LocalTimestamp(value, (header >> 4) & 0x3))
+                    elif kind == _GLOBAL_TS1:
+                        last = data[end - 1] if end - pos == 5 else 0
+                        append(GlobalTimestamp1(value & 0x3FFFFFF, bool(last & 0x20), bool(last & 0x40)))
+                    else:
+                        append(GlobalTimestamp2(value << 26))
+                pos = end
+
+            zeros = 0
+
+        self._pending = data[pos:]
+        self._zeros = zeros
+        self._page = page >> 5
+        return decoded
+
+    def decode_stream(self, stream, packets=True):
+        """Decodes the data read from a stream of SWO data.
+
+        Args:
+          self (ITMDecoder): the ``ITMDecoder`` instance
+          stream (SWOStream): the stream to read from, or any iterable of
+            ``bytes``
+          packets (bool): ``False`` to only demultiplex the stimulus ports
+
+        Returns:
+          An iterator over the decoded packets.
+        """
+        for data in stream:
+            for packet in self.feed(data, packets):
+                yield packet
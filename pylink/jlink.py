@@ -13,21 +13,28 @@
 # limitations under the License.
 
 from . import binpacker
+from . import cache
 from . import decorators
 from . import enums
 from . import errors
+from . import itm
 from . import jlock
 from . import library
+from . import snapshot
 from . import structs
+from . import swo
 from . import unlockers
 from . import util
 
+import array
+import contextlib
 import ctypes
 import datetime
 import functools
 import itertools
 import logging
 import math
+import mmap
 import operator
 import os
 import sys
@@ -70,6 +77,28 @@ class JLink(object):
     # Maximum number of methods of debug entry at a single time.
     MAX_NUM_MOES = 8
 
+    # Minimum size in bytes of the SWO buffers set by `swo_auto_configure()`.
+    MIN_SWO_BUFFER_SIZE = 0x1000
+
+    # Mapping of DLL access widths to the ``ctypes`` unit type and the
+    # ``array`` type code used to pack units of that width.
+    _MEMORY_ACCESS_CTYPES = {
+        0: ctypes.c_uint8,
+        1: ctypes.c_uint8,
+        2: ctypes.c_uint16,
+        4: ctypes.c_uint32,
+    }
+
+    _MEMORY_ACCESS_TYPECODES = {
+        1: 'B',
+        2: 'H',
+        4: 'I',
+    }
+
+    # Buffer formats of native integers, which are written as is when they
+    # are as wide as the access width.
+    _MEMORY_INTEGER_FORMATS = frozenset('bBhHiIlLqQnN')
+
     def minimum_required(version):
         """Decorator to specify the minimum SDK version required.
 
@@ -136,11 +165,13 @@ class JLink(object):
               JLinkException: if the J-Link DLL is not open or the J-Link is
                   disconnected.
             """
-            if not self.opened():
-                raise errors.JLinkException('J-Link DLL is not open.')
-            elif not self.connected():
-                raise errors.JLinkException('J-Link connection has been lost.')
-            return func(self, *args, **kwargs)
+            if not self._state_trusted('open', 3):
+                if not self.opened():
+                    raise errors.JLinkException('J-Link DLL is not open.')
+                elif not self.connected():
+                    raise errors.JLinkException('J-Link connection has been lost.')
+                self._state_checked('open')
+            return self._state_call(func, args, kwargs)
         return wrapper
 
     def connection_required(func):
@@ -169,9 +200,11 @@ class JLink(object):
             Raises:
               JLinkException: if the JLink's target is not connected.
             """
-            if not self.target_connected():
-                raise errors.JLinkException('Target is not connected.')
-            return func(self, *args, **kwargs)
+            if not self._state_trusted('target', 3):
+                if not self.target_connected():
+                    raise errors.JLinkException('Target is not connected.')
+                self._state_checked('open', 'target')
+            return self._state_call(func, args, kwargs)
         return wrapper
 
     def coresight_configuration_required(func):
@@ -200,9 +233,14 @@ class JLink(object):
             Raises:
               JLinkException: if the JLink's target is not connected.
             """
-            if not self.target_connected() and not self._coresight_configured:
-                raise errors.JLinkException('Target is not connected neither coresight is not configured.')
-            return func(self, *args, **kwargs)
+            if not (self._state_trusted('target', 3) or self._state_trusted('coresight', 3)):
+                if self.target_connected():
+                    self._state_checked('open', 'target')
+                elif not self._coresight_configured:
+                    raise errors.JLinkException('Target is not connected neither coresight is not configured.')
+                else:
+                    self._state_checked('coresight')
+            return self._state_call(func, args, kwargs)
         return wrapper
 
     def interface_required(interface):
@@ -315,6 +353,18 @@ class JLink(object):
 
         self._coresight_configured = False
 
+        # Optional host-side cache of target memory pages.
+        self._memory_cache = None
+
+        # Mapping of register names to indices for the connected core.
+        self._register_map = None
+
+        # State of a trusted session, in which the DLL state checks done by
+        # the decorators are skipped while they are known to be fresh.
+        self._trusted_interval = None
+        self._trusted_checked = {}
+        self._trusted_calls_saved = 0
+
         # Bind Types for function calls.
         self._dll.JLINKARM_OpenEx.restype = ctypes.POINTER(ctypes.c_char)
         self._dll.JLINKARM_GetCompileDateTime.restype = ctypes.POINTER(ctypes.c_char)
@@ -421,6 +471,9 @@ class JLink(object):
         """
         Converts a register name to a register index
 
+        The mapping of register names to indices is built once per connected
+        core, see ``register_map()``.
+
         Args:
             self (JLink): the ``JLink`` instance
             register (str): the register name
@@ -428,14 +481,118 @@ class JLink(object):
         Returns:
           ``int``
         """
-        regs = list(self.register_name(idx) for idx in self.register_list())
-        if isinstance(register, six.string_types):
-            try:
-                result = regs.index(register)
-            except ValueError:
-                error_message = "No register found matching name: {}. (available registers: {})"
-                raise errors.JLinkException(error_message.format(register, ', '.join(regs)))
-        return result
+        regs = self._register_map
+        if regs is None:
+            regs = self.register_map()
+
+        try:
+            return regs[register]
+        except KeyError:
+            error_message = "No register found matching name: {}. (available registers: {})"
+            raise errors.JLinkException(error_message.format(register, ', '.join(regs)))
+
+    @contextlib.contextmanager
+    def trusted_session(self, interval=1.0):
+        """Context manager that skips redundant DLL state checks.
+
+        Methods that require the J-Link to be open, or a target to be
+        connected, normally query the DLL for that state before every call.
+        Within a trusted session, a state that has been verified is trusted
+        for ``interval`` seconds instead, and is verified again only after
+        the interval expires, or after a call raises a ``JLinkException``.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          interval (float): number of seconds for which a verified state is
+            trusted
+
+        Returns:
+          A context manager yielding the ``JLink`` instance.
+
+        Raises:
+          ValueError: if ``interval`` is negative.
+        """
+        if interval < 0:
+            raise ValueError('Interval must be non-negative.')
+
+        previous = self._trusted_interval
+        self._trusted_interval = interval
+        try:
+            yield self
+        finally:
+            self._trusted_interval = previous
+            if previous is None:
+                self._trusted_checked.clear()
+
+    @property
+    def trusted_calls_saved(self):
+        """Returns the number of DLL state checks skipped by trusted sessions.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+
+        Returns:
+          The number of DLL calls saved.
+        """
+        return self._trusted_calls_saved
+
+    def _state_trusted(self, state, num_calls):
+        """Returns whether a DLL state check can be skipped.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          state (str): the state to check
+          num_calls (int): number of DLL calls the check would take
+
+        Returns:
+          ``True`` if the state was verified within a trusted session and has
+          not expired, otherwise ``False``.
+        """
+        if self._trusted_interval is None:
+            return False
+
+        checked = self._trusted_checked.get(state)
+        if checked is None or (time.monotonic() - checked) > self._trusted_interval:
+            return False
+
+        self._trusted_calls_saved += num_calls
+        return True
+
+    def _state_checked(self, *states):
+        """Records that DLL states have been verified.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          states (list): the states that were verified
+
+        Returns:
+          ``None``
+        """
+        if self._trusted_interval is not None:
+            now = time.monotonic()
+            for state in states:
+                self._trusted_checked[state] = now
+
+    def _state_call(self, func, args, kwargs):
+        """Calls a method wrapped by a state checking decorator.
+
+        If the method raises a ``JLinkException``, all verified states are
+        forgotten, so that they are checked again on the next call.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          func (function): the wrapped method
+          args (list): list of arguments to pass to ``func``
+          kwargs (dict): key-word arguments dict to pass to ``func``
+
+        Returns:
+          The return value of the wrapped method.
+        """
+        try:
+            return func(self, *args, **kwargs)
+        except errors.JLinkException:
+            self._trusted_checked.clear()
+            raise
 
     def opened(self):
         """Returns whether the DLL is open.
@@ -703,6 +860,8 @@ class JLink(object):
             self._open_refcount += 1
             return None
 
+        self._trusted_checked.clear()
+
         # For some reason, the J-Link driver complains if this isn't called
         # first (may have something to do with it trying to establish a
         # connection).  Without this call, it will log an error stating
@@ -782,6 +941,8 @@ class JLink(object):
 
         Raises:
           JLinkException: if there is no connected JLink.
+          JLinkWriteException: if writes buffered in the memory cache fail to
+            be written to the target; the J-Link is closed regardless.
         """
         if self._open_refcount == 0:
             # Do nothing if .open() has not been called.
@@ -793,11 +954,19 @@ class JLink(object):
 
         self._coresight_configured = False
 
-        self._dll.JLINKARM_Close()
+        try:
+            # Writes buffered in a write-back cache must reach the target
+            # before the connection to it is closed.
+            self._memory_cache_invalidate()
+        finally:
+            self._register_map = None
+            self._trusted_checked.clear()
+
+            self._dll.JLINKARM_Close()
 
-        if self._lock is not None:
-            del self._lock
-            self._lock = None
+            if self._lock is not None:
+                del self._lock
+                self._lock = None
 
         return None
 
@@ -1089,7 +1258,7 @@ class JLink(object):
         if self.tif == enums.JLinkInterfaces.SWD:
             # No special setup is needed for SWD, just need to output the
             # switching sequence.
-            res = self._dll.JLINKARM_CORESIGHT_Configure('')
+            res = self._dll.JLINKARM_CORESIGHT_Configure(b'')
             if res < 0:
                 raise errors.JLinkException(res)
 
@@ -1127,9 +1296,18 @@ class JLink(object):
 
         Raises:
           JLinkException: if connection fails to establish.
+          JLinkWriteException: if writes buffered in the memory cache fail to
+            be written to the target.
           TypeError: if given speed is invalid
         """
 
+        # Writes buffered in a write-back cache are flushed to the target
+        # before reconnecting to it.
+        self._memory_cache_invalidate()
+
+        self._register_map = None
+        self._trusted_checked.clear()
+
         if verbose:
             self.exec_command('EnableRemarks = 1')
 
@@ -1750,6 +1928,7 @@ class JLink(object):
             return False
 
         self._tif = interface
+        self._register_map = None
         return True
 
     @open_required
@@ -2155,6 +2334,8 @@ class JLink(object):
         Returns:
           Number of bytes erased.
         """
+        self._memory_cache_invalidate()
+
         try:
             # This has to be in a try-catch, as the device may not be in a
             # state where it can halt, but we still want to try and erase.
@@ -2196,6 +2377,8 @@ class JLink(object):
         if flags != 0:
             raise errors.JLinkException('Flags are reserved for future use.')
 
+        self._memory_cache_invalidate()
+
         if on_progress is not None:
             # Set the function to be called on flash programming progress.
             func = enums.JLinkFunctions.FLASH_PROGRESS_PROTOTYPE(on_progress)
@@ -2215,7 +2398,7 @@ class JLink(object):
             pass
 
         # Perform read-modify-write operation.
-        self._dll.JLINKARM_BeginDownload(flags=flags)
+        self._dll.JLINKARM_BeginDownload(flags)
 
         if isinstance(data, list):
             data = bytes(data)
@@ -2250,6 +2433,8 @@ class JLink(object):
         Raises:
           JLinkException: on hardware errors.
         """
+        self._memory_cache_invalidate()
+
         if on_progress is not None:
             # Set the function to be called on flash programming progress.
             func = enums.JLinkFunctions.FLASH_PROGRESS_PROTOTYPE(on_progress)
@@ -2290,6 +2475,8 @@ class JLink(object):
         Returns:
           Number of bytes read.
         """
+        self._memory_cache_invalidate()
+
         self._dll.JLINKARM_SetResetDelay(ms)
 
         res = self._dll.JLINKARM_Reset()
@@ -2345,6 +2532,8 @@ class JLink(object):
         if skip_breakpoints:
             flags = flags | enums.JLinkFlags.GO_OVERSTEP_BP
 
+        self._memory_cache_invalidate()
+
         self._dll.JLINKARM_GoEx(num_instructions, flags)
 
         return True
@@ -2516,6 +2705,28 @@ class JLink(object):
         result = self._dll.JLINKARM_GetRegisterName(register_index)
         return ctypes.cast(result, ctypes.c_char_p).value.decode()
 
+    @connection_required
+    def register_map(self):
+        """Returns the mapping of CPU register names to register indices.
+
+        The mapping is built once for the connected core, and is rebuilt after
+        the J-Link is reconnected, closed, or the target interface changes.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+
+        Returns:
+          A dictionary mapping each register name to its index, in the order
+          given by ``register_list()``.
+        """
+        if self._register_map is None:
+            regs = dict((self.register_name(idx), idx) for idx in self.register_list())
+            # Do not cache an empty map, as the core may not be ready yet.
+            if not regs:
+                return {}
+            self._register_map = regs
+        return dict(self._register_map)
+
     @connection_required
     def cpu_speed(self, silent=False):
         """Retrieves the CPU speed of the target.
@@ -2630,6 +2841,172 @@ class JLink(object):
         """
         self._dll.JLINKARM_WriteBits()
 
+    @interface_required(enums.JLinkInterfaces.JTAG)
+    @open_required
+    def jtag_shift(self, tms, tdi, num_bits):
+        """Shifts an arbitrary number of bits through the JTAG chain.
+
+        Unlike ``jtag_send()``, which is limited to ``32`` bits, any number of
+        bits can be shifted in a single call.  The bits are transferred least
+        significant bit first, starting with bit ``0`` of the first byte.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          tms (bytes): the bits to clock out on TMS
+          tdi (bytes): the bits to clock out on TDI
+          num_bits (int): the number of bits to shift
+
+        Returns:
+          A ``bytes`` object holding the ``num_bits`` bits captured from TDO.
+
+        Raises:
+          ValueError: if ``num_bits < 1``, or ``tms`` or ``tdi`` holds fewer
+            than ``num_bits`` bits.
+        """
+        if not util.is_natural(num_bits) or num_bits <= 0:
+            raise ValueError('Number of bits must be >= 1.')
+
+        tms = bytes(tms)
+        tdi = bytes(tdi)
+        num_bytes = (num_bits + 7) // 8
+        if len(tms) < num_bytes or len(tdi) < num_bytes:
+            raise ValueError('Expected at least %d bytes of TMS and TDI data.' % num_bytes)
+
+        tdo = (ctypes.c_uint8 * num_bytes)()
+        self._dll.JLINKARM_JTAG_StoreGetRaw(tdi, tdo, tms, num_bits)
+        return bytes(tdo)
+
+    def _jtag_scan(self, vectors, num_bits, ir):
+        """Scans bit vectors through the instruction or data register.
+
+        Each scan starts and ends in the Run-Test/Idle state of the TAP
+        controller.  The TMS and TDI bits of all scans are stored with a
+        single call to the DLL, flushed with a single sync, and the TDO bits
+        are read back from the input buffer at once.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          vectors (list): list of bit vectors, each an integer or ``bytes``
+            holding the bits least significant bit first
+          num_bits (int): the length in bits of each bit vector
+          ir (bool): ``True`` to scan the instruction register, otherwise
+            ``False`` to scan the data register
+
+        Returns:
+          A ``bytes`` object holding the bits captured during each scan,
+          concatenated least significant bit first.
+
+        Raises:
+          JLinkException: if the bits could not be stored.
+          TypeError: if a bit vector is not an integer or bytes.
+          ValueError: if ``num_bits < 1``.
+        """
+        if not util.is_natural(num_bits) or num_bits <= 0:
+            raise ValueError('Number of bits must be >= 1.')
+
+        if isinstance(vectors, (six.integer_types, bytes, bytearray)):
+            vectors = [vectors]
+
+        # TMS sequences from Run-Test/Idle to Shift-IR or Shift-DR, and from
+        # Exit1 back to Run-Test/Idle through Update, least significant first.
+        (enter, enter_bits) = (0x3, 4) if ir else (0x1, 3)
+        (leave, leave_bits) = (0x1, 2)
+
+        mask = (1 << num_bits) - 1
+        tms = 0
+        tdi = 0
+        pos = 0
+        shifts = []
+        for vector in vectors:
+            if isinstance(vector, (bytes, bytearray)):
+                vector = int.from_bytes(vector, 'little')
+            elif not isinstance(vector, six.integer_types):
+                raise TypeError('Expected bit vector to be bytes or int: given %s' % type(vector))
+
+            tms |= enter << pos
+            pos += enter_bits
+
+            # The last bit is shifted while moving to Exit1.
+            tms |= (1 << (num_bits - 1)) << pos
+            tdi |= (vector & mask) << pos
+            shifts.append(pos)
+            pos += num_bits
+
+            tms |= leave << pos
+            pos += leave_bits
+
+        if not shifts:
+            return bytes()
+
+        bitpos = self._dll.JLINKARM_JTAG_StoreRaw(binpacker.pack(tdi, pos), binpacker.pack(tms, pos), pos)
+        if bitpos < 0:
+            raise errors.JLinkException(bitpos)
+
+        self._dll.JLINKARM_JTAG_SyncBits()
+
+        buf = (ctypes.c_uint8 * ((pos + 7) // 8))()
+        self._dll.JLINKARM_JTAG_GetData(ctypes.byref(buf), bitpos, pos)
+        tdo = int.from_bytes(bytes(buf), 'little')
+
+        captured = 0
+        for (index, shift) in enumerate(shifts):
+            captured |= ((tdo >> shift) & mask) << (index * num_bits)
+
+        return captured.to_bytes((len(shifts) * num_bits + 7) // 8, 'little')
+
+    @interface_required(enums.JLinkInterfaces.JTAG)
+    @open_required
+    def jtag_scan_ir(self, vectors, ir_len):
+        """Scans one or more bit vectors through the instruction register.
+
+        All of the scans are pipelined before a single sync, see
+        ``_jtag_scan()``.  The TAP controller must be in the Run-Test/Idle
+        state, and is left in it.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          vectors (list): a bit vector, or list of bit vectors, to scan, each
+            an integer or ``bytes`` holding the bits least significant first
+          ir_len (int): the total length of the instruction registers in the
+            chain
+
+        Returns:
+          A ``bytes`` object holding the ``ir_len`` bits captured during each
+          scan, concatenated least significant bit first.
+
+        Raises:
+          JLinkException: if the bits could not be stored.
+          TypeError: if a bit vector is not an integer or bytes.
+          ValueError: if ``ir_len < 1``.
+        """
+        return self._jtag_scan(vectors, ir_len, True)
+
+    @interface_required(enums.JLinkInterfaces.JTAG)
+    @open_required
+    def jtag_scan_dr(self, vectors, dr_len):
+        """Scans one or more bit vectors through the data register.
+
+        All of the scans are pipelined before a single sync, see
+        ``_jtag_scan()``.  The TAP controller must be in the Run-Test/Idle
+        state, and is left in it.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          vectors (list): a bit vector, or list of bit vectors, to scan, each
+            an integer or ``bytes`` holding the bits least significant first
+          dr_len (int): the total length of the data registers in the chain
+
+        Returns:
+          A ``bytes`` object holding the ``dr_len`` bits captured during each
+          scan, concatenated least significant bit first.
+
+        Raises:
+          JLinkException: if the bits could not be stored.
+          TypeError: if a bit vector is not an integer or bytes.
+          ValueError: if ``dr_len < 1``.
+        """
+        return self._jtag_scan(vectors, dr_len, False)
+
     @interface_required(enums.JLinkInterfaces.JTAG)
     @open_required
     def jtag_store_instruction(self, instr, ir_len):
@@ -2870,6 +3247,24 @@ class JLink(object):
         value = self._dll.JLINK_SWD_GetU32(offset)
         return ctypes.c_uint32(value).value
 
+    @interface_required(enums.JLinkInterfaces.SWD)
+    @connection_required
+    def swd_read(self, offset, nbits):
+        """Gets an arbitrary number of bits from the input buffer.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          offset (int): the offset (in bits) from which to start reading
+          nbits (int): the number of bits to read
+
+        Returns:
+          The bits read from the input buffer as an integer, with the bit at
+          ``offset`` as its least significant bit.
+        """
+        buf = (ctypes.c_uint8 * ((nbits + 7) // 8))()
+        self._dll.JLINK_SWD_GetData(ctypes.byref(buf), offset, nbits)
+        return int.from_bytes(bytes(buf), 'little')
+
     @interface_required(enums.JLinkInterfaces.SWD)
     @connection_required
     def swd_write(self, output, value, nbits):
@@ -2973,11 +3368,18 @@ class JLink(object):
         Returns:
           Number of bytes written to flash.
         """
+        self._memory_cache_invalidate()
+
         # This indicates that all data written from this point on will go into
         # the buffer of the flashloader of the DLL.
         self._dll.JLINKARM_BeginDownload(flags)
 
-        self.memory_write(addr, data, nbits=nbits)
+        # Data written to the flashloader must bypass the memory cache.
+        memory_cache, self._memory_cache = self._memory_cache, None
+        try:
+            self.memory_write(addr, data, nbits=nbits)
+        finally:
+            self._memory_cache = memory_cache
 
         # Start downloading the data into the flash memory.
         bytes_flashed = self._dll.JLINKARM_EndDownload()
@@ -3049,6 +3451,10 @@ class JLink(object):
         Raises:
           JLinkException: if memory could not be read.
         """
+        data = self._memory_cache_read(addr, num_bytes)
+        if data is not None:
+            return list(data)
+
         buf_size = num_bytes
         buf = (ctypes.c_uint8 * buf_size)()
         res = self._dll.JLINKARM_ReadCodeMem(addr, buf_size, buf)
@@ -3103,196 +3509,1019 @@ class JLink(object):
 
         return list(buf)
 
-    @connection_required
-    def memory_read(self, addr, num_units, zone=None, nbits=None):
-        """Reads memory from a target system or specific memory zone.
-
-        The optional ``zone`` specifies a memory zone to access to read from,
-        e.g. ``IDATA``, ``DDATA``, or ``CODE``.
-
-        The given number of bits, if provided, must be either ``8``, ``16``, or
-        ``32``.  If not provided, always reads ``num_units`` bytes.
+    @property
+    def memory_cache(self):
+        """Returns the host-side memory cache, if enabled.
 
         Args:
           self (JLink): the ``JLink`` instance
-          addr (int): start address to read from
-          num_units (int): number of units to read
-          zone (str): optional memory zone name to access
-          nbits (int): number of bits to use for each unit
 
         Returns:
-          List of units read from the target system.
-
-        Raises:
-          JLinkException: if memory could not be read.
-          ValueError: if ``nbits`` is not ``None``, and not in ``8``, ``16``,
-            or ``32``.
+          The ``MemoryCache`` instance, or ``None`` if caching is disabled.
         """
-        buf_size = num_units
-        buf = None
-        access = 0
-
-        if nbits is None:
-            buf = (ctypes.c_uint8 * buf_size)()
-            access = 0
-        elif nbits == 8:
-            buf = (ctypes.c_uint8 * buf_size)()
-            access = 1
-        elif nbits == 16:
-            buf = (ctypes.c_uint16 * buf_size)()
-            access = 2
-            buf_size = buf_size * access
-        elif nbits == 32:
-            buf = (ctypes.c_uint32 * buf_size)()
-            access = 4
-            buf_size = buf_size * access
-        else:
-            raise ValueError('Given bit size is invalid: %s' % nbits)
-
-        args = [addr, buf_size, buf, access]
-
-        method = self._dll.JLINKARM_ReadMemEx
-        if zone is not None:
-            method = self._dll.JLINKARM_ReadMemZonedEx
-            args.append(zone.encode())
-
-        units_read = method(*args)
-        if units_read < 0:
-            raise errors.JLinkReadException(units_read)
+        return self._memory_cache
 
-        return buf[:units_read]
+    def memory_cache_enable(self, page_size=1024, max_pages=256, write_back=False, excludes=None):
+        """Enables a host-side cache of target memory pages.
 
-    @connection_required
-    def memory_read8(self, addr, num_bytes, zone=None):
-        """Reads memory from the target system in units of bytes.
+        While the CPU is halted, reads through ``memory_read()`` and the
+        related methods, as well as ``code_memory_read()``, are served from
+        an LRU cache of pages.  The cache is invalidated whenever the CPU
+        runs, or the target is reset, erased, flashed or has a register
+        written.  Regions in ``excludes`` are never cached; by default these
+        are the ARM device and peripheral regions.
 
         Args:
           self (JLink): the ``JLink`` instance
-          addr (int): start address to read from
-          num_bytes (int): number of bytes to read
-          zone (str): memory zone to read from
+          page_size (int): size of a cache page in bytes
+          max_pages (int): maximum number of pages to cache
+          write_back (bool): ``True`` to buffer memory writes in the cache
+            until it is invalidated or flushed, otherwise ``False`` to write
+            them through to the target
+          excludes (list): list of ``(addr, num_bytes)`` regions to never
+            cache
 
         Returns:
-          List of bytes read from the target system.
+          The ``MemoryCache`` instance.
 
         Raises:
-          JLinkException: if memory could not be read.
+          ValueError: if ``page_size`` or ``max_pages`` is not positive.
         """
-        return self.memory_read(addr, num_bytes, zone=zone, nbits=8)
+        self.memory_cache_disable()
+        self._memory_cache = cache.MemoryCache(self._memory_cache_fill,
+                                               self._memory_cache_write,
+                                               page_size=page_size,
+                                               max_pages=max_pages,
+                                               write_back=write_back,
+                                               excludes=excludes)
+        return self._memory_cache
 
-    @connection_required
-    def memory_read16(self, addr, num_halfwords, zone=None):
-        """Reads memory from the target system in units of 16-bits.
+    def memory_cache_disable(self):
+        """Flushes and disables the host-side memory cache.
 
         Args:
           self (JLink): the ``JLink`` instance
-          addr (int): start address to read from
-          num_halfwords (int): number of half words to read
-          zone (str): memory zone to read from
 
         Returns:
-          List of halfwords read from the target system.
-
-        Raises:
-          JLinkException: if memory could not be read
+          ``None``
         """
-        return self.memory_read(addr, num_halfwords, zone=zone, nbits=16)
+        memory_cache, self._memory_cache = self._memory_cache, None
+        if memory_cache is not None:
+            memory_cache.invalidate()
+        return None
 
     @connection_required
-    def memory_read32(self, addr, num_words, zone=None):
-        """Reads memory from the target system in units of 32-bits.
+    def memory_cache_flush(self):
+        """Writes any writes buffered in the memory cache to the target.
 
         Args:
           self (JLink): the ``JLink`` instance
-          addr (int): start address to read from
-          num_words (int): number of words to read
-          zone (str): memory zone to read from
 
         Returns:
-          List of words read from the target system.
+          ``None``
 
         Raises:
-          JLinkException: if memory could not be read
+          JLinkException: on write hardware failure.
         """
-        return self.memory_read(addr, num_words, zone=zone, nbits=32)
+        if self._memory_cache is not None:
+            self._memory_cache.flush()
+        return None
 
-    @connection_required
-    def memory_read64(self, addr, num_long_words):
-        """Reads memory from the target system in units of 64-bits.
+    def _memory_cache_invalidate(self):
+        """Flushes and drops all pages of the memory cache, if enabled.
 
         Args:
           self (JLink): the ``JLink`` instance
-          addr (int): start address to read from
-          num_long_words (int): number of long words to read
 
         Returns:
-          List of long words read from the target system.
-
-        Raises:
-          JLinkException: if memory could not be read
+          ``None``
         """
-        buf_size = num_long_words
-        buf = (ctypes.c_ulonglong * buf_size)()
-        units_read = self._dll.JLINKARM_ReadMemU64(addr, buf_size, buf, 0)
-        if units_read < 0:
-            raise errors.JLinkException(units_read)
-
-        return buf[:units_read]
-
-    @connection_required
-    def memory_write(self, addr, data, zone=None, nbits=None):
-        """Writes memory to a target system or specific memory zone.
+        if self._memory_cache is not None:
+            self._memory_cache.invalidate()
+        return None
 
-        The optional ``zone`` specifies a memory zone to access to write to,
-        e.g. ``IDATA``, ``DDATA``, or ``CODE``.
+    def _memory_cache_halted(self):
+        """Returns whether the memory cache may be used.
 
-        The given number of bits, if provided, must be either ``8``, ``16``, or
-        ``32``.
+        The cache is only valid while the CPU is halted, so it is invalidated
+        if the CPU is found to be running.
 
         Args:
           self (JLink): the ``JLink`` instance
-          addr (int): start address to write to
-          data (list): list of data units to write
-          zone (str): optional memory zone name to access
-          nbits (int): number of bits to use for each unit
 
         Returns:
-          Number of units written.
-
+          ``True`` if the CPU is halted, otherwise ``False``.
+        """
+        if int(self._dll.JLINKARM_IsHalted()) > 0:
+            return True
+
+        self._memory_cache.invalidate()
+        return False
+
+    def _memory_cache_read(self, addr, num_bytes, zone=None):
+        """Reads a region from the memory cache.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to read from
+          num_bytes (int): number of bytes to read
+          zone (str): optional memory zone name to access
+
+        Returns:
+          The ``bytearray`` read, or ``None`` if the region cannot be served
+          from the cache.
+        """
+        memory_cache = self._memory_cache
+        if memory_cache is None or not memory_cache.cacheable(addr, num_bytes):
+            return None
+        elif not self._memory_cache_halted():
+            return None
+        return memory_cache.read(addr, num_bytes, zone)
+
+    def _memory_cache_fill(self, addr, num_bytes, zone=None):
+        """Reads a page from the target for the memory cache.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address of the page
+          num_bytes (int): size of the page
+          zone (str): optional memory zone name to access
+
+        Returns:
+          The ``bytearray`` read, or ``None`` if the page could not be read in
+          full.
+        """
+        data = bytearray(num_bytes)
+        buf = (ctypes.c_uint8 * num_bytes).from_buffer(data)
+        try:
+            bytes_read = self._memory_read_uncached(addr, buf, num_bytes, 0, zone)
+        except errors.JLinkException:
+            return None
+        finally:
+            del buf
+
+        if bytes_read < num_bytes:
+            return None
+
+        return data
+
+    def _memory_cache_write(self, addr, data, zone=None):
+        """Writes bytes buffered in the memory cache back to the target.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to write to
+          data (bytes): data to write
+          zone (str): optional memory zone name to access
+
+        Returns:
+          ``None``
+
+        Raises:
+          JLinkWriteException: on write hardware failure.
+        """
+        buf = (ctypes.c_uint8 * len(data)).from_buffer_copy(data)
+        self._memory_write_uncached(addr, buf, len(data), 0, zone)
+        return None
+
+    @connection_required
+    def memory_read(self, addr, num_units, zone=None, nbits=None):
+        """Reads memory from a target system or specific memory zone.
+
+        The optional ``zone`` specifies a memory zone to access to read from,
+        e.g. ``IDATA``, ``DDATA``, or ``CODE``.
+
+        The given number of bits, if provided, must be either ``8``, ``16``, or
+        ``32``.  If not provided, always reads ``num_units`` bytes.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to read from
+          num_units (int): number of units to read
+          zone (str): optional memory zone name to access
+          nbits (int): number of bits to use for each unit
+
+        Returns:
+          List of units read from the target system.
+
+        Raises:
+          JLinkException: if memory could not be read.
+          ValueError: if ``nbits`` is not ``None``, and not in ``8``, ``16``,
+            or ``32``.
+        """
+        access = self._memory_access_width(nbits)
+        buf = (self._MEMORY_ACCESS_CTYPES[access] * num_units)()
+        buf_size = num_units * max(access, 1)
+
+        units_read = self._memory_read_raw(addr, buf, buf_size, access, zone)
+
+        return buf[:units_read]
+
+    def _memory_access_width(self, nbits):
+        """Returns the DLL access width for the given number of bits.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          nbits (int): number of bits to use for each unit, or ``None``
+
+        Returns:
+          The access width in bytes, or ``0`` to let the DLL choose it.
+
+        Raises:
+          ValueError: if ``nbits`` is not ``None``, and not in ``8``, ``16``,
+            or ``32``.
+        """
+        if nbits is None:
+            return 0
+        elif nbits == 8:
+            return 1
+        elif nbits == 16:
+            return 2
+        elif nbits == 32:
+            return 4
+        raise ValueError('Given bit size is invalid: %s' % nbits)
+
+    def _memory_read_raw(self, addr, buf, buf_size, access, zone=None):
+        """Reads target memory into the given ``ctypes`` buffer.
+
+        The read is served from the memory cache if it is enabled and the
+        region can be cached.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to read from
+          buf (ctypes.Array): buffer to read into
+          buf_size (int): number of bytes to read
+          access (int): access width in bytes (``0`` for any)
+          zone (str): optional memory zone name to access
+
+        Returns:
+          Number of units read from the target system.
+
+        Raises:
+          JLinkReadException: if memory could not be read.
+        """
+        data = self._memory_cache_read(addr, buf_size, zone)
+        if data is not None:
+            ctypes.memmove(buf, (ctypes.c_char * buf_size).from_buffer(data), buf_size)
+            return buf_size // max(access, 1)
+
+        return self._memory_read_uncached(addr, buf, buf_size, access, zone)
+
+    def _memory_read_uncached(self, addr, buf, buf_size, access, zone=None):
+        """Reads target memory directly into the given ``ctypes`` buffer.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to read from
+          buf (ctypes.Array): buffer to read into
+          buf_size (int): number of bytes to read
+          access (int): access width in bytes (``0`` for any)
+          zone (str): optional memory zone name to access
+
+        Returns:
+          Number of units read from the target system.
+
+        Raises:
+          JLinkReadException: if memory could not be read.
+        """
+        args = [addr, buf_size, buf, access]
+
+        method = self._dll.JLINKARM_ReadMemEx
+        if zone is not None:
+            method = self._dll.JLINKARM_ReadMemZonedEx
+            args.append(zone.encode())
+
+        units_read = method(*args)
+        if units_read < 0:
+            raise errors.JLinkReadException(units_read)
+
+        return units_read
+
+    @connection_required
+    def memory_read_many(self, requests, zone=None, max_gap=64):
+        """Reads several memory ranges from a target system in a batch.
+
+        Each request is a tuple of ``(addr, num_units)`` or
+        ``(addr, num_units, nbits)``, with the same meaning as the
+        corresponding arguments of ``memory_read()``.  Requests with the same
+        access width that overlap, or are separated by at most ``max_gap``
+        bytes, are coalesced into a single transfer, so reading many small
+        variables scattered over memory costs only a few transfers.
+
+        Coalescing ranges separated by a gap reads the unrequested bytes in
+        the gap too.  Reads of device and peripheral registers may have side
+        effects, e.g. clearing status flags or popping FIFOs, so ranges are
+        never coalesced across a gap that overlaps one of the
+        ``MemoryCache.DEVICE_REGIONS``, or a region excluded from the memory
+        cache, if enabled.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          requests (list): list of ``(addr, num_units[, nbits])`` tuples
+          zone (str): optional memory zone name to access
+          max_gap (int): maximum number of unrequested bytes between two
+            ranges for them to be read in the same transfer
+
+        Returns:
+          A list with the list of units read for each of the given requests,
+          in the order of the requests.
+
+        Raises:
+          JLinkException: if memory could not be read.
+          ValueError: if a given ``nbits`` is not ``None``, and not in ``8``,
+            ``16``, or ``32``, or ``max_gap`` is negative.
+        """
+        if max_gap < 0:
+            raise ValueError('Maximum gap must be non-negative.')
+
+        ranges = []
+        for (idx, request) in enumerate(requests):
+            addr, num_units = request[0], request[1]
+            nbits = request[2] if len(request) > 2 else None
+            access = self._memory_access_width(nbits)
+            end = addr + num_units * max(access, 1)
+            ranges.append((access, addr, end, idx))
+
+        # Coalesce the sorted ranges into transfers of the same access width
+        # that stay aligned to that width.
+        transfers = []
+        for (access, start, end, idx) in sorted(ranges):
+            if transfers:
+                transfer = transfers[-1]
+                width = max(access, 1)
+                if (transfer[0] == access and
+                        start - transfer[2] <= max_gap and
+                        (start - transfer[1]) % width == 0 and
+                        not self._memory_gap_volatile(transfer[2], start)):
+                    transfer[2] = max(transfer[2], end)
+                    transfer[3].append((start, end, idx))
+                    continue
+            transfers.append([access, start, end, [(start, end, idx)]])
+
+        results = [None] * len(ranges)
+        for (access, start, end, members) in transfers:
+            width = max(access, 1)
+            typecode = self._MEMORY_ACCESS_TYPECODES[width]
+
+            data = bytearray(end - start)
+            buf = (ctypes.c_uint8 * len(data)).from_buffer(data)
+            units_read = self._memory_read_raw(start, buf, len(data), access, zone)
+            del buf
+
+            view = memoryview(data)[:units_read * width]
+            for (member_start, member_end, idx) in members:
+                chunk = view[member_start - start:member_end - start]
+                chunk = chunk[:len(chunk) - (len(chunk) % width)]
+                results[idx] = chunk.cast(typecode).tolist()
+
+        return results
+
+    def _memory_gap_volatile(self, start, end):
+        """Returns whether reading the bytes of a gap may have side effects.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          start (int): start address of the gap
+          end (int): end address of the gap
+
+        Returns:
+          ``True`` if the gap overlaps a device region, or a region excluded
+          from the memory cache, otherwise ``False``.
+        """
+        if start >= end:
+            return False
+
+        regions = cache.MemoryCache.DEVICE_REGIONS
+        if self._memory_cache is not None:
+            regions = regions + self._memory_cache.excludes
+
+        for (region_addr, region_size) in regions:
+            if start < region_addr + region_size and region_addr < end:
+                return True
+        return False
+
+    @connection_required
+    def memory_read8(self, addr, num_bytes, zone=None):
+        """Reads memory from the target system in units of bytes.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to read from
+          num_bytes (int): number of bytes to read
+          zone (str): memory zone to read from
+
+        Returns:
+          List of bytes read from the target system.
+
+        Raises:
+          JLinkException: if memory could not be read.
+        """
+        return self.memory_read(addr, num_bytes, zone=zone, nbits=8)
+
+    @connection_required
+    def memory_read16(self, addr, num_halfwords, zone=None):
+        """Reads memory from the target system in units of 16-bits.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to read from
+          num_halfwords (int): number of half words to read
+          zone (str): memory zone to read from
+
+        Returns:
+          List of halfwords read from the target system.
+
+        Raises:
+          JLinkException: if memory could not be read
+        """
+        return self.memory_read(addr, num_halfwords, zone=zone, nbits=16)
+
+    @connection_required
+    def memory_read32(self, addr, num_words, zone=None):
+        """Reads memory from the target system in units of 32-bits.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to read from
+          num_words (int): number of words to read
+          zone (str): memory zone to read from
+
+        Returns:
+          List of words read from the target system.
+
+        Raises:
+          JLinkException: if memory could not be read
+        """
+        return self.memory_read(addr, num_words, zone=zone, nbits=32)
+
+    @connection_required
+    def memory_read64(self, addr, num_long_words):
+        """Reads memory from the target system in units of 64-bits.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to read from
+          num_long_words (int): number of long words to read
+
+        Returns:
+          List of long words read from the target system.
+
+        Raises:
+          JLinkException: if memory could not be read
+        """
+        buf_size = num_long_words
+        buf = (ctypes.c_ulonglong * buf_size)()
+        units_read = self._dll.JLINKARM_ReadMemU64(addr, buf_size, buf, 0)
+        if units_read < 0:
+            raise errors.JLinkException(units_read)
+
+        return buf[:units_read]
+
+    @connection_required
+    def memory_readinto(self, addr, buffer, zone=None, nbits=None):
+        """Reads memory from a target system directly into a writable buffer.
+
+        The given ``buffer`` can be any object supporting the writable buffer
+        protocol, e.g. a ``bytearray``, ``memoryview``, ``mmap`` or
+        ``array.array``.  The target memory is read into it in place, so no
+        intermediate list or copy is created.
+
+        The given number of bits, if provided, must be either ``8``, ``16``, or
+        ``32``, and the size of ``buffer`` must be a multiple of the access
+        width.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to read from
+          buffer (object): writable buffer to read into
+          zone (str): optional memory zone name to access
+          nbits (int): number of bits to use for each unit
+
+        Returns:
+          Number of bytes read into ``buffer``.
+
+        Raises:
+          JLinkException: if memory could not be read.
+          TypeError: if ``buffer`` is not a writable buffer.
+          ValueError: if ``nbits`` is not ``None``, and not in ``8``, ``16``,
+            or ``32``, or if the buffer size is not a multiple of the access
+            width.
+        """
+        access = self._memory_access_width(nbits)
+
+        with memoryview(buffer) as view:
+            if view.readonly:
+                raise TypeError('Expected a writable buffer.')
+
+            num_bytes = view.nbytes
+            if access > 1 and num_bytes % access:
+                raise ValueError('Buffer size %d is not a multiple of %d bytes.' % (num_bytes, access))
+
+            if num_bytes == 0:
+                return 0
+
+            with view.cast('B') as raw:
+                buf = (ctypes.c_uint8 * num_bytes).from_buffer(raw)
+                try:
+                    units_read = self._memory_read_raw(addr, buf, num_bytes, access, zone)
+                finally:
+                    # Drop the export on the underlying buffer, so that the
+                    # caller is free to resize it (e.g. a ``bytearray``).
+                    del buf
+
+        return units_read * max(access, 1)
+
+    @connection_required
+    def memory_read_bytes(self, addr, num_bytes, zone=None, nbits=None):
+        """Reads memory from a target system as ``bytes``.
+
+        This is similar to calling ``memory_read``, except that the data is
+        returned as a ``bytes`` object instead of a list of integers.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to read from
+          num_bytes (int): number of bytes to read
+          zone (str): optional memory zone name to access
+          nbits (int): number of bits to use for each access
+
+        Returns:
+          ``bytes`` read from the target system.
+
+        Raises:
+          JLinkException: if memory could not be read.
+          ValueError: if ``nbits`` is not ``None``, and not in ``8``, ``16``,
+            or ``32``, or ``num_bytes`` is not a multiple of the access width.
+        """
+        buf = bytearray(num_bytes)
+        bytes_read = self.memory_readinto(addr, buf, zone=zone, nbits=nbits)
+        if bytes_read == num_bytes:
+            return bytes(buf)
+        return bytes(memoryview(buf)[:bytes_read])
+
+    @connection_required
+    def memory_read_view(self, addr, num_units, zone=None, nbits=None):
+        """Reads memory from a target system as a typed ``memoryview``.
+
+        The returned ``memoryview`` has the format ``B``, ``H``, or ``I`` for
+        8, 16, and 32-bit accesses respectively, and indexes into it yield
+        the units read in native byte order.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to read from
+          num_units (int): number of units to read
+          zone (str): optional memory zone name to access
+          nbits (int): number of bits to use for each unit
+
+        Returns:
+          A ``memoryview`` of the units read from the target system.
+
+        Raises:
+          JLinkException: if memory could not be read.
+          ValueError: if ``nbits`` is not ``None``, and not in ``8``, ``16``,
+            or ``32``.
+        """
+        access = self._memory_access_width(nbits)
+        width = max(access, 1)
+        fmt = self._MEMORY_ACCESS_TYPECODES[width]
+
+        buf = bytearray(num_units * width)
+        bytes_read = self.memory_readinto(addr, buf, zone=zone, nbits=nbits)
+        return memoryview(buf).cast(fmt)[:bytes_read // width]
+
+    def _memory_chunks(self, addr, num_bytes, chunk_size, zone=None, nbits=None, out=None,
+                       on_progress=None, hasher=None, retries=0, skip_errors=False, fill=0):
+        """Reads a memory region chunk by chunk.
+
+        Each chunk is read either into a single scratch buffer that is reused
+        between chunks, or in place into ``out`` if it is given.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to read from
+          num_bytes (int): number of bytes to read
+          chunk_size (int): maximum number of bytes to read per chunk
+          zone (str): optional memory zone name to access
+          nbits (int): number of bits to use for each access
+          out (memoryview): optional byte view to read the region into
+          on_progress (function): function called as
+            ``on_progress(bytes_done, num_bytes)`` after each chunk
+          hasher (object): optional hash object (e.g. from ``hashlib``) that
+            is updated with each chunk
+          retries (int): number of times to retry reading a failed chunk
+          skip_errors (bool): ``True`` to skip unreadable chunks, otherwise
+            ``False`` to raise an exception
+          fill (int): byte value to fill skipped chunks with
+
+        Returns:
+          A generator of ``(chunk_addr, view, error)`` tuples, where ``view``
+          is a ``memoryview`` of the chunk that is only valid until the next
+          chunk is read, and ``error`` is the exception if the chunk was
+          skipped, otherwise ``None``.
+
+        Raises:
+          JLinkReadException: if a chunk could not be read and ``skip_errors``
+            is ``False``.
+          ValueError: if the arguments are invalid.
+        """
+        access = self._memory_access_width(nbits)
+        width = max(access, 1)
+
+        if chunk_size <= 0 or chunk_size % width:
+            raise ValueError('Chunk size must be a positive multiple of %d bytes.' % width)
+        elif num_bytes < 0 or num_bytes % width:
+            raise ValueError('Length must be a non-negative multiple of %d bytes.' % width)
+        elif retries < 0:
+            raise ValueError('Number of retries must be non-negative.')
+
+        if out is None:
+            scratch = memoryview(bytearray(min(chunk_size, num_bytes)))
+            scratch_buf = (ctypes.c_uint8 * len(scratch)).from_buffer(scratch)
+
+        offset = 0
+        while offset < num_bytes:
+            size = min(chunk_size, num_bytes - offset)
+            chunk_addr = addr + offset
+
+            if out is None:
+                view, buf = scratch[:size], scratch_buf
+            else:
+                view = out[offset:offset + size]
+                buf = (ctypes.c_uint8 * size).from_buffer(view)
+
+            error = None
+            for _ in range(retries + 1):
+                bytes_read = 0
+                try:
+                    bytes_read = self._memory_read_raw(chunk_addr, buf, size, access, zone) * width
+                except errors.JLinkException as e:
+                    error = e
+                    continue
+
+                if bytes_read >= size:
+                    error = None
+                    break
+
+                error = errors.JLinkReadException('Read %d of %d bytes at 0x%08X.' % (bytes_read, size, chunk_addr))
+
+            if error is not None:
+                if not skip_errors:
+                    raise error
+                logger.warning('Skipping unreadable memory at 0x%08X: %s', chunk_addr, error)
+                view[bytes_read:] = bytes([fill]) * (size - bytes_read)
+
+            offset += size
+
+            if hasher is not None:
+                hasher.update(view)
+
+            if on_progress is not None:
+                on_progress(offset, num_bytes)
+
+            yield (chunk_addr, view, error)
+
+    @connection_required
+    def memory_iter(self, addr, num_bytes, chunk_size=0x1000, zone=None, nbits=None,
+                    on_progress=None, hasher=None, retries=0, skip_errors=False, fill=0):
+        """Reads a memory region from a target system as a stream of chunks.
+
+        Only a single chunk is held in memory at a time, so this can be used
+        to read arbitrarily large regions.  Unreadable chunks are retried up
+        to ``retries`` times, and then either raise an exception, or if
+        ``skip_errors`` is ``True``, are yielded filled with ``fill``.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to read from
+          num_bytes (int): number of bytes to read
+          chunk_size (int): maximum number of bytes to read per chunk
+          zone (str): optional memory zone name to access
+          nbits (int): number of bits to use for each access
+          on_progress (function): function called as
+            ``on_progress(bytes_done, num_bytes)`` after each chunk
+          hasher (object): optional hash object (e.g. from ``hashlib``) that
+            is updated with each chunk
+          retries (int): number of times to retry reading a failed chunk
+          skip_errors (bool): ``True`` to skip unreadable chunks, otherwise
+            ``False`` to raise an exception
+          fill (int): byte value to fill skipped chunks with
+
+        Returns:
+          A generator of ``bytes`` chunks read from the target system.
+
+        Raises:
+          JLinkReadException: if a chunk could not be read and ``skip_errors``
+            is ``False``.
+          ValueError: if the arguments are invalid.
+        """
+        chunks = self._memory_chunks(addr, num_bytes, chunk_size, zone=zone, nbits=nbits,
+                                     on_progress=on_progress, hasher=hasher, retries=retries,
+                                     skip_errors=skip_errors, fill=fill)
+        for (_, view, _) in chunks:
+            yield view.tobytes()
+
+    @connection_required
+    def memory_dump(self, addr, num_bytes, dest, chunk_size=0x1000, zone=None, nbits=None,
+                    on_progress=None, hasher=None, retries=0, skip_errors=False, fill=0):
+        """Dumps a memory region from a target system to a file or buffer.
+
+        The given ``dest`` may be a path to a file to create, a writable file
+        object, or a writable buffer (e.g. a ``bytearray`` or ``mmap``) of at
+        least ``num_bytes`` bytes.  Buffers are read into in place from their
+        start, while files are written chunk by chunk, so memory use is
+        bounded by ``chunk_size``.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to read from
+          num_bytes (int): number of bytes to read
+          dest (object): path, file object, or buffer to dump to
+          chunk_size (int): maximum number of bytes to read per chunk
+          zone (str): optional memory zone name to access
+          nbits (int): number of bits to use for each access
+          on_progress (function): function called as
+            ``on_progress(bytes_done, num_bytes)`` after each chunk
+          hasher (object): optional hash object (e.g. from ``hashlib``) that
+            is updated with each chunk
+          retries (int): number of times to retry reading a failed chunk
+          skip_errors (bool): ``True`` to skip unreadable chunks, otherwise
+            ``False`` to raise an exception
+          fill (int): byte value to fill skipped chunks with
+
+        Returns:
+          A list of the ``(addr, num_bytes)`` chunks that were skipped.
+
+        Raises:
+          JLinkReadException: if a chunk could not be read and ``skip_errors``
+            is ``False``.
+          TypeError: if ``dest`` is not a path, file, or writable buffer.
+          ValueError: if the arguments are invalid, or ``dest`` is too small.
+        """
+        kwargs = dict(zone=zone, nbits=nbits, on_progress=on_progress, hasher=hasher,
+                      retries=retries, skip_errors=skip_errors, fill=fill)
+
+        if isinstance(dest, (str, os.PathLike)):
+            with open(dest, 'wb') as f:
+                return self.memory_dump(addr, num_bytes, f, chunk_size, **kwargs)
+
+        skipped = []
+        if hasattr(dest, 'write') and not isinstance(dest, mmap.mmap):
+            for (chunk_addr, view, error) in self._memory_chunks(addr, num_bytes, chunk_size, **kwargs):
+                dest.write(view)
+                if error is not None:
+                    skipped.append((chunk_addr, len(view)))
+            return skipped
+
+        out = memoryview(dest)
+        if out.readonly:
+            raise TypeError('Expected a writable buffer.')
+        elif out.nbytes < num_bytes:
+            raise ValueError('Buffer of %d bytes is too small.' % out.nbytes)
+
+        out = out.cast('B')
+        for (chunk_addr, view, error) in self._memory_chunks(addr, num_bytes, chunk_size, out=out, **kwargs):
+            if error is not None:
+                skipped.append((chunk_addr, len(view)))
+
+        return skipped
+
+    @connection_required
+    def memory_write(self, addr, data, zone=None, nbits=None):
+        """Writes memory to a target system or specific memory zone.
+
+        The optional ``zone`` specifies a memory zone to access to write to,
+        e.g. ``IDATA``, ``DDATA``, or ``CODE``.
+
+        The given number of bits, if provided, must be either ``8``, ``16``, or
+        ``32``.
+
+        Each element of ``data`` is written as one unit, whatever the type of
+        ``data``.  Contiguous buffers of integers as wide as the access width
+        (e.g. ``bytes`` written with 8-bit accesses, or an ``array.array`` of
+        type ``'I'`` written with 32-bit accesses) are handed to the DLL
+        without being unpacked.  Use ``memory_write_bytes()`` to write the raw
+        contents of a buffer with a different access width.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to write to
+          data (list): list of data units to write
+          zone (str): optional memory zone name to access
+          nbits (int): number of bits to use for each unit
+
+        Returns:
+          Number of units written.
+
         Raises:
           JLinkException: on write hardware failure.
           ValueError: if ``nbits`` is not ``None``, and not in ``8``, ``16`` or
             ``32``.
         """
-        buf_size = len(data)
-        buf = None
-        access = 0
+        access = self._memory_access_width(nbits)
 
-        if nbits is None:
+        try:
+            view = memoryview(data)
+        except TypeError:
+            view = None
+
+        if view is not None:
+            if self._memory_buffer_packed(view, access):
+                # Each item is one unit, so the buffer is written as is.
+                return self._memory_write_buffer(addr, view, access, zone)
+            data = view.tolist()
+
+        if access == 0:
             # Pack the given data into an array of 8-bit unsigned integers in
-            # order to write it successfully
-            packed_data = map(lambda d: reversed(binpacker.pack(d)), data)
-            packed_data = list(itertools.chain(*packed_data))
+            # order to write it successfully.  Values that fit into a byte
+            # each pack to exactly that byte, so try that first.
+            try:
+                packed_data = bytearray(data)
+            except (TypeError, ValueError):
+                packed_data = map(lambda d: reversed(binpacker.pack(d)), data)
+                packed_data = bytearray(itertools.chain(*packed_data))
 
             buf_size = len(packed_data)
-            buf = (ctypes.c_uint8 * buf_size)(*packed_data)
+            buf = (ctypes.c_uint8 * buf_size).from_buffer(packed_data)
+        else:
+            buf = self._memory_pack_units(data, access)
+            buf_size = len(data) * access
 
-            # Allow the access width to be chosen for us.
-            access = 0
-        elif nbits == 8:
-            buf = (ctypes.c_uint8 * buf_size)(*data)
-            access = 1
-        elif nbits == 16:
-            buf = (ctypes.c_uint16 * buf_size)(*data)
-            access = 2
-            buf_size = buf_size * access
-        elif nbits == 32:
-            buf = (ctypes.c_uint32 * buf_size)(*data)
-            access = 4
-            buf_size = buf_size * access
+        return self._memory_write_raw(addr, buf, buf_size, access, zone)
+
+    def _memory_buffer_packed(self, view, access):
+        """Returns whether a buffer holds its units packed for an access width.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          view (memoryview): view of the buffer
+          access (int): access width in bytes (``0`` for any)
+
+        Returns:
+          ``True`` if each item of the buffer is a native integer as wide as
+          the access width, so the buffer can be written as is, otherwise
+          ``False``.
+        """
+        if not view.c_contiguous:
+            return False
+        elif access == 0:
+            return view.format == 'B'
+        return view.itemsize == access and view.format.lstrip('@') in self._MEMORY_INTEGER_FORMATS
+
+    @connection_required
+    def memory_write_bytes(self, addr, data, zone=None, nbits=None):
+        """Writes the raw contents of a buffer to target memory.
+
+        Unlike ``memory_write()``, the contents of ``data`` are handed to the
+        DLL as-is without being unpacked, and ``nbits`` only selects the
+        access width, so e.g. an ``array.array`` of half-words can be written
+        with 32-bit accesses.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to write to
+          data (bytes): object supporting the buffer protocol to write, e.g.
+            ``bytes``, ``bytearray``, ``memoryview`` or ``array.array``
+          zone (str): optional memory zone name to access
+          nbits (int): number of bits to use for each access
+
+        Returns:
+          Number of units written.
+
+        Raises:
+          JLinkException: on write hardware failure.
+          ValueError: if ``nbits`` is not ``None``, and not in ``8``, ``16`` or
+            ``32``, or if the size of ``data`` is not a multiple of the access
+            width.
+        """
+        access = self._memory_access_width(nbits)
+        return self._memory_write_buffer(addr, memoryview(data), access, zone)
+
+    def _memory_write_buffer(self, addr, view, access, zone=None):
+        """Writes the raw contents of a buffer to target memory.
+
+        Writable buffers are handed to the DLL without being copied.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to write to
+          view (memoryview): view of the buffer to write
+          access (int): access width in bytes (``0`` for any)
+          zone (str): optional memory zone name to access
+
+        Returns:
+          Number of units written.
+
+        Raises:
+          JLinkException: on write hardware failure.
+          ValueError: if the size of the buffer is not a multiple of the access
+            width.
+        """
+        view = view.cast('B')
+        buf_size = view.nbytes
+        if access > 1 and buf_size % access:
+            raise ValueError('Buffer size %d is not a multiple of %d bytes.' % (buf_size, access))
+
+        ctype = self._MEMORY_ACCESS_CTYPES[access]
+        buf_type = ctype * (buf_size // ctypes.sizeof(ctype))
+        if view.readonly:
+            buf = buf_type.from_buffer_copy(view)
+        else:
+            buf = buf_type.from_buffer(view)
+
+        return self._memory_write_raw(addr, buf, buf_size, access, zone)
+
+    def _memory_pack_units(self, data, access):
+        """Packs a sequence of units into a ``ctypes`` array.
+
+        The units are packed in C through an ``array.array`` when they fit in
+        the given access width, otherwise they are truncated to the access
+        width by ``ctypes``.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          data (list): list of units to pack
+          access (int): access width in bytes
+
+        Returns:
+          A ``ctypes`` array of the packed units.
+        """
+        ctype = self._MEMORY_ACCESS_CTYPES[access]
+        typecode = self._MEMORY_ACCESS_TYPECODES[access]
+
+        try:
+            packed_data = array.array(typecode, data)
+        except OverflowError:
+            return (ctype * len(data))(*data)
+
+        if packed_data.itemsize != access:
+            return (ctype * len(data))(*data)
+
+        return (ctype * len(packed_data)).from_buffer(packed_data)
+
+    def _memory_write_raw(self, addr, buf, buf_size, access, zone=None):
+        """Writes the given ``ctypes`` buffer to target memory.
+
+        If the memory cache is enabled, the write is either buffered in the
+        cache (write-back), or written to the target and then applied to any
+        cached pages (write-through).
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to write to
+          buf (ctypes.Array): buffer to write
+          buf_size (int): number of bytes to write
+          access (int): access width in bytes (``0`` for any)
+          zone (str): optional memory zone name to access
+
+        Returns:
+          Number of units written.
+
+        Raises:
+          JLinkWriteException: on write hardware failure.
+        """
+        memory_cache = self._memory_cache
+        if memory_cache is None:
+            return self._memory_write_uncached(addr, buf, buf_size, access, zone)
+
+        data = ctypes.string_at(buf, buf_size)
+        if memory_cache.cacheable(addr, buf_size) and self._memory_cache_halted():
+            if memory_cache.write_back and memory_cache.write(addr, data, zone):
+                return buf_size // max(access, 1)
+        else:
+            memory_cache.discard(addr, buf_size, zone)
+
+        try:
+            units_written = self._memory_write_uncached(addr, buf, buf_size, access, zone)
+        except errors.JLinkException:
+            memory_cache.discard(addr, buf_size, zone)
+            raise
+
+        if units_written * max(access, 1) == buf_size:
+            memory_cache.update(addr, data, zone)
         else:
-            raise ValueError('Given bit size is invalid: %s' % nbits)
+            memory_cache.discard(addr, buf_size, zone)
+
+        return units_written
+
+    def _memory_write_uncached(self, addr, buf, buf_size, access, zone=None):
+        """Writes the given ``ctypes`` buffer directly to target memory.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          addr (int): start address to write to
+          buf (ctypes.Array): buffer to write
+          buf_size (int): number of bytes to write
+          access (int): access width in bytes (``0`` for any)
+          zone (str): optional memory zone name to access
 
+        Returns:
+          Number of units written.
+
+        Raises:
+          JLinkWriteException: on write hardware failure.
+        """
         args = [addr, buf_size, buf, access]
 
         method = self._dll.JLINKARM_WriteMemEx
@@ -3379,6 +4608,18 @@ class JLink(object):
         Raises:
           JLinkException: on memory access error.
         """
+        if sys.byteorder == 'little':
+            # On a little-endian host, a packed long word is laid out as its
+            # low word followed by its high word, so it can be written as is.
+            try:
+                long_words = array.array('Q', data)
+            except OverflowError:
+                long_words = None
+
+            if long_words is not None and long_words.itemsize == 8:
+                words = memoryview(long_words).cast('B').cast('I')
+                return self.memory_write32(addr, words, zone=zone)
+
         words = []
         bitmask = 0xFFFFFFFF
         for long_word in data:
@@ -3401,6 +4642,9 @@ class JLink(object):
         Raises:
           JLinkException: on write error.
         """
+        if self._memory_cache is not None:
+            self._memory_cache.discard(addr, 1)
+
         res = self._dll.JLINKARM_WriteU8(addr, value)
         if res != 0:
             raise errors.JLinkWriteException('Error writing to %d' % addr)
@@ -3421,6 +4665,9 @@ class JLink(object):
         Raises:
           JLinkException: on write error.
         """
+        if self._memory_cache is not None:
+            self._memory_cache.discard(addr, 2)
+
         res = self._dll.JLINKARM_WriteU16(addr, value)
         if res != 0:
             raise errors.JLinkWriteException('Error writing to %d' % addr)
@@ -3441,6 +4688,9 @@ class JLink(object):
         Raises:
           JLinkException: on write error.
         """
+        if self._memory_cache is not None:
+            self._memory_cache.discard(addr, 4)
+
         res = self._dll.JLINKARM_WriteU32(addr, value)
         if res != 0:
             raise errors.JLinkWriteException('Error writing to %d' % addr)
@@ -3463,6 +4713,10 @@ class JLink(object):
         """
         # Default type is uint32_t，so specify the parameter type of the C function, otherwise get "ArgumentError"
         self._dll.JLINKARM_WriteU64.argtypes = [ctypes.c_uint32, ctypes.c_uint64]
+
+        if self._memory_cache is not None:
+            self._memory_cache.discard(addr, 8)
+
         res = self._dll.JLINKARM_WriteU64(addr, value)
         if res != 0:
             raise errors.JLinkWriteException('Error writing to %d' % addr)
@@ -3541,6 +4795,9 @@ class JLink(object):
         # TODO: rename 'reg_index' to 'register'
         if isinstance(reg_index, six.string_types):
             reg_index = self._get_register_index_from_name(reg_index)
+
+        self._memory_cache_invalidate()
+
         res = self._dll.JLINKARM_WriteReg(reg_index, value)
         if res != 0:
             raise errors.JLinkException('Error writing to register %d' % reg_index)
@@ -3582,12 +4839,74 @@ class JLink(object):
         # be bad documentation, but they cannot be trusted at all.
         statuses = (ctypes.c_uint8 * num_regs)(0)
 
+        self._memory_cache_invalidate()
+
         res = self._dll.JLINKARM_WriteRegs(buf, data, statuses, num_regs)
         if res != 0:
             raise errors.JLinkException(res)
 
         return None
 
+    @connection_required
+    def register_snapshot(self):
+        """Captures the values of all CPU registers at once.
+
+        All registers in ``register_list()`` are read with a single
+        ``JLINKARM_ReadRegs`` call.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+
+        Returns:
+          A ``RegisterSnapshot`` mapping each register name to its value.
+
+        Raises:
+          JLinkException: if the registers could not be read.
+        """
+        regs = self._register_map
+        if regs is None:
+            regs = self.register_map()
+
+        names, indices = list(regs.keys()), list(regs.values())
+        values = self.register_read_multiple(indices) if indices else []
+        return snapshot.RegisterSnapshot(names, indices, values)
+
+    @connection_required
+    def register_restore(self, register_snapshot, only_dirty=True):
+        """Writes the values of a register snapshot back to the CPU.
+
+        If ``only_dirty`` is ``True``, the current register values are read
+        first, and only the registers whose values differ from the snapshot
+        are written.  All writes are done with a single ``JLINKARM_WriteRegs``
+        call.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          register_snapshot (RegisterSnapshot): the snapshot to restore
+          only_dirty (bool): ``True`` to only write the registers that have
+            changed since the snapshot, otherwise ``False`` to write all of
+            them
+
+        Returns:
+          The number of registers written.
+
+        Raises:
+          JLinkException: if the registers could not be read or written.
+        """
+        indices = list(register_snapshot.indices)
+        values = list(register_snapshot.values())
+
+        if only_dirty and indices:
+            current = self.register_read_multiple(indices)
+            dirty = [i for (i, value) in enumerate(values) if value != current[i]]
+            indices = [indices[i] for i in dirty]
+            values = [values[i] for i in dirty]
+
+        if indices:
+            self.register_write_multiple(indices, values)
+
+        return len(indices)
+
     @connection_required
     def ice_register_read(self, register_index):
         """Reads a value from an ARM ICE register.
@@ -3883,6 +5202,8 @@ class JLink(object):
         Raises:
           JLinkException: on error
         """
+        self._memory_cache_invalidate()
+
         method = self._dll.JLINKARM_Step
         if thumb:
             method = self._dll.JLINKARM_StepComposite
@@ -4694,7 +6015,7 @@ class JLink(object):
           JLinkException: on error.
         """
         size = ctypes.c_uint32(size)
-        res = self._dll.JLINK_STRACE_Control(enums.JLinkStraceCommand.SET_BUFFER_SIZE, size)
+        res = self._dll.JLINK_STRACE_Control(enums.JLinkStraceCommand.SET_BUFFER_SIZE, ctypes.byref(size))
         if res < 0:
             raise errors.JLinkException('Failed to set the STRACE buffer size.')
 
@@ -5240,6 +6561,38 @@ class JLink(object):
 
         return list(buf)[:buf_size]
 
+    @connection_required
+    def swo_read_into(self, buf, offset=0, remove=False):
+        """Reads data from the SWO buffer into a caller-provided buffer.
+
+        Unlike ``swo_read()``, no buffer is allocated, so the same buffer can
+        be reused by every read.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          buf (bytearray): writable buffer to read into, whose length is the
+            maximum number of bytes to read
+          offset (int): offset of first byte to be retrieved
+          remove (bool): if data should be removed from buffer after read
+
+        Returns:
+          The number of bytes read into ``buf``.
+        """
+        view = memoryview(buf).cast('B')
+        buf_size = ctypes.c_uint32(view.nbytes)
+        data = (ctypes.c_uint8 * view.nbytes).from_buffer(view)
+
+        self._dll.JLINKARM_SWO_Read(data, offset, ctypes.byref(buf_size))
+
+        # After the call, ``buf_size`` has been modified to be the actual
+        # number of bytes that was read.
+        buf_size = buf_size.value
+
+        if remove and buf_size > 0:
+            self.swo_flush(buf_size)
+
+        return buf_size
+
     @connection_required
     def swo_read_stimulus(self, port, num_bytes):
         """Reads the printable data via SWO.
@@ -5270,6 +6623,114 @@ class JLink(object):
 
         return list(buf)[:bytes_read]
 
+    @connection_required
+    def swo_auto_configure(self, cpu_speed, port_mask=0x01, marker=None, port=0,
+                           duration=0.1, num_speeds=8, host_buffer_time=1.0,
+                           emu_buffer_time=0.01):
+        """Selects the highest SWO speed at which SWO data is received intact.
+
+        The speeds supported by both the target and the J-Link are tried from
+        highest to lowest.  At each speed, SWO is enabled and its data is
+        captured for ``duration`` seconds and decoded as ITM packets.  A speed
+        is accepted if the data decodes without errors or overflow packets,
+        and contains the ``marker`` written to stimulus port ``port`` by the
+        target, or, if there is no marker, an ITM sync packet.
+
+        The host and emulator SWO buffers are then sized to hold the data
+        received at the measured throughput in ``host_buffer_time`` and
+        ``emu_buffer_time`` seconds respectively, rounded up to a power of
+        two, and SWO is restarted at the selected speed with these buffer
+        sizes.  SWO is stopped if no speed could be validated, or on error.
+
+        Args:
+          self (JLink): the ``JLink`` instance
+          cpu_speed (int): the target CPU frequency in Hz
+          port_mask (int): port mask specifying which stimulus ports to enable
+          marker (bytes): data the target writes periodically to ``port``
+          port (int): the stimulus port the marker is written to
+          duration (float): number of seconds to capture at each speed
+          num_speeds (int): maximum number of speeds to try
+          host_buffer_time (float): seconds of data the host buffer must hold
+          emu_buffer_time (float): seconds of data the emulator buffer must
+            hold
+
+        Returns:
+          A ``SWOConfiguration`` describing the selected configuration and its
+          measured throughput.
+
+        Raises:
+          JLinkException: if no speed could be validated, or on error.
+          ValueError: if ``duration`` is not positive.
+        """
+        if duration <= 0:
+            raise ValueError('Duration must be greater than 0.')
+
+        enabled = False
+        selected = None
+        buf = bytearray(self.MIN_SWO_BUFFER_SIZE)
+        try:
+            for swo_speed in self.swo_supported_speeds(cpu_speed, num_speeds):
+                self.swo_enable(cpu_speed, swo_speed, port_mask)
+                enabled = True
+                self.swo_flush()
+
+                decoder = itm.ITMDecoder(ports=[port])
+                num_bytes = 0
+                start = time.monotonic()
+                while True:
+                    elapsed = time.monotonic() - start
+                    if elapsed >= duration:
+                        break
+
+                    if self.swo_num_bytes() == 0:
+                        time.sleep(min(0.001, duration - elapsed))
+                        continue
+
+                    num_read = self.swo_read_into(buf, remove=True)
+                    decoder.feed(memoryview(buf)[:num_read], packets=False)
+                    num_bytes += num_read
+
+                if decoder.errors > 0 or decoder.overflows > 0:
+                    continue
+
+                if marker is not None:
+                    if marker not in decoder.read(port):
+                        continue
+                elif decoder.syncs == 0:
+                    continue
+
+                selected = (swo_speed, num_bytes / elapsed)
+                break
+        except Exception:
+            if enabled:
+                try:
+                    self.swo_stop()
+                except errors.JLinkException:
+                    pass
+            raise
+
+        if selected is None:
+            if enabled:
+                self.swo_stop()
+            raise errors.JLinkException('No SWO speed could be validated.')
+
+        (swo_speed, throughput) = selected
+        host_buffer_size = max(int(throughput * host_buffer_time), self.MIN_SWO_BUFFER_SIZE)
+        host_buffer_size = 1 << (host_buffer_size - 1).bit_length()
+        emu_buffer_size = max(int(throughput * emu_buffer_time), self.MIN_SWO_BUFFER_SIZE)
+        emu_buffer_size = 1 << (emu_buffer_size - 1).bit_length()
+
+        # The J-Link applies the buffer sizes when SWO is started, so SWO is
+        # restarted at the selected speed once they are set.
+        self.swo_stop()
+        self.swo_set_host_buffer_size(host_buffer_size)
+        self.swo_set_emu_buffer_size(emu_buffer_size)
+        self.swo_enable(cpu_speed, swo_speed, port_mask)
+
+        return swo.SWOConfiguration(cpu_speed, swo_speed, port_mask,
+                                    host_buffer_size, emu_buffer_size,
+                                    throughput)
+
 ###############################################################################
 #
 # Real Time Terminal (RTT) API
@@ -5429,8 +6890,9 @@ class JLink(object):
         Raises:
           JLinkRTTException: if the underlying JLINK_RTTERMINAL_Write call fails.
         """
+        data = bytearray(data)
         buf_size = len(data)
-        buf = (ctypes.c_ubyte * buf_size)(*bytearray(data))
+        buf = (ctypes.c_ubyte * buf_size).from_buffer(data)
         bytes_written = self._dll.JLINK_RTTERMINAL_Write(buffer_index, buf, buf_size)
 
         if bytes_written < 0:
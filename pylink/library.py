@@ -14,13 +14,222 @@
 
 from . import util
 
+import atexit
 import ctypes
 import ctypes.util as ctypes_util
+import hashlib
+import json
 import os
 import platform
 import re
+import shutil
 import sys
 import tempfile
+import threading
+
+
+# C types of the J-Link SDK API, used in the prototypes below.  ``char``
+# return values are used as booleans or small status codes.
+_BOOL = ctypes.c_int8
+_CHARP = ctypes.POINTER(ctypes.c_char)
+_INT = ctypes.c_int
+_PTR = ctypes.c_void_p
+_STR = ctypes.c_char_p
+_U8 = ctypes.c_uint8
+_U16 = ctypes.c_uint16
+_U32 = ctypes.c_uint32
+_U64 = ctypes.c_uint64
+
+
+class TemporaryCopyPool(object):
+    """Pool of temporary copies of DLL files.
+
+    Each copy handed out by ``acquire()`` is distinct from every other copy
+    currently in use, so that concurrent sessions load separate instances of
+    the DLL.  Copies given back with ``release()`` after the DLL loaded from
+    them was actually closed are reused by later calls to ``acquire()`` for
+    the same, unmodified, DLL file, instead of copying the file again.  Any
+    other released copy is removed, as the dynamic loader would hand back the
+    instance still loaded from it, global state and all.  Unused copies are
+    removed when the process exits.
+
+    Copies are never hard links, as the dynamic loader treats a hard link as
+    the library it links to, and would not load a separate instance.
+    """
+
+    def __init__(self):
+        """Initializes the pool.
+
+        Args:
+          self (TemporaryCopyPool): the ``TemporaryCopyPool`` instance
+
+        Returns:
+          ``None``
+        """
+        self._lock = threading.Lock()
+        self._free = {}
+        self._used = {}
+        atexit.register(self.clear)
+
+    @staticmethod
+    def _key(path):
+        """Returns the key identifying the current contents of a file.
+
+        Args:
+          path (str): path to the file
+
+        Returns:
+          A tuple of the file's absolute path, size, and modification time.
+
+        Raises:
+          OSError: if the file does not exist.
+        """
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+    @staticmethod
+    def copy(src, dst):
+        """Copies a file, without reading it into memory where possible.
+
+        On Linux, ``copy_file_range()`` copies the file within the kernel,
+        which file systems supporting it turn into a reflink.  Otherwise, the
+        copy falls back to ``shutil.copyfile()``, which uses the platform's
+        fast copy calls, if any.
+
+        Args:
+          src (str): path to the file to copy
+          dst (str): path to copy the file to
+
+        Returns:
+          ``None``
+        """
+        copy_file_range = getattr(os, 'copy_file_range', None)
+        if copy_file_range is not None:
+            try:
+                with open(src, 'rb') as inputfile, open(dst, 'wb') as outputfile:
+                    remaining = os.fstat(inputfile.fileno()).st_size
+                    while remaining > 0:
+                        copied = copy_file_range(inputfile.fileno(), outputfile.fileno(), remaining)
+                        if copied == 0:
+                            break
+                        remaining -= copied
+                if remaining == 0:
+                    return None
+            except OSError:
+                # Not supported by the kernel or across these file systems.
+                pass
+
+        shutil.copyfile(src, dst)
+        return None
+
+    def acquire(self, path, suffix=''):
+        """Returns a temporary copy of a file for exclusive use.
+
+        Args:
+          self (TemporaryCopyPool): the ``TemporaryCopyPool`` instance
+          path (str): path to the file to copy
+          suffix (str): suffix of the copy's file name
+
+        Returns:
+          The path to the copy.
+
+        Raises:
+          OSError: if the file does not exist, or can not be copied.
+        """
+        key = self._key(path)
+        stale = []
+        with self._lock:
+            for other in list(self._free):
+                if other[0] == key[0] and other != key:
+                    stale.extend(self._free.pop(other))
+
+            copies = self._free.get(key, [])
+            while copies:
+                copy = copies.pop()
+                if os.path.isfile(copy):
+                    self._used[copy] = key
+                    break
+            else:
+                copy = None
+
+        self._remove(stale)
+        if copy is not None:
+            return copy
+
+        tf = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+
+        # This is needed to work around a WindowsError where the file is not
+        # being properly cleaned up after exiting the with statement.
+        tf.close()
+
+        try:
+            self.copy(path, tf.name)
+        except Exception:
+            self._remove([tf.name])
+            raise
+
+        with self._lock:
+            self._used[tf.name] = key
+
+        return tf.name
+
+    def release(self, copy, reuse=False):
+        """Gives back a copy acquired from the pool.
+
+        A copy must only be reused once the DLL loaded from it has been
+        closed, e.g. with ``FreeLibrary()``, otherwise loading the copy again
+        returns the instance that is still loaded.
+
+        Args:
+          self (TemporaryCopyPool): the ``TemporaryCopyPool`` instance
+          copy (str): path to the copy, as returned by ``acquire()``
+          reuse (bool): ``True`` to return the copy to the pool, for reuse by
+            a later ``acquire()``, otherwise the copy is removed
+
+        Returns:
+          ``True`` if the copy was released, otherwise ``False`` if it was not
+          acquired from the pool.
+        """
+        with self._lock:
+            key = self._used.pop(copy, None)
+            if key is None:
+                return False
+            if reuse:
+                self._free.setdefault(key, []).append(copy)
+
+        if not reuse:
+            self._remove([copy])
+        return True
+
+    def clear(self):
+        """Removes all the copies that are not in use.
+
+        Args:
+          self (TemporaryCopyPool): the ``TemporaryCopyPool`` instance
+
+        Returns:
+          ``None``
+        """
+        with self._lock:
+            copies = [copy for copies in self._free.values() for copy in copies]
+            self._free.clear()
+        self._remove(copies)
+
+    @staticmethod
+    def _remove(copies):
+        """Removes the given copies, ignoring those that can not be removed.
+
+        Args:
+          copies (list): paths to the copies to remove
+
+        Returns:
+          ``None``
+        """
+        for copy in copies:
+            try:
+                os.remove(copy)
+            except OSError:
+                pass
 
 
 class Library(object):
@@ -87,6 +296,196 @@ class Library(object):
         'JLINKARM_WriteMem'
     ]
 
+    # Prototypes of the J-Link SDK API calls used by ``JLink``, as a mapping
+    # of the function name to a tuple of its ``restype`` and ``argtypes``.
+    #
+    # These are bound once when the DLL is loaded, so that arguments are
+    # converted to the C types the DLL expects, instead of being passed as
+    # a C ``int``, which silently truncates values that do not fit.  All
+    # pointer arguments are declared as ``void *`` so that any buffer, array,
+    # reference, or callback can be passed.
+    _prototypes_ = {
+        'JLINKARM_BeginDownload': (None, [_U32]),
+        'JLINKARM_Clock': (_INT, []),
+        'JLINKARM_Close': (None, []),
+        'JLINKARM_ClrBPEx': (_INT, [_INT]),
+        'JLINKARM_ClrDataEvent': (_INT, [_U32]),
+        'JLINKARM_ClrError': (None, []),
+        'JLINKARM_ClrRESET': (None, []),
+        'JLINKARM_ClrTCK': (_INT, []),
+        'JLINKARM_ClrTDI': (None, []),
+        'JLINKARM_ClrTMS': (None, []),
+        'JLINKARM_ClrTRST': (None, []),
+        'JLINKARM_ConfigJTAG': (None, [_INT, _INT]),
+        'JLINKARM_Connect': (_INT, []),
+        'JLINKARM_CORE_GetFound': (_U32, []),
+        'JLINKARM_Core2CoreName': (None, [_U32, _PTR, _U32]),
+        'JLINKARM_CORESIGHT_Configure': (_INT, [_STR]),
+        'JLINKARM_CORESIGHT_ReadAPDPReg': (_INT, [_U8, _U8, _PTR]),
+        'JLINKARM_CORESIGHT_WriteAPDPReg': (_INT, [_U8, _U8, _U32]),
+        'JLINKARM_CP15_IsPresent': (_BOOL, []),
+        'JLINKARM_CP15_ReadEx': (_INT, [_U8, _U8, _U8, _U8, _PTR]),
+        'JLINKARM_CP15_WriteEx': (_INT, [_U8, _U8, _U8, _U8, _U32]),
+        'JLINKARM_DEVICE_GetIndex': (_INT, [_STR]),
+        'JLINKARM_DEVICE_GetInfo': (_INT, [_INT, _PTR]),
+        'JLINKARM_DisassembleInst': (_INT, [_PTR, _U32, _U32]),
+        'JLINKARM_EMU_COM_IsSupported': (_INT, []),
+        'JLINKARM_EMU_GetList': (_INT, [_INT, _PTR, _INT]),
+        'JLINKARM_EMU_GetNumDevices': (_INT, []),
+        'JLINKARM_EMU_GetProductName': (None, [_PTR, _U32]),
+        'JLINKARM_EMU_HasCapEx': (_INT, [_INT]),
+        'JLINKARM_EMU_HasCPUCap': (_INT, [_U32]),
+        'JLINKARM_EMU_IsConnected': (_BOOL, []),
+        'JLINKARM_EMU_SelectByUSBSN': (_INT, [_U32]),
+        'JLINKARM_EMU_SelectIPBySN': (None, [_U32]),
+        'JLINKARM_EnableLog': (None, [_PTR]),
+        'JLINKARM_EnableLogCom': (None, [_PTR]),
+        'JLINKARM_EnableSoftBPs': (None, [_INT]),
+        'JLINKARM_EndDownload': (_INT, []),
+        'JLINKARM_ETM_IsPresent': (_BOOL, []),
+        'JLINKARM_ETM_ReadReg': (_U32, [_U32]),
+        'JLINKARM_ETM_WriteReg': (None, [_U32, _U32, _INT]),
+        'JLINKARM_ExecCommand': (_INT, [_STR, _PTR, _INT]),
+        'JLINKARM_FindBP': (_INT, [_U32]),
+        'JLINKARM_GetBPInfoEx': (_INT, [_INT, _PTR]),
+        'JLINKARM_GetCompileDateTime': (_CHARP, []),
+        'JLINKARM_GetDebugInfo': (_INT, [_U32, _PTR]),
+        'JLINKARM_GetDeviceFamily': (_INT, []),
+        'JLINKARM_GetDLLVersion': (_U32, []),
+        'JLINKARM_GetEmbeddedFWString': (_INT, [_STR, _PTR, _U32]),
+        'JLINKARM_GetEmuCaps': (_U32, []),
+        'JLINKARM_GetEmuCapsEx': (None, [_PTR, _INT]),
+        'JLINKARM_GetFeatureString': (None, [_PTR]),
+        'JLINKARM_GetFirmwareString': (None, [_PTR, _INT]),
+        'JLINKARM_GetHardwareVersion': (_U32, []),
+        'JLINKARM_GetHWInfo': (_INT, [_U32, _PTR]),
+        'JLINKARM_GetHWStatus': (_INT, [_PTR]),
+        'JLINKARM_GetId': (_U32, []),
+        'JLINKARM_GetIRLen': (_INT, []),
+        'JLINKARM_GetMOEs': (_INT, [_PTR, _INT]),
+        'JLINKARM_GetNumBPs': (_INT, []),
+        'JLINKARM_GetNumBPUnits': (_INT, [_U32]),
+        'JLINKARM_GetNumWPs': (_INT, []),
+        'JLINKARM_GetNumWPUnits': (_INT, []),
+        'JLINKARM_GetOEMString': (_INT, [_PTR]),
+        'JLINKARM_GetRegisterList': (_INT, [_PTR, _INT]),
+        'JLINKARM_GetRegisterName': (_CHARP, [_U32]),
+        'JLINKARM_GetScanLen': (_INT, []),
+        'JLINKARM_GetSelDevice': (_U16, []),
+        'JLINKARM_GetSN': (_INT, []),
+        'JLINKARM_GetSpeed': (_U16, []),
+        'JLINKARM_GetSpeedInfo': (None, [_PTR]),
+        'JLINKARM_GetWPInfoEx': (_INT, [_INT, _PTR]),
+        'JLINKARM_Go': (None, []),
+        'JLINKARM_GoEx': (None, [_U32, _U32]),
+        'JLINKARM_Halt': (_BOOL, []),
+        'JLINKARM_HasError': (_BOOL, []),
+        'JLINKARM_IsConnected': (_BOOL, []),
+        'JLINKARM_IsHalted': (_BOOL, []),
+        'JLINKARM_IsOpen': (_BOOL, []),
+        'JLINKARM_JTAG_GetData': (None, [_PTR, _INT, _INT]),
+        'JLINKARM_JTAG_GetDeviceId': (_U32, [_U32]),
+        'JLINKARM_JTAG_GetDeviceInfo': (_INT, [_U32, _PTR]),
+        'JLINKARM_JTAG_GetU8': (_U8, [_INT]),
+        'JLINKARM_JTAG_GetU16': (_U16, [_INT]),
+        'JLINKARM_JTAG_GetU32': (_U32, [_INT]),
+        'JLINKARM_JTAG_StoreData': (_INT, [_PTR, _INT]),
+        'JLINKARM_JTAG_StoreInst': (_INT, [_PTR, _INT]),
+        'JLINKARM_JTAG_StoreGetRaw': (None, [_PTR, _PTR, _PTR, _U32]),
+        'JLINKARM_JTAG_StoreRaw': (_INT, [_PTR, _PTR, _U32]),
+        'JLINKARM_JTAG_SyncBits': (None, []),
+        'JLINKARM_JTAG_SyncBytes': (None, []),
+        'JLINKARM_MeasureCPUSpeedEx': (_INT, [_U32, _INT, _INT]),
+        'JLINKARM_MeasureSCLen': (_INT, [_INT]),
+        'JLINKARM_OpenEx': (_CHARP, [_PTR, _PTR]),
+        'JLINKARM_ReadCodeMem': (_INT, [_U32, _U32, _PTR]),
+        'JLINKARM_ReadICEReg': (_U32, [_INT]),
+        'JLINKARM_ReadMemEx': (_INT, [_U32, _U32, _PTR, _U32]),
+        'JLINKARM_ReadMemU64': (_INT, [_U32, _U32, _PTR, _PTR]),
+        'JLINKARM_ReadMemZonedEx': (_INT, [_U32, _U32, _PTR, _U32, _STR]),
+        'JLINKARM_ReadReg': (_U32, [_U32]),
+        'JLINKARM_ReadRegs': (_INT, [_PTR, _PTR, _PTR, _U32]),
+        'JLINKARM_Reset': (_INT, []),
+        'JLINKARM_ResetPullsRESET': (None, [_U8]),
+        'JLINKARM_ResetPullsTRST': (None, [_U8]),
+        'JLINKARM_ResetTRST': (None, []),
+        'JLINKARM_SelectIP': (_BOOL, [_STR, _INT]),
+        'JLINKARM_SelectTraceSource': (_INT, [_INT]),
+        'JLINKARM_SelectUSB': (_BOOL, [_INT]),
+        'JLINKARM_SetBPEx': (_INT, [_U32, _U32]),
+        'JLINKARM_SetDataEvent': (_INT, [_PTR, _PTR]),
+        'JLINKARM_SetEndian': (_INT, [_INT]),
+        'JLINKARM_SetErrorOutHandler': (None, [_PTR]),
+        'JLINKARM_SetInitRegsOnReset': (_INT, [_INT]),
+        'JLINKARM_SetLogFile': (None, [_STR]),
+        'JLINKARM_SetMaxSpeed': (None, []),
+        'JLINKARM_SetRESET': (None, []),
+        'JLINKARM_SetResetDelay': (None, [_INT]),
+        'JLINKARM_SetResetType': (_INT, [_INT]),
+        'JLINKARM_SetSpeed': (None, [_U32]),
+        'JLINKARM_SetTCK': (_INT, []),
+        'JLINKARM_SetTDI': (None, []),
+        'JLINKARM_SetTMS': (None, []),
+        'JLINKARM_SetTRST': (None, []),
+        'JLINKARM_SetWarnOutHandler': (None, [_PTR]),
+        'JLINKARM_Step': (_BOOL, []),
+        'JLINKARM_StepComposite': (_BOOL, []),
+        'JLINKARM_StoreBits': (None, [_U32, _U32, _U32]),
+        'JLINKARM_SWO_Control': (_INT, [_U32, _PTR]),
+        'JLINKARM_SWO_DisableTarget': (_INT, [_U32]),
+        'JLINKARM_SWO_EnableTarget': (_INT, [_U32, _U32, _INT, _U32]),
+        'JLINKARM_SWO_GetCompatibleSpeeds': (_INT, [_U32, _U32, _PTR, _INT]),
+        'JLINKARM_SWO_Read': (None, [_PTR, _U32, _PTR]),
+        'JLINKARM_SWO_ReadStimulus': (_INT, [_INT, _PTR, _U32]),
+        'JLINKARM_Test': (_BOOL, []),
+        'JLINKARM_TIF_GetAvailable': (None, [_PTR]),
+        'JLINKARM_TIF_Select': (_INT, [_INT]),
+        'JLINKARM_TRACE_Control': (_INT, [_U32, _PTR]),
+        'JLINKARM_TRACE_Read': (_INT, [_PTR, _U32, _PTR]),
+        'JLINKARM_UpdateFirmwareIfNewer': (_U16, []),
+        'JLINKARM_WriteBits': (None, []),
+        'JLINKARM_WriteICEReg': (None, [_INT, _U32, _INT]),
+        'JLINKARM_WriteMem': (_INT, [_U32, _U32, _PTR]),
+        'JLINKARM_WriteMemEx': (_INT, [_U32, _U32, _PTR, _U32]),
+        'JLINKARM_WriteMemZonedEx': (_INT, [_U32, _U32, _PTR, _U32, _STR]),
+        'JLINKARM_WriteReg': (_BOOL, [_U32, _U32]),
+        'JLINKARM_WriteRegs': (_INT, [_PTR, _PTR, _PTR, _U32]),
+        'JLINKARM_WriteU8': (_INT, [_U32, _U8]),
+        'JLINKARM_WriteU16': (_INT, [_U32, _U16]),
+        'JLINKARM_WriteU32': (_INT, [_U32, _U32]),
+        'JLINKARM_WriteU64': (_INT, [_U32, _U64]),
+        'JLINKARM_WriteVectorCatch': (_INT, [_U32]),
+        'JLINK_DownloadFile': (_INT, [_STR, _U32]),
+        'JLINK_EMU_AddLicense': (_INT, [_PTR]),
+        'JLINK_EMU_EraseLicenses': (_INT, []),
+        'JLINK_EMU_GetLicenses': (_INT, [_PTR, _U32]),
+        'JLINK_EMU_GPIO_GetProps': (_INT, [_PTR, _INT]),
+        'JLINK_EMU_GPIO_GetState': (_INT, [_PTR, _PTR, _U32]),
+        'JLINK_EMU_GPIO_SetState': (_INT, [_PTR, _PTR, _PTR, _U32]),
+        'JLINK_EraseChip': (_INT, []),
+        'JLINK_GetAvailableLicense': (_INT, [_PTR, _U32]),
+        'JLINK_GetMemZones': (_INT, [_PTR, _INT]),
+        'JLINK_POWERTRACE_Control': (_INT, [_INT, _PTR, _PTR]),
+        'JLINK_POWERTRACE_Read': (_INT, [_PTR, _INT]),
+        'JLINK_RTTERMINAL_Control': (_INT, [_U32, _PTR]),
+        'JLINK_RTTERMINAL_Read': (_INT, [_U32, _PTR, _U32]),
+        'JLINK_RTTERMINAL_Write': (_INT, [_U32, _PTR, _U32]),
+        'JLINK_SetFlashProgProgressCallback': (None, [_PTR]),
+        'JLINK_SetHookUnsecureDialog': (_INT, [_PTR]),
+        'JLINK_STRACE_Config': (_INT, [_STR]),
+        'JLINK_STRACE_Control': (_INT, [_U32, _PTR]),
+        'JLINK_STRACE_Read': (_INT, [_PTR, _U32]),
+        'JLINK_STRACE_Start': (_INT, []),
+        'JLINK_STRACE_Stop': (_INT, []),
+        'JLINK_SWD_GetData': (None, [_PTR, _INT, _INT]),
+        'JLINK_SWD_GetU8': (_U8, [_INT]),
+        'JLINK_SWD_GetU16': (_U16, [_INT]),
+        'JLINK_SWD_GetU32': (_U32, [_INT]),
+        'JLINK_SWD_StoreRaw': (_INT, [_PTR, _PTR, _U32]),
+        'JLINK_SWD_SyncBits': (None, []),
+        'JLINK_SWD_SyncBytes': (None, []),
+    }
+
     # On Linux and macOS, represents the library file name prefix
     # (the part just before .so or .dylib).
     #
@@ -118,6 +517,21 @@ class Library(object):
     # dance three times.
     _dlinfo = None
 
+    # Name of the environment variable giving the path of the file in which
+    # the location of the default J-Link DLL is cached across processes.  An
+    # empty value disables the cache.
+    CACHE_ENV_VAR = 'PYLINK_LIBRARY_CACHE'
+
+    # DLLs loaded without a temporary copy, shared by all instances of this
+    # class that load the same path.  Maps the DLL path to a list of the
+    # ``cdll`` library, the ``windll`` library, and the number of instances
+    # using them.
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    # Temporary copies of DLLs, shared by all instances of this class.
+    _copy_pool = TemporaryCopyPool()
+
     @classmethod
     def get_appropriate_windows_sdk_name(cls):
         """Returns the appropriate JLink SDK library name on Windows depending
@@ -302,6 +716,7 @@ class Library(object):
         self._cygwin = sys.platform.startswith('cygwin')
         self._use_tmpcpy = use_tmpcpy
         self._temp = None
+        self._shared_path = None
 
         if self._windows or self._cygwin:
             self._sdk = self.get_appropriate_windows_sdk_name()
@@ -314,7 +729,7 @@ class Library(object):
             self.load_default()
 
     def __del__(self):
-        """Cleans up the temporary DLL file created when the lib was loaded.
+        """Releases the temporary DLL file used when the lib was loaded.
 
         Args:
           self (Library): the ``Library`` instance
@@ -330,12 +745,36 @@ class Library(object):
         The default J-Link SDK is determined by first checking if ``ctypes``
         can find the DLL, then by searching the platform-specific paths.
 
+        The location of the DLL found is cached on disk, see ``cache_path()``,
+        so that later instances, including those in other processes, skip the
+        search as long as the DLL is not modified.
+
         Args:
           self (Library): the ``Library`` instance
 
         Returns:
           ``True`` if the DLL was loaded, otherwise ``False``.
         """
+        path = self._cache_read()
+        if path is None:
+            path = self.find_default()
+            if path is not None:
+                self._cache_write(path)
+
+        if path is not None:
+            return self.load(path)
+
+        return False
+
+    def find_default(self):
+        """Searches for the default J-Link SDK DLL.
+
+        Args:
+          self (Library): the ``Library`` instance
+
+        Returns:
+          The path to the DLL, or ``None`` if it could not be found.
+        """
 
         # Request the underlying operating system, through ctypes,
         # to resolve the J-Link DLL "the standard way" by its
@@ -368,10 +807,127 @@ class Library(object):
             elif sys.platform.startswith('darwin'):
                 path = next(self.find_library_darwin(), None)
 
+        return path
+
+    @classmethod
+    def cache_path(cls):
+        """Returns the path of the file caching the default DLL's location.
+
+        This is the value of the ``PYLINK_LIBRARY_CACHE`` environment variable
+        if it is set, otherwise a file in the user's cache directory.
+
+        Args:
+          cls (Library): the ``Library`` class
+
+        Returns:
+          The path of the cache file, or ``None`` if caching is disabled.
+        """
+        path = os.environ.get(cls.CACHE_ENV_VAR)
         if path is not None:
-            return self.load(path)
+            return path or None
 
-        return False
+        base = os.environ.get('XDG_CACHE_HOME')
+        if not base and sys.platform.startswith('win'):
+            base = os.environ.get('LOCALAPPDATA')
+        if not base:
+            home = os.path.expanduser('~')
+            if home == '~':
+                return None
+            base = os.path.join(home, '.cache')
+
+        return os.path.join(base, 'pylink', 'library.json')
+
+    def _cache_key(self):
+        """Returns the key of the cached DLL location for this environment.
+
+        The key covers everything that affects which DLL the search finds: the
+        platform, the Python word size, and the library search paths.
+
+        Args:
+          self (Library): the ``Library`` instance
+
+        Returns:
+          The key as a string.
+        """
+        env = [
+            sys.platform,
+            platform.machine(),
+            str(ctypes.sizeof(ctypes.c_void_p)),
+            self._sdk,
+            os.environ.get('LD_LIBRARY_PATH', ''),
+            os.environ.get('DYLD_LIBRARY_PATH', ''),
+        ]
+        if self._windows or self._cygwin:
+            env.append(os.environ.get('PATH', ''))
+        return hashlib.sha1('\0'.join(env).encode()).hexdigest()
+
+    def _cache_read(self):
+        """Returns the cached location of the default DLL, if still valid.
+
+        Args:
+          self (Library): the ``Library`` instance
+
+        Returns:
+          The path to the DLL, or ``None`` if it is not cached, or if the DLL
+          has been modified or removed since.
+        """
+        cache_path = self.cache_path()
+        if cache_path is None:
+            return None
+
+        try:
+            with open(cache_path, 'r') as f:
+                entry = json.load(f).get(self._cache_key())
+            if entry is None or os.stat(entry['path']).st_mtime != entry['mtime']:
+                return None
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            return None
+
+        return entry['path']
+
+    def _cache_write(self, path):
+        """Caches the location of the default DLL.
+
+        Failures to write the cache are ignored, as the cache is only an
+        optimization.
+
+        Args:
+          self (Library): the ``Library`` instance
+          path (str): the path to the DLL
+
+        Returns:
+          ``None``
+        """
+        cache_path = self.cache_path()
+        if cache_path is None:
+            return None
+
+        try:
+            try:
+                with open(cache_path, 'r') as f:
+                    entries = dict(json.load(f))
+            except (OSError, ValueError, TypeError):
+                entries = {}
+
+            entries[self._cache_key()] = {
+                'path': path,
+                'mtime': os.stat(path).st_mtime,
+            }
+
+            directory = os.path.dirname(cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # Write to a temporary file first, so that concurrent processes
+            # never read a partially written cache.
+            tf = tempfile.NamedTemporaryFile('w', dir=directory or None, suffix='.tmp', delete=False)
+            with tf:
+                json.dump(entries, tf)
+            os.replace(tf.name, cache_path)
+        except (OSError, TypeError, ValueError):
+            pass
+
+        return None
 
     def load(self, path=None):
         """Loads the specified DLL, if any, otherwise re-loads the current DLL.
@@ -380,7 +936,7 @@ class Library(object):
         otherwise re-loads the DLL currently specified by this library.
 
         Note:
-          This creates a temporary DLL file to use for the instance.  This is
+          This uses a temporary copy of the DLL for the instance.  This is
           necessary to work around a limitation of the J-Link DLL in which
           multiple J-Links cannot be accessed from the same process.
 
@@ -418,20 +974,21 @@ class Library(object):
             self._use_tmpcpy = (maybe_version <= 6.10) if maybe_version else True
 
         if self._use_tmpcpy:
-            # Copy the J-Link DLL to a temporary file.  This will be cleaned up the
+            # Use a temporary copy of the J-Link DLL.  This is released the
             # next time we load a DLL using this library or if this library is
             # cleaned up.
-            tf = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-            with open(tf.name, 'wb') as outputfile:
-                with open(self._path, 'rb') as inputfile:
-                    outputfile.write(inputfile.read())
-
-            # This is needed to work around a WindowsError where the file is not
-            # being properly cleaned up after exiting the with statement.
-            tf.close()
-
-            lib_path = tf.name
-            self._temp = tf
+            lib_path = self._copy_pool.acquire(self._path, suffix)
+            self._temp = lib_path
+        else:
+            # Without a temporary copy, every instance loading the path gets
+            # the same library, so reuse the one already loaded, if any.
+            with Library._shared_lock:
+                shared = Library._shared.get(lib_path)
+                if shared is not None:
+                    self._lib, self._winlib = shared[0], shared[1]
+                    self._shared_path = lib_path
+                    shared[2] += 1
+                    return True
 
         self._lib = ctypes.cdll.LoadLibrary(lib_path)
 
@@ -448,13 +1005,54 @@ class Library(object):
                     # older versions of the J-Link firmware, so ignore them in
                     # these cases.
                     setattr(self._lib, stdcall, getattr(self._winlib, stdcall))
+
+        self.bind_prototypes(self._lib)
+
+        if self._temp is None:
+            with Library._shared_lock:
+                Library._shared[lib_path] = [self._lib, self._winlib, 1]
+                self._shared_path = lib_path
+
         return True
 
+    @classmethod
+    def bind_prototypes(cls, dll, prototypes=None):
+        """Binds the ``restype`` and ``argtypes`` of the DLL's API calls.
+
+        Functions that are not exported by the DLL, e.g. by older versions of
+        the J-Link DLL, are skipped.
+
+        Args:
+          cls (Library): the ``Library`` class
+          dll (ctypes.CDLL): the loaded DLL
+          prototypes (dict): mapping of function names to a tuple of their
+            ``restype`` and ``argtypes``, defaults to ``_prototypes_``
+
+        Returns:
+          The number of functions bound.
+        """
+        if prototypes is None:
+            prototypes = cls._prototypes_
+
+        bound = 0
+        for (name, (restype, argtypes)) in prototypes.items():
+            try:
+                func = getattr(dll, name)
+            except AttributeError:
+                continue
+            func.restype = restype
+            func.argtypes = argtypes
+            bound += 1
+
+        return bound
+
     def unload(self):
         """Unloads the library's DLL if it has been loaded.
 
-        This additionally cleans up the temporary DLL file that was created
-        when the library was loaded.
+        This additionally releases the temporary DLL file that was used when
+        the library was loaded.  The file is returned to the pool of copies for
+        reuse only if the DLL was actually closed, which is only done on
+        Windows, otherwise it is removed.
 
         Args:
           self (Library): the ``Library`` instance
@@ -463,6 +1061,21 @@ class Library(object):
           ``True`` if the DLL was unloaded, otherwise ``False``.
         """
         unloaded = False
+        freed = False
+
+        if self._shared_path is not None:
+            # Only release a shared library once no other instance uses it.
+            with Library._shared_lock:
+                shared = Library._shared.get(self._shared_path)
+                if shared is not None and shared[0] is self._lib:
+                    shared[2] -= 1
+                    if shared[2] > 0:
+                        self._lib = None
+                        self._winlib = None
+                        unloaded = True
+                    else:
+                        del Library._shared[self._shared_path]
+                self._shared_path = None
 
         if self._lib is not None:
             if self._winlib is not None:
@@ -483,6 +1096,7 @@ class Library(object):
                 self._winlib = None
 
                 unloaded = True
+                freed = True
             else:
                 # On OSX and Linux, just release the library; it's not safe
                 # to close a dll that ctypes is using.
@@ -491,7 +1105,7 @@ class Library(object):
                 unloaded = True
 
         if self._temp is not None:
-            os.remove(self._temp.name)
+            self._copy_pool.release(self._temp, reuse=freed)
             self._temp = None
 
         return unloaded
@@ -0,0 +1,373 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import time
+
+
+# Translates the ASCII digits of a binary string into bit values.
+_BINARY_DIGITS = bytes.maketrans(b'01', b'\x00\x01')
+
+
+class Sample(collections.namedtuple('Sample', ['timestamp', 'states'])):
+    """Pin states captured by a single boundary-scan.
+
+    Attributes:
+      timestamp: time of the scan, in seconds since the epoch.
+      states: tuple of pin states, ``0`` or ``1``, in the order of the pins of
+        the ``BoundaryScan``.
+    """
+    __slots__ = ()
+
+
+class Device(object):
+    """Description of a device in a JTAG scan chain.
+
+    Attributes:
+      ir_len: length of the instruction register in bits.
+      bsr_len: length of the boundary-scan register in bits.
+      sample: opcode of the ``SAMPLE/PRELOAD`` instruction.
+      extest: opcode of the ``EXTEST`` instruction.
+      bypass: opcode of the ``BYPASS`` instruction.
+      cells: mapping of pin names to the index of the boundary-scan cell that
+        captures the pin, with cell ``0`` being the cell nearest to TDO.
+    """
+
+    def __init__(self, ir_len, bsr_len=0, sample=None, extest=0x0, bypass=None, cells=None):
+        """Initializes the device description.
+
+        Args:
+          self (Device): the ``Device`` instance
+          ir_len (int): length of the instruction register in bits
+          bsr_len (int): length of the boundary-scan register in bits, or
+            ``0`` for a device that is only ever bypassed
+          sample (int): opcode of the ``SAMPLE/PRELOAD`` instruction
+          extest (int): opcode of the ``EXTEST`` instruction
+          bypass (int): opcode of the ``BYPASS`` instruction, defaults to all
+            ones
+          cells (dict): mapping of pin names to boundary-scan cell indices
+
+        Returns:
+          ``None``
+
+        Raises:
+          ValueError: if a length is invalid, or a cell is out of range.
+        """
+        if ir_len < 2:
+            raise ValueError('Instruction register must be at least 2 bits.')
+
+        if bsr_len < 0:
+            raise ValueError('Boundary-scan register length must be non-negative.')
+
+        cells = dict(cells or {})
+        for (pin, cell) in cells.items():
+            if not (0 <= cell < bsr_len):
+                raise ValueError('Cell %d of pin %s is out of range.' % (cell, pin))
+
+        self.ir_len = ir_len
+        self.bsr_len = bsr_len
+        self.sample = sample
+        self.extest = extest
+        self.bypass = ((1 << ir_len) - 1) if bypass is None else bypass
+        self.cells = cells
+
+
+class Chain(object):
+    """Description of a JTAG scan chain.
+
+    The devices are ordered from TDO to TDI, so the first device is the one
+    whose registers are shifted out first.  While one device is scanned, all
+    of the other devices are put into ``BYPASS``.
+
+    Attributes:
+      devices: list of ``Device`` instances, from TDO to TDI.
+    """
+
+    def __init__(self, devices):
+        """Initializes the chain description.
+
+        Args:
+          self (Chain): the ``Chain`` instance
+          devices (list): list of ``Device`` instances, from TDO to TDI
+
+        Returns:
+          ``None``
+
+        Raises:
+          ValueError: if there are no devices.
+        """
+        if len(devices) == 0:
+            raise ValueError('Chain must have at least one device.')
+
+        self.devices = list(devices)
+
+    @property
+    def ir_len(self):
+        """Returns the total length of the instruction registers in the chain.
+
+        Args:
+          self (Chain): the ``Chain`` instance
+
+        Returns:
+          The total instruction register length in bits.
+        """
+        return sum(device.ir_len for device in self.devices)
+
+    def instruction(self, index, opcode):
+        """Returns the chain's instruction register vector for an instruction.
+
+        Args:
+          self (Chain): the ``Chain`` instance
+          index (int): index of the device to load the instruction into
+          opcode (int): opcode of the instruction
+
+        Returns:
+          The instruction register vector, with every other device bypassed.
+        """
+        vector = 0
+        pos = 0
+        for (i, device) in enumerate(self.devices):
+            value = opcode if i == index else device.bypass
+            vector |= (value & ((1 << device.ir_len) - 1)) << pos
+            pos += device.ir_len
+        return vector
+
+    def data_layout(self, index):
+        """Returns where a device's boundary-scan register is in the chain.
+
+        Args:
+          self (Chain): the ``Chain`` instance
+          index (int): index of the device whose register is selected
+
+        Returns:
+          A tuple of ``(offset, dr_len)``, where ``offset`` is the bit position
+          of the device's register in the chain's data register vector, and
+          ``dr_len`` is the length of the chain's data register.
+        """
+        # Each bypassed device contributes a single bit.
+        offset = index
+        dr_len = self.devices[index].bsr_len + len(self.devices) - 1
+        return (offset, dr_len)
+
+
+class BoundaryScan(object):
+    """Runs repeated boundary-scans of a device's pins.
+
+    Every scan selects the device's boundary-scan register and captures the
+    state of its pins.  Scans are run in batches, each of which is pipelined
+    through a single ``JLink.jtag_scan_dr()`` call, and the captured bits of a
+    batch are decoded into pin states all at once.  The decoded ``Sample``
+    instances are appended to a ring buffer, ``samples``, which holds the most
+    recent samples.
+
+    The TAP controller must be in the Run-Test/Idle state.
+
+    Attributes:
+      chain: the ``Chain`` of the scanned device.
+      index: index of the scanned device in the chain.
+      pins: list of the names of the pins that are decoded.
+      samples: ring buffer of the most recent ``Sample`` instances.
+    """
+
+    def __init__(self, jlink, chain, index=0, pins=None, buffer_size=4096):
+        """Initializes the boundary-scan engine.
+
+        Args:
+          self (BoundaryScan): the ``BoundaryScan`` instance
+          jlink (JLink): the ``JLink`` instance to scan with
+          chain (Chain): the scan chain
+          index (int): index of the device to scan
+          pins (list): names of the pins to decode, defaults to all of the
+            pins in the device's cell map
+          buffer_size (int): maximum number of samples held in ``samples``
+
+        Returns:
+          ``None``
+
+        Raises:
+          KeyError: if a pin is not in the device's cell map.
+          ValueError: if the device has no boundary-scan register.
+        """
+        device = chain.devices[index]
+        if device.bsr_len == 0:
+            raise ValueError('Device does not have a boundary-scan register.')
+
+        self.chain = chain
+        self.index = index
+        self.pins = list(device.cells) if pins is None else list(pins)
+        self.samples = collections.deque(maxlen=buffer_size)
+
+        self._jlink = jlink
+        self._device = device
+        self._cells = [device.cells[pin] for pin in self.pins]
+        self._instruction = None
+        self._vector = 0
+
+    def _select(self, opcode):
+        """Loads an instruction into the device, unless already loaded.
+
+        Args:
+          self (BoundaryScan): the ``BoundaryScan`` instance
+          opcode (int): opcode of the instruction
+
+        Returns:
+          ``None``
+
+        Raises:
+          ValueError: if the opcode is not known.
+        """
+        if opcode is None:
+            raise ValueError('Device does not define the instruction.')
+
+        if self._instruction != opcode:
+            vector = self.chain.instruction(self.index, opcode)
+            self._jlink.jtag_scan_ir(vector, self.chain.ir_len)
+            self._instruction = opcode
+
+    def _scan(self, count):
+        """Runs a batch of data register scans and records their samples.
+
+        Args:
+          self (BoundaryScan): the ``BoundaryScan`` instance
+          count (int): number of scans to run
+
+        Returns:
+          A list of the ``Sample`` instances captured.
+        """
+        if count <= 0:
+            return []
+
+        (offset, dr_len) = self.chain.data_layout(self.index)
+        vector = self._vector << offset
+
+        start = time.time()
+        captured = self._jlink.jtag_scan_dr([vector] * count, dr_len)
+        end = time.time()
+
+        samples = self.decode(captured, count)
+        step = (end - start) / count
+        samples = [Sample(start + step * (i + 1), states) for (i, states) in enumerate(samples)]
+        self.samples.extend(samples)
+        return samples
+
+    def decode(self, captured, count):
+        """Decodes the bits captured by a batch of scans into pin states.
+
+        The captured bits are expanded into a string of bit values once, and
+        the states of each pin across all of the scans are then extracted with
+        a single strided slice.
+
+        Args:
+          self (BoundaryScan): the ``BoundaryScan`` instance
+          captured (bytes): the bits captured by ``count`` consecutive scans
+            of the chain's data register, least significant bit first
+          count (int): the number of scans
+
+        Returns:
+          A list of tuples of pin states, one tuple for each scan.
+        """
+        (offset, dr_len) = self.chain.data_layout(self.index)
+        num_bits = count * dr_len
+
+        value = int.from_bytes(bytes(captured), 'little') & ((1 << num_bits) - 1)
+        bits = format(value, '0%db' % num_bits)[::-1].encode('ascii').translate(_BINARY_DIGITS)
+
+        series = [bits[offset + cell::dr_len] for cell in self._cells]
+        if not series:
+            return [()] * count
+
+        return list(zip(*series))
+
+    def sample(self, count=1):
+        """Captures the device's pins with the ``SAMPLE/PRELOAD`` instruction.
+
+        The pins keep operating normally.  The last vector given to
+        ``preload()`` or ``extest()`` is shifted in, so the boundary-scan
+        register's update latches are left unchanged.
+
+        Args:
+          self (BoundaryScan): the ``BoundaryScan`` instance
+          count (int): number of scans to run
+
+        Returns:
+          A list of the ``Sample`` instances captured.
+
+        Raises:
+          ValueError: if the device does not define ``SAMPLE/PRELOAD``.
+        """
+        self._select(self._device.sample)
+        return self._scan(count)
+
+    def preload(self, vector):
+        """Loads a vector into the boundary-scan register's update latches.
+
+        Args:
+          self (BoundaryScan): the ``BoundaryScan`` instance
+          vector (int): the boundary-scan register value
+
+        Returns:
+          The ``Sample`` captured while preloading.
+
+        Raises:
+          ValueError: if the device does not define ``SAMPLE/PRELOAD``.
+        """
+        self._vector = vector & ((1 << self._device.bsr_len) - 1)
+        return self.sample(1)[0]
+
+    def extest(self, vector, count=1):
+        """Drives the device's pins with the ``EXTEST`` instruction.
+
+        If ``EXTEST`` is not yet loaded, the vector is preloaded first, so that
+        the pins are not driven with stale values when ``EXTEST`` is loaded.
+
+        Args:
+          self (BoundaryScan): the ``BoundaryScan`` instance
+          vector (int): the boundary-scan register value to drive
+          count (int): number of scans to run
+
+        Returns:
+          A list of the ``Sample`` instances captured.
+
+        Raises:
+          ValueError: if the device does not define ``SAMPLE/PRELOAD`` or
+            ``EXTEST``.
+        """
+        if self._instruction != self._device.extest:
+            self.preload(vector)
+
+        self._vector = vector & ((1 << self._device.bsr_len) - 1)
+        self._select(self._device.extest)
+        return self._scan(count)
+
+    def run(self, num_samples, batch_size=256):
+        """Samples the device's pins repeatedly.
+
+        Args:
+          self (BoundaryScan): the ``BoundaryScan`` instance
+          num_samples (int): the total number of samples to capture
+          batch_size (int): the number of scans to pipeline in each batch
+
+        Returns:
+          The number of samples captured.
+
+        Raises:
+          ValueError: if ``batch_size`` is not positive.
+        """
+        if batch_size <= 0:
+            raise ValueError('Batch size must be greater than 0.')
+
+        captured = 0
+        while captured < num_samples:
+            captured += len(self.sample(min(batch_size, num_samples - captured)))
+        return captured
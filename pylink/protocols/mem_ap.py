@@ -0,0 +1,292 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from .. import errors
+
+
+class MemAP(object):
+    """Memory access through a CoreSight Memory Access Port (MEM-AP).
+
+    Accesses are made with ``JLink.coresight_read()`` and
+    ``JLink.coresight_write()``, so only ``JLink.coresight_configure()`` is
+    needed, not a connection to the target.
+
+    The Transfer Address Register (TAR) is auto-incremented by each access to
+    the Data Read/Write register (DRW), so a block is transferred with one TAR
+    write for each 1 KiB of memory, as auto-increment is only guaranteed
+    within a 1 KiB boundary, followed by the DRW accesses.  The DP ``SELECT``
+    register, the Control/Status Word (CSW) and the TAR are cached, so that
+    redundant writes to them are skipped, and each block transfer is run in a
+    ``JLink.trusted_session()``.
+
+    Note:
+      The cached state is only valid while nothing else accesses the DAP.
+      Call ``invalidate()`` after accessing the DAP by other means.
+    """
+
+    # Index of the SELECT register in the Debug Port.
+    DP_SELECT = 0x2
+
+    # Indices of the MEM-AP registers in bank 0.
+    CSW = 0x0
+    TAR = 0x1
+    DRW = 0x3
+
+    # Fields of the Control/Status Word.
+    CSW_SIZE_MASK = 0x7
+    CSW_ADDRINC_MASK = (0x3 << 4)
+    CSW_ADDRINC_SINGLE = (0x1 << 4)
+
+    # Values of the CSW ``Size`` field, by access size in bytes.
+    CSW_SIZES = {1: 0x0, 2: 0x1, 4: 0x2}
+
+    # Auto-increment of the TAR is only guaranteed within this boundary.
+    AUTO_INCREMENT_BOUNDARY = 0x400
+
+    def __init__(self, jlink, ap=0):
+        """Initializes the MEM-AP.
+
+        Args:
+          self (MemAP): the ``MemAP`` instance
+          jlink (JLink): the ``JLink`` instance to access the DAP with
+          ap (int): index of the Access Port
+
+        Returns:
+          ``None``
+        """
+        self.ap = ap
+        self._jlink = jlink
+        self.invalidate()
+
+    def invalidate(self):
+        """Drops the cached ``SELECT``, CSW and TAR values.
+
+        Args:
+          self (MemAP): the ``MemAP`` instance
+
+        Returns:
+          ``None``
+        """
+        self._select = None
+        self._csw = None
+        self._tar = None
+
+    def _select_bank(self, bank=0):
+        """Selects the Access Port and its register bank.
+
+        Args:
+          self (MemAP): the ``MemAP`` instance
+          bank (int): the register bank
+
+        Returns:
+          ``None``
+        """
+        select = (self.ap << 24) | ((bank & 0xF) << 4)
+        if self._select != select:
+            self._jlink.coresight_write(self.DP_SELECT, select, False)
+            self._select = select
+
+    def _set_size(self, size):
+        """Sets the access size in the CSW, with single auto-increment.
+
+        The other fields of the CSW are preserved.
+
+        Args:
+          self (MemAP): the ``MemAP`` instance
+          size (int): the access size in bytes
+
+        Returns:
+          ``None``
+        """
+        if self._csw is None:
+            self._csw = self._jlink.coresight_read(self.CSW, True)
+
+        csw = self._csw & ~(self.CSW_SIZE_MASK | self.CSW_ADDRINC_MASK)
+        csw |= self.CSW_SIZES[size] | self.CSW_ADDRINC_SINGLE
+        if csw != self._csw:
+            self._jlink.coresight_write(self.CSW, csw, True)
+            self._csw = csw
+
+    def _set_address(self, addr):
+        """Sets the TAR, unless it already holds the given address.
+
+        Args:
+          self (MemAP): the ``MemAP`` instance
+          addr (int): the address
+
+        Returns:
+          ``None``
+        """
+        if self._tar != addr:
+            self._jlink.coresight_write(self.TAR, addr, True)
+            self._tar = addr
+
+    def _advance(self, size):
+        """Tracks the auto-increment of the TAR after a DRW access.
+
+        Args:
+          self (MemAP): the ``MemAP`` instance
+          size (int): the access size in bytes
+
+        Returns:
+          ``None``
+        """
+        tar = (self._tar + size) & 0xFFFFFFFF
+        if tar % self.AUTO_INCREMENT_BOUNDARY == 0:
+            # The TAR may wrap within the boundary, so it must be rewritten.
+            self._tar = None
+        else:
+            self._tar = tar
+
+    def _units(self, addr, num_bytes):
+        """Splits a region into naturally aligned accesses.
+
+        Args:
+          self (MemAP): the ``MemAP`` instance
+          addr (int): start address of the region
+          num_bytes (int): size of the region in bytes
+
+        Returns:
+          A list of ``(addr, size)`` of each access.
+        """
+        units = []
+        end = addr + num_bytes
+        while addr < end:
+            size = 4 if (addr % 4 == 0 and end - addr >= 4) else 1
+            units.append((addr, size))
+            addr += size
+        return units
+
+    def _transfer(self, addr, num_bytes, func):
+        """Runs a function for each access of a block transfer.
+
+        Args:
+          self (MemAP): the ``MemAP`` instance
+          addr (int): start address of the block
+          num_bytes (int): size of the block in bytes
+          func (function): function called as ``func(addr, size, pos)`` for
+            each access, with the TAR and CSW set up for it
+
+        Returns:
+          ``None``
+
+        Raises:
+          JLinkException: on hardware error.
+        """
+        try:
+            with self._jlink.trusted_session():
+                self._select_bank(0)
+                for (unit_addr, size) in self._units(addr, num_bytes):
+                    self._set_size(size)
+                    self._set_address(unit_addr)
+                    func(unit_addr, size, unit_addr - addr)
+                    self._advance(size)
+        except errors.JLinkException:
+            self.invalidate()
+            raise
+
+    def read_block(self, addr, num_bytes):
+        """Reads a block of memory.
+
+        Aligned words are read with 32-bit accesses, and any unaligned bytes
+        at the start or end of the block with 8-bit accesses.
+
+        Args:
+          self (MemAP): the ``MemAP`` instance
+          addr (int): start address to read from
+          num_bytes (int): number of bytes to read
+
+        Returns:
+          The ``bytes`` read.
+
+        Raises:
+          JLinkException: on hardware error.
+        """
+        data = bytearray(num_bytes)
+
+        def _read(unit_addr, size, pos):
+            value = self._jlink.coresight_read(self.DRW, True)
+            if size == 1:
+                # Bytes are transferred on the byte lane of their address.
+                data[pos] = (value >> ((unit_addr % 4) * 8)) & 0xFF
+            else:
+                data[pos:pos + 4] = value.to_bytes(4, 'little')
+
+        self._transfer(addr, num_bytes, _read)
+        return bytes(data)
+
+    def write_block(self, addr, data):
+        """Writes a block of memory.
+
+        Aligned words are written with 32-bit accesses, and any unaligned bytes
+        at the start or end of the block with 8-bit accesses.
+
+        Args:
+          self (MemAP): the ``MemAP`` instance
+          addr (int): start address to write to
+          data (bytes): data to write
+
+        Returns:
+          ``None``
+
+        Raises:
+          JLinkException: on hardware error.
+        """
+        data = bytes(data)
+
+        def _write(unit_addr, size, pos):
+            if size == 1:
+                value = data[pos] << ((unit_addr % 4) * 8)
+            else:
+                value = int.from_bytes(data[pos:pos + 4], 'little')
+            self._jlink.coresight_write(self.DRW, value, True)
+
+        self._transfer(addr, len(data), _write)
+
+    def read32(self, addr):
+        """Reads a 32-bit word from memory.
+
+        Args:
+          self (MemAP): the ``MemAP`` instance
+          addr (int): the word aligned address to read from
+
+        Returns:
+          The word read.
+
+        Raises:
+          JLinkException: on hardware error.
+          ValueError: if the address is not word aligned.
+        """
+        if addr % 4:
+            raise ValueError('Address 0x%08X is not word aligned.' % addr)
+        return int.from_bytes(self.read_block(addr, 4), 'little')
+
+    def write32(self, addr, value):
+        """Writes a 32-bit word to memory.
+
+        Args:
+          self (MemAP): the ``MemAP`` instance
+          addr (int): the word aligned address to write to
+          value (int): the word to write
+
+        Returns:
+          ``None``
+
+        Raises:
+          JLinkException: on hardware error.
+          ValueError: if the address is not word aligned.
+        """
+        if addr % 4:
+            raise ValueError('Address 0x%08X is not word aligned.' % addr)
+        self.write_block(addr, (value & 0xFFFFFFFF).to_bytes(4, 'little'))
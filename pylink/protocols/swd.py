@@ -276,3 +276,188 @@ class WriteRequest(Request):
         jlink.swd_write32(0xFFFFFFFF, self.data)
         jlink.swd_write8(0xFF, util.calculate_parity(self.data))
         return Response(jlink.swd_read8(ack) & 7)
+
+
+class SWDTransactionQueue(object):
+    """Queue of SWD requests that are sent to the target in a single batch.
+
+    Each request is clocked out with the same sequence of bits as its
+    ``send()`` method, but the direction and data bits of all queued requests
+    are assembled into one buffer, which is transferred with a single call to
+    ``JLink.swd_write()``.  The ACKs, data and parity of every request are
+    then decoded from one read of the input buffer.
+
+    Note:
+      The target does not drive the data phase of a request that is not
+      ACK'd, and may not accept the requests that follow it, so responses
+      after the first non-ACK response in a batch should not be relied upon.
+    """
+
+    # Number of bits clocked for each request type.
+    READ_NUM_BITS = 51
+    WRITE_NUM_BITS = 53
+
+    def __init__(self):
+        """Initializes the transaction queue.
+
+        Args:
+          self (SWDTransactionQueue): the ``SWDTransactionQueue`` instance
+
+        Returns:
+          ``None``
+        """
+        self._requests = []
+        self._output = 0
+        self._value = 0
+        self._num_bits = 0
+
+    def __len__(self):
+        """Returns the number of queued requests.
+
+        Args:
+          self (SWDTransactionQueue): the ``SWDTransactionQueue`` instance
+
+        Returns:
+          The number of queued requests.
+        """
+        return len(self._requests)
+
+    def _store(self, output, value, nbits):
+        """Appends bits to the direction and data buffers.
+
+        Args:
+          self (SWDTransactionQueue): the ``SWDTransactionQueue`` instance
+          output (int): the direction bits, ``1`` for bits driven by the host
+          value (int): the data bits
+          nbits (int): the number of bits to append
+
+        Returns:
+          ``None``
+        """
+        mask = (1 << nbits) - 1
+        self._output |= (output & mask) << self._num_bits
+        self._value |= (value & mask) << self._num_bits
+        self._num_bits += nbits
+
+    def add(self, request):
+        """Queues a request.
+
+        Args:
+          self (SWDTransactionQueue): the ``SWDTransactionQueue`` instance
+          request (Request): the ``ReadRequest`` or ``WriteRequest`` to queue
+
+        Returns:
+          The index of the request's response in the list returned by
+          ``send()``.
+        """
+        # Request and ACK phases.
+        self._store(0xFF, request.value, 8)
+        self._store(0x0, 0x0, 3)
+
+        if request.data is None:
+            # Data, parity and turnaround, then eight idle clocks.
+            self._store(0x0, 0x0, 32)
+            self._store(0xFC, 0x0, 8)
+        else:
+            # Turnaround, then data and parity.
+            self._store(0x0, 0x0, 2)
+            self._store(0xFFFFFFFF, request.data, 32)
+            self._store(0xFF, util.calculate_parity(request.data), 8)
+
+        self._requests.append(request)
+        return len(self._requests) - 1
+
+    def read(self, address, ap):
+        """Queues a read request.
+
+        Args:
+          self (SWDTransactionQueue): the ``SWDTransactionQueue`` instance
+          address (int): the register index
+          ap (bool): ``True`` if this request is to an Access Port Access
+              Register, otherwise ``False`` for a Debug Port Access Register
+
+        Returns:
+          The index of the request's response in the list returned by
+          ``send()``.
+        """
+        return self.add(ReadRequest(address, ap))
+
+    def write(self, address, ap, data):
+        """Queues a write request.
+
+        Args:
+          self (SWDTransactionQueue): the ``SWDTransactionQueue`` instance
+          address (int): the register index
+          ap (bool): ``True`` if this request is to an Access Port Access
+              Register, otherwise ``False`` for a Debug Port Access Register
+          data (int): the data to write
+
+        Returns:
+          The index of the request's response in the list returned by
+          ``send()``.
+        """
+        return self.add(WriteRequest(address, ap, data))
+
+    def clear(self):
+        """Removes all queued requests.
+
+        Args:
+          self (SWDTransactionQueue): the ``SWDTransactionQueue`` instance
+
+        Returns:
+          ``None``
+        """
+        self._requests = []
+        self._output = 0
+        self._value = 0
+        self._num_bits = 0
+
+    def send(self, jlink):
+        """Sends the queued requests and decodes their responses.
+
+        The queue is cleared once the requests have been sent.
+
+        Args:
+          self (SWDTransactionQueue): the ``SWDTransactionQueue`` instance
+          jlink (JLink): the ``JLink`` instance to use for write/read
+
+        Returns:
+          A list of ``Response`` instances, one for each queued request, in
+          the order they were queued.
+        """
+        if not self._requests:
+            return []
+
+        requests = self._requests
+        num_bits = self._num_bits
+        bitpos = jlink.swd_write(self._output, self._value, num_bits)
+        self.clear()
+
+        jlink.swd_sync()
+        bits = jlink.swd_read(bitpos, num_bits)
+
+        responses = []
+        checks = []
+        offset = 0
+        for request in requests:
+            # The ACK follows the eight request bits.
+            ack = bits >> (offset + 8)
+            status = ack & 7
+
+            if request.data is None:
+                data = (ack >> 3) & 0xFFFFFFFF
+                if status == Response.STATUS_ACK:
+                    checks.append((len(responses), data, (ack >> 35) & 1))
+                responses.append(Response(status, data))
+                offset += self.READ_NUM_BITS
+            else:
+                responses.append(Response(status))
+                offset += self.WRITE_NUM_BITS
+
+        # Check the parity of all the ACK'd reads at once.
+        parities = util.calculate_parity_many([check[1] for check in checks])
+        for ((index, data, parity), expected) in zip(checks, parities):
+            if parity != expected:
+                responses[index] = Response(Response.STATUS_INVALID, data)
+
+        return responses
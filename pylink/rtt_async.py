@@ -0,0 +1,753 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import concurrent.futures
+
+
+class RTTReader(object):
+    """Reads the data of an RTT up buffer, like an ``asyncio.StreamReader``.
+
+    Data is added by the ``RTTPoller`` that created the reader.  While more
+    than ``limit`` bytes are buffered, the poller stops reading the channel,
+    so that the target's up buffer fills instead of host memory.
+    """
+
+    def __init__(self, poller, buffer_index, limit):
+        """Initializes the reader.
+
+        Args:
+          self (RTTReader): the ``RTTReader`` instance
+          poller (RTTPoller): the poller that services the channel
+          buffer_index (int): index of the RTT up buffer
+          limit (int): number of buffered bytes above which the channel is not
+            read
+
+        Returns:
+          ``None``
+        """
+        self.buffer_index = buffer_index
+        self.limit = limit
+        self._poller = poller
+        self._buffer = bytearray()
+        self._eof = False
+        self._exception = None
+        self._waiter = None
+
+    def __aiter__(self):
+        """Returns an asynchronous iterator over the lines read.
+
+        Args:
+          self (RTTReader): the ``RTTReader`` instance
+
+        Returns:
+          The ``RTTReader`` instance.
+        """
+        return self
+
+    async def __anext__(self):
+        """Reads the next line.
+
+        Args:
+          self (RTTReader): the ``RTTReader`` instance
+
+        Returns:
+          The next line, including its trailing newline, if any.
+
+        Raises:
+          StopAsyncIteration: at the end of the stream.
+        """
+        line = await self.readline()
+        if not line:
+            raise StopAsyncIteration
+        return line
+
+    @property
+    def paused(self):
+        """Returns whether the channel is not being read.
+
+        Args:
+          self (RTTReader): the ``RTTReader`` instance
+
+        Returns:
+          ``True`` if more than ``limit`` bytes are buffered, and no coroutine
+          is waiting for more.
+        """
+        return len(self._buffer) > self.limit and self._waiter is None
+
+    def at_eof(self):
+        """Returns whether the buffer is empty and the stream has ended.
+
+        Args:
+          self (RTTReader): the ``RTTReader`` instance
+
+        Returns:
+          ``True`` if no more data can be read, otherwise ``False``.
+        """
+        return self._eof and not self._buffer
+
+    def exception(self):
+        """Returns the exception that ended the stream, if any.
+
+        Args:
+          self (RTTReader): the ``RTTReader`` instance
+
+        Returns:
+          The exception, or ``None``.
+        """
+        return self._exception
+
+    def _wakeup(self):
+        """Wakes up the coroutine waiting for data, if any.
+
+        Args:
+          self (RTTReader): the ``RTTReader`` instance
+
+        Returns:
+          ``None``
+        """
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def feed_data(self, data):
+        """Adds data read from the channel.
+
+        Args:
+          self (RTTReader): the ``RTTReader`` instance
+          data (bytes): the data
+
+        Returns:
+          ``None``
+        """
+        if data:
+            self._buffer.extend(data)
+            self._wakeup()
+
+    def feed_eof(self):
+        """Ends the stream.
+
+        Args:
+          self (RTTReader): the ``RTTReader`` instance
+
+        Returns:
+          ``None``
+        """
+        self._eof = True
+        self._wakeup()
+
+    def set_exception(self, exc):
+        """Ends the stream with an exception, raised by subsequent reads.
+
+        Args:
+          self (RTTReader): the ``RTTReader`` instance
+          exc (Exception): the exception
+
+        Returns:
+          ``None``
+        """
+        self._exception = exc
+        self._eof = True
+        self._wakeup()
+
+    async def _wait_for_data(self):
+        """Waits until data is added or the stream ends.
+
+        Args:
+          self (RTTReader): the ``RTTReader`` instance
+
+        Returns:
+          ``None``
+        """
+        self._waiter = asyncio.get_event_loop().create_future()
+        self._poller.wakeup()
+        try:
+            await self._waiter
+        finally:
+            self._waiter = None
+
+    def _take(self, num_bytes):
+        """Removes data from the front of the buffer.
+
+        Args:
+          self (RTTReader): the ``RTTReader`` instance
+          num_bytes (int): the number of bytes to remove
+
+        Returns:
+          The ``bytes`` removed.
+        """
+        data = bytes(self._buffer[:num_bytes])
+        del self._buffer[:num_bytes]
+        return data
+
+    async def read(self, n=-1):
+        """Reads up to ``n`` bytes.
+
+        Waits until at least one byte is buffered, or the stream ends.
+
+        Args:
+          self (RTTReader): the ``RTTReader`` instance
+          n (int): maximum number of bytes to read, or ``-1`` to read all of
+            the buffered data
+
+        Returns:
+          The ``bytes`` read, empty at the end of the stream.
+
+        Raises:
+          JLinkRTTException: if the stream ended because of an error.
+        """
+        if n == 0:
+            return b''
+
+        while not self._buffer and not self._eof:
+            await self._wait_for_data()
+
+        if not self._buffer and self._exception is not None:
+            raise self._exception
+
+        return self._take(len(self._buffer) if n < 0 else n)
+
+    async def readexactly(self, n):
+        """Reads exactly ``n`` bytes.
+
+        Args:
+          self (RTTReader): the ``RTTReader`` instance
+          n (int): the number of bytes to read
+
+        Returns:
+          The ``bytes`` read.
+
+        Raises:
+          IncompleteReadError: if the stream ends before ``n`` bytes are read.
+        """
+        while len(self._buffer) < n and not self._eof:
+            await self._wait_for_data()
+
+        if len(self._buffer) < n:
+            raise asyncio.IncompleteReadError(self._take(len(self._buffer)), n)
+
+        return self._take(n)
+
+    async def readuntil(self, separator=b'\n'):
+        """Reads data until a separator is found.
+
+        Args:
+          self (RTTReader): the ``RTTReader`` instance
+          separator (bytes): the separator
+
+        Returns:
+          The ``bytes`` read, including the separator.
+
+        Raises:
+          IncompleteReadError: if the stream ends before the separator is
+            found.
+        """
+        start = 0
+        while True:
+            index = self._buffer.find(separator, start)
+            if index >= 0:
+                return self._take(index + len(separator))
+
+            if self._eof:
+                raise asyncio.IncompleteReadError(self._take(len(self._buffer)), None)
+
+            start = max(len(self._buffer) - len(separator) + 1, 0)
+            await self._wait_for_data()
+
+    async def readline(self):
+        """Reads a line.
+
+        Args:
+          self (RTTReader): the ``RTTReader`` instance
+
+        Returns:
+          The line read, including its trailing newline, or the remaining
+          data at the end of the stream.
+        """
+        try:
+            return await self.readuntil(b'\n')
+        except asyncio.IncompleteReadError as e:
+            return e.partial
+
+
+class RTTWriter(object):
+    """Writes data to an RTT down buffer, like an ``asyncio.StreamWriter``.
+
+    ``write()`` queues the data, which the ``RTTPoller`` that created the
+    writer passes to the target as fast as the target accepts it.
+    ``drain()`` waits until every byte has been accepted.
+    """
+
+    def __init__(self, poller, buffer_index):
+        """Initializes the writer.
+
+        Args:
+          self (RTTWriter): the ``RTTWriter`` instance
+          poller (RTTPoller): the poller that services the channel
+          buffer_index (int): index of the RTT down buffer
+
+        Returns:
+          ``None``
+        """
+        self.buffer_index = buffer_index
+        self._poller = poller
+        self._pending = bytearray()
+        self._closing = False
+        self._exception = None
+        self._drainers = []
+
+    @property
+    def pending(self):
+        """Returns the number of bytes not yet accepted by the target.
+
+        Args:
+          self (RTTWriter): the ``RTTWriter`` instance
+
+        Returns:
+          The number of pending bytes.
+        """
+        return len(self._pending)
+
+    def write(self, data):
+        """Queues data to be written.
+
+        Args:
+          self (RTTWriter): the ``RTTWriter`` instance
+          data (bytes): the data to write
+
+        Returns:
+          ``None``
+
+        Raises:
+          RuntimeError: if the writer is closing.
+        """
+        if self._closing:
+            raise RuntimeError('RTT writer is closing.')
+
+        if data:
+            self._pending.extend(data)
+            self._poller.wakeup()
+
+    def writelines(self, data):
+        """Queues a list of data to be written.
+
+        Args:
+          self (RTTWriter): the ``RTTWriter`` instance
+          data (list): the list of ``bytes`` to write
+
+        Returns:
+          ``None``
+        """
+        for item in data:
+            self.write(item)
+
+    def accepted(self, num_bytes):
+        """Removes data that the target has accepted from the queue.
+
+        Args:
+          self (RTTWriter): the ``RTTWriter`` instance
+          num_bytes (int): the number of bytes accepted
+
+        Returns:
+          ``None``
+        """
+        del self._pending[:num_bytes]
+        if not self._pending:
+            self._resolve()
+
+    def set_exception(self, exc):
+        """Fails the writer, and any coroutine waiting for it to drain.
+
+        Args:
+          self (RTTWriter): the ``RTTWriter`` instance
+          exc (Exception): the exception
+
+        Returns:
+          ``None``
+        """
+        self._exception = exc
+        self._closing = True
+        self._resolve()
+
+    def _resolve(self):
+        """Wakes up the coroutines waiting for the writer to drain.
+
+        Args:
+          self (RTTWriter): the ``RTTWriter`` instance
+
+        Returns:
+          ``None``
+        """
+        for waiter in self._drainers:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._drainers = []
+
+    async def drain(self):
+        """Waits until every byte written has been accepted by the target.
+
+        Args:
+          self (RTTWriter): the ``RTTWriter`` instance
+
+        Returns:
+          ``None``
+
+        Raises:
+          JLinkRTTException: if the channel failed.
+          ConnectionResetError: if the poller stopped before the data was
+            accepted.
+        """
+        if self._pending and self._exception is None:
+            waiter = asyncio.get_event_loop().create_future()
+            self._drainers.append(waiter)
+            self._poller.wakeup()
+            await waiter
+
+        if self._exception is not None:
+            raise self._exception
+
+    def close(self):
+        """Closes the writer once the queued data has been written.
+
+        Args:
+          self (RTTWriter): the ``RTTWriter`` instance
+
+        Returns:
+          ``None``
+        """
+        self._closing = True
+
+    def is_closing(self):
+        """Returns whether the writer is closing.
+
+        Args:
+          self (RTTWriter): the ``RTTWriter`` instance
+
+        Returns:
+          ``True`` if the writer is closing, otherwise ``False``.
+        """
+        return self._closing
+
+    async def wait_closed(self):
+        """Waits until the writer is closed and its data has been written.
+
+        Args:
+          self (RTTWriter): the ``RTTWriter`` instance
+
+        Returns:
+          ``None``
+        """
+        try:
+            await self.drain()
+        except Exception:
+            pass
+
+
+class RTTPoller(object):
+    """Services RTT channels from ``asyncio`` with a single background poller.
+
+    Each tick of the poller reads every up buffer that has an ``RTTReader``,
+    and writes the pending data of every down buffer that has an
+    ``RTTWriter``, in a single call on a dedicated executor thread.  Every
+    DLL call made through the poller, including those made with ``call()``,
+    runs on that one thread, so they are serialized.
+
+    The poll interval adapts to the traffic: after a tick that moved data, the
+    next tick runs after ``min_interval``, and after each idle tick the
+    interval is doubled, up to ``max_interval``.  Writing data, or waiting
+    for it, wakes the poller immediately.
+
+    RTT must be started on the ``JLink``, e.g. with
+    ``await poller.call(jlink.rtt_start)``, before data can be transferred.
+
+    Attributes:
+      interval: the current poll interval in seconds.
+      ticks: the number of ticks run.
+    """
+
+    def __init__(self, jlink, min_interval=0.001, max_interval=0.05,
+                 read_size=4096, write_size=4096, limit=1 << 16):
+        """Initializes the poller.
+
+        Args:
+          self (RTTPoller): the ``RTTPoller`` instance
+          jlink (JLink): the ``JLink`` instance to transfer data with
+          min_interval (float): minimum number of seconds between ticks
+          max_interval (float): maximum number of seconds between ticks
+          read_size (int): maximum number of bytes to read from a channel per
+            tick
+          write_size (int): maximum number of bytes to write to a channel per
+            tick
+          limit (int): number of bytes buffered by a reader above which its
+            channel is not read
+
+        Returns:
+          ``None``
+
+        Raises:
+          ValueError: if an interval or a size is invalid.
+        """
+        if min_interval < 0 or max_interval < min_interval:
+            raise ValueError('Invalid poll intervals.')
+
+        if read_size <= 0 or write_size <= 0:
+            raise ValueError('Read and write sizes must be greater than 0.')
+
+        self.interval = min_interval
+        self.ticks = 0
+
+        self._jlink = jlink
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._read_size = read_size
+        self._write_size = write_size
+        self._limit = limit
+
+        self._readers = {}
+        self._writers = {}
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._task = None
+        self._event = None
+        self._closing = False
+
+    async def __aenter__(self):
+        """Starts the poller on entering an asynchronous context manager.
+
+        Args:
+          self (RTTPoller): the ``RTTPoller`` instance
+
+        Returns:
+          The ``RTTPoller`` instance.
+        """
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Closes the poller on exiting an asynchronous context manager.
+
+        Args:
+          self (RTTPoller): the ``RTTPoller`` instance
+          exc_type (BaseExceptionType, None): the exception class, if any
+          exc_val (BaseException, None): the exception object, if any
+          exc_tb (TracebackType, None): the exception traceback, if any
+
+        Returns:
+          ``None``
+        """
+        await self.close()
+
+    @property
+    def running(self):
+        """Returns whether the poller is running.
+
+        Args:
+          self (RTTPoller): the ``RTTPoller`` instance
+
+        Returns:
+          ``True`` if the poller is running, otherwise ``False``.
+        """
+        return self._task is not None and not self._task.done()
+
+    def reader(self, buffer_index):
+        """Returns the reader of an RTT up buffer.
+
+        Args:
+          self (RTTPoller): the ``RTTPoller`` instance
+          buffer_index (int): index of the up buffer
+
+        Returns:
+          The ``RTTReader`` of the buffer.
+        """
+        if buffer_index not in self._readers:
+            self._readers[buffer_index] = RTTReader(self, buffer_index, self._limit)
+            self.wakeup()
+        return self._readers[buffer_index]
+
+    def writer(self, buffer_index):
+        """Returns the writer of an RTT down buffer.
+
+        Args:
+          self (RTTPoller): the ``RTTPoller`` instance
+          buffer_index (int): index of the down buffer
+
+        Returns:
+          The ``RTTWriter`` of the buffer.
+        """
+        if buffer_index not in self._writers:
+            self._writers[buffer_index] = RTTWriter(self, buffer_index)
+        return self._writers[buffer_index]
+
+    async def call(self, func, *args):
+        """Calls a function on the poller's executor thread.
+
+        Args:
+          self (RTTPoller): the ``RTTPoller`` instance
+          func (function): the function, e.g. a ``JLink`` method
+          args: the arguments to pass to the function
+
+        Returns:
+          The return value of the function.
+        """
+        return await asyncio.get_event_loop().run_in_executor(self._executor, func, *args)
+
+    def wakeup(self):
+        """Runs the next tick without waiting for the poll interval.
+
+        Args:
+          self (RTTPoller): the ``RTTPoller`` instance
+
+        Returns:
+          ``None``
+        """
+        self.interval = self._min_interval
+        if self._event is not None:
+            self._event.set()
+
+    def start(self):
+        """Starts polling on the running event loop.
+
+        Args:
+          self (RTTPoller): the ``RTTPoller`` instance
+
+        Returns:
+          ``None``
+        """
+        if self.running:
+            return
+
+        self._closing = False
+        self._event = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run())
+
+    async def close(self):
+        """Stops polling, once every writer has drained or failed.
+
+        The tick in progress, if any, completes, then the readers are ended,
+        and the writers with data that was not accepted are failed.
+
+        Args:
+          self (RTTPoller): the ``RTTPoller`` instance
+
+        Returns:
+          ``None``
+        """
+        self._closing = True
+        self.wakeup()
+        if self._task is not None:
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    def _tick(self, reads, writes):
+        """Transfers the data of every channel.
+
+        Runs on the executor thread.
+
+        Args:
+          self (RTTPoller): the ``RTTPoller`` instance
+          reads (list): list of ``(buffer_index, num_bytes)`` to read
+          writes (list): list of ``(buffer_index, data)`` to write
+
+        Returns:
+          A tuple of the list of ``(buffer_index, data)`` read, and the list
+          of ``(buffer_index, num_bytes)`` written.
+        """
+        received = [(index, self._jlink.rtt_read(index, num_bytes)) for (index, num_bytes) in reads]
+        written = [(index, self._jlink.rtt_write(index, data)) for (index, data) in writes]
+        return (received, written)
+
+    async def _run(self):
+        """Runs ticks until the poller is closed.
+
+        Args:
+          self (RTTPoller): the ``RTTPoller`` instance
+
+        Returns:
+          ``None``
+        """
+        failure = None
+        try:
+            while True:
+                writes = [(index, bytes(writer._pending[:self._write_size]))
+                          for (index, writer) in self._writers.items() if writer.pending]
+                if self._closing and not writes:
+                    break
+
+                reads = [(index, self._read_size)
+                         for (index, reader) in self._readers.items()
+                         if not reader.paused and not reader.at_eof()]
+
+                self._event.clear()
+                (received, written) = await self.call(self._tick, reads, writes)
+                self.ticks += 1
+
+                moved = False
+                for (index, data) in received:
+                    self._readers[index].feed_data(bytes(data))
+                    moved = moved or len(data) > 0
+                for (index, num_bytes) in written:
+                    self._writers[index].accepted(num_bytes)
+                    moved = moved or num_bytes > 0
+
+                if moved:
+                    self.interval = self._min_interval
+                elif self._closing:
+                    # The target accepts no more data, so the writers are
+                    # failed rather than waited for.
+                    break
+                else:
+                    self.interval = min(max(self.interval * 2, self._min_interval), self._max_interval)
+
+                try:
+                    await asyncio.wait_for(self._event.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+        except Exception as e:
+            failure = e
+        finally:
+            for reader in self._readers.values():
+                if failure is not None:
+                    reader.set_exception(failure)
+                else:
+                    reader.feed_eof()
+
+            for writer in self._writers.values():
+                if writer.pending:
+                    writer.set_exception(failure or ConnectionResetError('RTT poller closed.'))
+
+
+async def open_rtt(jlink, block_address=None, **kwargs):
+    """Starts RTT, and an ``RTTPoller`` to service its channels.
+
+    Args:
+      jlink (JLink): the ``JLink`` instance
+      block_address (int): optional address of the RTT control block
+      kwargs (dict): options to pass to the ``RTTPoller``
+
+    Returns:
+      The running ``RTTPoller``.
+
+    Raises:
+      JLinkRTTException: if RTT could not be started.
+    """
+    poller = RTTPoller(jlink, **kwargs)
+    try:
+        await poller.call(jlink.rtt_start, block_address)
+    except Exception:
+        await poller.close()
+        raise
+    poller.start()
+    return poller
@@ -0,0 +1,419 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from . import errors
+from . import structs
+
+import collections
+import struct
+
+
+class RTTBuffer(collections.namedtuple('RTTBuffer', ['index', 'up', 'address', 'name', 'buffer', 'size', 'flags'])):
+    """Cached descriptor of an RTT ring buffer in target memory.
+
+    Attributes:
+      index: index of the buffer.
+      up: ``True`` for an up buffer (target to host), ``False`` for a down
+        buffer (host to target).
+      address: address of the buffer's descriptor in the control block.
+      name: name of the buffer.
+      buffer: address of the buffer's data.
+      size: size of the buffer's data in bytes.
+      flags: flags set on the buffer.
+    """
+    __slots__ = ()
+
+
+class HostRTT(object):
+    """Host-side RTT that accesses the control block with memory reads.
+
+    The ``SEGGER RTT`` control block is located once, either at a given
+    address or by scanning RAM with bulk reads, and its buffer descriptors
+    are cached.  Each ``poll()`` then reads the write and read offsets of
+    every up buffer with one memory read, reads the pending data of every up
+    buffer with ``JLink.memory_read_many()``, which coalesces neighbouring
+    regions into as few transfers as possible, and advances the read offsets
+    with ``JLink.memory_write32()``.  The data is kept on the host until it is
+    read with ``rtt_read()``.
+
+    The methods mirror the RTT methods of ``JLink``, so a ``HostRTT`` can be
+    used in place of a ``JLink`` for RTT, e.g. by an ``RTTPoller``.
+    """
+
+    # Identifier at the start of the control block.
+    ID = b'SEGGER RTT\x00'
+
+    # Size of the control block's identifier field.
+    ID_SIZE = 16
+
+    # Size of the control block header, the identifier followed by the
+    # numbers of up and down buffers.
+    HEADER_SIZE = 24
+
+    # Size of a buffer descriptor: name, buffer, size, write offset, read
+    # offset and flags, as 32-bit words.
+    DESCRIPTOR_SIZE = 24
+    DESCRIPTOR_WORDS = 6
+    WR_OFF = 3
+    RD_OFF = 4
+
+    # Maximum number of bytes read for a buffer name.
+    MAX_NAME_SIZE = 32
+
+    # Maximum plausible number of up or down buffers in a control block.
+    MAX_NUM_BUFFERS = 255
+
+    # Default RAM range searched for the control block.
+    DEFAULT_SEARCH_RANGES = [(0x20000000, 0x10000)]
+
+    def __init__(self, jlink):
+        """Initializes the host-side RTT.
+
+        Args:
+          self (HostRTT): the ``HostRTT`` instance
+          jlink (JLink): the ``JLink`` instance to access target memory with
+
+        Returns:
+          ``None``
+        """
+        self._jlink = jlink
+        self.block_address = None
+        self._up = []
+        self._down = []
+        self._received = collections.defaultdict(bytearray)
+
+    def _find(self, search_ranges, chunk_size):
+        """Scans memory for the control block.
+
+        Args:
+          self (HostRTT): the ``HostRTT`` instance
+          search_ranges (list): list of ``(addr, num_bytes)`` ranges to scan
+          chunk_size (int): number of bytes to read at once
+
+        Returns:
+          The address of the control block, or ``None`` if it was not found.
+        """
+        for (start, num_bytes) in search_ranges:
+            tail = b''
+            addr = start
+            chunks = self._jlink.memory_iter(start, num_bytes, chunk_size, skip_errors=True)
+            for chunk in chunks:
+                data = tail + chunk
+                base = addr - len(tail)
+                pos = data.find(self.ID)
+                while pos >= 0:
+                    if self._read_header(base + pos) is not None:
+                        return base + pos
+                    pos = data.find(self.ID, pos + 1)
+
+                # Keep enough of the chunk to find an identifier that spans
+                # two chunks.
+                tail = data[-(len(self.ID) - 1):]
+                addr += len(chunk)
+        return None
+
+    def _read_header(self, addr):
+        """Reads and validates the header of a control block.
+
+        Args:
+          self (HostRTT): the ``HostRTT`` instance
+          addr (int): the address of the control block
+
+        Returns:
+          A tuple of the number of up and down buffers, or ``None`` if there
+          is no valid control block at the address.
+        """
+        header = self._jlink.memory_read_bytes(addr, self.HEADER_SIZE)
+        if len(header) < self.HEADER_SIZE or not header.startswith(self.ID):
+            return None
+
+        (num_up, num_down) = struct.unpack_from('<II', header, self.ID_SIZE)
+        if num_up > self.MAX_NUM_BUFFERS or num_down > self.MAX_NUM_BUFFERS:
+            return None
+
+        return (num_up, num_down)
+
+    def rtt_start(self, block_address=None, search_ranges=None, chunk_size=0x1000):
+        """Locates the control block and caches its buffer descriptors.
+
+        Args:
+          self (HostRTT): the ``HostRTT`` instance
+          block_address (int): address of the control block, or ``None`` to
+            search for it
+          search_ranges (list): list of ``(addr, num_bytes)`` RAM ranges to
+            search, defaults to ``DEFAULT_SEARCH_RANGES``
+          chunk_size (int): number of bytes to read at once when searching
+
+        Returns:
+          ``None``
+
+        Raises:
+          JLinkRTTException: if the control block could not be found.
+        """
+        if block_address is None:
+            block_address = self._find(search_ranges or self.DEFAULT_SEARCH_RANGES, chunk_size)
+            if block_address is None:
+                raise errors.JLinkRTTException('RTT control block not found.')
+
+        counts = self._read_header(block_address)
+        if counts is None:
+            raise errors.JLinkRTTException('No RTT control block at 0x%08X.' % block_address)
+
+        (num_up, num_down) = counts
+        num_buffers = num_up + num_down
+        base = block_address + self.HEADER_SIZE
+        words = self._jlink.memory_read32(base, num_buffers * self.DESCRIPTOR_WORDS)
+
+        descriptors = []
+        for index in range(num_buffers):
+            fields = words[index * self.DESCRIPTOR_WORDS:(index + 1) * self.DESCRIPTOR_WORDS]
+            descriptors.append((base + index * self.DESCRIPTOR_SIZE, fields))
+
+        # The names of all of the buffers are read in a single batch.
+        requests = [(fields[0], self.MAX_NAME_SIZE) for (_, fields) in descriptors if fields[0]]
+        names = iter(self._jlink.memory_read_many(requests))
+
+        buffers = []
+        for (index, (address, fields)) in enumerate(descriptors):
+            name = ''
+            if fields[0]:
+                name = bytes(bytearray(next(names))).split(b'\x00', 1)[0].decode('ascii', 'replace')
+
+            up = index < num_up
+            buf_index = index if up else index - num_up
+            buffers.append(RTTBuffer(buf_index, up, address, name, fields[1], fields[2], fields[5]))
+
+        self.block_address = block_address
+        self._up = buffers[:num_up]
+        self._down = buffers[num_up:]
+        self._received.clear()
+
+    def rtt_stop(self):
+        """Forgets the control block.
+
+        Args:
+          self (HostRTT): the ``HostRTT`` instance
+
+        Returns:
+          ``None``
+        """
+        self.block_address = None
+        self._up = []
+        self._down = []
+        self._received.clear()
+
+    def _buffer(self, buffers, buffer_index):
+        """Returns the cached descriptor of a buffer.
+
+        Args:
+          self (HostRTT): the ``HostRTT`` instance
+          buffers (list): the up or down buffer descriptors
+          buffer_index (int): index of the buffer
+
+        Returns:
+          The ``RTTBuffer``.
+
+        Raises:
+          JLinkRTTException: if RTT is not started, or there is no such buffer.
+        """
+        if self.block_address is None:
+            raise errors.JLinkRTTException('RTT control block has not been found.')
+
+        if not (0 <= buffer_index < len(buffers)):
+            raise errors.JLinkRTTException('Invalid RTT buffer index: %d' % buffer_index)
+
+        return buffers[buffer_index]
+
+    def rtt_get_num_up_buffers(self):
+        """Returns the number of up buffers in the control block.
+
+        Args:
+          self (HostRTT): the ``HostRTT`` instance
+
+        Returns:
+          The number of up buffers.
+        """
+        return len(self._up)
+
+    def rtt_get_num_down_buffers(self):
+        """Returns the number of down buffers in the control block.
+
+        Args:
+          self (HostRTT): the ``HostRTT`` instance
+
+        Returns:
+          The number of down buffers.
+        """
+        return len(self._down)
+
+    def rtt_get_buf_descriptor(self, buffer_index, up):
+        """Returns the descriptor of a buffer.
+
+        Args:
+          self (HostRTT): the ``HostRTT`` instance
+          buffer_index (int): the index of the buffer
+          up (bool): ``True`` if buffer is an UP buffer, otherwise ``False``
+
+        Returns:
+          ``JLinkRTTerminalBufDesc`` describing the buffer.
+
+        Raises:
+          JLinkRTTException: if RTT is not started, or there is no such buffer.
+        """
+        buf = self._buffer(self._up if up else self._down, buffer_index)
+        desc = structs.JLinkRTTerminalBufDesc()
+        desc.BufferIndex = buffer_index
+        desc.Direction = 0 if up else 1
+        desc.acName = buf.name.encode('ascii', 'replace')[:31]
+        desc.SizeOfBuffer = buf.size
+        desc.Flags = buf.flags
+        return desc
+
+    def _check_offsets(self, buf, write_offset, read_offset):
+        """Checks that the offsets of a buffer are within it.
+
+        Args:
+          self (HostRTT): the ``HostRTT`` instance
+          buf (RTTBuffer): the buffer
+          write_offset (int): the write offset
+          read_offset (int): the read offset
+
+        Returns:
+          ``None``
+
+        Raises:
+          JLinkRTTException: if an offset is out of range.
+        """
+        if write_offset >= buf.size or read_offset >= buf.size:
+            raise errors.JLinkRTTException('Corrupt offsets in RTT buffer %d.' % buf.index)
+
+    def poll(self):
+        """Reads the pending data of every up buffer.
+
+        Args:
+          self (HostRTT): the ``HostRTT`` instance
+
+        Returns:
+          The number of bytes read.
+
+        Raises:
+          JLinkRTTException: if RTT is not started, or a buffer is corrupt.
+        """
+        if self.block_address is None:
+            raise errors.JLinkRTTException('RTT control block has not been found.')
+
+        if not self._up:
+            return 0
+
+        words = self._jlink.memory_read32(self._up[0].address, len(self._up) * self.DESCRIPTOR_WORDS)
+
+        requests = []
+        pending = []
+        for buf in self._up:
+            write_offset = words[buf.index * self.DESCRIPTOR_WORDS + self.WR_OFF]
+            read_offset = words[buf.index * self.DESCRIPTOR_WORDS + self.RD_OFF]
+            if write_offset == read_offset:
+                continue
+
+            self._check_offsets(buf, write_offset, read_offset)
+            if write_offset > read_offset:
+                regions = [(buf.buffer + read_offset, write_offset - read_offset)]
+            else:
+                regions = [(buf.buffer + read_offset, buf.size - read_offset)]
+                if write_offset > 0:
+                    regions.append((buf.buffer, write_offset))
+
+            requests.extend(regions)
+            pending.append((buf, write_offset, len(regions)))
+
+        if not requests:
+            return 0
+
+        chunks = iter(self._jlink.memory_read_many(requests))
+        num_bytes = 0
+        for (buf, write_offset, num_regions) in pending:
+            received = self._received[buf.index]
+            for _ in range(num_regions):
+                chunk = next(chunks)
+                received.extend(bytearray(chunk))
+                num_bytes += len(chunk)
+            self._jlink.memory_write32(buf.address + self.RD_OFF * 4, [write_offset])
+
+        return num_bytes
+
+    def rtt_read(self, buffer_index, num_bytes):
+        """Reads data from an up buffer.
+
+        If fewer than ``num_bytes`` bytes have been received on the host, the
+        up buffers are polled first.
+
+        Args:
+          self (HostRTT): the ``HostRTT`` instance
+          buffer_index (int): the index of the up buffer to read from
+          num_bytes (int): the maximum number of bytes to read
+
+        Returns:
+          A list of bytes read from RTT.
+
+        Raises:
+          JLinkRTTException: if RTT is not started, or there is no such buffer.
+        """
+        self._buffer(self._up, buffer_index)
+
+        received = self._received[buffer_index]
+        if len(received) < num_bytes:
+            self.poll()
+
+        data = list(received[:num_bytes])
+        del received[:num_bytes]
+        return data
+
+    def rtt_write(self, buffer_index, data):
+        """Writes data to a down buffer.
+
+        As much of the data as fits in the free space of the buffer is
+        written, with at most two memory writes, after which the buffer's
+        write offset is advanced.
+
+        Args:
+          self (HostRTT): the ``HostRTT`` instance
+          buffer_index (int): the index of the down buffer to write to
+          data (list): the list of bytes to write to the RTT buffer
+
+        Returns:
+          The number of bytes successfully written to the RTT buffer.
+
+        Raises:
+          JLinkRTTException: if RTT is not started, or there is no such buffer.
+        """
+        buf = self._buffer(self._down, buffer_index)
+        data = bytes(bytearray(data))
+
+        (write_offset, read_offset) = self._jlink.memory_read32(buf.address + self.WR_OFF * 4, 2)
+        self._check_offsets(buf, write_offset, read_offset)
+
+        # One byte is always left free, so that a full buffer can be told
+        # apart from an empty one.
+        free = (read_offset - write_offset - 1) % buf.size
+        num_bytes = min(len(data), free)
+        if num_bytes == 0:
+            return 0
+
+        first = min(num_bytes, buf.size - write_offset)
+        self._jlink.memory_write8(buf.buffer + write_offset, data[:first])
+        if num_bytes > first:
+            self._jlink.memory_write8(buf.buffer, data[first:num_bytes])
+
+        self._jlink.memory_write32(buf.address + self.WR_OFF * 4, [(write_offset + num_bytes) % buf.size])
+        return num_bytes
@@ -0,0 +1,171 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections.abc
+
+
+class RegisterSnapshot(collections.abc.Mapping):
+    """Immutable mapping of CPU register names to their values.
+
+    A snapshot is taken with ``JLink.register_snapshot()``, and can be written
+    back to the CPU with ``JLink.register_restore()``.  Besides the register
+    values, a snapshot records the index of each register, so that it can be
+    restored without looking the registers up by name again.
+    """
+
+    __slots__ = ('_names', '_indices', '_values', '_positions')
+
+    def __init__(self, names, indices, values):
+        """Initializes the snapshot.
+
+        Args:
+          self (RegisterSnapshot): the ``RegisterSnapshot`` instance
+          names (list): list of register names
+          indices (list): list of register indices, one for each name
+          values (list): list of register values, one for each name
+
+        Returns:
+          ``None``
+
+        Raises:
+          ValueError: if the number of names, indices, and values differ.
+        """
+        if not (len(names) == len(indices) == len(values)):
+            raise ValueError('Must be an equal number of names, indices and values.')
+
+        self._names = tuple(names)
+        self._indices = tuple(indices)
+        self._values = tuple(values)
+        self._positions = dict((name, pos) for (pos, name) in enumerate(self._names))
+
+    def __getitem__(self, name):
+        """Returns the value of the given register.
+
+        Args:
+          self (RegisterSnapshot): the ``RegisterSnapshot`` instance
+          name (str): name of the register
+
+        Returns:
+          The value of the register.
+
+        Raises:
+          KeyError: if the register is not in the snapshot.
+        """
+        return self._values[self._positions[name]]
+
+    def __iter__(self):
+        """Returns an iterator over the register names.
+
+        Args:
+          self (RegisterSnapshot): the ``RegisterSnapshot`` instance
+
+        Returns:
+          An iterator over the register names.
+        """
+        return iter(self._names)
+
+    def __len__(self):
+        """Returns the number of registers in the snapshot.
+
+        Args:
+          self (RegisterSnapshot): the ``RegisterSnapshot`` instance
+
+        Returns:
+          The number of registers.
+        """
+        return len(self._names)
+
+    def __repr__(self):
+        """Returns a string representation of the snapshot.
+
+        Args:
+          self (RegisterSnapshot): the ``RegisterSnapshot`` instance
+
+        Returns:
+          String representation of the snapshot.
+        """
+        regs = ', '.join('%s=0x%08X' % item for item in zip(self._names, self._values))
+        return '%s(%s)' % (self.__class__.__name__, regs)
+
+    @property
+    def indices(self):
+        """Returns the register indices, in the order of the register names.
+
+        Args:
+          self (RegisterSnapshot): the ``RegisterSnapshot`` instance
+
+        Returns:
+          A tuple of register indices.
+        """
+        return self._indices
+
+    def index(self, name):
+        """Returns the index of the given register.
+
+        Args:
+          self (RegisterSnapshot): the ``RegisterSnapshot`` instance
+          name (str): name of the register
+
+        Returns:
+          The index of the register.
+
+        Raises:
+          KeyError: if the register is not in the snapshot.
+        """
+        return self._indices[self._positions[name]]
+
+    def diff(self, other):
+        """Returns the registers whose values differ from another snapshot.
+
+        Registers that are only in one of the snapshots are reported with a
+        value of ``None`` for the other snapshot.
+
+        Args:
+          self (RegisterSnapshot): the ``RegisterSnapshot`` instance
+          other (Mapping): the snapshot to compare against, e.g. an earlier
+            snapshot
+
+        Returns:
+          A dictionary mapping the name of each differing register to a tuple
+          of ``(other_value, value)``.
+        """
+        changes = {}
+        for (name, value) in zip(self._names, self._values):
+            other_value = other.get(name)
+            if other_value != value:
+                changes[name] = (other_value, value)
+
+        for name in other:
+            if name not in self._positions:
+                changes[name] = (other[name], None)
+
+        return changes
+
+    def replace(self, **values):
+        """Returns a copy of the snapshot with some register values replaced.
+
+        Args:
+          self (RegisterSnapshot): the ``RegisterSnapshot`` instance
+          values (dict): mapping of register names to their new values
+
+        Returns:
+          A new ``RegisterSnapshot``.
+
+        Raises:
+          KeyError: if a register is not in the snapshot.
+        """
+        new_values = list(self._values)
+        for (name, value) in values.items():
+            new_values[self._positions[name]] = value
+        return self.__class__(self._names, self._indices, new_values)
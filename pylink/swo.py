@@ -0,0 +1,363 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from . import errors
+
+import collections
+import threading
+import time
+
+
+class SWOConfiguration(collections.namedtuple('SWOConfiguration', [
+        'cpu_speed',
+        'swo_speed',
+        'port_mask',
+        'host_buffer_size',
+        'emu_buffer_size',
+        'throughput'])):
+    """SWO configuration selected by ``JLink.swo_auto_configure()``.
+
+    Attributes:
+      cpu_speed: the target CPU frequency in Hz.
+      swo_speed: the selected SWO speed in Hz.
+      port_mask: mask of the enabled stimulus ports.
+      host_buffer_size: size of the host's SWO buffer in bytes.
+      emu_buffer_size: size of the J-Link's SWO buffer in bytes.
+      throughput: the sustained throughput measured at the selected speed,
+        in bytes per second.
+    """
+    __slots__ = ()
+
+
+class SWOStream(object):
+    """Streams SWO data from a J-Link on a dedicated reader thread.
+
+    The reader thread polls ``JLink.swo_num_bytes()``, and reads the pending
+    data with ``JLink.swo_read_into()``, removing it from the J-Link's SWO
+    buffer, straight into a preallocated ring buffer.  The poll interval
+    adapts to the data rate: it is halved while data is pending, down to
+    ``min_interval``, and the reader does not wait at all while more than a
+    chunk is pending, and it is doubled while no data is pending, up to
+    ``max_interval``.
+
+    If the ring buffer is full, the oldest data is dropped to make room, so
+    that the J-Link's buffer is always drained.  Dropped data is counted by
+    ``overflows`` and ``dropped``.
+
+    SWO must be started on the ``JLink`` before the stream is started.
+
+    Attributes:
+      bytes_read: total number of bytes read from the J-Link.
+      overflows: number of times data was dropped from the ring buffer.
+      dropped: total number of bytes dropped from the ring buffer.
+      interval: the current poll interval in seconds.
+    """
+
+    def __init__(self, jlink, buffer_size=1 << 20, chunk_size=1 << 16,
+                 min_interval=0.0005, max_interval=0.05):
+        """Initializes the stream.
+
+        Args:
+          self (SWOStream): the ``SWOStream`` instance
+          jlink (JLink): the ``JLink`` instance to read SWO data from
+          buffer_size (int): size of the ring buffer in bytes
+          chunk_size (int): maximum number of bytes to read at once
+          min_interval (float): minimum number of seconds between polls
+          max_interval (float): maximum number of seconds between polls
+
+        Returns:
+          ``None``
+
+        Raises:
+          ValueError: if a size or an interval is invalid.
+        """
+        if buffer_size <= 0 or chunk_size <= 0:
+            raise ValueError('Buffer and chunk sizes must be greater than 0.')
+
+        if min_interval < 0 or max_interval < min_interval:
+            raise ValueError('Invalid poll intervals.')
+
+        self.bytes_read = 0
+        self.overflows = 0
+        self.dropped = 0
+        self.interval = min_interval
+
+        self._jlink = jlink
+        self._chunk_size = chunk_size
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._head = 0
+        self._size = 0
+
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._error = None
+
+    def __enter__(self):
+        """Starts the stream on entering a context manager.
+
+        Args:
+          self (SWOStream): the ``SWOStream`` instance
+
+        Returns:
+          The ``SWOStream`` instance.
+        """
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Stops the stream on exiting a context manager.
+
+        Args:
+          self (SWOStream): the ``SWOStream`` instance
+          exc_type (BaseExceptionType, None): the exception class, if any
+          exc_val (BaseException, None): the exception object, if any
+          exc_tb (TracebackType, None): the exception traceback, if any
+
+        Returns:
+          ``None``
+        """
+        self.stop()
+
+    def __len__(self):
+        """Returns the number of bytes buffered.
+
+        Args:
+          self (SWOStream): the ``SWOStream`` instance
+
+        Returns:
+          The number of bytes that can be read without waiting.
+        """
+        with self._cond:
+            return self._size
+
+    def __iter__(self):
+        """Iterates over the data as it arrives.
+
+        Iteration ends once the stream is stopped and its buffer is drained.
+
+        Args:
+          self (SWOStream): the ``SWOStream`` instance
+
+        Returns:
+          An iterator over non-empty ``bytes``.
+
+        Raises:
+          JLinkException: if the reader thread failed.
+        """
+        while True:
+            data = self.read()
+            if not data:
+                return
+            yield data
+
+    @property
+    def running(self):
+        """Returns whether the reader thread is running.
+
+        Args:
+          self (SWOStream): the ``SWOStream`` instance
+
+        Returns:
+          ``True`` if the reader thread is running, otherwise ``False``.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Starts the reader thread.
+
+        Args:
+          self (SWOStream): the ``SWOStream`` instance
+
+        Returns:
+          ``None``
+        """
+        if self.running:
+            return
+
+        self._stop.clear()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='SWOStream')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stops the reader thread.
+
+        Data already buffered can still be read after the stream is stopped.
+
+        Args:
+          self (SWOStream): the ``SWOStream`` instance
+
+        Returns:
+          ``None``
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        with self._cond:
+            self._cond.notify_all()
+
+    def _run(self):
+        """Reads data from the J-Link until the stream is stopped.
+
+        Args:
+          self (SWOStream): the ``SWOStream`` instance
+
+        Returns:
+          ``None``
+        """
+        try:
+            while not self._stop.is_set():
+                pending = self._jlink.swo_num_bytes()
+                if pending > 0:
+                    self._fill(pending)
+
+                if pending > self._chunk_size:
+                    self.interval = self._min_interval
+                    continue
+                elif pending > 0:
+                    self.interval = max(self.interval / 2, self._min_interval)
+                else:
+                    self.interval = min(max(self.interval * 2, self._min_interval), self._max_interval)
+
+                self._stop.wait(self.interval)
+        except errors.JLinkException as e:
+            self._error = e
+        finally:
+            self._stop.set()
+            with self._cond:
+                self._cond.notify_all()
+
+    def _fill(self, pending):
+        """Reads pending data from the J-Link into the ring buffer.
+
+        Only the reader thread adds data to the ring buffer, so the region
+        after the buffered data can be read into without holding the lock.
+
+        Args:
+          self (SWOStream): the ``SWOStream`` instance
+          pending (int): the number of bytes in the J-Link's SWO buffer
+
+        Returns:
+          ``None``
+        """
+        capacity = len(self._buffer)
+        with self._cond:
+            tail = (self._head + self._size) % capacity
+            num_bytes = min(pending, self._chunk_size, capacity - tail)
+            free = capacity - self._size
+            if free < num_bytes:
+                drop = num_bytes - free
+                self._head = (self._head + drop) % capacity
+                self._size -= drop
+                self.dropped += drop
+                self.overflows += 1
+
+        num_read = self._jlink.swo_read_into(self._view[tail:tail + num_bytes], remove=True)
+
+        with self._cond:
+            self._size += num_read
+            self.bytes_read += num_read
+            self._cond.notify_all()
+
+    def _wait(self, timeout):
+        """Waits for data to be buffered.
+
+        Must be called with the lock held.
+
+        Args:
+          self (SWOStream): the ``SWOStream`` instance
+          timeout (float): maximum number of seconds to wait, or ``None`` to
+            wait until data arrives or the stream stops
+
+        Returns:
+          ``None``
+
+        Raises:
+          JLinkException: if the reader thread failed, and no data is
+            buffered.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._size == 0 and self.running:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            self._cond.wait(remaining)
+
+        if self._size == 0 and self._error is not None:
+            raise self._error
+
+    def readinto(self, buf, timeout=None):
+        """Reads buffered data into a caller-provided buffer.
+
+        Waits until at least one byte is buffered, the timeout expires, or the
+        stream is stopped.
+
+        Args:
+          self (SWOStream): the ``SWOStream`` instance
+          buf (bytearray): writable buffer to read into
+          timeout (float): maximum number of seconds to wait for data
+
+        Returns:
+          The number of bytes read into ``buf``, ``0`` if no data arrived.
+
+        Raises:
+          JLinkException: if the reader thread failed.
+        """
+        view = memoryview(buf).cast('B')
+        capacity = len(self._buffer)
+        with self._cond:
+            self._wait(timeout)
+
+            num_bytes = min(len(view), self._size)
+            first = min(num_bytes, capacity - self._head)
+            view[:first] = self._view[self._head:self._head + first]
+            view[first:num_bytes] = self._view[:num_bytes - first]
+
+            self._head = (self._head + num_bytes) % capacity
+            self._size -= num_bytes
+            return num_bytes
+
+    def read(self, size=-1, timeout=None):
+        """Reads buffered data.
+
+        Waits until at least one byte is buffered, the timeout expires, or the
+        stream is stopped.
+
+        Args:
+          self (SWOStream): the ``SWOStream`` instance
+          size (int): maximum number of bytes to read, or ``-1`` to read all of
+            the buffered data
+          timeout (float): maximum number of seconds to wait for data
+
+        Returns:
+          The ``bytes`` read, empty if no data arrived.
+
+        Raises:
+          JLinkException: if the reader thread failed.
+        """
+        with self._cond:
+            self._wait(timeout)
+            if size is None or size < 0:
+                size = self._size
+            buf = bytearray(min(size, self._size))
+            self.readinto(buf, timeout=0)
+            return bytes(buf)
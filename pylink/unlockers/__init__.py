@@ -15,12 +15,13 @@
 from .unlock_kinetis import unlock_kinetis
 
 
-def unlock(jlink, name):
+def unlock(jlink, name, **kwargs):
     """Unlocks a J-Link's target device.
 
     Args:
       jlink (JLink): the connected J-Link device
       name (str): the MCU name (e.g. Kinetis)
+      kwargs (dict): options to pass to the MCU's unlock method
 
     Supported Names:
       - Kinetis
@@ -32,5 +33,5 @@ def unlock(jlink, name):
       NotImplementedError: if no unlock method exists for the MCU.
     """
     if name.lower() in ['kinetis', 'freescale', 'nxp']:
-        return unlock_kinetis(jlink)
+        return unlock_kinetis(jlink, **kwargs)
     raise NotImplementedError('No unlock method for %s' % name)
@@ -16,6 +16,7 @@ from .. import decorators
 from .. import enums
 from ..protocols import swd
 from .. import registers
+from .. import util
 
 import collections
 import time
@@ -25,6 +26,14 @@ Identity = collections.namedtuple('Identity', ['version_code', 'part_no'])
 
 UNLOCK_METHODS = {}
 
+# Default number of seconds within which the unlock must complete.
+UNLOCK_TIMEOUT = 30.0
+
+# Default number of seconds to hold the target in reset before unlocking it,
+# and to wait after releasing it from reset.
+RESET_HOLD = 1.0
+RELEASE_HOLD = 1.0
+
 
 class KinetisException(Exception):
     """Exception generated when polling fails."""
@@ -65,41 +74,100 @@ def unlock_kinetis_abort_clear():
     return flags.value
 
 
-def unlock_kinetis_read_until_ack(jlink, address):
+def unlock_kinetis_read_until_ack(jlink, address, deadline=None):
     """Polls the device until the request is acknowledged.
 
     Sends a read request to the connected device to read the register at the
-    given 'address'.  Polls indefinitely until either the request is ACK'd or
-    the request ends in a fault.
+    given 'address'.  Polls until either the request is ACK'd, the request
+    ends in a fault, or the deadline passes.
 
     Args:
       jlink (JLink): the connected J-Link
       address (int) the address of the register to poll
+      deadline (float): ``time.monotonic()`` value after which to stop
+        polling, or ``None`` to poll indefinitely
 
     Returns:
       ``SWDResponse`` object on success.
 
     Raises:
-      KinetisException: when read exits with non-ack or non-wait status.
+      KinetisException: when read exits with non-ack or non-wait status, or
+        is not ACK'd before the deadline.
 
     Note:
       This function is required in order to avoid reading corrupt or otherwise
       invalid data from registers when communicating over SWD.
     """
     request = swd.ReadRequest(address, ap=True)
-    response = None
-    while True:
+
+    def _read():
         response = request.send(jlink)
         if response.ack():
-            break
+            return response
         elif response.wait():
-            continue
+            return None
         raise KinetisException('Read exited with status: %s', response.status)
 
-    return response
+    try:
+        return util.poll(_read, deadline)
+    except TimeoutError:
+        raise KinetisException('Read of register %d was not acknowledged in time.' % address)
+
+
+def unlock_kinetis_poll(jlink, address, flags, done, deadline=None):
+    """Polls a MDM-AP register until its flags meet a condition.
+
+    Args:
+      jlink (JLink): the connected J-Link
+      address (int): the address of the register to poll
+      flags (ctypes.Union): the register flags to read the register into
+      done (function): function called with ``flags`` after each read, which
+        returns whether polling is done
+      deadline (float): ``time.monotonic()`` value after which to stop
+        polling, or ``None`` to poll indefinitely
+
+    Returns:
+      The ``flags`` read.
+
+    Raises:
+      KinetisException: when a read fails, or the flags do not meet the
+        condition before the deadline.
+    """
+    # Have to read first to ensure the data is valid.
+    unlock_kinetis_read_until_ack(jlink, address, deadline)
+
+    def _check():
+        flags.value = unlock_kinetis_read_until_ack(jlink, address, deadline).data
+        return flags if done(flags) else None
+
+    try:
+        return util.poll(_check, deadline)
+    except TimeoutError:
+        raise KinetisException('Register %d did not reach its state in time.' % address)
+
+
+def unlock_kinetis_record(timings, phase, start):
+    """Records the time taken by a phase of the unlock.
+
+    Args:
+      timings (dict): dictionary to record the time in, or ``None``
+      phase (str): the name of the phase
+      start (float): ``time.monotonic()`` value at the start of the phase
+
+    Returns:
+      The ``time.monotonic()`` value at the end of the phase.
+    """
+    now = time.monotonic()
+    if timings is not None:
+        timings[phase] = now - start
+    return now
 
 
-def unlock_kinetis_swd(jlink):
+def unlock_kinetis_swd(jlink,
+                       timeout=UNLOCK_TIMEOUT,
+                       reset_hold=RESET_HOLD,
+                       release_hold=RELEASE_HOLD,
+                       timings=None):
     """Unlocks a Kinetis device over SWD.
 
     Steps Involved in Unlocking:
@@ -127,8 +195,23 @@ def unlock_kinetis_swd(jlink):
           indicate that it finished mass erasing, and therefore the system is
           now unsecure.
 
+    All of the polling shares a single deadline, and backs off from a tight
+    spin to exponentially longer sleeps, see ``util.poll()``.  If a
+    ``timings`` dictionary is given, the number of seconds taken by each
+    phase of the unlock is recorded in it under the phase's name:
+    ``configure``, ``reset_hold``, ``select``, ``flash_ready``,
+    ``erase_request``, ``erase``, ``release_hold``, ``reset``, and
+    ``total``.  Phases that were not reached are not recorded.
+
     Args:
       jlink (JLink): the connected J-Link
+      timeout (float): number of seconds within which the polling must
+        complete, or ``None`` to poll indefinitely
+      reset_hold (float): number of seconds to hold the target in reset
+        before unlocking it
+      release_hold (float): number of seconds to wait after releasing the
+        target from reset
+      timings (dict): optional dictionary to record phase timings in
 
     Returns:
       ``True`` if the device was unlocked successfully, otherwise ``False``.
@@ -143,6 +226,9 @@ def unlock_kinetis_swd(jlink):
       `Kinetis Docs <nxp.com/files/32bit/doc/ref_manual/K12P48M50SF4RM.pdf>`
     """
     SWDIdentity = Identity(0x2, 0xBA01)
+    start = time.monotonic()
+    deadline = None if timeout is None else start + timeout
+
     jlink.power_on()
     jlink.coresight_configure()
 
@@ -164,27 +250,28 @@ def unlock_kinetis_swd(jlink):
     flags.CSYSPWRUPREQ = 1  # System power-up request
     flags.CDBGPWRUPREQ = 1  # Debug power-up request
     jlink.coresight_write(0x01, flags.value, False)
+    phase = unlock_kinetis_record(timings, 'configure', start)
 
     # 4. Assert the reset pin.
     jlink.set_reset_pin_low()
-    time.sleep(1)
+    time.sleep(reset_hold)
+    phase = unlock_kinetis_record(timings, 'reset_hold', phase)
 
-    # 5. Send a SWD Request to clear any errors.
-    request = swd.WriteRequest(0x0, False, unlock_kinetis_abort_clear())
-    request.send(jlink)
+    try:
+        # 5. Send a SWD Request to clear any errors.
+        request = swd.WriteRequest(0x0, False, unlock_kinetis_abort_clear())
+        request.send(jlink)
 
-    # 6. Send a SWD Request to select the MDM-AP register, SELECT[31:24] = 0x01
-    request = swd.WriteRequest(0x2, False, (1 << 24))
-    request.send(jlink)
+        # 6. Send a SWD Request to select the MDM-AP register,
+        #    SELECT[31:24] = 0x01
+        request = swd.WriteRequest(0x2, False, (1 << 24))
+        request.send(jlink)
+        phase = unlock_kinetis_record(timings, 'select', phase)
 
-    try:
         # 7. Poll until the Flash-ready bit is set in the status register flags.
-        #    Have to read first to ensure the data is valid.
-        unlock_kinetis_read_until_ack(jlink, 0x0)
-        flags = registers.MDMAPStatusRegisterFlags()
-        flags.flash_ready = 0
-        while not flags.flash_ready:
-            flags.value = unlock_kinetis_read_until_ack(jlink, 0x0).data
+        unlock_kinetis_poll(jlink, 0x0, registers.MDMAPStatusRegisterFlags(),
+                            lambda flags: flags.flash_ready, deadline)
+        phase = unlock_kinetis_record(timings, 'flash_ready', phase)
 
         # 8. System may still be secure at this point, so request a mass erase.
         #    AP[1] bank 0, register 1 is the MDM-AP Control Register.
@@ -195,29 +282,29 @@ def unlock_kinetis_swd(jlink):
 
         # 9. Poll the status register until the mass erase command has been
         #    accepted.
-        unlock_kinetis_read_until_ack(jlink, 0x0)
-        flags = registers.MDMAPStatusRegisterFlags()
-        flags.flash_mass_erase_ack = 0
-        while not flags.flash_mass_erase_ack:
-            flags.value = unlock_kinetis_read_until_ack(jlink, 0x0).data
+        unlock_kinetis_poll(jlink, 0x0, registers.MDMAPStatusRegisterFlags(),
+                            lambda flags: flags.flash_mass_erase_ack, deadline)
+        phase = unlock_kinetis_record(timings, 'erase_request', phase)
 
         # 10. Poll the control register until the ``flash_mass_erase`` bit is
         #     cleared, which is done automatically when the mass erase
         #     finishes.
-        unlock_kinetis_read_until_ack(jlink, 0x1)
-        flags = registers.MDMAPControlRegisterFlags()
-        flags.flash_mass_erase = 1
-        while flags.flash_mass_erase:
-            flags.value = unlock_kinetis_read_until_ack(jlink, 0x1).data
+        unlock_kinetis_poll(jlink, 0x1, registers.MDMAPControlRegisterFlags(),
+                            lambda flags: not flags.flash_mass_erase, deadline)
+        phase = unlock_kinetis_record(timings, 'erase', phase)
 
     except KinetisException as e:
         jlink.set_reset_pin_high()
+        unlock_kinetis_record(timings, 'total', start)
         return False
 
     jlink.set_reset_pin_high()
-    time.sleep(1)
+    time.sleep(release_hold)
+    phase = unlock_kinetis_record(timings, 'release_hold', phase)
 
     jlink.reset()
+    unlock_kinetis_record(timings, 'reset', phase)
+    unlock_kinetis_record(timings, 'total', start)
 
     return True
 
@@ -225,7 +312,11 @@ def unlock_kinetis_swd(jlink):
 UNLOCK_METHODS[enums.JLinkInterfaces.SWD] = unlock_kinetis_swd
 
 
-def unlock_kinetis_jtag(jlink):
+def unlock_kinetis_jtag(jlink,
+                        timeout=UNLOCK_TIMEOUT,
+                        reset_hold=RESET_HOLD,
+                        release_hold=RELEASE_HOLD,
+                        timings=None):
     """Unlocks a Kinetis device over JTAG.
 
     Note:
@@ -233,6 +324,13 @@ def unlock_kinetis_jtag(jlink):
 
     Args:
       jlink (JLink): the connected J-Link
+      timeout (float): number of seconds within which the polling must
+        complete, or ``None`` to poll indefinitely
+      reset_hold (float): number of seconds to hold the target in reset
+        before unlocking it
+      release_hold (float): number of seconds to wait after releasing the
+        target from reset
+      timings (dict): optional dictionary to record phase timings in
 
     Returns:
       ``True`` if the device was unlocked successfully, otherwise ``False``.
@@ -248,11 +346,13 @@ UNLOCK_METHODS[enums.JLinkInterfaces.JTAG] = unlock_kinetis_jtag
 
 
 @decorators.async_decorator
-def unlock_kinetis(jlink):
+def unlock_kinetis(jlink, **kwargs):
     """Unlock for Freescale Kinetis K40 or K60 device.
 
     Args:
       jlink (JLink): an instance of a J-Link that is connected to a target.
+      kwargs (dict): the unlock options, such as ``timeout`` or ``timings``,
+        see ``unlock_kinetis_swd()``
 
     Returns:
       ``True`` if the device was successfully unlocked, otherwise ``False``.
@@ -267,7 +367,7 @@ def unlock_kinetis(jlink):
     if method is None:
         raise NotImplementedError('Unsupported target interface for unlock.')
 
-    return method(jlink)
+    return method(jlink, **kwargs)
 
 
 __all__ = ['unlock_kinetis']
@@ -17,6 +17,7 @@ from . import enums
 
 import platform
 import sys
+import time
 
 
 def is_integer(val):
@@ -156,6 +157,88 @@ def flash_progress_callback(action, progress_string, percentage):
     return None
 
 
+def poll(func, deadline=None, spins=10, interval=0.001, max_interval=0.1):
+    """Calls a function repeatedly until it returns a result.
+
+    The function is first called ``spins`` times in a row without sleeping,
+    so that conditions that are met quickly are detected without delay.
+    After that, the sleep between calls starts at ``interval`` seconds and
+    doubles after each call, up to ``max_interval`` seconds, and never extends
+    past the deadline.
+
+    Args:
+      func (function): function to call with no arguments, which returns
+        ``None`` until the polled condition is met
+      deadline (float): ``time.monotonic()`` value after which to stop
+        polling, or ``None`` to poll indefinitely
+      spins (int): number of calls to make before sleeping
+      interval (float): initial number of seconds to sleep between calls
+      max_interval (float): maximum number of seconds to sleep between calls
+
+    Returns:
+      The first result of ``func`` that is not ``None``.
+
+    Raises:
+      TimeoutError: if the deadline passes before ``func`` returns a result.
+    """
+    attempts = 0
+    backoff = interval
+    while True:
+        result = func()
+        if result is not None:
+            return result
+
+        attempts += 1
+        delay = 0
+        if attempts > spins:
+            delay = min(backoff, max_interval)
+            backoff = min(backoff * 2, max_interval)
+
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError('Polling did not complete before the deadline.')
+            delay = min(delay, remaining)
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+# Parity of each byte value, used where ``int.bit_count()`` is unavailable.
+PARITY_TABLE = bytes(bin(i).count('1') & 1 for i in range(256))
+
+
+def _table_parity(n):
+    """Returns the parity of a non-negative integer through ``PARITY_TABLE``.
+
+    Args:
+      n (int): the number whose parity to calculate
+
+    Returns:
+      ``1`` if the number has an odd number of ones, otherwise ``0``.
+    """
+    while n > 0xFFFFFFFF:
+        n = (n >> 32) ^ (n & 0xFFFFFFFF)
+    n ^= n >> 16
+    n ^= n >> 8
+    return PARITY_TABLE[n & 0xFF]
+
+
+def _bit_count_parity(n):
+    """Returns the parity of a non-negative integer through ``int.bit_count()``.
+
+    Args:
+      n (int): the number whose parity to calculate
+
+    Returns:
+      ``1`` if the number has an odd number of ones, otherwise ``0``.
+    """
+    return int.bit_count(n) & 1
+
+
+_parity = _bit_count_parity if hasattr(int, 'bit_count') else _table_parity
+
+
 def calculate_parity(n):
     """Calculates and returns the parity of a number.
 
@@ -174,9 +257,29 @@ def calculate_parity(n):
     if not is_natural(n):
         raise ValueError('Expected n to be a positive integer.')
 
-    y = 0
-    n = abs(n)
-    while n:
-        y += n & 1
-        n = n >> 1
-    return y & 1
+    return _parity(n)
+
+
+def calculate_parity_many(values):
+    """Calculates and returns the parity of each number in a sequence.
+
+    Args:
+      values (list): iterable of numbers whose parity to calculate, e.g. a
+        ``list``, an ``array.array``, a ``ctypes`` array or a generator of
+        integers
+
+    Returns:
+      A list with the parity of each number, in the order given.
+
+    Raises:
+      ValueError: if any of the numbers is not a non-negative integer.
+    """
+    try:
+        # An iterator can only be traversed once, so it is copied before the
+        # values are checked.
+        values = list(values)
+        if min(values, default=0) < 0:
+            raise ValueError('Expected values to be positive integers.')
+        return [_parity(value) for value in values]
+    except TypeError:
+        raise ValueError('Expected values to be positive integers.')
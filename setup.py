@@ -292,5 +292,5 @@ setuptools.setup(
         'bddtest': BDDTestCommand
     },
 
-    python_requires='>=3.0',
+    python_requires='>=3.7',
 )
@@ -0,0 +1,392 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pylink.jlink as jlink
+import pylink.protocols.boundary_scan as boundary_scan
+
+import mock
+
+import unittest
+
+
+class SimulatedTAP(object):
+    """Simulates a chain of JTAG TAP controllers behind a J-Link DLL.
+
+    Each device has an instruction register, and a boundary-scan register
+    that captures the device's pins under ``SAMPLE/PRELOAD`` and ``EXTEST``,
+    and drives its pins from its update latches under ``EXTEST``.  Every
+    other instruction selects a single-bit bypass register.
+    """
+
+    # Next state of the TAP controller for a TMS of ``0`` and ``1``.
+    TRANSITIONS = {
+        'RESET': ('IDLE', 'RESET'),
+        'IDLE': ('IDLE', 'SELECT_DR'),
+        'SELECT_DR': ('CAPTURE_DR', 'SELECT_IR'),
+        'CAPTURE_DR': ('SHIFT_DR', 'EXIT1_DR'),
+        'SHIFT_DR': ('SHIFT_DR', 'EXIT1_DR'),
+        'EXIT1_DR': ('PAUSE_DR', 'UPDATE_DR'),
+        'PAUSE_DR': ('PAUSE_DR', 'EXIT2_DR'),
+        'EXIT2_DR': ('SHIFT_DR', 'UPDATE_DR'),
+        'UPDATE_DR': ('IDLE', 'SELECT_DR'),
+        'SELECT_IR': ('CAPTURE_IR', 'RESET'),
+        'CAPTURE_IR': ('SHIFT_IR', 'EXIT1_IR'),
+        'SHIFT_IR': ('SHIFT_IR', 'EXIT1_IR'),
+        'EXIT1_IR': ('PAUSE_IR', 'UPDATE_IR'),
+        'PAUSE_IR': ('PAUSE_IR', 'EXIT2_IR'),
+        'EXIT2_IR': ('SHIFT_IR', 'UPDATE_IR'),
+        'UPDATE_IR': ('IDLE', 'SELECT_DR'),
+    }
+
+    def __init__(self, devices):
+        """Initializes the simulated chain in the Run-Test/Idle state.
+
+        Args:
+          self (SimulatedTAP): the ``SimulatedTAP`` instance
+          devices (list): list of ``Device`` descriptions, from TDO to TDI
+
+        Returns:
+          ``None``
+        """
+        self.devices = devices
+        self.state = 'IDLE'
+        self.instructions = [device.bypass for device in devices]
+        self.pins = [0] * len(devices)
+        self.latches = [0] * len(devices)
+        self.driven = [[] for _ in devices]
+        self.tdo = []
+        self.stores = 0
+        self.syncs = 0
+        self._register = 0
+        self._lengths = []
+
+    def _boundary(self, index):
+        """Returns whether a device has its boundary-scan register selected.
+
+        Args:
+          self (SimulatedTAP): the ``SimulatedTAP`` instance
+          index (int): index of the device
+
+        Returns:
+          ``True`` if the boundary-scan register is selected.
+        """
+        device = self.devices[index]
+        return self.instructions[index] in (device.sample, device.extest)
+
+    def _capture(self, ir):
+        """Loads the selected registers of every device into the chain.
+
+        Args:
+          self (SimulatedTAP): the ``SimulatedTAP`` instance
+          ir (bool): ``True`` to capture the instruction registers
+
+        Returns:
+          ``None``
+        """
+        self._register = 0
+        self._lengths = []
+        pos = 0
+        for (index, device) in enumerate(self.devices):
+            if ir:
+                (value, length) = (0x1, device.ir_len)
+            elif self._boundary(index):
+                (value, length) = (self.pins[index], device.bsr_len)
+            else:
+                (value, length) = (0, 1)
+            self._register |= value << pos
+            self._lengths.append(length)
+            pos += length
+
+    def _update(self, ir):
+        """Applies the shifted chain to the registers of every device.
+
+        Args:
+          self (SimulatedTAP): the ``SimulatedTAP`` instance
+          ir (bool): ``True`` to update the instruction registers
+
+        Returns:
+          ``None``
+        """
+        register = self._register
+        for (index, length) in enumerate(self._lengths):
+            value = register & ((1 << length) - 1)
+            register >>= length
+            if ir:
+                self.instructions[index] = value
+            elif self._boundary(index):
+                self.latches[index] = value
+
+        for (index, device) in enumerate(self.devices):
+            if self.instructions[index] == device.extest:
+                self.driven[index].append(self.latches[index])
+
+    def clock(self, tms, tdi):
+        """Clocks a single bit through the chain.
+
+        Args:
+          self (SimulatedTAP): the ``SimulatedTAP`` instance
+          tms (int): the TMS bit
+          tdi (int): the TDI bit
+
+        Returns:
+          The TDO bit.
+        """
+        tdo = 0
+        if self.state.startswith('CAPTURE'):
+            self._capture(self.state.endswith('IR'))
+        elif self.state.startswith('SHIFT'):
+            tdo = self._register & 1
+            length = sum(self._lengths)
+            self._register = (self._register >> 1) | (tdi << (length - 1))
+        elif self.state.startswith('UPDATE'):
+            self._update(self.state.endswith('IR'))
+
+        self.state = self.TRANSITIONS[self.state][tms]
+        return tdo
+
+    def store_raw(self, tdi, tms, num_bits):
+        """Simulates ``JLINKARM_JTAG_StoreRaw()``.
+
+        Args:
+          self (SimulatedTAP): the ``SimulatedTAP`` instance
+          tdi (ctypes.Array): the TDI bits
+          tms (ctypes.Array): the TMS bits
+          num_bits (int): the number of bits
+
+        Returns:
+          The bit position of the TDO bits in the input buffer.
+        """
+        self.stores += 1
+        bitpos = len(self.tdo)
+        for bit in range(num_bits):
+            (byte, shift) = divmod(bit, 8)
+            self.tdo.append(self.clock((tms[byte] >> shift) & 1, (tdi[byte] >> shift) & 1))
+        return bitpos
+
+    def get_data(self, buf, offset, num_bits):
+        """Simulates ``JLINKARM_JTAG_GetData()``.
+
+        Args:
+          self (SimulatedTAP): the ``SimulatedTAP`` instance
+          buf (ctypes.CArgObject): reference to the buffer to fill
+          offset (int): the bit position to read from
+          num_bits (int): the number of bits to read
+
+        Returns:
+          ``None``
+        """
+        for (index, bit) in enumerate(self.tdo[offset:offset + num_bits]):
+            buf._obj[index // 8] |= bit << (index % 8)
+
+    def sync_bits(self):
+        """Simulates ``JLINKARM_JTAG_SyncBits()``.
+
+        Args:
+          self (SimulatedTAP): the ``SimulatedTAP`` instance
+
+        Returns:
+          ``None``
+        """
+        self.syncs += 1
+
+
+class TestBoundaryScan(unittest.TestCase):
+    """Tests the `protocols.boundary_scan` submodule."""
+
+    def setUp(self):
+        """Called before each test.
+
+        Creates a J-Link whose DLL drives a simulated chain of a bypassed
+        device, nearest to TDO, and a device with a boundary-scan register.
+
+        Args:
+          self (TestBoundaryScan): the `TestBoundaryScan` instance
+
+        Returns:
+          `None`
+        """
+        self.cells = {'PA0': 0, 'PA1': 3, 'PB7': 10, 'RESET': 19}
+        self.chain = boundary_scan.Chain([
+            boundary_scan.Device(ir_len=4),
+            boundary_scan.Device(ir_len=5, bsr_len=20, sample=0x2, extest=0x0, cells=self.cells),
+        ])
+        self.tap = SimulatedTAP(self.chain.devices)
+
+        self.dll = mock.Mock()
+        self.dll.JLINKARM_JTAG_StoreRaw.side_effect = self.tap.store_raw
+        self.dll.JLINKARM_JTAG_GetData.side_effect = self.tap.get_data
+        self.dll.JLINKARM_JTAG_SyncBits.side_effect = self.tap.sync_bits
+
+        lib = mock.Mock()
+        lib.dll.return_value = self.dll
+        self.jlink = jlink.JLink(lib)
+
+    def tearDown(self):
+        """Called after each test.
+
+        Performs teardown.
+
+        Args:
+          self (TestBoundaryScan): the `TestBoundaryScan` instance
+
+        Returns:
+          `None`
+        """
+        pass
+
+    def test_boundary_scan_device_invalid(self):
+        """Tests creating invalid device and chain descriptions.
+
+        Args:
+          self (TestBoundaryScan): the `TestBoundaryScan` instance
+
+        Returns:
+          `None`
+        """
+        with self.assertRaises(ValueError):
+            boundary_scan.Device(ir_len=1)
+
+        with self.assertRaises(ValueError):
+            boundary_scan.Device(ir_len=4, bsr_len=-1)
+
+        with self.assertRaises(ValueError):
+            boundary_scan.Device(ir_len=4, bsr_len=8, cells={'PA0': 8})
+
+        with self.assertRaises(ValueError):
+            boundary_scan.Chain([])
+
+        with self.assertRaises(ValueError):
+            boundary_scan.BoundaryScan(self.jlink, self.chain, index=0)
+
+        with self.assertRaises(KeyError):
+            boundary_scan.BoundaryScan(self.jlink, self.chain, index=1, pins=['PC0'])
+
+    def test_boundary_scan_chain(self):
+        """Tests the instruction and data register layout of a chain.
+
+        Args:
+          self (TestBoundaryScan): the `TestBoundaryScan` instance
+
+        Returns:
+          `None`
+        """
+        self.assertEqual(9, self.chain.ir_len)
+        self.assertEqual(0xF | (0x2 << 4), self.chain.instruction(1, 0x2))
+        self.assertEqual(0x5 | (0x1F << 4), self.chain.instruction(0, 0x5))
+        self.assertEqual((1, 21), self.chain.data_layout(1))
+
+    def test_boundary_scan_sample(self):
+        """Tests sampling the pins of a device in the chain.
+
+        Args:
+          self (TestBoundaryScan): the `TestBoundaryScan` instance
+
+        Returns:
+          `None`
+        """
+        scan = boundary_scan.BoundaryScan(self.jlink, self.chain, index=1)
+        self.assertEqual(['PA0', 'PA1', 'PB7', 'RESET'], scan.pins)
+
+        self.tap.pins[1] = (1 << 0) | (1 << 10) | (1 << 19)
+        samples = scan.sample(3)
+        self.assertEqual([0xF, 0x2], self.tap.instructions)
+
+        self.assertEqual(3, len(samples))
+        for sample in samples:
+            self.assertEqual((1, 0, 1, 1), sample.states)
+        self.assertEqual(samples, list(scan.samples))
+        self.assertTrue(samples[0].timestamp <= samples[1].timestamp <= samples[2].timestamp)
+
+        # The instruction is loaded once, and the scans are pipelined.
+        self.assertEqual(2, self.tap.stores)
+        self.assertEqual(2, self.tap.syncs)
+
+        self.tap.pins[1] = (1 << 3)
+        self.assertEqual((0, 1, 0, 0), scan.sample()[0].states)
+        self.assertEqual(3, self.tap.stores)
+
+        # The pins keep running under SAMPLE/PRELOAD.
+        self.assertEqual([[], []], self.tap.driven)
+
+    def test_boundary_scan_decode(self):
+        """Tests decoding the pins of a batch of scans.
+
+        Args:
+          self (TestBoundaryScan): the `TestBoundaryScan` instance
+
+        Returns:
+          `None`
+        """
+        scan = boundary_scan.BoundaryScan(self.jlink, self.chain, index=1, pins=['RESET', 'PA1'])
+
+        # The bypass bit of the first device precedes the register.
+        first = (1 << (1 + 19))
+        second = (1 << (1 + 3)) | 1
+        captured = (first | (second << 21)).to_bytes(6, 'little')
+        self.assertEqual([(1, 0), (0, 1)], scan.decode(captured, 2))
+
+        scan = boundary_scan.BoundaryScan(self.jlink, self.chain, index=1, pins=[])
+        self.assertEqual([(), ()], scan.decode(captured, 2))
+
+    def test_boundary_scan_extest(self):
+        """Tests driving the pins of a device with ``EXTEST``.
+
+        Args:
+          self (TestBoundaryScan): the `TestBoundaryScan` instance
+
+        Returns:
+          `None`
+        """
+        scan = boundary_scan.BoundaryScan(self.jlink, self.chain, index=1)
+
+        vector = (1 << 3) | (1 << 19)
+        self.tap.pins[1] = vector
+        samples = scan.extest(vector, 2)
+        self.assertEqual([(0, 1, 0, 1), (0, 1, 0, 1)], [sample.states for sample in samples])
+
+        # The vector was preloaded before EXTEST was loaded, so the pins
+        # were only ever driven with it.
+        self.assertEqual([0xF, 0x0], self.tap.instructions)
+        self.assertEqual([vector] * 3, self.tap.driven[1])
+
+        scan.extest(0x1, 1)
+        self.assertEqual(0x1, self.tap.driven[1][-1])
+
+        # Sampling shifts the last vector, so the latches are unchanged.
+        scan.sample(1)
+        self.assertEqual(0x1, self.tap.latches[1])
+
+    def test_boundary_scan_run(self):
+        """Tests sampling repeatedly into the ring buffer.
+
+        Args:
+          self (TestBoundaryScan): the `TestBoundaryScan` instance
+
+        Returns:
+          `None`
+        """
+        scan = boundary_scan.BoundaryScan(self.jlink, self.chain, index=1, buffer_size=8)
+
+        with self.assertRaises(ValueError):
+            scan.run(10, batch_size=0)
+
+        self.tap.pins[1] = 1
+        self.assertEqual(10, scan.run(10, batch_size=4))
+        self.assertEqual(8, len(scan.samples))
+        self.assertEqual(1 + 3, self.tap.stores)
+        self.assertEqual(0, scan.run(0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,272 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from pylink.errors import JLinkException
+import pylink.protocols.mem_ap as mem_ap
+
+import contextlib
+import unittest
+
+
+class SimulatedDAP(object):
+    """Simulates the CoreSight register accesses of a J-Link to a MEM-AP.
+
+    The TAR auto-increments within 1 KiB, and wraps at the boundary, and
+    accesses smaller than a word use the byte lanes of their address.
+    """
+
+    def __init__(self, size=0x1000):
+        """Initializes the simulated DAP.
+
+        Args:
+          self (SimulatedDAP): the ``SimulatedDAP`` instance
+          size (int): size of the simulated memory in bytes
+
+        Returns:
+          ``None``
+        """
+        self.memory = bytearray(i & 0xFF for i in range(size))
+        self.select = 0
+        self.csw = 0x23000040
+        self.tar = 0
+        self.accesses = []
+        self.sessions = 0
+        self.fail = False
+
+    @contextlib.contextmanager
+    def trusted_session(self):
+        """Simulates ``JLink.trusted_session()``.
+
+        Args:
+          self (SimulatedDAP): the ``SimulatedDAP`` instance
+
+        Returns:
+          A context manager.
+        """
+        self.sessions += 1
+        yield self
+
+    def _drw(self, value=None):
+        """Accesses memory at the TAR, then auto-increments the TAR.
+
+        Args:
+          self (SimulatedDAP): the ``SimulatedDAP`` instance
+          value (int): the value to write, or ``None`` to read
+
+        Returns:
+          The value read.
+        """
+        size = 1 << (self.csw & 0x7)
+        addr = self.tar & ~(size - 1)
+        lane = (addr % 4) * 8
+        if value is not None:
+            data = ((value >> lane) & ((1 << (size * 8)) - 1)).to_bytes(size, 'little')
+            self.memory[addr:addr + size] = data
+        else:
+            value = int.from_bytes(self.memory[addr:addr + size], 'little') << lane
+
+        offset = ((self.tar & 0x3FF) + size) & 0x3FF
+        self.tar = (self.tar & ~0x3FF) | offset
+        return value
+
+    def coresight_read(self, reg, ap=True):
+        """Simulates ``JLink.coresight_read()``.
+
+        Args:
+          self (SimulatedDAP): the ``SimulatedDAP`` instance
+          reg (int): index of the register
+          ap (bool): ``True`` for an Access Port register
+
+        Returns:
+          The register value.
+        """
+        self.accesses.append(('read', reg, ap))
+        if self.fail:
+            raise JLinkException(-1)
+        return {0x0: self.csw, 0x1: self.tar}.get(reg) if reg != 0x3 else self._drw()
+
+    def coresight_write(self, reg, data, ap=True):
+        """Simulates ``JLink.coresight_write()``.
+
+        Args:
+          self (SimulatedDAP): the ``SimulatedDAP`` instance
+          reg (int): index of the register
+          data (int): the value to write
+          ap (bool): ``True`` for an Access Port register
+
+        Returns:
+          ``None``
+        """
+        self.accesses.append(('write', reg, ap))
+        if self.fail:
+            raise JLinkException(-1)
+        if not ap:
+            self.select = data
+        elif reg == 0x0:
+            self.csw = data
+        elif reg == 0x1:
+            self.tar = data
+        elif reg == 0x3:
+            self._drw(data)
+
+    def count(self, kind, reg, ap=True):
+        """Returns the number of accesses of a kind to a register.
+
+        Args:
+          self (SimulatedDAP): the ``SimulatedDAP`` instance
+          kind (str): ``'read'`` or ``'write'``
+          reg (int): index of the register
+          ap (bool): ``True`` for an Access Port register
+
+        Returns:
+          The number of accesses.
+        """
+        return self.accesses.count((kind, reg, ap))
+
+
+class TestMemAP(unittest.TestCase):
+    """Tests the `protocols.mem_ap` submodule."""
+
+    def setUp(self):
+        """Called before each test.
+
+        Performs setup.
+
+        Args:
+          self (TestMemAP): the `TestMemAP` instance
+
+        Returns:
+          `None`
+        """
+        self.dap = SimulatedDAP()
+        self.mem_ap = mem_ap.MemAP(self.dap, ap=1)
+
+    def tearDown(self):
+        """Called after each test.
+
+        Performs teardown.
+
+        Args:
+          self (TestMemAP): the `TestMemAP` instance
+
+        Returns:
+          `None`
+        """
+        pass
+
+    def test_mem_ap_read_block(self):
+        """Tests reading a block across a 1 KiB boundary.
+
+        Args:
+          self (TestMemAP): the `TestMemAP` instance
+
+        Returns:
+          `None`
+        """
+        data = self.mem_ap.read_block(0x3F0, 0x20)
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(bytes(self.dap.memory[0x3F0:0x410]), data)
+
+        # The TAR is written once, and again at the 1 KiB boundary.
+        self.assertEqual(2, self.dap.count('write', mem_ap.MemAP.TAR))
+        self.assertEqual(8, self.dap.count('read', mem_ap.MemAP.DRW))
+        self.assertEqual(1 << 24, self.dap.select)
+        self.assertEqual(0x23000052, self.dap.csw)
+        self.assertEqual(1, self.dap.sessions)
+
+    def test_mem_ap_cached_state(self):
+        """Tests that redundant SELECT, CSW, and TAR writes are skipped.
+
+        Args:
+          self (TestMemAP): the `TestMemAP` instance
+
+        Returns:
+          `None`
+        """
+        self.mem_ap.read_block(0x100, 8)
+        self.mem_ap.read_block(0x108, 8)
+        self.mem_ap.write_block(0x110, b'\x00' * 8)
+
+        self.assertEqual(1, self.dap.count('write', mem_ap.MemAP.DP_SELECT, False))
+        self.assertEqual(1, self.dap.count('read', mem_ap.MemAP.CSW))
+        self.assertEqual(1, self.dap.count('write', mem_ap.MemAP.CSW))
+        self.assertEqual(1, self.dap.count('write', mem_ap.MemAP.TAR))
+
+        self.mem_ap.invalidate()
+        self.mem_ap.read_block(0x100, 4)
+        self.assertEqual(2, self.dap.count('write', mem_ap.MemAP.DP_SELECT, False))
+        self.assertEqual(2, self.dap.count('read', mem_ap.MemAP.CSW))
+        self.assertEqual(2, self.dap.count('write', mem_ap.MemAP.TAR))
+
+    def test_mem_ap_unaligned(self):
+        """Tests reading and writing unaligned blocks.
+
+        Args:
+          self (TestMemAP): the `TestMemAP` instance
+
+        Returns:
+          `None`
+        """
+        self.assertEqual(bytes(self.dap.memory[0x3FD:0x407]), self.mem_ap.read_block(0x3FD, 10))
+
+        data = bytes(range(0xA0, 0xAB))
+        self.mem_ap.write_block(0x3FE, data)
+        self.assertEqual(data, bytes(self.dap.memory[0x3FE:0x409]))
+        self.assertEqual(0x09, self.dap.memory[0x409])
+        self.assertEqual(0xFD, self.dap.memory[0x3FD])
+        self.assertEqual(data, self.mem_ap.read_block(0x3FE, len(data)))
+
+        self.assertEqual(b'', self.mem_ap.read_block(0x0, 0))
+
+    def test_mem_ap_read_write_word(self):
+        """Tests reading and writing single words.
+
+        Args:
+          self (TestMemAP): the `TestMemAP` instance
+
+        Returns:
+          `None`
+        """
+        self.mem_ap.write32(0x20, 0xDEADBEEF)
+        self.assertEqual(b'\xEF\xBE\xAD\xDE', bytes(self.dap.memory[0x20:0x24]))
+        self.assertEqual(0xDEADBEEF, self.mem_ap.read32(0x20))
+
+        with self.assertRaises(ValueError):
+            self.mem_ap.read32(0x21)
+
+        with self.assertRaises(ValueError):
+            self.mem_ap.write32(0x22, 0)
+
+    def test_mem_ap_failure(self):
+        """Tests that the cached state is dropped on a hardware error.
+
+        Args:
+          self (TestMemAP): the `TestMemAP` instance
+
+        Returns:
+          `None`
+        """
+        self.mem_ap.read_block(0x0, 4)
+
+        self.dap.fail = True
+        with self.assertRaises(JLinkException):
+            self.mem_ap.read_block(0x4, 4)
+
+        self.dap.fail = False
+        self.mem_ap.read_block(0x4, 4)
+        self.assertEqual(2, self.dap.count('write', mem_ap.MemAP.DP_SELECT, False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -319,6 +319,79 @@ class TestSerialWireDebug(unittest.TestCase):
         self.assertEqual(1, mock_jlink.swd_read8.call_count)
         mock_jlink.swd_read8.assert_called_once_with(ack)
 
+    def test_swd_transaction_queue_empty(self):
+        """Tests sending an empty SWD transaction queue.
+
+        Args:
+          self (TestSerialWireDebug): the `TestSerialWireDebug` instance
+
+        Returns:
+          `None`
+        """
+        queue = swd.SWDTransactionQueue()
+        mock_jlink = mock.Mock()
+
+        self.assertEqual(0, len(queue))
+        self.assertEqual([], queue.send(mock_jlink))
+        self.assertEqual(0, mock_jlink.swd_write.call_count)
+
+    def test_swd_transaction_queue_send(self):
+        """Tests sending a batch of SWD requests in a single transfer.
+
+        The batch is clocked out with the same bits as sending each request on
+        its own, and the responses are decoded from a single read of the input
+        buffer.
+
+        Args:
+          self (TestSerialWireDebug): the `TestSerialWireDebug` instance
+
+        Returns:
+          `None`
+        """
+        queue = swd.SWDTransactionQueue()
+        self.assertEqual(0, queue.write(0x2, False, 0x01000000))
+        self.assertEqual(1, queue.read(0x0, True))
+        self.assertEqual(2, queue.read(0x1, True))
+        self.assertEqual(3, queue.read(0x3, True))
+        self.assertEqual(4, len(queue))
+
+        # Expected direction and data bits, least significant bit first.
+        request = swd.WriteRequest(0x2, False, 0x01000000)
+        output = 0xFF | (0xFFFFFFFF << 13) | (0xFF << 45)
+        value = request.value | (0x01000000 << 13) | (1 << 45)
+        for index in range(3):
+            request = swd.ReadRequest(index if index < 2 else 3, True)
+            output |= (0xFF | (0xFC << 43)) << (53 + 51 * index)
+            value |= request.value << (53 + 51 * index)
+
+        # Input bits: ACK'd write, ACK'd read with valid parity, ACK'd read
+        # with invalid parity, and a read that had to wait.
+        bits = swd.Response.STATUS_ACK << 8
+        bits |= (swd.Response.STATUS_ACK | (0x7 << 3) | (1 << 35)) << (53 + 8)
+        bits |= (swd.Response.STATUS_ACK | (0x3 << 3) | (1 << 35)) << (104 + 8)
+        bits |= (swd.Response.STATUS_WAIT | (0xFF << 3)) << (155 + 8)
+
+        bitpos = 5
+        mock_jlink = mock.Mock()
+        mock_jlink.swd_write.return_value = bitpos
+        mock_jlink.swd_read.return_value = bits
+
+        responses = queue.send(mock_jlink)
+        self.assertEqual(0, len(queue))
+
+        mock_jlink.swd_write.assert_called_once_with(output, value, 206)
+        mock_jlink.swd_sync.assert_called_once_with()
+        mock_jlink.swd_read.assert_called_once_with(bitpos, 206)
+
+        self.assertEqual(4, len(responses))
+        self.assertTrue(responses[0].ack())
+        self.assertIsNone(responses[0].data)
+        self.assertTrue(responses[1].ack())
+        self.assertEqual(0x7, responses[1].data)
+        self.assertTrue(responses[2].invalid())
+        self.assertEqual(0x3, responses[2].data)
+        self.assertTrue(responses[3].wait())
+
 
 if __name__ == '__main__':
     unittest.main()
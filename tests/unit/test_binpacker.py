@@ -14,9 +14,30 @@
 
 import pylink.binpacker as binpacker
 
+import ctypes
+import math
+import os
+import timeit
 import unittest
 
 
+def legacy_pack(value, nbits):
+    """Packs a value the way ``binpacker.pack()`` used to, one byte at a time.
+
+    Args:
+      value (int): the integer value to pack
+      nbits (int): number of bits to use to represent the value
+
+    Returns:
+      An array of ``ctypes.c_uint8`` representing the packed ``value``.
+    """
+    buf_size = int(math.ceil(nbits / float(binpacker.BITS_PER_BYTE)))
+    buf = (ctypes.c_uint8 * buf_size)()
+    for (idx, _) in enumerate(buf):
+        buf[idx] = (value >> (idx * binpacker.BITS_PER_BYTE)) & 0xFF
+    return buf
+
+
 class TestBinpacker(unittest.TestCase):
     """Unit test class for the `binpacker` submodule."""
 
@@ -66,6 +87,12 @@ class TestBinpacker(unittest.TestCase):
         self.assertEqual(4, binpacker.pack_size(2147483647))
         self.assertEqual(8, binpacker.pack_size(9223372036854775807))
 
+        # Values just below a power of 256 are rounded up by a floating-point
+        # logarithm.
+        self.assertEqual(6, binpacker.pack_size(0xFFFFFFFFFFFF))
+        self.assertEqual(8, binpacker.pack_size(0xFFFFFFFFFFFFFFFF))
+        self.assertEqual(9, binpacker.pack_size(0x10000000000000000))
+
     def test_pack_size_invalid(self):
         """Tests that the `pack_size()` method throws an exception.
 
@@ -165,6 +192,98 @@ class TestBinpacker(unittest.TestCase):
         with self.assertRaises(ValueError):
             binpacker.pack(4, -1)
 
+    def test_pack_large(self):
+        """Tests that the `pack()` method packs values wider than 64 bits.
+
+        Args:
+          self (TestBinpacker): the `TestBinpacker` instance
+
+        Returns:
+          `None`
+        """
+        packed = binpacker.pack(0xFFFFFFFFFFFF)
+        self.assertEqual(6, len(packed))
+        self.assertEqual([0xFF] * 6, list(packed))
+
+        value = (0xA5 << 96) | 0x5A
+        packed = binpacker.pack(value, 104)
+        self.assertEqual(13, len(packed))
+        self.assertEqual([0x5A] + [0] * 11 + [0xA5], list(packed))
+
+        # Values are truncated to the number of bytes, and negative values
+        # are packed in two's complement.
+        self.assertEqual([0x34, 0x12], list(binpacker.pack(0xAB1234, 12)))
+        self.assertEqual([0xFF, 0xFF], list(binpacker.pack(-1, 16)))
+
+    def test_pack_many(self):
+        """Tests that the `pack_many()` method packs values contiguously.
+
+        Args:
+          self (TestBinpacker): the `TestBinpacker` instance
+
+        Returns:
+          `None`
+        """
+        packed = binpacker.pack_many([0x1, 0x1234, 0xFFFF], 16)
+        self.assertIsInstance(packed, ctypes.Array)
+        self.assertEqual([0x01, 0x00, 0x34, 0x12, 0xFF, 0xFF], list(packed))
+
+        packed = binpacker.pack_many([0x1FF, 0x2], 9)
+        self.assertEqual([0xFF, 0x01, 0x02, 0x00], list(packed))
+
+        self.assertEqual(0, len(binpacker.pack_many([], 8)))
+
+        values = [0, 1, 0xFF, 0xDEADBEEF, 0xFFFFFFFF]
+        expected = []
+        for value in values:
+            expected.extend(binpacker.pack(value, 32))
+        self.assertEqual(expected, list(binpacker.pack_many(values, 32)))
+
+    def test_pack_many_invalid(self):
+        """Tests that the `pack_many()` method raises an exception.
+
+        Args:
+          self (TestBinpacker): the `TestBinpacker` instance
+
+        Returns:
+          `None`
+        """
+        with self.assertRaises(TypeError):
+            binpacker.pack_many(['Turanga Leela'], 8)
+
+        with self.assertRaises(ValueError):
+            binpacker.pack_many([4], 0)
+
+    def test_pack_legacy(self):
+        """Tests that values are packed the same as by the legacy packer.
+
+        Args:
+          self (TestBinpacker): the `TestBinpacker` instance
+
+        Returns:
+          `None`
+        """
+        for value in (0, 0x1234, 0xFFFFFFFF):
+            self.assertEqual(list(legacy_pack(value, 32)), list(binpacker.pack(value, 32)))
+
+    @unittest.skipUnless(os.environ.get('PYLINK_BENCHMARK'), 'set PYLINK_BENCHMARK to run benchmarks')
+    def test_pack_benchmark(self):
+        """Benchmarks packing a million values against the legacy packer.
+
+        Args:
+          self (TestBinpacker): the `TestBinpacker` instance
+
+        Returns:
+          `None`
+        """
+        values = range(1000000)
+        legacy_time = timeit.timeit(lambda: [legacy_pack(v, 32) for v in values], number=1)
+        pack_time = timeit.timeit(lambda: [binpacker.pack(v, 32) for v in values], number=1)
+        pack_many_time = timeit.timeit(lambda: binpacker.pack_many(values, 32), number=1)
+
+        self.assertLess(pack_time, legacy_time)
+        self.assertLess(pack_many_time, pack_time)
+
 
 if __name__ == '__main__':
     unittest.main()
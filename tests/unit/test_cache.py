@@ -0,0 +1,282 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pylink.cache as cache
+
+import unittest
+
+
+class TestMemoryCache(unittest.TestCase):
+    """Unit test class for the ``cache`` submodule."""
+
+    def setUp(self):
+        """Called before each test.
+
+        Performs setup.
+
+        Args:
+          self (TestMemoryCache): the ``TestMemoryCache`` instance
+
+        Returns:
+          ``None``
+        """
+        self.memory = bytearray(i & 0xFF for i in range(0x1000))
+        self.reads = []
+        self.writes = []
+
+    def tearDown(self):
+        """Called after each test.
+
+        Performs teardown.
+
+        Args:
+          self (TestMemoryCache): the ``TestMemoryCache`` instance
+
+        Returns:
+          ``None``
+        """
+        pass
+
+    def reader(self, addr, size, zone):
+        """Reads from the simulated target memory.
+
+        Args:
+          self (TestMemoryCache): the ``TestMemoryCache`` instance
+          addr (int): start address to read from
+          size (int): number of bytes to read
+          zone (str): memory zone to read from
+
+        Returns:
+          The bytes read, or ``None`` if out of range.
+        """
+        self.reads.append((addr, size, zone))
+        if addr + size > len(self.memory):
+            return None
+        return bytes(self.memory[addr:addr + size])
+
+    def writer(self, addr, data, zone):
+        """Writes to the simulated target memory.
+
+        Args:
+          self (TestMemoryCache): the ``TestMemoryCache`` instance
+          addr (int): start address to write to
+          data (bytes): data to write
+          zone (str): memory zone to write to
+
+        Returns:
+          ``None``
+        """
+        self.writes.append((addr, data, zone))
+        self.memory[addr:addr + len(data)] = data
+
+    def create(self, **kwargs):
+        """Creates a memory cache on top of the simulated target memory.
+
+        Args:
+          self (TestMemoryCache): the ``TestMemoryCache`` instance
+          kwargs (dict): keyword arguments to pass to the cache
+
+        Returns:
+          A ``MemoryCache`` instance.
+        """
+        return cache.MemoryCache(self.reader, self.writer, **kwargs)
+
+    def test_memory_cache_invalid(self):
+        """Tests creating a memory cache with invalid parameters.
+
+        Args:
+          self (TestMemoryCache): the ``TestMemoryCache`` instance
+
+        Returns:
+          ``None``
+        """
+        with self.assertRaises(ValueError):
+            self.create(page_size=0)
+
+        with self.assertRaises(ValueError):
+            self.create(max_pages=0)
+
+    def test_memory_cache_cacheable(self):
+        """Tests that excluded regions are not cacheable.
+
+        Args:
+          self (TestMemoryCache): the ``TestMemoryCache`` instance
+
+        Returns:
+          ``None``
+        """
+        memory_cache = self.create()
+        self.assertTrue(memory_cache.cacheable(0x20000000, 4))
+        self.assertFalse(memory_cache.cacheable(0x40000000, 4))
+        self.assertFalse(memory_cache.cacheable(0xE000ED00, 4))
+        self.assertFalse(memory_cache.cacheable(0x20000000, 0))
+
+        memory_cache = self.create(page_size=0x100, excludes=[(0x210, 0x10)])
+        self.assertTrue(memory_cache.cacheable(0x40000000, 4))
+        self.assertTrue(memory_cache.cacheable(0x100, 0x100))
+        self.assertFalse(memory_cache.cacheable(0x200, 4))
+        self.assertFalse(memory_cache.cacheable(0x1F0, 0x11))
+
+    def test_memory_cache_read(self):
+        """Tests reading through the memory cache.
+
+        Args:
+          self (TestMemoryCache): the ``TestMemoryCache`` instance
+
+        Returns:
+          ``None``
+        """
+        memory_cache = self.create(page_size=0x100)
+
+        self.assertEqual(self.memory[0xF0:0x110], memory_cache.read(0xF0, 0x20))
+        self.assertEqual([(0x0, 0x100, None), (0x100, 0x100, None)], self.reads)
+        self.assertEqual(0, memory_cache.hits)
+        self.assertEqual(2, memory_cache.misses)
+
+        self.assertEqual(self.memory[0x104:0x108], memory_cache.read(0x104, 4))
+        self.assertEqual(2, len(self.reads))
+        self.assertEqual(1, memory_cache.hits)
+
+        # Zones are cached separately.
+        memory_cache.read(0x104, 4, 'zone')
+        self.assertEqual((0x100, 0x100, 'zone'), self.reads[-1])
+        self.assertEqual(3, len(memory_cache))
+
+    def test_memory_cache_read_failure(self):
+        """Tests reading through the memory cache when a page can't be read.
+
+        Args:
+          self (TestMemoryCache): the ``TestMemoryCache`` instance
+
+        Returns:
+          ``None``
+        """
+        memory_cache = self.create(page_size=0x800)
+        self.assertIsNone(memory_cache.read(0x0FFC, 8))
+        self.assertEqual(1, len(memory_cache))
+
+    def test_memory_cache_eviction(self):
+        """Tests that the least recently used page is evicted.
+
+        Args:
+          self (TestMemoryCache): the ``TestMemoryCache`` instance
+
+        Returns:
+          ``None``
+        """
+        memory_cache = self.create(page_size=0x100, max_pages=2, write_back=True)
+
+        memory_cache.read(0x000, 1)
+        memory_cache.write(0x100, b'\xAA\xBB')
+        memory_cache.read(0x000, 1)
+        self.assertEqual([], self.writes)
+
+        # Evicts the dirty page at 0x100, which is written back.
+        memory_cache.read(0x200, 1)
+        self.assertEqual([(0x100, b'\xAA\xBB', None)], self.writes)
+        self.assertEqual(2, len(memory_cache))
+
+        memory_cache.read(0x000, 1)
+        self.assertEqual(3, memory_cache.misses)
+        self.assertEqual(2, memory_cache.hits)
+
+    def test_memory_cache_write_back(self):
+        """Tests buffering writes in the memory cache.
+
+        Args:
+          self (TestMemoryCache): the ``TestMemoryCache`` instance
+
+        Returns:
+          ``None``
+        """
+        memory_cache = self.create(page_size=0x100, write_back=True)
+
+        self.assertTrue(memory_cache.write(0xFE, b'\x01\x02\x03\x04'))
+        memory_cache.write(0x80, b'\x05')
+        self.assertEqual([], self.writes)
+        self.assertEqual(b'\x05', memory_cache.read(0x80, 1))
+        self.assertEqual(0x80, self.memory[0x80])
+
+        memory_cache.flush()
+        self.assertEqual(sorted([
+            (0x80, b'\x05\x81' + bytes(range(0x82, 0xFE)) + b'\x01\x02', None),
+            (0x100, b'\x03\x04', None),
+        ]), sorted(self.writes))
+        self.assertEqual(b'\x01\x02\x03\x04', self.memory[0xFE:0x102])
+
+        # Flushing again writes nothing, and the pages are kept.
+        memory_cache.flush()
+        self.assertEqual(2, len(self.writes))
+        self.assertEqual(2, len(memory_cache))
+
+    def test_memory_cache_write_failure(self):
+        """Tests buffering a write when a page can't be read.
+
+        Args:
+          self (TestMemoryCache): the ``TestMemoryCache`` instance
+
+        Returns:
+          ``None``
+        """
+        memory_cache = self.create(page_size=0x800, write_back=True)
+        self.assertFalse(memory_cache.write(0xFFF, b'\x00\x00'))
+        memory_cache.flush()
+        self.assertEqual([], self.writes)
+
+        memory_cache = self.create(page_size=0x100, max_pages=1, write_back=True)
+        self.assertFalse(memory_cache.write(0xFF, b'\x00\x00'))
+
+    def test_memory_cache_update_discard(self):
+        """Tests updating and discarding pages after writes to the target.
+
+        Args:
+          self (TestMemoryCache): the ``TestMemoryCache`` instance
+
+        Returns:
+          ``None``
+        """
+        memory_cache = self.create(page_size=0x100)
+        memory_cache.read(0x0, 1)
+
+        memory_cache.update(0xFF, b'\xAA\xBB')
+        self.assertEqual(b'\xAA', memory_cache.read(0xFF, 1))
+        self.assertEqual(1, len(memory_cache))
+
+        memory_cache.discard(0x10, 1)
+        self.assertEqual(0, len(memory_cache))
+        self.assertEqual([], self.writes)
+
+    def test_memory_cache_invalidate(self):
+        """Tests invalidating the memory cache flushes pending writes.
+
+        Args:
+          self (TestMemoryCache): the ``TestMemoryCache`` instance
+
+        Returns:
+          ``None``
+        """
+        memory_cache = self.create(page_size=0x100, write_back=True)
+        memory_cache.write(0x10, b'\xFF')
+        memory_cache.invalidate()
+        self.assertEqual([(0x10, b'\xFF', None)], self.writes)
+        self.assertEqual(0, len(memory_cache))
+
+        memory_cache.write(0x10, b'\x00')
+        memory_cache.clear()
+        self.assertEqual(1, len(self.writes))
+        self.assertEqual(0, len(memory_cache))
+
+
+if __name__ == '__main__':
+    unittest.main()
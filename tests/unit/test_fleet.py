@@ -0,0 +1,239 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pylink.enums as enums
+import pylink.fleet as fleet
+
+import mock
+
+import os
+import time
+import unittest
+
+
+def succeed(serial_no, scale):
+    """Simulates an operation that succeeds."""
+    return (True, serial_no * scale, {'phase': 0.0})
+
+
+def fail(serial_no):
+    """Simulates an operation that reports failure."""
+    return (False, None, {})
+
+
+def raise_error(serial_no):
+    """Simulates an operation that raises an exception."""
+    raise RuntimeError('board %d' % serial_no)
+
+
+def hang(serial_no):
+    """Simulates an operation that never finishes."""
+    time.sleep(60)
+
+
+def crash(serial_no):
+    """Simulates a worker that exits without a result."""
+    os._exit(3)
+
+
+def mixed(serial_no):
+    """Simulates a panel of boards, one of which hangs."""
+    if serial_no == 2:
+        hang(serial_no)
+    elif serial_no == 3:
+        raise_error(serial_no)
+    return succeed(serial_no, 1)
+
+
+class TestFleet(unittest.TestCase):
+    """Unit test for the `fleet` submodule."""
+
+    def setUp(self):
+        """Called before each test.
+
+        Performs setup.
+
+        Args:
+          self (TestFleet): the `TestFleet` instance
+
+        Returns:
+          `None`
+        """
+        pass
+
+    def tearDown(self):
+        """Called after each test.
+
+        Performs teardown.
+
+        Args:
+          self (TestFleet): the `TestFleet` instance
+
+        Returns:
+          `None`
+        """
+        pass
+
+    def test_fleet_run_success(self):
+        """Tests running an operation on several boards.
+
+        Args:
+          self (TestFleet): the `TestFleet` instance
+
+        Returns:
+          `None`
+        """
+        results = fleet.run([3, 1, 2], succeed, (10,), max_workers=2)
+        self.assertEqual([3, 1, 2], [r.serial_no for r in results])
+        self.assertEqual([30, 10, 20], [r.result for r in results])
+        for result in results:
+            self.assertTrue(result.success)
+            self.assertIsNone(result.error)
+            self.assertEqual({'phase': 0.0}, result.timings)
+            self.assertGreaterEqual(result.elapsed, 0)
+
+    def test_fleet_run_failures(self):
+        """Tests that failing boards are reported individually.
+
+        Args:
+          self (TestFleet): the `TestFleet` instance
+
+        Returns:
+          `None`
+        """
+        (failed,) = fleet.run([1], fail)
+        self.assertFalse(failed.success)
+        self.assertIsNone(failed.error)
+
+        (raised,) = fleet.run([7], raise_error)
+        self.assertFalse(raised.success)
+        self.assertEqual('RuntimeError: board 7', raised.error)
+
+        (crashed,) = fleet.run([1], crash)
+        self.assertFalse(crashed.success)
+        self.assertEqual('Worker exited with code 3.', crashed.error)
+
+    def test_fleet_run_timeout(self):
+        """Tests that a hung board does not block the others.
+
+        Args:
+          self (TestFleet): the `TestFleet` instance
+
+        Returns:
+          `None`
+        """
+        start = time.monotonic()
+        results = fleet.run([1, 2, 3, 4], mixed, timeout=2.0, context='fork')
+        self.assertLess(time.monotonic() - start, 30.0)
+
+        self.assertEqual([True, False, False, True], [r.success for r in results])
+        self.assertIn('Timed out', results[1].error)
+        self.assertEqual('RuntimeError: board 3', results[2].error)
+
+    def test_fleet_run_invalid(self):
+        """Tests running with invalid arguments.
+
+        Args:
+          self (TestFleet): the `TestFleet` instance
+
+        Returns:
+          `None`
+        """
+        with self.assertRaises(ValueError):
+            fleet.run([1, 1], succeed, (1,))
+
+        with self.assertRaises(ValueError):
+            fleet.run([1], succeed, (1,), max_workers=0)
+
+        self.assertEqual([], fleet.run([], succeed, (1,)))
+
+    @mock.patch('pylink.unlockers.unlock')
+    @mock.patch('pylink.jlink.JLink')
+    def test_fleet_unlock_board(self, mock_jlink_class, mock_unlock):
+        """Tests unlocking the target device of a single board.
+
+        Args:
+          self (TestFleet): the `TestFleet` instance
+          mock_jlink_class (Mock): mocked `JLink` class
+          mock_unlock (Mock): mocked `unlockers.unlock()` function
+
+        Returns:
+          `None`
+        """
+        mock_jlink = mock_jlink_class.return_value
+        mock_unlock.return_value = True
+
+        tif = enums.JLinkInterfaces.SWD
+        (success, result, timings) = fleet._unlock_board(123, 'Kinetis', tif, 'MK64F', {'timeout': 5.0})
+        self.assertTrue(success)
+        self.assertTrue(result)
+        self.assertIn('open', timings)
+        self.assertIn('connect', timings)
+
+        mock_jlink.open.assert_called_once_with(123)
+        mock_jlink.set_tif.assert_called_once_with(tif)
+        mock_jlink.connect.assert_called_once_with('MK64F')
+        mock_unlock.assert_called_once_with(mock_jlink, 'Kinetis', timings=timings, timeout=5.0)
+        mock_jlink.close.assert_called_once_with()
+
+        mock_unlock.side_effect = RuntimeError
+        with self.assertRaises(RuntimeError):
+            fleet._unlock_board(123, 'Kinetis', tif, 'MK64F', {})
+        self.assertEqual(2, mock_jlink.close.call_count)
+
+    @mock.patch('pylink.jlink.JLink')
+    def test_fleet_erase_board(self, mock_jlink_class):
+        """Tests erasing the target device of a single board.
+
+        Args:
+          self (TestFleet): the `TestFleet` instance
+          mock_jlink_class (Mock): mocked `JLink` class
+
+        Returns:
+          `None`
+        """
+        mock_jlink = mock_jlink_class.return_value
+        mock_jlink.erase.return_value = 0x1000
+
+        tif = enums.JLinkInterfaces.JTAG
+        (success, result, timings) = fleet._erase_board(123, tif, 'MK64F')
+        self.assertTrue(success)
+        self.assertEqual(0x1000, result)
+        self.assertEqual(set(['open', 'connect', 'erase']), set(timings))
+        mock_jlink.close.assert_called_once_with()
+
+    @mock.patch('pylink.fleet.run')
+    def test_fleet_unlock_erase(self, mock_run):
+        """Tests that unlocking and erasing run on each board.
+
+        Args:
+          self (TestFleet): the `TestFleet` instance
+          mock_run (Mock): mocked `run()` function
+
+        Returns:
+          `None`
+        """
+        tif = enums.JLinkInterfaces.SWD
+        fleet.unlock([1, 2], 'Kinetis', tif, 'MK64F', timeout=10.0, max_workers=1, reset_hold=0.2)
+        mock_run.assert_called_once_with([1, 2], fleet._unlock_board,
+                                         ('Kinetis', tif, 'MK64F', {'reset_hold': 0.2}), 10.0, 1)
+
+        mock_run.reset_mock()
+        fleet.erase([1, 2], tif, 'MK64F')
+        mock_run.assert_called_once_with([1, 2], fleet._erase_board, (tif, 'MK64F'),
+                                         fleet.BOARD_TIMEOUT, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,235 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pylink.itm as itm
+
+import os
+import timeit
+import unittest
+
+
+# A capture holding one of each kind of packet, and the packets in it.
+CAPTURE = bytes(bytearray([
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x80,  # Sync
+    0x01, 0x48,                          # Port 0, 'H'
+    0x0A, 0x34, 0x12,                    # Port 1, 0x1234
+    0x13, 0x78, 0x56, 0x34, 0x12,        # Port 2, 0x12345678
+    0x30,                                # Local timestamp, 3
+    0xD0, 0x81, 0x01,                    # Local timestamp, 129, delayed
+    0x94, 0x85, 0x80, 0x80, 0x40,        # Global timestamp 1, with wrap
+    0xB4, 0x03,                          # Global timestamp 2
+    0x70,                                # Overflow
+    0x05, 0x21,                          # Event counter, CPI and CYC
+    0x0E, 0x0F, 0x10,                    # Exception 15 entry
+    0x15, 0x00,                          # PC sample, asleep
+    0x17, 0x00, 0x01, 0x00, 0x08,        # PC sample, 0x08000100
+    0x47, 0x10, 0x02, 0x00, 0x08,        # Data trace PC, comparator 0
+    0x4E, 0x04, 0x20,                    # Data trace address, comparator 0
+    0x9E, 0xEF, 0xBE,                    # Data trace write, comparator 1
+    0x18,                                # Extension, stimulus port page 1
+    0x01, 0x21,                          # Port 32, '!'
+    0x04,                                # Reserved
+]))
+
+PACKETS = [
+    itm.Sync(),
+    itm.Stimulus(0, 0x48, 1),
+    itm.Stimulus(1, 0x1234, 2),
+    itm.Stimulus(2, 0x12345678, 4),
+    itm.LocalTimestamp(3, 0),
+    itm.LocalTimestamp(129, 1),
+    itm.GlobalTimestamp1(0x5, False, True),
+    itm.GlobalTimestamp2(0x3 << 26),
+    itm.Overflow(),
+    itm.EventCounter(itm.ITMDecoder.EVENT_CPI | itm.ITMDecoder.EVENT_CYC),
+    itm.ExceptionTrace(15, 1),
+    itm.PCSample(None),
+    itm.PCSample(0x08000100),
+    itm.DataTracePC(0, 0x08000210),
+    itm.DataTraceAddress(0, 0x2004),
+    itm.DataTraceValue(1, 0xBEEF, 2, True),
+    itm.Extension(1, False),
+    itm.Stimulus(32, 0x21, 1),
+]
+
+
+class TestITMDecoder(unittest.TestCase):
+    """Tests the `itm` submodule."""
+
+    def setUp(self):
+        """Called before each test.
+
+        Performs setup.
+
+        Args:
+          self (TestITMDecoder): the `TestITMDecoder` instance
+
+        Returns:
+          `None`
+        """
+        self.decoder = itm.ITMDecoder()
+
+    def tearDown(self):
+        """Called after each test.
+
+        Performs teardown.
+
+        Args:
+          self (TestITMDecoder): the `TestITMDecoder` instance
+
+        Returns:
+          `None`
+        """
+        pass
+
+    def test_itm_decode(self):
+        """Tests decoding each kind of packet.
+
+        Args:
+          self (TestITMDecoder): the `TestITMDecoder` instance
+
+        Returns:
+          `None`
+        """
+        self.assertEqual(PACKETS, self.decoder.feed(CAPTURE))
+        self.assertEqual(1, self.decoder.syncs)
+        self.assertEqual(1, self.decoder.overflows)
+        self.assertEqual(1, self.decoder.errors)
+
+        self.assertEqual(b'H', self.decoder.read(0))
+        self.assertEqual(b'\x34\x12', self.decoder.read(1))
+        self.assertEqual(b'\x78\x56\x34\x12', self.decoder.read(2))
+        self.assertEqual(b'!', self.decoder.read(32))
+        self.assertEqual(b'', self.decoder.read(0))
+        self.assertEqual(b'', self.decoder.read(3))
+
+    def test_itm_decode_chunks(self):
+        """Tests that packets are decoded across any chunk boundaries.
+
+        Args:
+          self (TestITMDecoder): the `TestITMDecoder` instance
+
+        Returns:
+          `None`
+        """
+        for chunk_size in range(1, 8):
+            decoder = itm.ITMDecoder()
+            packets = []
+            for pos in range(0, len(CAPTURE), chunk_size):
+                packets.extend(decoder.feed(CAPTURE[pos:pos + chunk_size]))
+            self.assertEqual(PACKETS, packets)
+            self.assertEqual(1, decoder.syncs)
+            self.assertEqual(b'H', decoder.read(0))
+
+    def test_itm_decode_ports(self):
+        """Tests demultiplexing only some of the stimulus ports.
+
+        Args:
+          self (TestITMDecoder): the `TestITMDecoder` instance
+
+        Returns:
+          `None`
+        """
+        decoder = itm.ITMDecoder(ports=[1])
+        self.assertEqual([], decoder.feed(CAPTURE, packets=False))
+        self.assertEqual(1, decoder.syncs)
+        self.assertEqual(1, decoder.overflows)
+        self.assertEqual(b'', decoder.read(0))
+        self.assertEqual(b'\x34\x12', decoder.read(1))
+
+    def test_itm_decode_errors(self):
+        """Tests resynchronizing after invalid data.
+
+        Args:
+          self (TestITMDecoder): the `TestITMDecoder` instance
+
+        Returns:
+          `None`
+        """
+        # Too few zeros for a sync packet, and an overlong timestamp, after
+        # which the decoder resynchronizes on the next sync packet.
+        data = bytes(bytearray([0x00, 0x00, 0x80, 0xC0, 0x81, 0x81, 0x81, 0x81, 0x81]))
+        data += b'\x00' * 8 + b'\x80\x41\x41'
+        packets = self.decoder.feed(data)
+        self.assertEqual(1, self.decoder.syncs)
+        self.assertGreaterEqual(self.decoder.errors, 2)
+        self.assertEqual([itm.Sync(), itm.Stimulus(8, 0x41, 1)], packets[-2:])
+
+        self.decoder.reset()
+        self.assertEqual(0, self.decoder.errors)
+        self.assertEqual([itm.Sync()], self.decoder.feed(b'\x00' * 8 + b'\x80'))
+
+    def test_itm_decode_errors_demultiplex(self):
+        """Tests that invalid data is counted when only demultiplexing.
+
+        Args:
+          self (TestITMDecoder): the `TestITMDecoder` instance
+
+        Returns:
+          `None`
+        """
+        # A hardware source packet with a reserved discriminator.
+        self.assertEqual([], self.decoder.feed(b'\xfd\x00', packets=False))
+        self.assertEqual(1, self.decoder.errors)
+
+        decoder = itm.ITMDecoder()
+        self.assertEqual([], decoder.feed(b'\xfd\x00\x01\x41', packets=False))
+        self.assertEqual(1, decoder.errors)
+        self.assertEqual(b'A', decoder.read(0))
+
+    def test_itm_decode_stream(self):
+        """Tests decoding the chunks read from a stream.
+
+        Args:
+          self (TestITMDecoder): the `TestITMDecoder` instance
+
+        Returns:
+          `None`
+        """
+        chunks = [CAPTURE[:7], CAPTURE[7:30], CAPTURE[30:]]
+        self.assertEqual(PACKETS, list(self.decoder.decode_stream(chunks)))
+
+    @unittest.skipUnless(os.environ.get('PYLINK_BENCHMARK'), 'set PYLINK_BENCHMARK to run benchmarks')
+    def test_itm_decode_benchmark(self):
+        """Benchmarks decoding a capture of a printf-heavy application.
+
+        Args:
+          self (TestITMDecoder): the `TestITMDecoder` instance
+
+        Returns:
+          `None`
+        """
+        line = b''.join(b'\x01' + bytes(bytearray([c])) for c in bytearray(b'Hello, world!\n'))
+        record = CAPTURE + line * 8 + b'\x17\x00\x01\x00\x08\x30'
+        capture = record * (0x100000 // len(record))
+        chunks = [capture[pos:pos + 0x1000] for pos in range(0, len(capture), 0x1000)]
+
+        def decode(packets):
+            decoder = itm.ITMDecoder()
+            for chunk in chunks:
+                decoder.feed(chunk, packets)
+            return decoder
+
+        decoder = decode(True)
+        self.assertEqual(len(capture) // len(record), decoder.syncs)
+
+        packets_time = timeit.timeit(lambda: decode(True), number=1)
+        demux_time = timeit.timeit(lambda: decode(False), number=1)
+
+        # Only demultiplexing the stimulus ports must be the faster mode.
+        self.assertLess(demux_time, packets_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
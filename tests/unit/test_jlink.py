@@ -16,6 +16,7 @@ import pylink.enums as enums
 from pylink.errors import JLinkException, JLinkDataException
 import pylink.jlink as jlink
 import pylink.protocols.swd as swd
+import pylink.snapshot as snapshot
 import pylink.structs as structs
 import pylink.unlockers.unlock_kinetis as unlock_kinetis
 import pylink.util as util
@@ -26,9 +27,12 @@ try:
     import StringIO
 except ImportError:
     import io as StringIO
+import array
 import ctypes
 import functools
+import hashlib
 import itertools
+import mmap
 import unittest
 
 
@@ -206,6 +210,118 @@ class TestJLink(unittest.TestCase):
         my_link = jlink.JLink(self.lib)
         my_link.cpu_capability(1)
 
+    @mock.patch('time.monotonic')
+    def test_jlink_trusted_session(self, mock_monotonic):
+        """Tests that a trusted session skips redundant state checks.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+          mock_monotonic (Mock): mocked monotonic clock
+
+        Returns:
+          ``None``
+        """
+        mock_monotonic.return_value = 100.0
+        self.dll.JLINKARM_IsOpen.return_value = True
+        self.dll.JLINKARM_EMU_IsConnected.return_value = True
+        self.dll.JLINKARM_IsConnected.return_value = True
+        self.dll.JLINKARM_UpdateFirmwareIfNewer.return_value = 0
+        self.dll.reset_mock()
+
+        with self.assertRaises(ValueError):
+            with self.jlink.trusted_session(-1):
+                pass
+
+        with self.jlink.trusted_session(0.5) as my_jlink:
+            self.assertIs(self.jlink, my_jlink)
+            for _ in range(3):
+                my_jlink.update_firmware()
+                my_jlink.cpu_capability(1)
+
+            self.assertEqual(3, self.dll.JLINKARM_IsOpen.call_count)
+            self.assertEqual(2, self.dll.JLINKARM_EMU_IsConnected.call_count)
+            self.assertEqual(1, self.dll.JLINKARM_IsConnected.call_count)
+            self.assertEqual(12, my_jlink.trusted_calls_saved)
+
+            # Once the interval expires, the state is checked again.
+            mock_monotonic.return_value = 101.0
+            my_jlink.cpu_capability(1)
+            self.assertEqual(2, self.dll.JLINKARM_IsConnected.call_count)
+            my_jlink.cpu_capability(1)
+            self.assertEqual(2, self.dll.JLINKARM_IsConnected.call_count)
+
+        # Outside of the session, the state is always checked.
+        self.jlink.cpu_capability(1)
+        self.assertEqual(3, self.dll.JLINKARM_IsConnected.call_count)
+        self.assertEqual(15, self.jlink.trusted_calls_saved)
+
+    @mock.patch('time.monotonic')
+    def test_jlink_trusted_session_error(self, mock_monotonic):
+        """Tests that an error in a trusted session forces a state check.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+          mock_monotonic (Mock): mocked monotonic clock
+
+        Returns:
+          ``None``
+        """
+        mock_monotonic.return_value = 100.0
+        self.dll.JLINKARM_IsOpen.return_value = True
+        self.dll.JLINKARM_EMU_IsConnected.return_value = True
+        self.dll.JLINKARM_IsConnected.return_value = True
+        self.dll.JLINKARM_IsHalted.return_value = -1
+
+        with self.jlink.trusted_session(float('inf')):
+            self.jlink.cpu_capability(1)
+            self.jlink.cpu_capability(1)
+            self.assertEqual(1, self.dll.JLINKARM_IsConnected.call_count)
+
+            with self.assertRaises(JLinkException):
+                self.jlink.halted()
+
+            self.dll.JLINKARM_IsConnected.return_value = False
+            with self.assertRaisesRegexp(JLinkException, 'Target is not connected'):
+                self.jlink.cpu_capability(1)
+
+    @mock.patch('time.monotonic')
+    def test_jlink_trusted_session_coresight(self, mock_monotonic):
+        """Tests that a trusted session skips state checks when only the
+        CoreSight configuration has been done.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+          mock_monotonic (Mock): mocked monotonic clock
+
+        Returns:
+          ``None``
+        """
+        mock_monotonic.return_value = 100.0
+        self.dll.JLINKARM_IsOpen.return_value = True
+        self.dll.JLINKARM_EMU_IsConnected.return_value = True
+        self.dll.JLINKARM_IsConnected.return_value = False
+        self.dll.JLINKARM_CORESIGHT_ReadAPDPReg.return_value = 0
+        self.jlink._coresight_configured = True
+        self.dll.reset_mock()
+
+        with self.jlink.trusted_session(0.5):
+            for _ in range(4):
+                self.jlink.coresight_read(0, True)
+
+            self.assertEqual(4, self.dll.JLINKARM_CORESIGHT_ReadAPDPReg.call_count)
+            self.assertEqual(1, self.dll.JLINKARM_IsOpen.call_count)
+            self.assertEqual(1, self.dll.JLINKARM_IsConnected.call_count)
+            self.assertEqual(9, self.jlink.trusted_calls_saved)
+
+        # Outside of the session, the state is always checked.
+        self.jlink.coresight_read(0, True)
+        self.assertEqual(2, self.dll.JLINKARM_IsConnected.call_count)
+
+        self.jlink._coresight_configured = False
+        with self.jlink.trusted_session(0.5):
+            with self.assertRaisesRegexp(JLinkException, 'coresight'):
+                self.jlink.coresight_read(0, True)
+
     def test_jlink_minimum_required(self):
         """Tests that the minimum required decorator handles versions correctly.
 
@@ -1243,7 +1359,7 @@ class TestJLink(unittest.TestCase):
         self.dll.JLINKARM_CORESIGHT_Configure.return_value = 0
 
         self.jlink.coresight_configure()
-        self.dll.JLINKARM_CORESIGHT_Configure.assert_called_with('')
+        self.dll.JLINKARM_CORESIGHT_Configure.assert_called_with(b'')
 
     def test_jlink_coresight_configure_jtag(self):
         """Tests Coresight Configure over JTAG.
@@ -3152,6 +3268,67 @@ class TestJLink(unittest.TestCase):
 
         self.assertEqual(register_name, self.jlink.register_name(0))
 
+    def test_jlink_register_map(self):
+        """Tests the register name to index mapping is built once.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        def register_list(buf, num_items):
+            for (i, idx) in enumerate([0, 1, 13, 15]):
+                buf[i] = idx
+            return 4
+
+        names = {0: 'R0', 1: 'R1', 13: 'SP', 15: 'PC'}
+        self.dll.JLINKARM_GetRegisterList.side_effect = register_list
+        self.dll.JLINKARM_GetRegisterName.side_effect = lambda idx: names[idx].encode()
+        self.dll.JLINKARM_ReadReg.return_value = 0
+        self.dll.JLINKARM_ReadRegs.return_value = 0
+        self.dll.JLINKARM_TIF_Select.return_value = 0
+        self.jlink.supported_tifs = mock.Mock()
+        self.jlink.supported_tifs.return_value = (1 << enums.JLinkInterfaces.SWD)
+
+        expected = {'R0': 0, 'R1': 1, 'SP': 13, 'PC': 15}
+        self.assertEqual(expected, self.jlink.register_map())
+        self.assertEqual(['R0', 'R1', 'SP', 'PC'], list(self.jlink.register_map()))
+        self.assertEqual(1, self.dll.JLINKARM_GetRegisterList.call_count)
+        self.assertEqual(4, self.dll.JLINKARM_GetRegisterName.call_count)
+
+        self.jlink.register_read('PC')
+        self.dll.JLINKARM_ReadReg.assert_called_with(15)
+
+        self.jlink.register_read_multiple(['SP', 'PC'])
+        indices = self.dll.JLINKARM_ReadRegs.call_args[0][0]
+        self.assertEqual([13, 15], list(indices))
+        self.assertEqual(1, self.dll.JLINKARM_GetRegisterList.call_count)
+        self.assertEqual(4, self.dll.JLINKARM_GetRegisterName.call_count)
+
+        # Changing the target interface rebuilds the map.
+        self.jlink.set_tif(enums.JLinkInterfaces.SWD)
+        self.jlink.register_read('SP')
+        self.assertEqual(2, self.dll.JLINKARM_GetRegisterList.call_count)
+
+    def test_jlink_register_map_empty(self):
+        """Tests an empty register mapping is not cached.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        self.dll.JLINKARM_GetRegisterList.return_value = 0
+
+        self.assertEqual({}, self.jlink.register_map())
+        self.assertEqual({}, self.jlink.register_map())
+        self.assertEqual(2, self.dll.JLINKARM_GetRegisterList.call_count)
+
+        with self.assertRaises(JLinkException):
+            self.jlink.register_read('PC')
+
     def test_jlink_cpu_speed_error(self):
         """Tests the J-Link ``cpu_speed()`` method on error.
 
@@ -3297,6 +3474,144 @@ class TestJLink(unittest.TestCase):
         self.jlink.jtag_flush()
         self.dll.JLINKARM_WriteBits.assert_called_once()
 
+    def test_jlink_jtag_shift_invalid(self):
+        """Tests passing invalid arguments to ``jtag_shift()``.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        with self.assertRaises(ValueError):
+            self.jlink.jtag_shift(b'\x00', b'\x00', 0)
+
+        with self.assertRaises(ValueError):
+            self.jlink.jtag_shift(b'\x00', b'\x00\x00', 9)
+
+        with self.assertRaises(ValueError):
+            self.jlink.jtag_shift(b'\x00\x00', b'\x00', 9)
+
+        self.assertEqual(0, self.dll.JLINKARM_JTAG_StoreGetRaw.call_count)
+
+    def test_jlink_jtag_shift(self):
+        """Tests shifting more than ``32`` bits with ``jtag_shift()``.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        def _store_get_raw(tdi, tdo, tms, num_bits):
+            for (index, value) in enumerate(tdi[:len(tdo)]):
+                tdo[index] = value ^ 0xFF
+
+        self.dll.JLINKARM_JTAG_StoreGetRaw.side_effect = _store_get_raw
+
+        tms = bytes(9)
+        tdi = bytes(range(9))
+        tdo = self.jlink.jtag_shift(tms, tdi, 65)
+        self.assertIsInstance(tdo, bytes)
+        self.assertEqual(bytes(value ^ 0xFF for value in range(9)), tdo)
+
+        (args, _) = self.dll.JLINKARM_JTAG_StoreGetRaw.call_args
+        self.assertEqual(tdi, args[0])
+        self.assertEqual(tms, args[2])
+        self.assertEqual(65, args[3])
+
+    def _jtag_loopback(self, bitpos):
+        """Simulates a JTAG chain whose TDO follows its TDI.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+          bitpos (int): the bit position returned for stored bits
+
+        Returns:
+          A list that the ``(tdi, tms, num_bits)`` of each store is added to.
+        """
+        stores = []
+
+        def _store_raw(tdi, tms, num_bits):
+            stores.append((list(tdi), list(tms), num_bits))
+            return bitpos
+
+        def _get_data(buf, offset, num_bits):
+            self.assertEqual(bitpos, offset)
+            data = stores[-1][0]
+            buf._obj[:len(data)] = data
+
+        self.dll.JLINKARM_JTAG_StoreRaw.side_effect = _store_raw
+        self.dll.JLINKARM_JTAG_GetData.side_effect = _get_data
+        return stores
+
+    def test_jlink_jtag_scan_ir(self):
+        """Tests scanning the instruction register with ``jtag_scan_ir()``.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        stores = self._jtag_loopback(5)
+
+        self.assertEqual(b'\x05', self.jlink.jtag_scan_ir(0x5, 4))
+        self.dll.JLINKARM_JTAG_SyncBits.assert_called_once_with()
+
+        # Run-Test/Idle to Shift-IR, four bits with the last one moving to
+        # Exit1-IR, then back to Run-Test/Idle through Update-IR.
+        (tdi, tms, num_bits) = stores[0]
+        self.assertEqual(10, num_bits)
+        self.assertEqual([0x83, 0x01], tms)
+        self.assertEqual([0x50, 0x00], tdi)
+
+    def test_jlink_jtag_scan_dr(self):
+        """Tests pipelining data register scans with ``jtag_scan_dr()``.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        stores = self._jtag_loopback(0)
+
+        vectors = [0xABC, b'\x21\x03', 0xFFFFF]
+        captured = self.jlink.jtag_scan_dr(vectors, 12)
+        self.assertEqual((0xFFF << 24) | (0x321 << 12) | 0xABC, int.from_bytes(captured, 'little'))
+        self.assertEqual(5, len(captured))
+
+        self.assertEqual(1, len(stores))
+        self.assertEqual(3 * (3 + 12 + 2), stores[0][2])
+        self.dll.JLINKARM_JTAG_SyncBits.assert_called_once_with()
+        self.dll.JLINKARM_JTAG_GetData.assert_called_once()
+
+        # Bit vectors longer than 32 bits.
+        self.assertEqual(bytes(range(1, 11)), self.jlink.jtag_scan_dr(bytes(range(1, 11)), 80))
+
+    def test_jlink_jtag_scan_invalid(self):
+        """Tests passing invalid arguments to the JTAG scan methods.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        self.assertEqual(b'', self.jlink.jtag_scan_dr([], 8))
+        self.assertEqual(0, self.dll.JLINKARM_JTAG_StoreRaw.call_count)
+
+        with self.assertRaises(ValueError):
+            self.jlink.jtag_scan_ir(0x1, 0)
+
+        with self.assertRaises(TypeError):
+            self.jlink.jtag_scan_dr(['0x1'], 8)
+
+        self.dll.JLINKARM_JTAG_StoreRaw.return_value = -1
+        with self.assertRaises(JLinkException):
+            self.jlink.jtag_scan_dr(0x1, 8)
+
     def test_jlink_jtag_store_instruction(self):
         """Tests the J-Link JTAG method for storing a JTAG instruction.
 
@@ -3451,6 +3766,28 @@ class TestJLink(unittest.TestCase):
 
         self.assertEqual(val, self.jlink.swd_read32(0))
 
+    def test_jlink_swd_read(self):
+        """Tests the J-Link ``swd_read()`` method.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        self.jlink._tif = enums.JLinkInterfaces.SWD
+
+        def _get_data(buf, offset, nbits):
+            buf._obj[:] = [0x21, 0x43, 0x05]
+
+        self.dll.JLINK_SWD_GetData.side_effect = _get_data
+        self.assertEqual(0x54321, self.jlink.swd_read(8, 20))
+
+        (buf, offset, nbits) = self.dll.JLINK_SWD_GetData.call_args[0]
+        self.assertEqual(3, len(buf._obj))
+        self.assertEqual(8, offset)
+        self.assertEqual(20, nbits)
+
     def test_jlink_swd_write_fail(self):
         """Tests the J-Link ``swd_write()`` method on failure.
 
@@ -3672,8 +4009,8 @@ class TestJLink(unittest.TestCase):
 
         self.assertEqual(1, self.dll.JLINK_GetMemZones.call_count)
 
-    def test_jlink_memory_read_failure(self):
-        """Tests a memory read that fails to read.
+    def test_jlink_memory_cache_enable_disable(self):
+        """Tests enabling and disabling the memory cache.
 
         Args:
           self (TestJLink): the ``TestJLink`` instance
@@ -3681,13 +4018,20 @@ class TestJLink(unittest.TestCase):
         Returns:
           ``None``
         """
-        self.dll.JLINKARM_ReadMemEx.return_value = -1
+        self.assertIsNone(self.jlink.memory_cache)
 
-        with self.assertRaises(JLinkException):
-            self.jlink.memory_read(0, 1)
+        memory_cache = self.jlink.memory_cache_enable(page_size=0x100, write_back=True)
+        self.assertIs(memory_cache, self.jlink.memory_cache)
+        self.assertEqual(0x100, memory_cache.page_size)
+        self.assertTrue(memory_cache.write_back)
 
-    def test_jlink_memory_read_invalid_access(self):
-        """Tests the memory read fails when given an invalid access width.
+        memory_cache.invalidate = mock.Mock()
+        self.jlink.memory_cache_disable()
+        memory_cache.invalidate.assert_called_once()
+        self.assertIsNone(self.jlink.memory_cache)
+
+    def test_jlink_memory_cache_read(self):
+        """Tests memory reads are served from the cache while halted.
 
         Args:
           self (TestJLink): the ``TestJLink`` instance
@@ -3695,17 +4039,39 @@ class TestJLink(unittest.TestCase):
         Returns:
           ``None``
         """
-        with self.assertRaises(ValueError):
-            self.jlink.memory_read(0, 0, nbits=42)
+        transfers = []
 
-        with self.assertRaises(ValueError):
-            self.jlink.memory_read(0, 0, nbits=13)
+        def read_memory(addr, buf_size, buf, access):
+            transfers.append((addr, buf_size, access))
+            ctypes.memmove(buf, bytes((addr + i) & 0xFF for i in range(buf_size)), buf_size)
+            return buf_size // max(access, 1)
 
-        with self.assertRaises(ValueError):
-            self.jlink.memory_read(0, 0, nbits=-1)
+        self.dll.JLINKARM_ReadMemEx.side_effect = read_memory
+        self.dll.JLINKARM_IsHalted.return_value = 1
 
-    def test_jlink_memory_read_zoned(self):
-        """Tests a memory read of a zoned memory region.
+        memory_cache = self.jlink.memory_cache_enable(page_size=0x100)
+
+        self.assertEqual([0x03020100], self.jlink.memory_read32(0x100, 1))
+        self.assertEqual([0x10, 0x11], self.jlink.memory_read8(0x110, 2))
+        self.assertEqual(b'\x20', self.jlink.memory_read_bytes(0x120, 1))
+        self.assertEqual([0x30], self.jlink.code_memory_read(0x130, 1))
+        self.assertEqual([(0x100, 0x100, 0)], transfers)
+        self.assertEqual(3, memory_cache.hits)
+        self.assertEqual(1, memory_cache.misses)
+        self.dll.JLINKARM_ReadCodeMem.assert_not_called()
+
+        # Excluded regions are always read from the target.
+        self.jlink.memory_read32(0x40000000, 1)
+        self.assertEqual((0x40000000, 4, 4), transfers[-1])
+
+        # Running CPUs invalidate the cache.
+        self.dll.JLINKARM_IsHalted.return_value = 0
+        self.jlink.memory_read8(0x110, 2)
+        self.assertEqual((0x110, 2, 1), transfers[-1])
+        self.assertEqual(0, len(memory_cache))
+
+    def test_jlink_memory_cache_write_through(self):
+        """Tests memory writes update the cache in write-through mode.
 
         Args:
           self (TestJLink): the ``TestJLink`` instance
@@ -3713,18 +4079,31 @@ class TestJLink(unittest.TestCase):
         Returns:
           ``None``
         """
-        self.dll.JLINKARM_ReadMemZonedEx.return_value = 0
+        self.dll.JLINKARM_ReadMemEx.side_effect = lambda a, size, b, c: size
+        self.dll.JLINKARM_WriteMemEx.return_value = 4
+        self.dll.JLINKARM_IsHalted.return_value = 1
 
-        res = self.jlink.memory_read(0, 1, 'zone')
+        memory_cache = self.jlink.memory_cache_enable(page_size=0x100)
+        self.jlink.memory_read8(0x0, 1)
 
-        self.assertTrue(isinstance(res, list))
-        self.assertEqual(0, len(res))
+        self.jlink.memory_write8(0x10, [1, 2, 3, 4])
+        self.dll.JLINKARM_WriteMemEx.assert_called_once()
+        self.assertEqual([1, 2, 3, 4], self.jlink.memory_read8(0x10, 4))
+        self.assertEqual(1, self.dll.JLINKARM_ReadMemEx.call_count)
 
-        self.dll.JLINKARM_ReadMemZonedEx.assert_called_once()
-        self.dll.JLINKARM_ReadMemEx.assert_not_called()
+        # A short write drops the page.
+        self.dll.JLINKARM_WriteMemEx.return_value = 1
+        self.jlink.memory_write8(0x10, [1, 2, 3, 4])
+        self.assertEqual(0, len(memory_cache))
 
-    def test_jlink_memory_read_unzoned(self):
-        """Tests a memory read of an unzoned region.
+        self.jlink.memory_read8(0x0, 1)
+        self.dll.JLINKARM_WriteMemEx.return_value = -1
+        with self.assertRaises(JLinkException):
+            self.jlink.memory_write8(0x10, [1, 2, 3, 4])
+        self.assertEqual(0, len(memory_cache))
+
+    def test_jlink_memory_cache_write_back(self):
+        """Tests memory writes are buffered in write-back mode.
 
         Args:
           self (TestJLink): the ``TestJLink`` instance
@@ -3732,21 +4111,29 @@ class TestJLink(unittest.TestCase):
         Returns:
           ``None``
         """
-        self.dll.JLINKARM_ReadMemEx.return_value = 0
+        self.dll.JLINKARM_ReadMemEx.side_effect = lambda a, size, b, c: size
+        self.dll.JLINKARM_WriteMemEx.return_value = 2
+        self.dll.JLINKARM_IsHalted.return_value = 1
 
-        res = self.jlink.memory_read(0, 1)
+        self.jlink.memory_cache_enable(page_size=0x100, write_back=True)
 
-        self.assertTrue(isinstance(res, list))
-        self.assertEqual(0, len(res))
+        self.assertEqual(1, self.jlink.memory_write16(0x10, [0xBEEF]))
+        self.dll.JLINKARM_WriteMemEx.assert_not_called()
+        self.assertEqual([0xBEEF], self.jlink.memory_read16(0x10, 1))
 
-        self.dll.JLINKARM_ReadMemEx.assert_called_once()
-        self.dll.JLINKARM_ReadMemZonedEx.assert_not_called()
+        self.jlink.memory_cache_flush()
+        addr, num_bytes, buf, access = self.dll.JLINKARM_WriteMemEx.call_args[0]
+        self.assertEqual(0x10, addr)
+        self.assertEqual(2, num_bytes)
+        self.assertEqual(0, access)
 
-    def test_jlink_memory_read_access(self):
-        """Tests the different memory read access bits.
+        # Flash writes bypass the cache.
+        self.dll.JLINKARM_EndDownload.return_value = 2
+        self.jlink.flash_write16(0x0, [0xFFFF])
+        self.assertEqual(2, self.dll.JLINKARM_WriteMemEx.call_count)
 
-        There are three types of ways to access memory: by byte, by halfword,
-        and by word.
+    def test_jlink_memory_cache_write_back_close(self):
+        """Tests buffered writes are flushed before closing or reconnecting.
 
         Args:
           self (TestJLink): the ``TestJLink`` instance
@@ -3754,39 +4141,197 @@ class TestJLink(unittest.TestCase):
         Returns:
           ``None``
         """
-        num_units = 4
-        accesses = [1, 2, 4]
+        self.dll.JLINKARM_ReadMemEx.side_effect = lambda a, size, b, c: size
+        self.dll.JLINKARM_WriteMemEx.return_value = 4
+        self.dll.JLINKARM_IsHalted.return_value = 1
 
-        def write_to_memory(addr, buf_size, buf, access):
-            self.assertEqual(num_units * access, buf_size)
+        memory_cache = self.jlink.memory_cache_enable(page_size=0x100, write_back=True)
 
-            # Write a byte first
-            buf[0] = 0xFF
+        calls = []
+        self.dll.JLINKARM_WriteMemEx.side_effect = lambda *args: calls.append('write') or 4
+        self.dll.JLINKARM_Close.side_effect = lambda: calls.append('close')
 
-            # Write a halfword next
-            buf[1] = 0xFF00
+        self.jlink.memory_write32(0x20, [0xDEADBEEF])
+        self.dll.JLINKARM_WriteMemEx.assert_not_called()
 
-            # Write a word next
-            buf[2] = 0xFFFF0000
+        self.jlink._open_refcount = 1
+        self.jlink.close()
+        self.assertEqual(['write', 'close'], calls)
+        self.assertEqual(0x20, self.dll.JLINKARM_WriteMemEx.call_args[0][0])
+        self.assertEqual(0, len(memory_cache))
+
+        # The J-Link is closed even if the buffered writes fail.
+        del calls[:]
+        self.jlink.memory_write32(0x20, [0xDEADBEEF])
+        self.dll.JLINKARM_WriteMemEx.side_effect = lambda *args: calls.append('write') or -1
+        self.jlink._open_refcount = 1
+        with self.assertRaises(JLinkException):
+            self.jlink.close()
+        self.assertEqual(['write', 'close'], calls)
+        self.assertEqual(0, len(memory_cache))
+
+        # Reconnecting also flushes the buffered writes.
+        self.dll.JLINKARM_WriteMemEx.side_effect = None
+        self.dll.JLINKARM_WriteMemEx.reset_mock()
+        self.jlink.memory_write32(0x40, [0xDEADBEEF])
+        self.dll.JLINKARM_WriteMemEx.assert_not_called()
+        self.dll.JLINKARM_DEVICE_GetIndex.return_value = 0
+        with self.assertRaises(JLinkException):
+            self.jlink.connect('device')
+        self.assertEqual(0x40, self.dll.JLINKARM_WriteMemEx.call_args[0][0])
 
-            # Write a long word next
-            buf[3] = 0xFFFFFFFF00000000
+    def test_jlink_memory_cache_invalidated(self):
+        """Tests the memory cache is invalidated by run control and writes.
 
-            self.assertEqual(accesses.pop(0), access)
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
 
-            return num_units
+        Returns:
+          ``None``
+        """
+        self.dll.JLINKARM_IsHalted.return_value = 1
+        self.dll.JLINKARM_Reset.return_value = 0
+        self.dll.JLINKARM_Step.return_value = 0
+        self.dll.JLINKARM_WriteReg.return_value = 0
+        self.dll.JLINKARM_WriteRegs.return_value = 0
+        self.dll.JLINK_EraseChip.return_value = 0
+        self.dll.JLINK_DownloadFile.return_value = 0
+        self.dll.JLINKARM_EndDownload.return_value = 0
+        self.dll.JLINKARM_WriteU32.return_value = 0
 
-        self.dll.JLINKARM_ReadMemEx.side_effect = write_to_memory
-        self.dll.JLINKARM_ReadMemEx.return_value = num_units
+        memory_cache = self.jlink.memory_cache_enable()
+        memory_cache.invalidate = mock.Mock()
+        memory_cache.discard = mock.Mock()
+        self.jlink.halt = mock.Mock()
 
-        res = self.jlink.memory_read(0, num_units, nbits=8)
-        self.assertEqual(num_units, len(res))
-        self.assertEqual(0xFF, res[0])
-        self.assertEqual(0x00, res[1])
-        self.assertEqual(0x00, res[2])
-        self.assertEqual(0x00, res[3])
+        self.jlink.restart()
+        self.jlink.step()
+        self.jlink.reset()
+        self.jlink.erase()
+        self.jlink.flash([0], 0)
+        self.jlink.flash_file('file', 0)
+        self.jlink.register_write(0, 0)
+        self.jlink.register_write_multiple([0], [0])
+        self.assertEqual(8, memory_cache.invalidate.call_count)
 
-        res = self.jlink.memory_read(0, num_units, nbits=16)
+        self.jlink.peripheral_write32(0x1000, 0)
+        memory_cache.discard.assert_called_once_with(0x1000, 4)
+
+    def test_jlink_memory_read_failure(self):
+        """Tests a memory read that fails to read.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        self.dll.JLINKARM_ReadMemEx.return_value = -1
+
+        with self.assertRaises(JLinkException):
+            self.jlink.memory_read(0, 1)
+
+    def test_jlink_memory_read_invalid_access(self):
+        """Tests the memory read fails when given an invalid access width.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        with self.assertRaises(ValueError):
+            self.jlink.memory_read(0, 0, nbits=42)
+
+        with self.assertRaises(ValueError):
+            self.jlink.memory_read(0, 0, nbits=13)
+
+        with self.assertRaises(ValueError):
+            self.jlink.memory_read(0, 0, nbits=-1)
+
+    def test_jlink_memory_read_zoned(self):
+        """Tests a memory read of a zoned memory region.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        self.dll.JLINKARM_ReadMemZonedEx.return_value = 0
+
+        res = self.jlink.memory_read(0, 1, 'zone')
+
+        self.assertTrue(isinstance(res, list))
+        self.assertEqual(0, len(res))
+
+        self.dll.JLINKARM_ReadMemZonedEx.assert_called_once()
+        self.dll.JLINKARM_ReadMemEx.assert_not_called()
+
+    def test_jlink_memory_read_unzoned(self):
+        """Tests a memory read of an unzoned region.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        self.dll.JLINKARM_ReadMemEx.return_value = 0
+
+        res = self.jlink.memory_read(0, 1)
+
+        self.assertTrue(isinstance(res, list))
+        self.assertEqual(0, len(res))
+
+        self.dll.JLINKARM_ReadMemEx.assert_called_once()
+        self.dll.JLINKARM_ReadMemZonedEx.assert_not_called()
+
+    def test_jlink_memory_read_access(self):
+        """Tests the different memory read access bits.
+
+        There are three types of ways to access memory: by byte, by halfword,
+        and by word.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        num_units = 4
+        accesses = [1, 2, 4]
+
+        def write_to_memory(addr, buf_size, buf, access):
+            self.assertEqual(num_units * access, buf_size)
+
+            # Write a byte first
+            buf[0] = 0xFF
+
+            # Write a halfword next
+            buf[1] = 0xFF00
+
+            # Write a word next
+            buf[2] = 0xFFFF0000
+
+            # Write a long word next
+            buf[3] = 0xFFFFFFFF00000000
+
+            self.assertEqual(accesses.pop(0), access)
+
+            return num_units
+
+        self.dll.JLINKARM_ReadMemEx.side_effect = write_to_memory
+        self.dll.JLINKARM_ReadMemEx.return_value = num_units
+
+        res = self.jlink.memory_read(0, num_units, nbits=8)
+        self.assertEqual(num_units, len(res))
+        self.assertEqual(0xFF, res[0])
+        self.assertEqual(0x00, res[1])
+        self.assertEqual(0x00, res[2])
+        self.assertEqual(0x00, res[3])
+
+        res = self.jlink.memory_read(0, num_units, nbits=16)
         self.assertEqual(num_units, len(res))
         self.assertEqual(0xFF, res[0])
         self.assertEqual(0xFF00, res[1])
@@ -3800,6 +4345,136 @@ class TestJLink(unittest.TestCase):
         self.assertEqual(0xFFFF0000, res[2])
         self.assertEqual(0x00, res[3])
 
+    def test_jlink_memory_read_many_invalid(self):
+        """Tests a batch memory read with invalid arguments.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        with self.assertRaises(ValueError):
+            self.jlink.memory_read_many([(0, 1, 13)])
+
+        with self.assertRaises(ValueError):
+            self.jlink.memory_read_many([(0, 1)], max_gap=-1)
+
+        self.assertEqual([], self.jlink.memory_read_many([]))
+        self.dll.JLINKARM_ReadMemEx.assert_not_called()
+
+    def test_jlink_memory_read_many_failure(self):
+        """Tests a batch memory read that fails to read.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        self.dll.JLINKARM_ReadMemEx.return_value = -1
+
+        with self.assertRaises(JLinkException):
+            self.jlink.memory_read_many([(0, 1)])
+
+    def test_jlink_memory_read_many_coalesced(self):
+        """Tests a batch memory read coalesces nearby ranges.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        transfers = []
+
+        def read_memory(addr, buf_size, buf, access):
+            transfers.append((addr, buf_size, access))
+            for i in range(buf_size):
+                buf[i] = (addr + i) & 0xFF
+            return buf_size // max(access, 1)
+
+        self.dll.JLINKARM_ReadMemEx.side_effect = read_memory
+
+        requests = [
+            (0x2010, 1, 32),
+            (0x1000, 4),
+            (0x2000, 2, 32),
+            (0x1002, 2),
+            (0x1100, 1),
+            (0x2008, 1, 16),
+        ]
+        res = self.jlink.memory_read_many(requests, max_gap=0x10)
+
+        self.assertEqual([
+            (0x1000, 4, 0),
+            (0x1100, 1, 0),
+            (0x2008, 2, 2),
+            (0x2000, 0x14, 4),
+        ], transfers)
+
+        self.assertEqual(len(requests), len(res))
+        self.assertEqual([0x13121110], res[0])
+        self.assertEqual([0x00, 0x01, 0x02, 0x03], res[1])
+        self.assertEqual([0x03020100, 0x07060504], res[2])
+        self.assertEqual([0x02, 0x03], res[3])
+        self.assertEqual([0x00], res[4])
+        self.assertEqual([0x0908], res[5])
+
+    def test_jlink_memory_read_many_device(self):
+        """Tests a batch memory read never reads gaps in device regions.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        transfers = []
+
+        def read_memory(addr, buf_size, buf, access):
+            transfers.append((addr, buf_size, access))
+            return buf_size // max(access, 1)
+
+        self.dll.JLINKARM_ReadMemEx.side_effect = read_memory
+
+        # Two nearby peripheral registers, and two adjoining ones.
+        requests = [(0x40001000, 1, 32), (0x40001008, 1, 32), (0x40002000, 1, 32), (0x40002004, 1, 32)]
+        self.assertEqual(4, len(self.jlink.memory_read_many(requests)))
+        self.assertEqual([
+            (0x40001000, 4, 4),
+            (0x40001008, 4, 4),
+            (0x40002000, 8, 4),
+        ], transfers)
+
+        # Regions excluded from the memory cache are not read either.
+        del transfers[:]
+        self.jlink.memory_cache_enable(excludes=[(0x20001004, 4)])
+        self.dll.JLINKARM_IsHalted.return_value = 0
+        requests = [(0x20001000, 1, 32), (0x20001008, 1, 32), (0x20002000, 1, 32), (0x20002008, 1, 32)]
+        self.jlink.memory_read_many(requests)
+        self.assertEqual([
+            (0x20001000, 4, 4),
+            (0x20001008, 4, 4),
+            (0x20002000, 12, 4),
+        ], transfers)
+
+    def test_jlink_memory_read_many_partial(self):
+        """Tests a batch memory read when a transfer is cut short.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        self.dll.JLINKARM_ReadMemEx.return_value = 3
+
+        res = self.jlink.memory_read_many([(0, 2), (2, 2), (4, 2)])
+
+        self.dll.JLINKARM_ReadMemEx.assert_called_once()
+        self.assertEqual([[0, 0], [0], []], res)
+
     def test_jlink_memory_read_byte_halfword_word(self):
         """Tests the memory read functions for bytes, halfwords and words.
 
@@ -3839,6 +4514,281 @@ class TestJLink(unittest.TestCase):
         self.assertTrue(isinstance(res, list))
         self.assertEqual(0, len(res))
 
+    def test_jlink_memory_readinto_invalid(self):
+        """Tests reading memory into an invalid buffer.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        with self.assertRaises(TypeError):
+            self.jlink.memory_readinto(0, bytes(4))
+
+        with self.assertRaises(ValueError):
+            self.jlink.memory_readinto(0, bytearray(3), nbits=16)
+
+        with self.assertRaises(ValueError):
+            self.jlink.memory_readinto(0, bytearray(4), nbits=13)
+
+        self.assertEqual(0, self.jlink.memory_readinto(0, bytearray(0)))
+        self.dll.JLINKARM_ReadMemEx.assert_not_called()
+
+    def test_jlink_memory_readinto_failure(self):
+        """Tests reading memory into a buffer when the read fails.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        self.dll.JLINKARM_ReadMemEx.return_value = -1
+
+        with self.assertRaises(JLinkException):
+            self.jlink.memory_readinto(0, bytearray(4))
+
+    def test_jlink_memory_readinto_success(self):
+        """Tests reading memory in place into different buffer types.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        accesses = []
+
+        def read_memory(addr, buf_size, buf, access):
+            accesses.append(access)
+            for i in range(buf_size):
+                buf[i] = i + 1
+            return buf_size // max(access, 1)
+
+        self.dll.JLINKARM_ReadMemEx = read_memory
+
+        buf = bytearray(4)
+        self.assertEqual(4, self.jlink.memory_readinto(0, buf))
+        self.assertEqual(bytearray([1, 2, 3, 4]), buf)
+
+        # The buffer should no longer be exported after the read.
+        buf.extend(b'\x00')
+
+        view = memoryview(bytearray(8))[2:6]
+        self.assertEqual(4, self.jlink.memory_readinto(0, view, nbits=16))
+        self.assertEqual(b'\x01\x02\x03\x04', view.tobytes())
+
+        words = array.array('I', [0, 0])
+        self.assertEqual(8, self.jlink.memory_readinto(0, words, nbits=32))
+        self.assertEqual(array.array('I', bytes(range(1, 9))), words)
+
+        self.assertEqual([0, 2, 4], accesses)
+
+    def test_jlink_memory_readinto_zoned(self):
+        """Tests reading memory into a buffer from a zoned memory region.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        self.dll.JLINKARM_ReadMemZonedEx.return_value = 2
+
+        self.assertEqual(2, self.jlink.memory_readinto(0, bytearray(4), zone='zone'))
+
+        self.dll.JLINKARM_ReadMemZonedEx.assert_called_once()
+        self.dll.JLINKARM_ReadMemEx.assert_not_called()
+        self.assertEqual(b'zone', self.dll.JLINKARM_ReadMemZonedEx.call_args[0][4])
+
+    def test_jlink_memory_read_bytes(self):
+        """Tests reading memory as ``bytes``.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        def read_memory(addr, buf_size, buf, access):
+            for i in range(buf_size):
+                buf[i] = 0xA0 + i
+            return 3
+
+        self.dll.JLINKARM_ReadMemEx.side_effect = read_memory
+
+        res = self.jlink.memory_read_bytes(0, 4)
+        self.assertTrue(isinstance(res, bytes))
+        self.assertEqual(b'\xa0\xa1\xa2', res)
+
+        self.dll.JLINKARM_ReadMemEx.side_effect = None
+        self.dll.JLINKARM_ReadMemEx.return_value = 2
+
+        res = self.jlink.memory_read_bytes(0, 4, nbits=16)
+        self.assertEqual(4, len(res))
+        self.assertEqual(2, self.dll.JLINKARM_ReadMemEx.call_args[0][3])
+
+    def test_jlink_memory_read_view(self):
+        """Tests reading memory as a typed ``memoryview``.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        def read_memory(addr, buf_size, buf, access):
+            for i in range(buf_size):
+                buf[i] = 0xFF
+            return (buf_size // max(access, 1)) - 1
+
+        self.dll.JLINKARM_ReadMemEx.side_effect = read_memory
+
+        res = self.jlink.memory_read_view(0, 4)
+        self.assertEqual('B', res.format)
+        self.assertEqual([0xFF] * 3, res.tolist())
+
+        res = self.jlink.memory_read_view(0, 4, nbits=16)
+        self.assertEqual('H', res.format)
+        self.assertEqual([0xFFFF] * 3, res.tolist())
+
+        res = self.jlink.memory_read_view(0, 4, nbits=32)
+        self.assertEqual('I', res.format)
+        self.assertEqual([0xFFFFFFFF] * 3, res.tolist())
+
+        with self.assertRaises(ValueError):
+            self.jlink.memory_read_view(0, 4, nbits=64)
+
+    def test_jlink_memory_iter_invalid(self):
+        """Tests streaming memory with invalid arguments.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        with self.assertRaises(ValueError):
+            list(self.jlink.memory_iter(0, 8, chunk_size=0))
+
+        with self.assertRaises(ValueError):
+            list(self.jlink.memory_iter(0, 8, chunk_size=6, nbits=32))
+
+        with self.assertRaises(ValueError):
+            list(self.jlink.memory_iter(0, 6, nbits=32))
+
+        with self.assertRaises(ValueError):
+            list(self.jlink.memory_iter(0, 8, retries=-1))
+
+        self.assertEqual([], list(self.jlink.memory_iter(0, 0)))
+
+    def test_jlink_memory_iter_success(self):
+        """Tests streaming memory in chunks.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        memory = bytes(range(256))
+        transfers = []
+
+        def read_memory(addr, buf_size, buf, access):
+            transfers.append((addr, buf_size, access))
+            ctypes.memmove(buf, memory[addr:addr + buf_size], buf_size)
+            return buf_size // max(access, 1)
+
+        self.dll.JLINKARM_ReadMemEx.side_effect = read_memory
+
+        progress = []
+        hasher = hashlib.sha1()
+        chunks = self.jlink.memory_iter(0x10, 0x28, chunk_size=0x10, nbits=32,
+                                        on_progress=lambda *args: progress.append(args),
+                                        hasher=hasher)
+
+        chunks = list(chunks)
+        self.assertEqual([memory[0x10:0x20], memory[0x20:0x30], memory[0x30:0x38]], chunks)
+        self.assertEqual([(0x10, 0x10, 4), (0x20, 0x10, 4), (0x30, 0x8, 4)], transfers)
+        self.assertEqual([(0x10, 0x28), (0x20, 0x28), (0x28, 0x28)], progress)
+        self.assertEqual(hashlib.sha1(memory[0x10:0x38]).digest(), hasher.digest())
+
+    def test_jlink_memory_iter_failure(self):
+        """Tests streaming memory when chunks fail to read.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        self.dll.JLINKARM_ReadMemEx.side_effect = [4, -1, 2, 4]
+        chunks = self.jlink.memory_iter(0, 8, chunk_size=4, retries=1)
+        with self.assertRaises(JLinkException):
+            list(chunks)
+        self.assertEqual(3, self.dll.JLINKARM_ReadMemEx.call_count)
+
+        self.dll.JLINKARM_ReadMemEx.reset_mock()
+        self.dll.JLINKARM_ReadMemEx.side_effect = [-1, 4, 4]
+        chunks = self.jlink.memory_iter(0, 8, chunk_size=4, retries=1)
+        self.assertEqual(2, len(list(chunks)))
+        self.assertEqual(3, self.dll.JLINKARM_ReadMemEx.call_count)
+
+    def test_jlink_memory_dump_file(self):
+        """Tests dumping memory to a file object or path.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        def read_memory(addr, buf_size, buf, access):
+            ctypes.memmove(buf, bytes([addr & 0xFF]) * buf_size, buf_size)
+            return 1 if addr == 0x4 else buf_size
+
+        self.dll.JLINKARM_ReadMemEx.side_effect = read_memory
+
+        f = StringIO.BytesIO()
+        skipped = self.jlink.memory_dump(0, 12, f, chunk_size=4, skip_errors=True, fill=0xFF)
+        self.assertEqual([(0x4, 4)], skipped)
+        self.assertEqual(b'\x00' * 4 + b'\x04\xFF\xFF\xFF' + b'\x08' * 4, f.getvalue())
+
+        with self.assertRaises(JLinkException):
+            self.jlink.memory_dump(0, 12, StringIO.BytesIO(), chunk_size=4)
+
+        mock_open = mock.mock_open()
+        with mock.patch('pylink.jlink.open', mock_open, create=True):
+            self.assertEqual([], self.jlink.memory_dump(0, 4, 'dump.bin'))
+        mock_open.assert_called_once_with('dump.bin', 'wb')
+        mock_open().write.assert_called_once()
+
+    def test_jlink_memory_dump_buffer(self):
+        """Tests dumping memory in place into a buffer.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        def read_memory(addr, buf_size, buf, access):
+            ctypes.memmove(buf, bytes([addr & 0xFF]) * buf_size, buf_size)
+            return buf_size
+
+        self.dll.JLINKARM_ReadMemEx.side_effect = read_memory
+
+        with self.assertRaises(TypeError):
+            self.jlink.memory_dump(0, 4, bytes(4))
+
+        with self.assertRaises(ValueError):
+            self.jlink.memory_dump(0, 8, bytearray(4))
+
+        buf = mmap.mmap(-1, 12)
+        self.assertEqual([], self.jlink.memory_dump(0, 10, buf, chunk_size=4))
+        self.assertEqual(b'\x00' * 4 + b'\x04' * 4 + b'\x08' * 2 + b'\x00' * 2, buf[:])
+
     def test_jlink_memory_write_invalid_access(self):
         """Tests the memory write fails when given an invalid access width.
 
@@ -3987,6 +4937,182 @@ class TestJLink(unittest.TestCase):
         self.assertEqual(0, data[8])
         self.assertEqual(0, data[9])
 
+    def test_jlink_memory_write_buffer(self):
+        """Tests writing buffer objects to memory without unpacking them.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        self.dll.JLINKARM_WriteMemEx.return_value = 0
+
+        self.jlink.memory_write(0, b'\x01\x02\x03\x04')
+        _, num_bytes, buf, width = self.dll.JLINKARM_WriteMemEx.call_args[0]
+        self.assertEqual(0, width)
+        self.assertEqual(4, num_bytes)
+        self.assertEqual([1, 2, 3, 4], list(buf))
+
+        data = bytearray(b'\x01\x02\x03\x04')
+        self.jlink.memory_write8(0, data)
+        _, num_bytes, buf, width = self.dll.JLINKARM_WriteMemEx.call_args[0]
+        self.assertEqual(1, width)
+        self.assertEqual(4, num_bytes)
+
+        # Writable buffers are handed over without being copied.
+        data[0] = 0xFF
+        self.assertEqual(0xFF, buf[0])
+
+        data = array.array('H', [0xFF00, 0x00FF])
+        self.jlink.memory_write16(0, data)
+        _, num_bytes, buf, width = self.dll.JLINKARM_WriteMemEx.call_args[0]
+        self.assertEqual(2, width)
+        self.assertEqual(4, num_bytes)
+        self.assertEqual([0xFF00, 0x00FF], list(buf))
+
+        data = memoryview(array.array('I', [0xdeadbeef]))
+        self.dll.JLINKARM_WriteMemZonedEx.return_value = 0
+        self.jlink.memory_write32(0, data, zone='zone')
+        _, num_bytes, buf, width, zone = self.dll.JLINKARM_WriteMemZonedEx.call_args[0]
+        self.assertEqual(4, width)
+        self.assertEqual(4, num_bytes)
+        self.assertEqual([0xdeadbeef], list(buf))
+        self.assertEqual(b'zone', zone)
+
+    def test_jlink_memory_write_buffer_units(self):
+        """Tests that each element of a buffer is written as one unit.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        self.dll.JLINKARM_WriteMemEx.return_value = 2
+
+        self.assertEqual(2, self.jlink.memory_write32(0, b'\x01\x02'))
+        _, num_bytes, buf, width = self.dll.JLINKARM_WriteMemEx.call_args[0]
+        self.assertEqual(4, width)
+        self.assertEqual(8, num_bytes)
+        self.assertEqual([0x01, 0x02], list(buf))
+
+        self.jlink.memory_write16(0, bytearray(b'\xff\x00'))
+        _, num_bytes, buf, width = self.dll.JLINKARM_WriteMemEx.call_args[0]
+        self.assertEqual(2, width)
+        self.assertEqual(4, num_bytes)
+        self.assertEqual([0xFF, 0x00], list(buf))
+
+        self.jlink.memory_write(0, array.array('H', [0x1234, 0x56]))
+        _, num_bytes, buf, width = self.dll.JLINKARM_WriteMemEx.call_args[0]
+        self.assertEqual(0, width)
+        self.assertEqual([0x12, 0x34, 0x56], list(buf))
+
+    @mock.patch('pylink.binpacker.pack')
+    def test_jlink_memory_write_packed(self, mock_pack):
+        """Tests typed buffers are written without unpacking their units.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+          mock_pack (Mock): mock for ``binpacker.pack()``
+
+        Returns:
+          ``None``
+        """
+        self.dll.JLINKARM_WriteMemEx.return_value = 2
+        self.jlink._memory_pack_units = mock.Mock()
+
+        data = array.array('I', [0xdeadbeef, 0x1])
+        self.assertEqual(2, self.jlink.memory_write32(0, data))
+        _, num_bytes, buf, width = self.dll.JLINKARM_WriteMemEx.call_args[0]
+        self.assertEqual(4, width)
+        self.assertEqual(8, num_bytes)
+
+        # The array is handed over without being copied into a list.
+        data[1] = 0x2
+        self.assertEqual([0xdeadbeef, 0x2], list(buf))
+
+        self.jlink.memory_write16(0, memoryview(array.array('h', [-1, 2])))
+        _, num_bytes, buf, width = self.dll.JLINKARM_WriteMemEx.call_args[0]
+        self.assertEqual(2, width)
+        self.assertEqual([0xFFFF, 0x2], list(buf))
+
+        self.jlink.memory_write64(0, [0x100000002])
+        _, num_bytes, buf, width = self.dll.JLINKARM_WriteMemEx.call_args[0]
+        self.assertEqual(4, width)
+        self.assertEqual(8, num_bytes)
+        self.assertEqual([0x2, 0x1], list(buf))
+
+        self.jlink._memory_pack_units.assert_not_called()
+        mock_pack.assert_not_called()
+
+    def test_jlink_memory_write_bytes(self):
+        """Tests writing the raw contents of a buffer.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        self.dll.JLINKARM_WriteMemEx.return_value = 2
+
+        data = bytearray(b'\x01\x00\x00\x00\x02\x00\x00\x00')
+        self.assertEqual(2, self.jlink.memory_write_bytes(0, data, nbits=32))
+        _, num_bytes, buf, width = self.dll.JLINKARM_WriteMemEx.call_args[0]
+        self.assertEqual(4, width)
+        self.assertEqual(8, num_bytes)
+        self.assertEqual([0x01, 0x02], list(buf))
+
+        # Writable buffers are handed over without being copied.
+        data[0] = 0xFF
+        self.assertEqual(0xFF, buf[0])
+
+        self.jlink.memory_write_bytes(0, array.array('H', [0x1234, 0x5678]), nbits=32)
+        _, num_bytes, buf, width = self.dll.JLINKARM_WriteMemEx.call_args[0]
+        self.assertEqual(4, width)
+        self.assertEqual([0x56781234], list(buf))
+
+        with self.assertRaises(ValueError):
+            self.jlink.memory_write_bytes(0, b'\x00\x00', nbits=32)
+
+    def test_jlink_memory_write_bytes_list(self):
+        """Tests writing a list of byte values with no access width.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        self.dll.JLINKARM_WriteMemEx.return_value = 0
+
+        self.jlink.memory_write(0, [0x00, 0x7F, 0xFF])
+
+        _, num_bytes, buf, width = self.dll.JLINKARM_WriteMemEx.call_args[0]
+        self.assertEqual(0, width)
+        self.assertEqual(3, num_bytes)
+        self.assertEqual([0x00, 0x7F, 0xFF], list(buf))
+
+        with self.assertRaises(ValueError):
+            self.jlink.memory_write(0, [0, -1])
+
+    def test_jlink_memory_write_long_word_overflow(self):
+        """Tests the ``memory_write64()`` method truncates long words.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        self.jlink.memory_write32 = mock.Mock()
+
+        self.jlink.memory_write64(0, [(1 << 64) | 0x1, -1])
+
+        words = self.jlink.memory_write32.call_args[0][1]
+        self.assertEqual([0x1, 0x0, 0xFFFFFFFF, 0xFFFFFFFF], list(words))
+
     def test_jlink_memory_write_long_word(self):
         """Tests the ``memory_write64()`` method.
 
@@ -4219,6 +5345,78 @@ class TestJLink(unittest.TestCase):
         self.assertEqual(list(indices), [0, 1])
         self.assertEqual(list(values), [0xFF] * count)
 
+    def test_jlink_register_snapshot(self):
+        """Tests capturing all registers with a single read.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        def register_list(buf, num_items):
+            for (i, idx) in enumerate([0, 13, 15]):
+                buf[i] = idx
+            return 3
+
+        def read_registers(indices, data, statuses, num_regs):
+            for i in range(num_regs):
+                data[i] = 0x100 + indices[i]
+            return 0
+
+        names = {0: 'R0', 13: 'SP', 15: 'PC'}
+        self.dll.JLINKARM_GetRegisterList.side_effect = register_list
+        self.dll.JLINKARM_GetRegisterName.side_effect = lambda idx: names[idx].encode()
+        self.dll.JLINKARM_ReadRegs.side_effect = read_registers
+
+        regs = self.jlink.register_snapshot()
+        self.assertEqual({'R0': 0x100, 'SP': 0x10D, 'PC': 0x10F}, dict(regs))
+        self.assertEqual((0, 13, 15), regs.indices)
+        self.assertEqual(15, regs.index('PC'))
+
+        self.jlink.register_snapshot()
+        self.assertEqual(2, self.dll.JLINKARM_ReadRegs.call_count)
+        self.assertEqual(1, self.dll.JLINKARM_GetRegisterList.call_count)
+
+        self.dll.JLINKARM_ReadRegs.side_effect = None
+        self.dll.JLINKARM_ReadRegs.return_value = -1
+        with self.assertRaises(JLinkException):
+            self.jlink.register_snapshot()
+
+    def test_jlink_register_restore(self):
+        """Tests restoring registers writes them with a single write.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        def read_registers(indices, data, statuses, num_regs):
+            for i in range(num_regs):
+                data[i] = 0x1 if indices[i] == 15 else 0x0
+            return 0
+
+        self.dll.JLINKARM_ReadRegs.side_effect = read_registers
+        self.dll.JLINKARM_WriteRegs.return_value = 0
+
+        regs = snapshot.RegisterSnapshot(['R0', 'SP', 'PC'], [0, 13, 15], [0x0, 0x2, 0x3])
+
+        self.assertEqual(2, self.jlink.register_restore(regs))
+        indices, values, _, count = self.dll.JLINKARM_WriteRegs.call_args[0]
+        self.assertEqual(2, count)
+        self.assertEqual([13, 15], list(indices))
+        self.assertEqual([0x2, 0x3], list(values))
+
+        self.assertEqual(3, self.jlink.register_restore(regs, only_dirty=False))
+        indices, values, _, count = self.dll.JLINKARM_WriteRegs.call_args[0]
+        self.assertEqual([0, 13, 15], list(indices))
+        self.assertEqual(1, self.dll.JLINKARM_ReadRegs.call_count)
+
+        regs = snapshot.RegisterSnapshot(['R0', 'PC'], [0, 15], [0x0, 0x1])
+        self.assertEqual(0, self.jlink.register_restore(regs))
+        self.assertEqual(2, self.dll.JLINKARM_WriteRegs.call_count)
+
     def test_jlink_ice_register_read_success(self):
         """Tests successfully reading from an ICE register.
 
@@ -5872,6 +7070,131 @@ class TestJLink(unittest.TestCase):
         self.assertEqual(num_bytes, len(res))
         self.jlink.swo_flush.assert_called_once_with(num_bytes)
 
+    def test_jlink_swo_read_into(self):
+        """Tests reading data from the SWO buffer into a given buffer.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        self.jlink.swo_flush = mock.Mock()
+
+        def read(data, offset, buf_size):
+            size = ctypes.cast(buf_size, ctypes.POINTER(ctypes.c_uint32)).contents
+            self.assertEqual(4, size.value)
+            data[0:3] = [0x01, 0x02, 0x03]
+            size.value = 3
+
+        self.dll.JLINKARM_SWO_Read.side_effect = read
+
+        buf = bytearray(8)
+        view = memoryview(buf)[2:6]
+        self.assertEqual(3, self.jlink.swo_read_into(view))
+        self.assertEqual(b'\x00\x00\x01\x02\x03\x00\x00\x00', bytes(buf))
+        self.jlink.swo_flush.assert_not_called()
+
+        self.assertEqual(3, self.jlink.swo_read_into(view, remove=True))
+        self.jlink.swo_flush.assert_called_once_with(3)
+
+        # Nothing is flushed if nothing was read.
+        def read_nothing(data, offset, buf_size):
+            ctypes.cast(buf_size, ctypes.POINTER(ctypes.c_uint32)).contents.value = 0
+
+        self.dll.JLINKARM_SWO_Read.side_effect = read_nothing
+        self.jlink.swo_flush.reset_mock()
+        self.assertEqual(0, self.jlink.swo_read_into(view, remove=True))
+        self.jlink.swo_flush.assert_not_called()
+
+    def test_jlink_swo_auto_configure(self):
+        """Tests selecting the highest SWO speed that receives intact data.
+
+        Args:
+          self (TestJLink): the ``TestJLink`` instance
+
+        Returns:
+          ``None``
+        """
+        sync = b'\x00' * 5 + b'\x80'
+        captures = {
+            8000000: sync + b'\xfd\x00\x01\x55\x01\xAA',  # Corrupted.
+            6000000: b'\x04\x04\x04\x04',          # Garbage.
+            4000000: sync + b'\x70',               # Overflow.
+            2000000: sync + b'\x01\x00',           # No marker.
+            1000000: sync + b'\x01\x55\x01\xAA',   # Marker.
+        }
+        pending = []
+
+        self.jlink.swo_supported_speeds = mock.Mock(return_value=sorted(captures, reverse=True))
+        self.jlink.swo_enable = mock.Mock(side_effect=lambda c, s, p: pending.append(captures[s]))
+        self.jlink.swo_flush = mock.Mock()
+        self.jlink.swo_num_bytes = mock.Mock(side_effect=lambda: len(pending[-1]))
+        self.jlink.swo_set_host_buffer_size = mock.Mock()
+        self.jlink.swo_set_emu_buffer_size = mock.Mock()
+        self.jlink.swo_stop = mock.Mock()
+
+        calls = mock.Mock()
+        calls.attach_mock(self.jlink.swo_enable, 'swo_enable')
+        calls.attach_mock(self.jlink.swo_stop, 'swo_stop')
+        calls.attach_mock(self.jlink.swo_set_host_buffer_size, 'swo_set_host_buffer_size')
+        calls.attach_mock(self.jlink.swo_set_emu_buffer_size, 'swo_set_emu_buffer_size')
+
+        def read_into(buf, offset=0, remove=False):
+            data = pending[-1]
+            buf[:len(data)] = data
+            pending[-1] = b''
+            return len(data)
+
+        self.jlink.swo_read_into = mock.Mock(side_effect=read_into)
+
+        config = self.jlink.swo_auto_configure(48000000, marker=b'\x55\xAA', duration=0.01)
+        self.assertEqual(48000000, config.cpu_speed)
+        self.assertEqual(1000000, config.swo_speed)
+        self.assertEqual(0x01, config.port_mask)
+        self.assertGreater(config.throughput, 0)
+        self.assertEqual(self.jlink.MIN_SWO_BUFFER_SIZE, config.host_buffer_size)
+        self.assertEqual(self.jlink.MIN_SWO_BUFFER_SIZE, config.emu_buffer_size)
+        self.jlink.swo_set_host_buffer_size.assert_called_once_with(config.host_buffer_size)
+        self.jlink.swo_set_emu_buffer_size.assert_called_once_with(config.emu_buffer_size)
+        self.assertEqual(6, self.jlink.swo_enable.call_count)
+
+        # SWO is restarted at the selected speed after the buffers are sized.
+        self.assertEqual([
+            mock.call.swo_enable(48000000, 1000000, 0x01),
+            mock.call.swo_stop(),
+            mock.call.swo_set_host_buffer_size(config.host_buffer_size),
+            mock.call.swo_set_emu_buffer_size(config.emu_buffer_size),
+            mock.call.swo_enable(48000000, 1000000, 0x01),
+        ], calls.mock_calls[-5:])
+
+        # Without a marker, a sync packet is enough.
+        self.jlink.swo_enable.reset_mock()
+        config = self.jlink.swo_auto_configure(48000000, duration=0.01)
+        self.assertEqual(2000000, config.swo_speed)
+
+        # The buffers are sized from the throughput.
+        config = self.jlink.swo_auto_configure(48000000, duration=0.01, host_buffer_time=1e6)
+        self.assertGreater(config.host_buffer_size, self.jlink.MIN_SWO_BUFFER_SIZE)
+        self.assertEqual(0, config.host_buffer_size & (config.host_buffer_size - 1))
+
+        # SWO is stopped if no speed could be validated.
+        self.jlink.swo_stop.reset_mock()
+        captures[1000000] = b''
+        with self.assertRaises(JLinkException):
+            self.jlink.swo_auto_configure(48000000, marker=b'\x55\xAA', duration=0.01)
+        self.jlink.swo_stop.assert_called_once_with()
+
+        # SWO is stopped if reading its data fails.
+        self.jlink.swo_stop.reset_mock()
+        self.jlink.swo_read_into.side_effect = JLinkException('SWO read failed.')
+        with self.assertRaisesRegexp(JLinkException, 'SWO read failed'):
+            self.jlink.swo_auto_configure(48000000, duration=0.01)
+        self.jlink.swo_stop.assert_called_once_with()
+
+        with self.assertRaises(ValueError):
+            self.jlink.swo_auto_configure(48000000, duration=0)
+
     def test_jlink_swo_read_stimulus_invalid(self):
         """Tests for an invalid port when reading data from a stimulus port.
 
@@ -18,6 +18,12 @@ import pylink.util as util
 
 import mock
 
+import ctypes
+import ctypes.util as ctypes_util
+import os
+import shutil
+import tempfile
+import timeit
 import unittest
 
 
@@ -39,6 +45,17 @@ class TestLibrary(unittest.TestCase):
         self.assertRaisesRegexp = getattr(self, 'assertRaisesRegex', assertRaisesRegexp)
         self.lib_path = '/'
 
+        # Keep the tests from using the on-disk cache of the DLL location, or
+        # libraries shared by earlier tests.
+        self.cache_patcher = mock.patch.object(library.Library, 'cache_path', return_value=None)
+        self.cache_patcher.start()
+        library.Library._shared.clear()
+
+        # Keep the tests from copying DLLs to temporary files.
+        self.copy_pool_patcher = mock.patch.object(library.Library, '_copy_pool')
+        self.copy_pool = self.copy_pool_patcher.start()
+        self.copy_pool.acquire.return_value = '/tmp/tmpjlinkarm'
+
     def tearDown(self):
         """Called after each test.
 
@@ -50,7 +67,9 @@ class TestLibrary(unittest.TestCase):
         Returns:
           ``None``
         """
-        pass
+        self.cache_patcher.stop()
+        self.copy_pool_patcher.stop()
+        library.Library._shared.clear()
 
     def mock_directories(self, mock_os, structure, sep):
         """Mocks a directory structure.
@@ -128,12 +147,9 @@ class TestLibrary(unittest.TestCase):
         mock_os.walk.return_value = mock_walk(sep)
 
     @mock.patch('sys.platform', new='darwin')
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('ctypes.cdll.LoadLibrary')
-    def test_initialize_default(self, mock_load_library, mock_find_library, mock_open):
+    def test_initialize_default(self, mock_load_library, mock_find_library):
         """Tests creating a library and finding the default DLL.
 
         Args:
@@ -141,7 +157,6 @@ class TestLibrary(unittest.TestCase):
           mock_load_library (Mock): a mocked version of the library loader
           mock_find_library (Mock): mock for mocking the
             ``ctypes.util.find_library()`` call
-          mock_open (Mock): mock for mocking the call to ``open()``
 
         Returns:
           ``None``
@@ -152,17 +167,14 @@ class TestLibrary(unittest.TestCase):
         lib.unload = mock.Mock()
 
         mock_find_library.assert_called_once_with(library.Library.JLINK_SDK_OBJECT)
-        mock_open.assert_called_with(self.lib_path, 'rb')
+        self.copy_pool.acquire.assert_called_with(self.lib_path, mock.ANY)
         mock_load_library.assert_called_once()
 
     @mock.patch('sys.platform', new='darwin')
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('ctypes.cdll.LoadLibrary')
     @mock.patch('os.path.isdir')
-    def test_initialiaze_no(self, mock_isdir, mock_load_library, mock_find_library, mock_open):
+    def test_initialiaze_no(self, mock_isdir, mock_load_library, mock_find_library):
         """Tests creating a library when the default DLL does not exist.
 
         Args:
@@ -171,7 +183,6 @@ class TestLibrary(unittest.TestCase):
           mock_load_library (Mock): a mocked version of the library loader
           mock_find_library (Mock): mock for mocking the
             ``ctypes.util.find_library()`` call
-          mock_open (Mock): mock for mocking the clal to ``open()``
 
         Returns:
           ``None``
@@ -187,12 +198,9 @@ class TestLibrary(unittest.TestCase):
         self.assertEqual(0, mock_load_library.call_count)
 
     @mock.patch('sys.platform', new='darwin')
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('ctypes.cdll.LoadLibrary')
-    def test_initialize_with_path(self, mock_load_library, mock_find_library, mock_open):
+    def test_initialize_with_path(self, mock_load_library, mock_find_library):
         """Tests creating a library when passing in a DLL path.
 
         Args:
@@ -200,7 +208,6 @@ class TestLibrary(unittest.TestCase):
           mock_load_library (Mock): a mocked version of the library loader
           mock_find_library (Mock): mock for mocking the
             ``ctypes.util.find_library()`` call
-          mock_open (Mock): mock for mocking the call to ``open()``
 
         Returns:
           ``None``
@@ -212,17 +219,14 @@ class TestLibrary(unittest.TestCase):
 
         self.assertEqual(0, mock_find_library.call_count)
 
-        mock_open.assert_called_with(self.lib_path, 'rb')
+        self.copy_pool.acquire.assert_called_with(self.lib_path, mock.ANY)
         mock_load_library.assert_called_once()
 
     @mock.patch('sys.platform', new='windows')
     @mock.patch('sys.maxsize', new=(2**63-1))
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('pylink.library.ctypes')
-    def test_initialize_windows(self, mock_ctypes, mock_find_library, mock_open):
+    def test_initialize_windows(self, mock_ctypes, mock_find_library):
         """Tests creating a library on a Windows machine.
 
         Args:
@@ -230,7 +234,6 @@ class TestLibrary(unittest.TestCase):
           mock_ctypes (Mock): a mocked version of the ctypes library
           mock_find_library (Mock): mock for mocking the
             ``ctypes.util.find_library()`` call
-          mock_open (Mock): mock for mocking the call to ``open()``
 
         Returns:
           ``None``
@@ -249,18 +252,15 @@ class TestLibrary(unittest.TestCase):
         lib.unload = mock.Mock()
 
         mock_find_library.assert_called_once_with(library.Library.WINDOWS_64_JLINK_SDK_NAME)
-        mock_open.assert_called_with(self.lib_path, 'rb')
+        self.copy_pool.acquire.assert_called_with(self.lib_path, mock.ANY)
         mock_cdll.LoadLibrary.assert_called_once()
         mock_windll.LoadLibrary.assert_called_once()
 
     @mock.patch('sys.platform', new='windows')
     @mock.patch('sys.maxsize', new=(2**31-1))
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('pylink.library.ctypes')
-    def test_initialize_windows_32bit(self, mock_ctypes, mock_find_library, mock_open):
+    def test_initialize_windows_32bit(self, mock_ctypes, mock_find_library):
         """Tests creating a library on a Windows machine with 32bit Python.
 
         Args:
@@ -268,7 +268,6 @@ class TestLibrary(unittest.TestCase):
           mock_ctypes (Mock): a mocked version of the ctypes library
           mock_find_library (Mock): mock for mocking the
             ``ctypes.util.find_library()`` call
-          mock_open (Mock): mock for mocking the call to ``open()``
 
         Returns:
           ``None``
@@ -287,17 +286,14 @@ class TestLibrary(unittest.TestCase):
         lib.unload = mock.Mock()
 
         mock_find_library.assert_called_once_with(library.Library.WINDOWS_32_JLINK_SDK_NAME)
-        mock_open.assert_called_with(self.lib_path, 'rb')
+        self.copy_pool.acquire.assert_called_with(self.lib_path, mock.ANY)
         mock_cdll.LoadLibrary.assert_called_once()
         mock_windll.LoadLibrary.assert_called_once()
 
     @mock.patch('sys.platform', new='darwin')
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('ctypes.cdll.LoadLibrary')
-    def test_load(self, mock_load_library, mock_find_library, mock_open):
+    def test_load(self, mock_load_library, mock_find_library):
         """Tests that we can pass in a path to a DLL to load.
 
         If the path is valid, loads the given ``DLL``, otherwise stays the
@@ -308,7 +304,6 @@ class TestLibrary(unittest.TestCase):
           mock_load_library (Mock): a mocked version of the library loader
           mock_find_library (Mock): mock for mocking the
             ``ctypes.util.find_library()`` call
-          mock_open (Mock): mock for mocking the call to ``open()``
 
         Returns:
           ``None``
@@ -321,30 +316,26 @@ class TestLibrary(unittest.TestCase):
         mock_find_library.assert_called_once_with(library.Library.JLINK_SDK_OBJECT)
         self.assertEqual(1, mock_find_library.call_count)
 
-        mock_open.assert_called_with(self.lib_path, 'rb')
+        self.copy_pool.acquire.assert_called_with(self.lib_path, mock.ANY)
         self.assertEqual(1, mock_load_library.call_count)
 
         new_path = '\\'
         lib.load(new_path)
 
-        mock_open.assert_called_with(new_path, 'rb')
+        self.copy_pool.acquire.assert_called_with(new_path, mock.ANY)
         self.assertEqual(2, mock_load_library.call_count)
 
         lib.load(None)
-        mock_open.assert_called_with(new_path, 'rb')
+        self.copy_pool.acquire.assert_called_with(new_path, mock.ANY)
         self.assertEqual(3, mock_load_library.call_count)
 
     @mock.patch('sys.platform', new='darwin')
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
-    @mock.patch('pylink.library.open', new=mock.MagicMock())
     @mock.patch('pylink.library.ctypes')
-    @mock.patch('os.remove')
-    def test_unload_no_library(self, mock_remove, mock_ctypes):
+    def test_unload_no_library(self, mock_ctypes):
         """Tests unloading the library when no DLL is loaded.
 
         Args:
           self (TestLibrary): the ``TestLibrary`` instance
-          mock_remove (Mock): the mocked call to ``os.remove()``
           mock_ctypes (Mock): mocked ``ctypes`` module
 
         Returns:
@@ -356,19 +347,15 @@ class TestLibrary(unittest.TestCase):
 
         self.assertFalse(lib.unload())
 
-        mock_remove.assert_not_called()
+        self.copy_pool.release.assert_not_called()
 
     @mock.patch('sys.platform', new='windows')
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
-    @mock.patch('pylink.library.open', new=mock.MagicMock())
     @mock.patch('pylink.library.ctypes')
-    @mock.patch('os.remove')
-    def test_unload_windows(self, mock_remove, mock_ctypes):
+    def test_unload_windows(self, mock_ctypes):
         """Tests unloading the library on Windows.
 
         Args:
           self (TestLibrary): the ``TestLibrary`` instance
-          mock_remove (Mock): the mocked call to ``os.remove()``
           mock_ctypes (Mock): mocked ``ctypes`` module
 
         Returns:
@@ -380,19 +367,16 @@ class TestLibrary(unittest.TestCase):
 
         self.assertEqual(2, mock_ctypes.windll.kernel32.FreeLibrary.call_count)
 
-        mock_remove.assert_called_once()
+        # The DLL was freed, so its copy can be reused.
+        self.copy_pool.release.assert_called_once_with('/tmp/tmpjlinkarm', reuse=True)
 
     @mock.patch('sys.platform', new='darwin')
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
-    @mock.patch('pylink.library.open', new=mock.MagicMock())
     @mock.patch('pylink.library.ctypes')
-    @mock.patch('os.remove')
-    def test_unload_darwin_linux(self, mock_remove, mock_ctypes):
+    def test_unload_darwin_linux(self, mock_ctypes):
         """Tests unloading the library on Darwin and Linux platforms.
 
         Args:
           self (TestLibrary): the ``TestLibrary`` instance
-          mock_remove (Mock): the mocked call to ``os.remove()``
           mock_ctypes (Mock): mocked ``ctypes`` module
 
         Returns:
@@ -402,18 +386,16 @@ class TestLibrary(unittest.TestCase):
 
         self.assertTrue(lib.unload())
 
-        mock_remove.assert_called_once()
+        # The DLL is never closed, so its copy must not be reused.
+        self.copy_pool.release.assert_called_once_with('/tmp/tmpjlinkarm', reuse=False)
 
         self.assertEqual(None, lib._lib)
         self.assertEqual(None, lib._temp)
 
     @mock.patch('sys.platform', new='darwin')
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('ctypes.cdll.LoadLibrary')
-    def test_dll_getter(self, mock_load_library, mock_find_library, mock_open):
+    def test_dll_getter(self, mock_load_library, mock_find_library):
         """Tests that the ``.dll()`` getter returns the set ``DLL``.
 
         Args:
@@ -421,7 +403,6 @@ class TestLibrary(unittest.TestCase):
           mock_load_library (Mock): a mocked version of the library loader
           mock_find_library (Mock): mock for mocking the
             ``ctypes.util.find_library()`` call
-          mock_open (Mock): mock for mocking the call to ``open()``
 
         Returns:
           ``None``
@@ -435,19 +416,16 @@ class TestLibrary(unittest.TestCase):
         mock_find_library.assert_called_once_with(library.Library.JLINK_SDK_OBJECT)
         self.assertEqual(1, mock_find_library.call_count)
 
-        mock_open.assert_called_with(self.lib_path, 'rb')
+        self.copy_pool.acquire.assert_called_with(self.lib_path, mock.ANY)
         mock_load_library.assert_called_once()
 
         self.assertEqual(0xDEADBEEF, lib.dll())
 
     @mock.patch('sys.platform', new='darwin')
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('ctypes.cdll.LoadLibrary')
     @mock.patch('pylink.library.os')
-    def test_darwin_4_98_e(self, mock_os, mock_load_library, mock_find_library, mock_open):
+    def test_darwin_4_98_e(self, mock_os, mock_load_library, mock_find_library):
         """Tests finding the DLL on Darwin through the SEGGER application for V4.98E-.
 
         Args:
@@ -455,7 +433,6 @@ class TestLibrary(unittest.TestCase):
           mock_os (Mock): a mocked version of the ``os`` module
           mock_load_library (Mock): a mocked version of the library loader
           mock_find_library (Mock): a mocked call to ``ctypes`` find library
-          mock_open (Mock): mock for mocking the call to ``open()``
 
         Returns:
           ``None``
@@ -475,13 +452,10 @@ class TestLibrary(unittest.TestCase):
         self.assertEqual(1, mock_load_library.call_count)
 
     @mock.patch('sys.platform', new='darwin')
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('ctypes.cdll.LoadLibrary')
     @mock.patch('pylink.library.os')
-    def test_darwin_5_0_0(self, mock_os, mock_load_library, mock_find_library, mock_open):
+    def test_darwin_5_0_0(self, mock_os, mock_load_library, mock_find_library):
         """Tests finding the DLL on Darwin through the SEGGER application for V5.0.0+.
 
         Args:
@@ -489,7 +463,6 @@ class TestLibrary(unittest.TestCase):
           mock_os (Mock): a mocked version of the ``os`` module
           mock_load_library (Mock): a mocked version of the library loader
           mock_find_library (Mock): a mocked call to ``ctypes`` find library
-          mock_open (Mock): mock for mocking the call to ``open()``
 
         Returns:
           ``None``
@@ -510,13 +483,10 @@ class TestLibrary(unittest.TestCase):
         self.assertEqual(1, mock_load_library.call_count)
 
     @mock.patch('sys.platform', new='darwin')
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('ctypes.cdll.LoadLibrary')
     @mock.patch('pylink.library.os')
-    def test_darwin_6_0_0(self, mock_os, mock_load_library, mock_find_library, mock_open):
+    def test_darwin_6_0_0(self, mock_os, mock_load_library, mock_find_library):
         """Tests finding the DLL on Darwin through the SEGGER application for V6.0.0+.
 
         Args:
@@ -524,7 +494,6 @@ class TestLibrary(unittest.TestCase):
           mock_os (Mock): a mocked version of the ``os`` module
           mock_load_library (Mock): a mocked version of the library loader
           mock_find_library (Mock): a mocked call to ``ctypes`` find library
-          mock_open (Mock): mock for mocking the call to ``open()``
 
         Returns:
           ``None``
@@ -544,13 +513,10 @@ class TestLibrary(unittest.TestCase):
         self.assertEqual(1, mock_load_library.call_count)
 
     @mock.patch('sys.platform', new='darwin')
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('ctypes.cdll.LoadLibrary')
     @mock.patch('pylink.library.os')
-    def test_darwin_empty(self, mock_os, mock_load_library, mock_find_library, mock_open):
+    def test_darwin_empty(self, mock_os, mock_load_library, mock_find_library):
         """Tests finding the DLL on Darwin through the SEGGER application for V6.0.0+.
 
         Args:
@@ -558,7 +524,6 @@ class TestLibrary(unittest.TestCase):
           mock_os (Mock): a mocked version of the ``os`` module
           mock_load_library (Mock): a mocked version of the library loader
           mock_find_library (Mock): a mocked call to ``ctypes`` find library
-          mock_open (Mock): mock for mocking the call to ``open()``
 
         Returns:
           ``None``
@@ -579,13 +544,10 @@ class TestLibrary(unittest.TestCase):
 
     @mock.patch('sys.platform', new='windows')
     @mock.patch('sys.maxsize', new=(2**31 - 1))
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('pylink.library.ctypes')
     @mock.patch('pylink.library.os')
-    def test_windows_4_98_e(self, mock_os, mock_ctypes, mock_find_library, mock_open):
+    def test_windows_4_98_e(self, mock_os, mock_ctypes, mock_find_library):
         """Tests finding the DLL on Windows through the SEGGER application for V4.98E-.
 
         Args:
@@ -593,7 +555,6 @@ class TestLibrary(unittest.TestCase):
           mock_os (Mock): a mocked version of the ``os`` module
           mock_ctypes (Mock): a mocked version of the ctypes library
           mock_find_library (Mock): a mocked call to ``ctypes`` find library
-          mock_open (Mock): mock for mocking the call to ``open()``
 
         Returns:
           ``None``
@@ -624,13 +585,10 @@ class TestLibrary(unittest.TestCase):
 
     @mock.patch('sys.platform', new='windows')
     @mock.patch('sys.maxsize', new=(2**31-1))
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('pylink.library.ctypes')
     @mock.patch('pylink.library.os')
-    def test_windows_5_10_0(self, mock_os, mock_ctypes, mock_find_library, mock_open):
+    def test_windows_5_10_0(self, mock_os, mock_ctypes, mock_find_library):
         """Tests finding the DLL on Windows through the SEGGER application for V5.0.0+.
 
         Args:
@@ -638,7 +596,6 @@ class TestLibrary(unittest.TestCase):
           mock_os (Mock): a mocked version of the ``os`` module
           mock_ctypes (Mock): a mocked version of the ctypes library
           mock_find_library (Mock): a mocked call to ``ctypes`` find library
-          mock_open (Mock): mock for mocking the call to ``open()``
 
         Returns:
           ``None``
@@ -669,13 +626,10 @@ class TestLibrary(unittest.TestCase):
 
     @mock.patch('sys.platform', new='windows')
     @mock.patch('sys.maxsize', new=(2**31-1))
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('pylink.library.ctypes')
     @mock.patch('pylink.library.os')
-    def test_windows_jlinkarm(self, mock_os, mock_ctypes, mock_find_library, mock_open):
+    def test_windows_jlinkarm(self, mock_os, mock_ctypes, mock_find_library):
         """Tests finding the DLL on Windows through the SEGGER JLinkARM folder.
 
         Args:
@@ -683,7 +637,6 @@ class TestLibrary(unittest.TestCase):
           mock_os (Mock): a mocked version of the ``os`` module
           mock_ctypes (Mock): a mocked version of the ctypes library
           mock_find_library (Mock): a mocked call to ``ctypes`` find library
-          mock_open (Mock): mock for mocking the call to ``open()``
 
         Returns:
           ``None``
@@ -714,13 +667,10 @@ class TestLibrary(unittest.TestCase):
 
     @mock.patch('sys.platform', new='windows')
     @mock.patch('sys.maxsize', new=(2**31 - 1))
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('pylink.library.ctypes')
     @mock.patch('pylink.library.os')
-    def test_windows_empty(self, mock_os, mock_ctypes, mock_find_library, mock_open):
+    def test_windows_empty(self, mock_os, mock_ctypes, mock_find_library):
         """Tests finding the DLL on Windows through the SEGGER application for V6.0.0+.
 
         Args:
@@ -728,7 +678,6 @@ class TestLibrary(unittest.TestCase):
           mock_os (Mock): a mocked version of the ``os`` module
           mock_ctypes (Mock): a mocked version of the ctypes library
           mock_find_library (Mock): a mocked call to ``ctypes`` find library
-          mock_open (Mock): mock for mocking the call to ``open``
 
         Returns:
           ``None``
@@ -760,13 +709,10 @@ class TestLibrary(unittest.TestCase):
 
     @mock.patch('sys.platform', new='cygwin')
     @mock.patch('sys.maxsize', new=(2**31-1))
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('ctypes.cdll.LoadLibrary')
     @mock.patch('pylink.library.os')
-    def test_cygwin(self, mock_os, mock_load_library, mock_find_library, mock_open):
+    def test_cygwin(self, mock_os, mock_load_library, mock_find_library):
         """Tests finding the DLL when running within Cygwin.
 
         Args:
@@ -774,7 +720,6 @@ class TestLibrary(unittest.TestCase):
           mock_os (Mock): a mocked version of the ``os`` module
           mock_load_library (Mock): a mocked version of the library loader
           mock_find_library (Mock): a mocked call to ``ctypes`` find library
-          mock_open (Mock): mock for mocking the call to ``open()``
 
         Returns:
           ``None``
@@ -797,13 +742,10 @@ class TestLibrary(unittest.TestCase):
 
     @mock.patch('sys.platform', new='linux')
     @mock.patch('pylink.util.is_os_64bit', return_value=False)
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('ctypes.cdll.LoadLibrary')
     @mock.patch('pylink.library.os')
-    def test_linux_4_98_e(self, mock_os, mock_load_library, mock_find_library, mock_open, mock_is_os_64bit):
+    def test_linux_4_98_e(self, mock_os, mock_load_library, mock_find_library, mock_is_os_64bit):
         """Tests finding the DLL on Linux through the SEGGER application for V4.98E-.
 
         Args:
@@ -811,7 +753,6 @@ class TestLibrary(unittest.TestCase):
           mock_os (Mock): a mocked version of the ``os`` module
           mock_load_library (Mock): a mocked version of the library loader
           mock_find_library (Mock): a mocked call to ``ctypes`` find library
-          mock_open (Mock): mock for mocking the call to ``open()``
 
         Returns:
           ``None``
@@ -830,13 +771,10 @@ class TestLibrary(unittest.TestCase):
 
     @mock.patch('sys.platform', new='linux2')
     @mock.patch('pylink.util.is_os_64bit', return_value=False)
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('ctypes.cdll.LoadLibrary')
     @mock.patch('pylink.library.os')
-    def test_linux_6_10_0_32bit(self, mock_os, mock_load_library, mock_find_library, mock_open, mock_is_os_64bit):
+    def test_linux_6_10_0_32bit(self, mock_os, mock_load_library, mock_find_library, mock_is_os_64bit):
         """Tests finding the DLL on Linux through the SEGGER application for V6.0.0+ on 32 bit linux.
 
         Args:
@@ -844,7 +782,6 @@ class TestLibrary(unittest.TestCase):
           mock_os (Mock): a mocked version of the ``os`` module
           mock_load_library (Mock): a mocked version of the library loader
           mock_find_library (Mock): a mocked call to ``ctypes`` find library
-          mock_open (Mock): mock for mocking the call to ``open()``
           mock_is_os_64bit (Mock): mock for mocking the call to ``is_os_64bit``, returns False
 
         Returns:
@@ -876,15 +813,12 @@ class TestLibrary(unittest.TestCase):
 
     @mock.patch('sys.platform', new='linux2')
     @mock.patch('pylink.util.is_os_64bit', return_value=True)
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('ctypes.cdll.LoadLibrary')
     @mock.patch('ctypes.CDLL')
     @mock.patch('pylink.library.os')
     def test_linux_6_10_0_64bit(self, mock_os, mock_cdll, mock_load_library,
-                                mock_find_library, mock_open, mock_is_os_64bit):
+                                mock_find_library, mock_is_os_64bit):
         """Tests finding the DLL on Linux through the SEGGER application for V6.0.0+ on 64 bit linux.
 
         Args:
@@ -893,7 +827,6 @@ class TestLibrary(unittest.TestCase):
           mock_cdll (Mock): a mocked version of the `cdll.CDLL` class constructor
           mock_load_library (Mock): a mocked version of the library loader
           mock_find_library (Mock): a mocked call to ``ctypes`` find library
-          mock_open (Mock): mock for mocking the call to ``open()``
           mock_is_os_64bit (Mock): mock for mocking the call to ``is_os_64bit``, returns True
 
         Returns:
@@ -925,15 +858,12 @@ class TestLibrary(unittest.TestCase):
 
     @mock.patch('sys.platform', new='linux2')
     @mock.patch('pylink.util.is_os_64bit', return_value=True)
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('ctypes.cdll.LoadLibrary')
     @mock.patch('ctypes.CDLL')
     @mock.patch('pylink.library.os')
     def test_linux_64bit_no_x86(self, mock_os, mock_cdll, mock_load_library,
-                                mock_find_library, mock_open, mock_is_os_64bit):
+                                mock_find_library, mock_is_os_64bit):
         """Tests finding the DLL on Linux when no library name contains 'x86'.
 
         Args:
@@ -942,7 +872,6 @@ class TestLibrary(unittest.TestCase):
           mock_cdll (Mock): a mocked version of the `cdll.CDLL` class constructor
           mock_load_library (Mock): a mocked version of the library loader
           mock_find_library (Mock): a mocked call to ``ctypes`` find library
-          mock_open (Mock): mock for mocking the call to ``open()``
           mock_is_os_64bit (Mock): mock for mocking the call to ``is_os_64bit``, returns True
 
         Returns:
@@ -967,13 +896,10 @@ class TestLibrary(unittest.TestCase):
         self.assertEqual(directories[1], lib._path)
 
     @mock.patch('sys.platform', new='linux')
-    @mock.patch('pylink.library.open')
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
     @mock.patch('ctypes.util.find_library')
     @mock.patch('ctypes.cdll.LoadLibrary')
     @mock.patch('pylink.library.os')
-    def test_linux_empty(self, mock_os, mock_load_library, mock_find_library, mock_open):
+    def test_linux_empty(self, mock_os, mock_load_library, mock_find_library):
         """Tests finding the DLL on Linux through the SEGGER application for V6.0.0+.
 
         Args:
@@ -981,7 +907,6 @@ class TestLibrary(unittest.TestCase):
           mock_os (Mock): a mocked version of the ``os`` module
           mock_load_library (Mock): a mocked version of the library loader
           mock_find_library (Mock): a mocked call to ``ctypes`` find library
-          mock_open (Mock): mock for mocking the call to ``open()``
 
         Returns:
           ``None``
@@ -1000,9 +925,6 @@ class TestLibrary(unittest.TestCase):
 
     @mock.patch('os.name', new='posix')
     @mock.patch('sys.platform', new='linux')
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('pylink.library.open')
     @mock.patch('pylink.library.os')
     @mock.patch('pylink.util.is_os_64bit', return_value=True)
     @mock.patch('pylink.platform.libc_ver', return_value=('libc', '1.0'))
@@ -1011,7 +933,7 @@ class TestLibrary(unittest.TestCase):
     @mock.patch('ctypes.CDLL')
     @mock.patch('ctypes.cdll.LoadLibrary')
     def test_linux_glibc_unavailable(self, mock_load_library, mock_cdll, mock_dlinfo_ctr, mock_find_library,
-                                     mock_libc_ver, mock_is_os_64bit, mock_os,  mock_open):
+                                     mock_libc_ver, mock_is_os_64bit, mock_os):
         """Confirms the whole JLinkarmDlInfo code path is not involved when GNU libc
         extensions are unavailable on a Linux system, and that we'll successfully fallback
         to the "search by file name".
@@ -1042,9 +964,6 @@ class TestLibrary(unittest.TestCase):
 
     @mock.patch('os.name', new='posix')
     @mock.patch('sys.platform', new='linux')
-    @mock.patch('tempfile.NamedTemporaryFile', new=mock.Mock())
-    @mock.patch('os.remove', new=mock.Mock())
-    @mock.patch('pylink.library.open')
     @mock.patch('pylink.library.os')
     @mock.patch('pylink.util.is_os_64bit', return_value=True)
     @mock.patch('pylink.platform.libc_ver', return_value=('glibc', '2.34'))
@@ -1052,7 +971,7 @@ class TestLibrary(unittest.TestCase):
     @mock.patch('ctypes.CDLL')
     @mock.patch('ctypes.cdll.LoadLibrary')
     def test_linux_dl_unavailable(self, mock_load_library, mock_cdll, mock_find_library, mock_libc_ver,
-                                  mock_is_os_64bit, mock_os,  mock_open):
+                                  mock_is_os_64bit, mock_os):
         """Confirms we successfully fallback to the "search by file name" code path when libdl is
         unavailable despite the host system presenting itself as POSIX (GNU/Linux).
 
@@ -1137,6 +1056,307 @@ class TestLibrary(unittest.TestCase):
         lib = library.Library(path)
         self.assertEqual(lib.dll_version(), 7.96)
 
+    @mock.patch('ctypes.cdll.LoadLibrary')
+    def test_library_bind_prototypes(self, mock_load_library):
+        """Tests that the DLL's API call prototypes are bound on load.
+
+        Args:
+          self (TestLibrary): the ``TestLibrary`` instance
+          mock_load_library (Mock): mock for ``ctypes.cdll.LoadLibrary``
+
+        Returns:
+          ``None``
+        """
+        dll = mock.Mock(spec=['JLINKARM_IsOpen', 'JLINKARM_WriteU64'])
+        mock_load_library.return_value = dll
+
+        lib = library.Library('/opt/SEGGER/JLink_V796n/libjlinkarm.so')
+        self.assertIs(dll, lib.dll())
+        self.assertEqual(ctypes.c_int8, dll.JLINKARM_IsOpen.restype)
+        self.assertEqual([], dll.JLINKARM_IsOpen.argtypes)
+        self.assertEqual([ctypes.c_uint32, ctypes.c_uint64], dll.JLINKARM_WriteU64.argtypes)
+
+        # Functions the DLL does not export are skipped.
+        self.assertEqual(2, library.Library.bind_prototypes(dll))
+
+    @unittest.skipIf(ctypes_util.find_library('c') is None, 'requires a C library')
+    def test_library_bind_prototypes_stub(self):
+        """Tests calls with bound prototypes against a stub library.
+
+        The C library's ``labs()`` stands in for a J-Link DLL call taking and
+        returning a 64-bit value.  Without a prototype, the argument is passed
+        as a C ``int`` and truncated.
+
+        Args:
+          self (TestLibrary): the ``TestLibrary`` instance
+
+        Returns:
+          ``None``
+        """
+        path = ctypes_util.find_library('c')
+        untyped = ctypes.CDLL(path)
+        typed = ctypes.CDLL(path)
+        prototypes = {'labs': (ctypes.c_long, [ctypes.c_long])}
+        self.assertEqual(1, library.Library.bind_prototypes(typed, prototypes))
+
+        value = -(1 << 40) if ctypes.sizeof(ctypes.c_long) == 8 else -(1 << 20)
+        self.assertEqual(abs(value), typed.labs(value))
+        if ctypes.sizeof(ctypes.c_long) == 8:
+            self.assertNotEqual(abs(value), untyped.labs(value))
+
+    @unittest.skipUnless(os.environ.get('PYLINK_BENCHMARK'), 'set PYLINK_BENCHMARK to run benchmarks')
+    @unittest.skipIf(ctypes_util.find_library('c') is None, 'requires a C library')
+    def test_library_bind_prototypes_benchmark(self):
+        """Benchmarks calls with bound prototypes against a stub library.
+
+        Args:
+          self (TestLibrary): the ``TestLibrary`` instance
+
+        Returns:
+          ``None``
+        """
+        path = ctypes_util.find_library('c')
+        untyped = ctypes.CDLL(path)
+        typed = ctypes.CDLL(path)
+        library.Library.bind_prototypes(typed, {'labs': (ctypes.c_long, [ctypes.c_long])})
+
+        number = 10000
+        untyped_time = min(timeit.repeat(lambda: untyped.labs(-1), number=number, repeat=3))
+        typed_time = min(timeit.repeat(lambda: typed.labs(-1), number=number, repeat=3))
+
+        # Binding the prototypes must not make the calls noticeably slower.
+        self.assertLess(typed_time, untyped_time * 1.5)
+
+    @mock.patch('pylink.library.Library.find_default')
+    @mock.patch('ctypes.cdll.LoadLibrary')
+    def test_library_cache(self, mock_load_library, mock_find_default):
+        """Tests that the location of the default DLL is cached on disk.
+
+        Args:
+          self (TestLibrary): the ``TestLibrary`` instance
+          mock_load_library (Mock): mock for ``ctypes.cdll.LoadLibrary``
+          mock_find_default (Mock): mock for ``Library.find_default()``
+
+        Returns:
+          ``None``
+        """
+        self.cache_patcher.stop()
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        dll_path = os.path.join(directory, 'libjlinkarm.so')
+        with open(dll_path, 'wb'):
+            pass
+
+        cache_path = os.path.join(directory, 'cache', 'library.json')
+        environ = {library.Library.CACHE_ENV_VAR: cache_path}
+        with mock.patch.dict(os.environ, environ):
+            self.assertEqual(cache_path, library.Library.cache_path())
+
+            mock_find_default.return_value = dll_path
+            lib = library.Library(use_tmpcpy=False)
+            self.assertEqual(1, mock_find_default.call_count)
+            self.assertTrue(os.path.isfile(cache_path))
+
+            # Later instances skip the search.
+            lib = library.Library(use_tmpcpy=False)
+            self.assertEqual(1, mock_find_default.call_count)
+            mock_load_library.assert_called_with(dll_path)
+
+            # The cached location is invalidated once the DLL is modified.
+            stat = os.stat(dll_path)
+            os.utime(dll_path, (stat.st_atime, stat.st_mtime + 10))
+            lib = library.Library(use_tmpcpy=False)
+            self.assertEqual(2, mock_find_default.call_count)
+
+            # Corrupt cache files are ignored.
+            with open(cache_path, 'w') as f:
+                f.write('{')
+            lib = library.Library(use_tmpcpy=False)
+            self.assertEqual(3, mock_find_default.call_count)
+
+        with mock.patch.dict(os.environ, {library.Library.CACHE_ENV_VAR: ''}):
+            self.assertIsNone(library.Library.cache_path())
+            lib = library.Library(use_tmpcpy=False)
+            lib = library.Library(use_tmpcpy=False)
+            self.assertEqual(5, mock_find_default.call_count)
+
+        self.cache_patcher.start()
+
+    @mock.patch('ctypes.cdll.LoadLibrary')
+    def test_library_shared(self, mock_load_library):
+        """Tests that DLLs loaded without a temporary copy are shared.
+
+        Args:
+          self (TestLibrary): the ``TestLibrary`` instance
+          mock_load_library (Mock): mock for ``ctypes.cdll.LoadLibrary``
+
+        Returns:
+          ``None``
+        """
+        mock_load_library.side_effect = lambda path: mock.Mock()
+
+        first = library.Library('/jlink/libjlinkarm.so', use_tmpcpy=False)
+        second = library.Library('/jlink/libjlinkarm.so', use_tmpcpy=False)
+        self.assertEqual(1, mock_load_library.call_count)
+        self.assertIs(first.dll(), second.dll())
+
+        # Temporary copies are never shared.
+        third = library.Library('/jlink/libjlinkarm.so', use_tmpcpy=True)
+        self.assertEqual(2, mock_load_library.call_count)
+        self.assertIsNot(first.dll(), third.dll())
+
+        # The library is released once no instance uses it any more.
+        self.assertTrue(first.unload())
+        self.assertIsNone(first.dll())
+        self.assertIsNotNone(second.dll())
+        self.assertIn('/jlink/libjlinkarm.so', library.Library._shared)
+
+        self.assertTrue(second.unload())
+        self.assertNotIn('/jlink/libjlinkarm.so', library.Library._shared)
+
+        library.Library('/jlink/libjlinkarm.so', use_tmpcpy=False)
+        self.assertEqual(3, mock_load_library.call_count)
+
+
+class TestTemporaryCopyPool(unittest.TestCase):
+    """Unit test for the ``TemporaryCopyPool`` of the ``library`` submodule."""
+
+    def setUp(self):
+        """Called before each test.
+
+        Performs setup.
+
+        Args:
+          self (TestTemporaryCopyPool): the ``TestTemporaryCopyPool`` instance
+
+        Returns:
+          ``None``
+        """
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'libjlinkarm.so')
+        with open(self.path, 'wb') as f:
+            f.write(bytes(range(256)) * 64)
+
+        self.pool = library.TemporaryCopyPool()
+
+    def tearDown(self):
+        """Called after each test.
+
+        Performs teardown.
+
+        Args:
+          self (TestTemporaryCopyPool): the ``TestTemporaryCopyPool`` instance
+
+        Returns:
+          ``None``
+        """
+        self.pool.clear()
+        shutil.rmtree(self.directory)
+
+    def read(self, path):
+        """Returns the contents of a file.
+
+        Args:
+          self (TestTemporaryCopyPool): the ``TestTemporaryCopyPool`` instance
+          path (str): path to the file
+
+        Returns:
+          The contents of the file.
+        """
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_copy_pool_acquire(self):
+        """Tests that each acquired copy is a distinct copy of the file.
+
+        Args:
+          self (TestTemporaryCopyPool): the ``TestTemporaryCopyPool`` instance
+
+        Returns:
+          ``None``
+        """
+        first = self.pool.acquire(self.path, '.so')
+        second = self.pool.acquire(self.path, '.so')
+        self.addCleanup(os.remove, first)
+        self.addCleanup(os.remove, second)
+
+        self.assertNotEqual(first, second)
+        self.assertTrue(first.endswith('.so'))
+        self.assertNotEqual(os.stat(first).st_ino, os.stat(second).st_ino)
+        self.assertEqual(self.read(self.path), self.read(first))
+        self.assertEqual(self.read(self.path), self.read(second))
+
+        with self.assertRaises(OSError):
+            self.pool.acquire(os.path.join(self.directory, 'missing.so'))
+
+    def test_copy_pool_release(self):
+        """Tests that released copies are reused while the file is unchanged.
+
+        Args:
+          self (TestTemporaryCopyPool): the ``TestTemporaryCopyPool`` instance
+
+        Returns:
+          ``None``
+        """
+        first = self.pool.acquire(self.path)
+        self.assertTrue(self.pool.release(first, reuse=True))
+        self.assertFalse(self.pool.release(first, reuse=True))
+
+        with mock.patch.object(self.pool, 'copy') as mock_copy:
+            self.assertEqual(first, self.pool.acquire(self.path))
+            mock_copy.assert_not_called()
+        self.pool.release(first, reuse=True)
+
+        # Copies of an older version of the file are removed, not reused.
+        stat = os.stat(self.path)
+        os.utime(self.path, (stat.st_atime, stat.st_mtime + 10))
+        second = self.pool.acquire(self.path)
+        self.assertNotEqual(first, second)
+        self.assertFalse(os.path.exists(first))
+
+        # Copies in use are not removed.
+        self.pool.clear()
+        self.assertTrue(os.path.exists(second))
+        self.pool.release(second, reuse=True)
+        self.pool.clear()
+        self.assertFalse(os.path.exists(second))
+
+    def test_copy_pool_release_no_reuse(self):
+        """Tests that copies of DLLs that were not closed are never reused.
+
+        Args:
+          self (TestTemporaryCopyPool): the ``TestTemporaryCopyPool`` instance
+
+        Returns:
+          ``None``
+        """
+        first = self.pool.acquire(self.path)
+        self.assertTrue(self.pool.release(first))
+        self.assertFalse(os.path.exists(first))
+
+        second = self.pool.acquire(self.path)
+        self.addCleanup(os.remove, second)
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.read(self.path), self.read(second))
+
+    @mock.patch('os.copy_file_range', create=True)
+    def test_copy_pool_copy_fallback(self, mock_copy_file_range):
+        """Tests copying a file when ``copy_file_range()`` is not supported.
+
+        Args:
+          self (TestTemporaryCopyPool): the ``TestTemporaryCopyPool`` instance
+          mock_copy_file_range (Mock): mock for ``os.copy_file_range()``
+
+        Returns:
+          ``None``
+        """
+        mock_copy_file_range.side_effect = OSError()
+
+        dst = os.path.join(self.directory, 'copy.so')
+        library.TemporaryCopyPool.copy(self.path, dst)
+        self.assertEqual(self.read(self.path), self.read(dst))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,341 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from pylink.errors import JLinkRTTException
+import pylink.rtt_async as rtt_async
+
+import asyncio
+import threading
+import unittest
+
+
+class SimulatedRTT(object):
+    """Simulates the RTT channels of a J-Link."""
+
+    def __init__(self, down_size=4):
+        """Initializes the simulated channels.
+
+        Args:
+          self (SimulatedRTT): the ``SimulatedRTT`` instance
+          down_size (int): number of bytes a down buffer accepts per write
+
+        Returns:
+          ``None``
+        """
+        self.up = {}
+        self.down = {}
+        self.down_size = down_size
+        self.threads = set()
+        self.started = None
+        self.fail = False
+
+    def send(self, index, data):
+        """Adds data to an up buffer, as if written by the target.
+
+        Args:
+          self (SimulatedRTT): the ``SimulatedRTT`` instance
+          index (int): index of the up buffer
+          data (bytes): the data
+
+        Returns:
+          ``None``
+        """
+        self.up.setdefault(index, bytearray()).extend(data)
+
+    def rtt_start(self, block_address=None):
+        """Simulates ``JLink.rtt_start()``.
+
+        Args:
+          self (SimulatedRTT): the ``SimulatedRTT`` instance
+          block_address (int): optional address of the control block
+
+        Returns:
+          ``None``
+        """
+        self.threads.add(threading.current_thread().ident)
+        self.started = block_address
+
+    def rtt_read(self, index, num_bytes):
+        """Simulates ``JLink.rtt_read()``.
+
+        Args:
+          self (SimulatedRTT): the ``SimulatedRTT`` instance
+          index (int): index of the up buffer
+          num_bytes (int): maximum number of bytes to read
+
+        Returns:
+          A list of bytes read.
+        """
+        self.threads.add(threading.current_thread().ident)
+        if self.fail:
+            raise JLinkRTTException(-1)
+        buf = self.up.setdefault(index, bytearray())
+        data = list(buf[:num_bytes])
+        del buf[:num_bytes]
+        return data
+
+    def rtt_write(self, index, data):
+        """Simulates ``JLink.rtt_write()``, accepting only part of the data.
+
+        Args:
+          self (SimulatedRTT): the ``SimulatedRTT`` instance
+          index (int): index of the down buffer
+          data (bytes): the data to write
+
+        Returns:
+          The number of bytes written.
+        """
+        self.threads.add(threading.current_thread().ident)
+        data = data[:self.down_size]
+        self.down.setdefault(index, bytearray()).extend(data)
+        return len(data)
+
+
+class TestRTTAsync(unittest.TestCase):
+    """Tests the `rtt_async` submodule."""
+
+    def setUp(self):
+        """Called before each test.
+
+        Performs setup.
+
+        Args:
+          self (TestRTTAsync): the `TestRTTAsync` instance
+
+        Returns:
+          `None`
+        """
+        self.jlink = SimulatedRTT()
+
+    def tearDown(self):
+        """Called after each test.
+
+        Performs teardown.
+
+        Args:
+          self (TestRTTAsync): the `TestRTTAsync` instance
+
+        Returns:
+          `None`
+        """
+        pass
+
+    def run_async(self, coro):
+        """Runs a coroutine to completion with a timeout.
+
+        Args:
+          self (TestRTTAsync): the `TestRTTAsync` instance
+          coro (coroutine): the coroutine
+
+        Returns:
+          The return value of the coroutine.
+        """
+        return asyncio.run(asyncio.wait_for(coro, 5.0))
+
+    def test_rtt_async_invalid(self):
+        """Tests creating a poller with invalid arguments.
+
+        Args:
+          self (TestRTTAsync): the `TestRTTAsync` instance
+
+        Returns:
+          `None`
+        """
+        with self.assertRaises(ValueError):
+            rtt_async.RTTPoller(self.jlink, min_interval=0.1, max_interval=0.01)
+
+        with self.assertRaises(ValueError):
+            rtt_async.RTTPoller(self.jlink, read_size=0)
+
+    def test_rtt_async_read(self):
+        """Tests reading the up buffers of several channels.
+
+        Args:
+          self (TestRTTAsync): the `TestRTTAsync` instance
+
+        Returns:
+          `None`
+        """
+        async def run():
+            poller = await rtt_async.open_rtt(self.jlink, 0x20000000, read_size=3)
+            async with poller:
+                terminal = poller.reader(0)
+                data = poller.reader(1)
+                self.jlink.send(0, b'hello\nworld\n')
+                self.jlink.send(1, b'\x01\x02\x03\x04\x05')
+
+                self.assertEqual(b'hello\n', await terminal.readline())
+                self.assertEqual(b'\x01\x02\x03\x04', await data.readexactly(4))
+                self.assertEqual(b'world\n', await terminal.readuntil(b'\n'))
+                self.assertEqual(b'\x05', await data.read())
+
+                self.jlink.send(0, b'end')
+                self.assertEqual(b'e', await terminal.read(1))
+
+            self.assertFalse(poller.running)
+            self.assertEqual(b'nd', await terminal.read())
+            self.assertEqual(b'', await terminal.read())
+            self.assertTrue(terminal.at_eof())
+            lines = [line async for line in terminal]
+            self.assertEqual([], lines)
+
+        self.run_async(run())
+        self.assertEqual(0x20000000, self.jlink.started)
+        self.assertEqual(1, len(self.jlink.threads))
+        self.assertNotIn(threading.current_thread().ident, self.jlink.threads)
+
+    def test_rtt_async_write(self):
+        """Tests that writes are retried until every byte is accepted.
+
+        Args:
+          self (TestRTTAsync): the `TestRTTAsync` instance
+
+        Returns:
+          `None`
+        """
+        async def run():
+            async with rtt_async.RTTPoller(self.jlink) as poller:
+                writer = poller.writer(0)
+                writer.write(b'0123456789')
+                writer.writelines([b'ab', b'cd'])
+                self.assertEqual(14, writer.pending)
+                await writer.drain()
+                self.assertEqual(0, writer.pending)
+                self.assertEqual(b'0123456789abcd', bytes(self.jlink.down[0]))
+
+                writer.write(b'xyz')
+                writer.close()
+                self.assertTrue(writer.is_closing())
+                with self.assertRaises(RuntimeError):
+                    writer.write(b'!')
+                await writer.wait_closed()
+
+            self.assertEqual(b'0123456789abcdxyz', bytes(self.jlink.down[0]))
+
+        self.run_async(run())
+
+    def test_rtt_async_close_pending(self):
+        """Tests that closing fails writes that the target does not accept.
+
+        Args:
+          self (TestRTTAsync): the `TestRTTAsync` instance
+
+        Returns:
+          `None`
+        """
+        self.jlink.down_size = 0
+
+        async def run():
+            poller = rtt_async.RTTPoller(self.jlink)
+            poller.start()
+            writer = poller.writer(0)
+            writer.write(b'data')
+            drain = asyncio.ensure_future(writer.drain())
+            await poller.close()
+            with self.assertRaises(ConnectionResetError):
+                await drain
+
+        self.run_async(run())
+
+    def test_rtt_async_interval(self):
+        """Tests that the poll interval backs off while idle.
+
+        Args:
+          self (TestRTTAsync): the `TestRTTAsync` instance
+
+        Returns:
+          `None`
+        """
+        async def run():
+            async with rtt_async.RTTPoller(self.jlink, min_interval=0.001, max_interval=0.008) as poller:
+                reader = poller.reader(0)
+                await asyncio.sleep(0.1)
+                self.assertEqual(0.008, poller.interval)
+
+                ticks = poller.ticks
+                self.jlink.send(0, b'x')
+                self.assertEqual(b'x', await reader.read())
+                self.assertGreater(poller.ticks, ticks)
+
+        self.run_async(run())
+
+    def test_rtt_async_backpressure(self):
+        """Tests that a reader over its limit stops its channel being read.
+
+        Args:
+          self (TestRTTAsync): the `TestRTTAsync` instance
+
+        Returns:
+          `None`
+        """
+        async def run():
+            async with rtt_async.RTTPoller(self.jlink, read_size=4, limit=8) as poller:
+                reader = poller.reader(0)
+                self.jlink.send(0, bytes(range(32)))
+                while not reader.paused:
+                    await asyncio.sleep(0.001)
+                await asyncio.sleep(0.02)
+                self.assertEqual(32 - 12, len(self.jlink.up[0]))
+
+                # Waiting for more than the limit resumes reading.
+                self.assertEqual(bytes(range(32)), await reader.readexactly(32))
+
+        self.run_async(run())
+
+    def test_rtt_async_error(self):
+        """Tests that a failed transfer ends the readers with the error.
+
+        Args:
+          self (TestRTTAsync): the `TestRTTAsync` instance
+
+        Returns:
+          `None`
+        """
+        async def run():
+            async with rtt_async.RTTPoller(self.jlink) as poller:
+                reader = poller.reader(0)
+                self.jlink.send(0, b'ok')
+                self.assertEqual(b'ok', await reader.read())
+
+                self.jlink.fail = True
+                with self.assertRaises(JLinkRTTException):
+                    await reader.read()
+                self.assertIsInstance(reader.exception(), JLinkRTTException)
+
+        self.run_async(run())
+
+    def test_rtt_async_cancel(self):
+        """Tests that a cancelled read does not disturb the poller.
+
+        Args:
+          self (TestRTTAsync): the `TestRTTAsync` instance
+
+        Returns:
+          `None`
+        """
+        async def run():
+            async with rtt_async.RTTPoller(self.jlink) as poller:
+                reader = poller.reader(0)
+                with self.assertRaises(asyncio.TimeoutError):
+                    await asyncio.wait_for(reader.read(), 0.02)
+
+                self.jlink.send(0, b'after')
+                self.assertEqual(b'after', await reader.read())
+                self.assertTrue(poller.running)
+
+        self.run_async(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,349 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from pylink.errors import JLinkRTTException
+import pylink.rtt_async as rtt_async
+import pylink.rtt_host as rtt_host
+
+import asyncio
+import collections
+import struct
+import unittest
+
+
+class SimulatedTarget(object):
+    """Simulates target RAM holding an RTT control block."""
+
+    RAM = 0x20000000
+
+    def __init__(self, block_address, up_sizes=(16, 8), down_sizes=(8,), ram_size=0x2000):
+        """Initializes the simulated target.
+
+        Args:
+          self (SimulatedTarget): the ``SimulatedTarget`` instance
+          block_address (int): address to place the control block at
+          up_sizes (list): sizes of the up buffers
+          down_sizes (list): sizes of the down buffers
+          ram_size (int): size of the RAM in bytes
+
+        Returns:
+          ``None``
+        """
+        self.memory = bytearray(ram_size)
+        self.calls = collections.Counter()
+        self.block_address = block_address
+
+        # Place the names and buffers after the control block.
+        sizes = list(up_sizes) + list(down_sizes)
+        addr = block_address + 24 + 24 * len(sizes)
+        self.descriptors = []
+        for (index, size) in enumerate(sizes):
+            name = addr
+            self.poke(name, b'Buffer%d\x00' % index)
+            buf = name + 16
+            addr = buf + size
+            desc = block_address + 24 + 24 * index
+            self.poke(desc, struct.pack('<IIIIII', name, buf, size, 0, 0, index))
+            self.descriptors.append(desc)
+
+        self.num_up = len(up_sizes)
+        self.poke(block_address, b'SEGGER RTT\x00\x00\x00\x00\x00\x00')
+        self.poke(block_address + 16, struct.pack('<II', len(up_sizes), len(down_sizes)))
+
+    def poke(self, addr, data):
+        """Writes data to the simulated RAM.
+
+        Args:
+          self (SimulatedTarget): the ``SimulatedTarget`` instance
+          addr (int): the address
+          data (bytes): the data
+
+        Returns:
+          ``None``
+        """
+        self.memory[addr - self.RAM:addr - self.RAM + len(data)] = data
+
+    def peek(self, addr, num_bytes):
+        """Reads data from the simulated RAM.
+
+        Args:
+          self (SimulatedTarget): the ``SimulatedTarget`` instance
+          addr (int): the address
+          num_bytes (int): the number of bytes
+
+        Returns:
+          The ``bytes`` read.
+        """
+        return bytes(self.memory[addr - self.RAM:addr - self.RAM + num_bytes])
+
+    def descriptor(self, desc):
+        """Reads a buffer descriptor.
+
+        Args:
+          self (SimulatedTarget): the ``SimulatedTarget`` instance
+          desc (int): address of the descriptor
+
+        Returns:
+          A tuple of the descriptor's words.
+        """
+        return struct.unpack('<IIIIII', self.peek(desc, 24))
+
+    def target_write(self, index, data):
+        """Writes data to an up buffer, as the target does.
+
+        Args:
+          self (SimulatedTarget): the ``SimulatedTarget`` instance
+          index (int): index of the up buffer
+          data (bytes): the data
+
+        Returns:
+          ``None``
+        """
+        desc = self.descriptors[index]
+        (_, buf, size, write_offset, _, _) = self.descriptor(desc)
+        for byte in bytearray(data):
+            self.poke(buf + write_offset, bytes(bytearray([byte])))
+            write_offset = (write_offset + 1) % size
+        self.poke(desc + 12, struct.pack('<I', write_offset))
+
+    def target_read(self, index):
+        """Reads all of the data in a down buffer, as the target does.
+
+        Args:
+          self (SimulatedTarget): the ``SimulatedTarget`` instance
+          index (int): index of the down buffer
+
+        Returns:
+          The ``bytes`` read.
+        """
+        desc = self.descriptors[self.num_up + index]
+        (_, buf, size, write_offset, read_offset, _) = self.descriptor(desc)
+        data = bytearray()
+        while read_offset != write_offset:
+            data += self.peek(buf + read_offset, 1)
+            read_offset = (read_offset + 1) % size
+        self.poke(desc + 16, struct.pack('<I', read_offset))
+        return bytes(data)
+
+    def memory_iter(self, addr, num_bytes, chunk_size=0x1000, skip_errors=False):
+        """Simulates ``JLink.memory_iter()``."""
+        self.calls['memory_iter'] += 1
+        for pos in range(addr, addr + num_bytes, chunk_size):
+            yield self.peek(pos, min(chunk_size, addr + num_bytes - pos))
+
+    def memory_read_bytes(self, addr, num_bytes):
+        """Simulates ``JLink.memory_read_bytes()``."""
+        self.calls['memory_read_bytes'] += 1
+        return self.peek(addr, num_bytes)
+
+    def memory_read32(self, addr, num_words):
+        """Simulates ``JLink.memory_read32()``."""
+        self.calls['memory_read32'] += 1
+        return list(struct.unpack('<%dI' % num_words, self.peek(addr, num_words * 4)))
+
+    def memory_read_many(self, requests):
+        """Simulates ``JLink.memory_read_many()``."""
+        self.calls['memory_read_many'] += 1
+        return [list(bytearray(self.peek(addr, num_bytes))) for (addr, num_bytes) in requests]
+
+    def memory_write8(self, addr, data):
+        """Simulates ``JLink.memory_write8()``."""
+        self.calls['memory_write8'] += 1
+        self.poke(addr, bytes(bytearray(data)))
+        return len(data)
+
+    def memory_write32(self, addr, data):
+        """Simulates ``JLink.memory_write32()``."""
+        self.calls['memory_write32'] += 1
+        self.poke(addr, struct.pack('<%dI' % len(data), *data))
+        return len(data)
+
+
+class TestHostRTT(unittest.TestCase):
+    """Tests the `rtt_host` submodule."""
+
+    def setUp(self):
+        """Called before each test.
+
+        Performs setup.
+
+        Args:
+          self (TestHostRTT): the `TestHostRTT` instance
+
+        Returns:
+          `None`
+        """
+        # The control block spans the boundary between two scanned chunks.
+        self.target = SimulatedTarget(0x20000FFA)
+        self.rtt = rtt_host.HostRTT(self.target)
+
+    def tearDown(self):
+        """Called after each test.
+
+        Performs teardown.
+
+        Args:
+          self (TestHostRTT): the `TestHostRTT` instance
+
+        Returns:
+          `None`
+        """
+        pass
+
+    def test_host_rtt_start(self):
+        """Tests locating the control block and caching its descriptors.
+
+        Args:
+          self (TestHostRTT): the `TestHostRTT` instance
+
+        Returns:
+          `None`
+        """
+        # A stray identifier without a valid header is skipped.
+        self.target.poke(0x20000010, b'SEGGER RTT\x00\x00\x00\x00\x00\x00\xff\xff\xff\xff')
+
+        self.rtt.rtt_start(search_ranges=[(0x20000000, 0x2000)])
+        self.assertEqual(0x20000FFA, self.rtt.block_address)
+        self.assertEqual(2, self.rtt.rtt_get_num_up_buffers())
+        self.assertEqual(1, self.rtt.rtt_get_num_down_buffers())
+
+        desc = self.rtt.rtt_get_buf_descriptor(1, True)
+        self.assertEqual(b'Buffer1', desc.acName)
+        self.assertEqual(8, desc.SizeOfBuffer)
+        self.assertTrue(desc.up)
+
+        desc = self.rtt.rtt_get_buf_descriptor(0, False)
+        self.assertEqual(b'Buffer2', desc.acName)
+        self.assertTrue(desc.down)
+
+        with self.assertRaises(JLinkRTTException):
+            self.rtt.rtt_get_buf_descriptor(1, False)
+
+        # The descriptors are read once, with the names in a single batch.
+        self.assertEqual(1, self.target.calls['memory_read32'])
+        self.assertEqual(1, self.target.calls['memory_read_many'])
+
+        self.rtt.rtt_stop()
+        self.assertIsNone(self.rtt.block_address)
+        with self.assertRaises(JLinkRTTException):
+            self.rtt.rtt_read(0, 1)
+
+    def test_host_rtt_start_address(self):
+        """Tests starting with a given or a wrong control block address.
+
+        Args:
+          self (TestHostRTT): the `TestHostRTT` instance
+
+        Returns:
+          `None`
+        """
+        self.rtt.rtt_start(0x20000FFA)
+        self.assertEqual(0, self.target.calls['memory_iter'])
+        self.assertEqual(2, self.rtt.rtt_get_num_up_buffers())
+
+        with self.assertRaises(JLinkRTTException):
+            self.rtt.rtt_start(0x20000000)
+
+        with self.assertRaises(JLinkRTTException):
+            self.rtt.rtt_start(search_ranges=[(0x20000000, 0x800)])
+
+    def test_host_rtt_read(self):
+        """Tests reading the up buffers, including wrapped data.
+
+        Args:
+          self (TestHostRTT): the `TestHostRTT` instance
+
+        Returns:
+          `None`
+        """
+        self.rtt.rtt_start(0x20000FFA)
+        self.assertEqual([], self.rtt.rtt_read(0, 4))
+
+        self.target.target_write(0, b'0123456789')
+        self.target.target_write(1, b'abc')
+        self.assertEqual(list(b'0123'), self.rtt.rtt_read(0, 4))
+
+        # Both up buffers were serviced by the poll.
+        self.target.calls.clear()
+        self.assertEqual(list(b'abc'), self.rtt.rtt_read(1, 16))
+        self.assertEqual(list(b'456789'), self.rtt.rtt_read(0, 6))
+        self.assertEqual(0, self.target.calls['memory_read_many'])
+
+        # The data wraps around the end of the buffer.
+        self.target.target_write(0, b'ABCDEFGHIJ')
+        self.target.calls.clear()
+        self.assertEqual(10, self.rtt.poll())
+        self.assertEqual(1, self.target.calls['memory_read32'])
+        self.assertEqual(1, self.target.calls['memory_read_many'])
+        self.assertEqual(1, self.target.calls['memory_write32'])
+        self.assertEqual(list(b'ABCDEFGHIJ'), self.rtt.rtt_read(0, 32))
+
+        (_, _, _, write_offset, read_offset, _) = self.target.descriptor(self.target.descriptors[0])
+        self.assertEqual(write_offset, read_offset)
+
+        self.target.poke(self.target.descriptors[1] + 12, struct.pack('<I', 100))
+        with self.assertRaises(JLinkRTTException):
+            self.rtt.poll()
+
+    def test_host_rtt_write(self):
+        """Tests writing to a down buffer until it is full.
+
+        Args:
+          self (TestHostRTT): the `TestHostRTT` instance
+
+        Returns:
+          `None`
+        """
+        self.rtt.rtt_start(0x20000FFA)
+
+        # One byte of the 8 byte buffer is always left free.
+        self.assertEqual(7, self.rtt.rtt_write(0, b'0123456789'))
+        self.assertEqual(0, self.rtt.rtt_write(0, b'89'))
+        self.assertEqual(b'0123456', self.target.target_read(0))
+
+        # The data wraps around the end of the buffer.
+        self.target.calls.clear()
+        self.assertEqual(3, self.rtt.rtt_write(0, [0x61, 0x62, 0x63]))
+        self.assertEqual(2, self.target.calls['memory_write8'])
+        self.assertEqual(1, self.target.calls['memory_write32'])
+        self.assertEqual(b'abc', self.target.target_read(0))
+
+        with self.assertRaises(JLinkRTTException):
+            self.rtt.rtt_write(1, b'x')
+
+    def test_host_rtt_poller(self):
+        """Tests using the host-side RTT in place of the J-Link's.
+
+        Args:
+          self (TestHostRTT): the `TestHostRTT` instance
+
+        Returns:
+          `None`
+        """
+        self.target.target_write(0, b'hello\n')
+
+        async def run():
+            poller = await rtt_async.open_rtt(self.rtt, 0x20000FFA)
+            async with poller:
+                self.assertEqual(b'hello\n', await poller.reader(0).readline())
+                writer = poller.writer(0)
+                writer.write(b'hi')
+                await writer.drain()
+
+        asyncio.run(asyncio.wait_for(run(), 5.0))
+        self.assertEqual(b'hi', self.target.target_read(0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pylink.snapshot as snapshot
+
+import unittest
+
+
+class TestRegisterSnapshot(unittest.TestCase):
+    """Unit test class for the ``snapshot`` submodule."""
+
+    def setUp(self):
+        """Called before each test.
+
+        Performs setup.
+
+        Args:
+          self (TestRegisterSnapshot): the ``TestRegisterSnapshot`` instance
+
+        Returns:
+          ``None``
+        """
+        self.snapshot = snapshot.RegisterSnapshot(['R0', 'SP', 'PC'], [0, 13, 15], [1, 2, 3])
+
+    def tearDown(self):
+        """Called after each test.
+
+        Performs teardown.
+
+        Args:
+          self (TestRegisterSnapshot): the ``TestRegisterSnapshot`` instance
+
+        Returns:
+          ``None``
+        """
+        pass
+
+    def test_register_snapshot_invalid(self):
+        """Tests creating a snapshot with mismatched lengths.
+
+        Args:
+          self (TestRegisterSnapshot): the ``TestRegisterSnapshot`` instance
+
+        Returns:
+          ``None``
+        """
+        with self.assertRaises(ValueError):
+            snapshot.RegisterSnapshot(['R0'], [0], [])
+
+        with self.assertRaises(ValueError):
+            snapshot.RegisterSnapshot(['R0'], [], [0])
+
+    def test_register_snapshot_mapping(self):
+        """Tests the snapshot behaves as an immutable mapping.
+
+        Args:
+          self (TestRegisterSnapshot): the ``TestRegisterSnapshot`` instance
+
+        Returns:
+          ``None``
+        """
+        self.assertEqual(3, len(self.snapshot))
+        self.assertEqual(['R0', 'SP', 'PC'], list(self.snapshot))
+        self.assertEqual(3, self.snapshot['PC'])
+        self.assertEqual({'R0': 1, 'SP': 2, 'PC': 3}, self.snapshot)
+        self.assertEqual(13, self.snapshot.index('SP'))
+        self.assertEqual((0, 13, 15), self.snapshot.indices)
+        self.assertEqual('RegisterSnapshot(R0=0x00000001, SP=0x00000002, PC=0x00000003)', repr(self.snapshot))
+
+        with self.assertRaises(KeyError):
+            self.snapshot['LR']
+
+        with self.assertRaises(TypeError):
+            self.snapshot['PC'] = 0
+
+        with self.assertRaises(AttributeError):
+            self.snapshot.foo = 0
+
+    def test_register_snapshot_diff(self):
+        """Tests comparing snapshots.
+
+        Args:
+          self (TestRegisterSnapshot): the ``TestRegisterSnapshot`` instance
+
+        Returns:
+          ``None``
+        """
+        self.assertEqual({}, self.snapshot.diff(self.snapshot))
+
+        other = snapshot.RegisterSnapshot(['R0', 'PC', 'LR'], [0, 15, 14], [1, 4, 5])
+        self.assertEqual({'SP': (None, 2), 'PC': (4, 3), 'LR': (5, None)}, self.snapshot.diff(other))
+
+    def test_register_snapshot_replace(self):
+        """Tests replacing register values in a snapshot.
+
+        Args:
+          self (TestRegisterSnapshot): the ``TestRegisterSnapshot`` instance
+
+        Returns:
+          ``None``
+        """
+        other = self.snapshot.replace(PC=0x100)
+        self.assertEqual(0x100, other['PC'])
+        self.assertEqual(3, self.snapshot['PC'])
+        self.assertEqual(self.snapshot.indices, other.indices)
+        self.assertEqual({'PC': (3, 0x100)}, other.diff(self.snapshot))
+
+        with self.assertRaises(KeyError):
+            self.snapshot.replace(LR=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
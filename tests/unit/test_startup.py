@@ -0,0 +1,138 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pylink
+
+import os
+import subprocess
+import sys
+import unittest
+
+
+class TestStartup(unittest.TestCase):
+    """Tests the start-up of the package and command-line interface.
+
+    Each entry point is run in a fresh interpreter with ``-X importtime``, and
+    the modules it imports are checked, so that changes pulling the J-Link
+    wrapper, or its dependencies, back into the start-up path are caught.
+    """
+
+    # Modules that must not be imported until a J-Link is used.
+    HEAVY_MODULES = ['pylink.jlink', 'pylink.library', 'pylink.structs', 'psutil']
+
+    def setUp(self):
+        """Called before each test.
+
+        Performs setup.
+
+        Args:
+          self (TestStartup): the ``TestStartup`` instance
+
+        Returns:
+          ``None``
+        """
+        root = os.path.dirname(os.path.dirname(os.path.abspath(pylink.__file__)))
+        self.env = dict(os.environ)
+        self.env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, self.env.get('PYTHONPATH')]))
+
+    def tearDown(self):
+        """Called after each test.
+
+        Performs teardown.
+
+        Args:
+          self (TestStartup): the ``TestStartup`` instance
+
+        Returns:
+          ``None``
+        """
+        pass
+
+    def importtime(self, *args):
+        """Runs Python with ``-X importtime`` and the given arguments.
+
+        Args:
+          self (TestStartup): the ``TestStartup`` instance
+          args (list): arguments to pass to the interpreter
+
+        Returns:
+          A dictionary mapping each imported module to its cumulative import
+          time in microseconds.
+        """
+        command = [sys.executable, '-X', 'importtime'] + list(args)
+        result = subprocess.run(command, env=self.env, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE, universal_newlines=True)
+        self.assertEqual(0, result.returncode, result.stderr)
+
+        modules = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or '[us]' in line:
+                continue
+            (_, cumulative, name) = line.split('|')
+            modules[name.strip()] = int(cumulative)
+
+        return modules
+
+    def test_startup_import(self):
+        """Tests that importing the package does not import its submodules.
+
+        Args:
+          self (TestStartup): the ``TestStartup`` instance
+
+        Returns:
+          ``None``
+        """
+        modules = self.importtime('-c', 'import pylink')
+        self.assertIn('pylink', modules)
+        for module in self.HEAVY_MODULES:
+            self.assertNotIn(module, modules)
+
+        modules = self.importtime('-c', 'import pylink; pylink.JLinkInterfaces')
+        self.assertIn('pylink.enums', modules)
+        self.assertNotIn('pylink.jlink', modules)
+
+    def test_startup_cli_help(self):
+        """Tests that the command-line help does not import the J-Link wrapper.
+
+        Args:
+          self (TestStartup): the ``TestStartup`` instance
+
+        Returns:
+          ``None``
+        """
+        modules = self.importtime('-m', 'pylink', '--help')
+        self.assertIn('pylink', modules)
+        for module in self.HEAVY_MODULES:
+            self.assertNotIn(module, modules)
+
+    @unittest.skipUnless(os.environ.get('PYLINK_BENCHMARK'), 'set PYLINK_BENCHMARK to run benchmarks')
+    def test_startup_benchmark(self):
+        """Benchmarks importing the package against importing the J-Link
+        wrapper.
+
+        Args:
+          self (TestStartup): the ``TestStartup`` instance
+
+        Returns:
+          ``None``
+        """
+        package_time = min(self.importtime('-c', 'import pylink')['pylink'] for _ in range(3))
+        jlink_time = min(self.importtime('-c', 'import pylink.jlink')['pylink.jlink'] for _ in range(3))
+
+        # Importing the package must cost a fraction of the J-Link wrapper.
+        self.assertLess(package_time * 4, jlink_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,285 @@
+# Copyright 2018 Square, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from pylink.errors import JLinkException
+import pylink.swo as swo
+
+import threading
+import time
+import unittest
+
+
+class SimulatedSWO(object):
+    """Simulates the SWO buffer of a J-Link."""
+
+    def __init__(self):
+        """Initializes the simulated SWO buffer.
+
+        Args:
+          self (SimulatedSWO): the ``SimulatedSWO`` instance
+
+        Returns:
+          ``None``
+        """
+        self.pending = bytearray()
+        self.lock = threading.Lock()
+        self.fail = False
+
+    def feed(self, data):
+        """Adds data to the SWO buffer, as if sent by the target.
+
+        Args:
+          self (SimulatedSWO): the ``SimulatedSWO`` instance
+          data (bytes): the data to add
+
+        Returns:
+          ``None``
+        """
+        with self.lock:
+            self.pending.extend(data)
+
+    def swo_num_bytes(self):
+        """Simulates ``JLink.swo_num_bytes()``.
+
+        Args:
+          self (SimulatedSWO): the ``SimulatedSWO`` instance
+
+        Returns:
+          Number of bytes in the SWO buffer.
+        """
+        if self.fail:
+            raise JLinkException(-1)
+        with self.lock:
+            return len(self.pending)
+
+    def swo_read_into(self, buf, offset=0, remove=False):
+        """Simulates ``JLink.swo_read_into()``.
+
+        Args:
+          self (SimulatedSWO): the ``SimulatedSWO`` instance
+          buf (memoryview): buffer to read into
+          offset (int): offset of first byte to be retrieved
+          remove (bool): if data should be removed from buffer after read
+
+        Returns:
+          The number of bytes read.
+        """
+        with self.lock:
+            data = self.pending[offset:offset + len(buf)]
+            buf[:len(data)] = data
+            if remove:
+                del self.pending[:len(data)]
+            return len(data)
+
+    def drain(self, timeout=5.0):
+        """Waits for the SWO buffer to be drained.
+
+        Args:
+          self (SimulatedSWO): the ``SimulatedSWO`` instance
+          timeout (float): maximum number of seconds to wait
+
+        Returns:
+          ``None``
+        """
+        deadline = time.monotonic() + timeout
+        while self.swo_num_bytes() > 0 and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+
+class TestSWOStream(unittest.TestCase):
+    """Tests the `swo` submodule."""
+
+    def setUp(self):
+        """Called before each test.
+
+        Performs setup.
+
+        Args:
+          self (TestSWOStream): the `TestSWOStream` instance
+
+        Returns:
+          `None`
+        """
+        self.jlink = SimulatedSWO()
+
+    def tearDown(self):
+        """Called after each test.
+
+        Performs teardown.
+
+        Args:
+          self (TestSWOStream): the `TestSWOStream` instance
+
+        Returns:
+          `None`
+        """
+        pass
+
+    def test_swo_stream_invalid(self):
+        """Tests creating a stream with invalid arguments.
+
+        Args:
+          self (TestSWOStream): the `TestSWOStream` instance
+
+        Returns:
+          `None`
+        """
+        with self.assertRaises(ValueError):
+            swo.SWOStream(self.jlink, buffer_size=0)
+
+        with self.assertRaises(ValueError):
+            swo.SWOStream(self.jlink, chunk_size=0)
+
+        with self.assertRaises(ValueError):
+            swo.SWOStream(self.jlink, min_interval=0.1, max_interval=0.01)
+
+    def test_swo_stream_read(self):
+        """Tests that data is streamed in order across the ring buffer.
+
+        Args:
+          self (TestSWOStream): the `TestSWOStream` instance
+
+        Returns:
+          `None`
+        """
+        expected = bytes(i & 0xFF for i in range(1000))
+        received = bytearray()
+
+        with swo.SWOStream(self.jlink, buffer_size=64, chunk_size=24) as stream:
+            self.assertTrue(stream.running)
+            for pos in range(0, len(expected), 40):
+                self.jlink.feed(expected[pos:pos + 40])
+                while len(received) < min(pos + 40, len(expected)):
+                    received.extend(stream.read(timeout=1.0))
+
+        self.assertFalse(stream.running)
+        self.assertEqual(expected, bytes(received))
+        self.assertEqual(len(expected), stream.bytes_read)
+        self.assertEqual(0, stream.overflows)
+        self.assertEqual(0, stream.dropped)
+
+    def test_swo_stream_readinto(self):
+        """Tests reading into a caller-provided buffer.
+
+        Args:
+          self (TestSWOStream): the `TestSWOStream` instance
+
+        Returns:
+          `None`
+        """
+        stream = swo.SWOStream(self.jlink, buffer_size=8, chunk_size=8)
+        self.jlink.feed(b'abcdef')
+        stream.start()
+        self.jlink.drain()
+
+        buf = bytearray(4)
+        self.assertEqual(4, stream.readinto(buf, timeout=1.0))
+        self.assertEqual(b'abcd', bytes(buf))
+        self.assertEqual(2, len(stream))
+
+        self.jlink.feed(b'ghij')
+        self.jlink.drain()
+        stream.stop()
+
+        self.assertEqual(b'efg', stream.read(3))
+        self.assertEqual(b'hij', stream.read())
+        self.assertEqual(0, stream.readinto(buf, timeout=0.01))
+        self.assertEqual(b'', stream.read(timeout=0.01))
+
+    def test_swo_stream_overflow(self):
+        """Tests that the oldest data is dropped when the buffer is full.
+
+        Args:
+          self (TestSWOStream): the `TestSWOStream` instance
+
+        Returns:
+          `None`
+        """
+        data = bytes(range(100))
+        self.jlink.feed(data)
+
+        stream = swo.SWOStream(self.jlink, buffer_size=16, chunk_size=8)
+        stream.start()
+        self.jlink.drain()
+        stream.stop()
+
+        self.assertEqual(data[-16:], stream.read())
+        self.assertEqual(100, stream.bytes_read)
+        self.assertEqual(84, stream.dropped)
+        self.assertGreater(stream.overflows, 0)
+
+    def test_swo_stream_iterate(self):
+        """Tests iterating over the data until the stream is stopped.
+
+        Args:
+          self (TestSWOStream): the `TestSWOStream` instance
+
+        Returns:
+          `None`
+        """
+        stream = swo.SWOStream(self.jlink)
+        self.jlink.feed(b'hello ')
+        stream.start()
+        self.jlink.drain()
+        self.jlink.feed(b'world')
+        self.jlink.drain()
+        stream.stop()
+
+        chunks = list(stream)
+        self.assertTrue(all(chunks))
+        self.assertEqual(b'hello world', b''.join(chunks))
+
+    def test_swo_stream_adaptive_interval(self):
+        """Tests that the poll interval backs off while idle.
+
+        Args:
+          self (TestSWOStream): the `TestSWOStream` instance
+
+        Returns:
+          `None`
+        """
+        stream = swo.SWOStream(self.jlink, min_interval=0.001, max_interval=0.2)
+        with stream:
+            deadline = time.monotonic() + 5.0
+            while stream.interval < 0.2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(0.2, stream.interval)
+
+            self.jlink.feed(b'x' * 10)
+            self.jlink.drain()
+            self.assertEqual(0.1, stream.interval)
+
+    def test_swo_stream_error(self):
+        """Tests that a failure of the reader thread is raised to readers.
+
+        Args:
+          self (TestSWOStream): the `TestSWOStream` instance
+
+        Returns:
+          `None`
+        """
+        stream = swo.SWOStream(self.jlink)
+        self.jlink.feed(b'abc')
+        stream.start()
+        self.jlink.drain()
+        self.jlink.fail = True
+
+        self.assertEqual(b'abc', stream.read(timeout=1.0))
+        with self.assertRaises(JLinkException):
+            stream.read(timeout=1.0)
+        self.assertFalse(stream.running)
+
+
+if __name__ == '__main__':
+    unittest.main()
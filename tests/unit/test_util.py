@@ -17,6 +17,8 @@ import pylink.util as util
 
 import mock
 
+import array
+import ctypes
 try:
     import StringIO
 except ImportError:
@@ -175,6 +177,55 @@ class TestUtil(unittest.TestCase):
         self.assertEqual(None, util.flash_progress_callback('Erase', '', 0))
         self.assertTrue(len(stream.getvalue()) > 0)
 
+    @mock.patch('time.sleep')
+    def test_poll(self, mock_sleep):
+        """Tests polling spins first, then backs off exponentially.
+
+        Args:
+          self (TestUtil): the `TestUtil` instance
+          mock_sleep (Mock): mocked `time.sleep()` function
+
+        Returns:
+          `None`
+        """
+        results = [None] * 8 + ['done']
+        func = mock.Mock(side_effect=results)
+
+        self.assertEqual('done', util.poll(func, spins=2, interval=0.01, max_interval=0.04))
+        self.assertEqual(9, func.call_count)
+        delays = [c[0][0] for c in mock_sleep.call_args_list]
+        self.assertEqual([0.01, 0.02, 0.04, 0.04, 0.04, 0.04], delays)
+
+        mock_sleep.reset_mock()
+        self.assertEqual(0, util.poll(lambda: 0))
+        self.assertEqual(0, mock_sleep.call_count)
+
+    @mock.patch('time.monotonic')
+    @mock.patch('time.sleep')
+    def test_poll_deadline(self, mock_sleep, mock_monotonic):
+        """Tests that polling stops at the deadline.
+
+        Args:
+          self (TestUtil): the `TestUtil` instance
+          mock_sleep (Mock): mocked `time.sleep()` function
+          mock_monotonic (Mock): mocked `time.monotonic()` function
+
+        Returns:
+          `None`
+        """
+        mock_monotonic.side_effect = [9.0, 9.95, 10.0]
+        func = mock.Mock(return_value=None)
+
+        with self.assertRaises(TimeoutError):
+            util.poll(func, deadline=10.0, spins=1, interval=0.1)
+
+        self.assertEqual(3, func.call_count)
+
+        # The sleep is cut short by the deadline.
+        delays = [c[0][0] for c in mock_sleep.call_args_list]
+        self.assertEqual(1, len(delays))
+        self.assertAlmostEqual(0.05, delays[0])
+
     def test_calculate_parity(self):
         """Tests that the parity is properly calculated.
 
@@ -203,6 +254,67 @@ class TestUtil(unittest.TestCase):
         with self.assertRaises(ValueError):
             util.calculate_parity(-1)
 
+    def test_calculate_parity_implementations(self):
+        """Tests that the parity implementations agree with each other.
+
+        Args:
+          self (TestUtil): the `TestUtil` instance
+
+        Returns:
+          `None`
+        """
+        self.assertEqual(256, len(util.PARITY_TABLE))
+        self.assertEqual(0, util.PARITY_TABLE[0xFF])
+        self.assertEqual(1, util.PARITY_TABLE[0x80])
+
+        values = [0, 1, 3, 0x80, 0xFFFF, 0x10000, 0xFFFFFFFF, 0x100000001, (1 << 100) | 0x7]
+        for value in values:
+            expected = bin(value).count('1') & 1
+            self.assertEqual(expected, util._table_parity(value))
+            self.assertEqual(expected, util.calculate_parity(value))
+            if hasattr(int, 'bit_count'):
+                self.assertEqual(expected, util._bit_count_parity(value))
+
+    def test_calculate_parity_many(self):
+        """Tests calculating the parity of a sequence of numbers.
+
+        Args:
+          self (TestUtil): the `TestUtil` instance
+
+        Returns:
+          `None`
+        """
+        self.assertEqual([], util.calculate_parity_many([]))
+        self.assertEqual([1, 1, 0, 0], util.calculate_parity_many([1, 2, 3, 0xFFFFFFFF]))
+
+        values = array.array('I', [0x7, 0xDEADBEEF, 0x80000000])
+        self.assertEqual([1, 0, 1], util.calculate_parity_many(values))
+
+        values = (ctypes.c_uint32 * 2)(0x1, 0x3)
+        self.assertEqual([1, 0], util.calculate_parity_many(values))
+
+        values = (value for value in [0x1, 0x3, 0x7])
+        self.assertEqual([1, 0, 1], util.calculate_parity_many(values))
+        self.assertEqual([1, 0], util.calculate_parity_many(iter([0x10, 0x11])))
+
+    def test_calculate_parity_many_invalid(self):
+        """Tests that an exception is raised for invalid args to `parity_many`.
+
+        Args:
+          self (TestUtil): the `TestUtil` instance
+
+        Returns:
+          `None`
+        """
+        with self.assertRaises(ValueError):
+            util.calculate_parity_many([1, -1])
+
+        with self.assertRaises(ValueError):
+            util.calculate_parity_many(['4'])
+
+        with self.assertRaises(ValueError):
+            util.calculate_parity_many(value for value in [1, -1])
+
 
 if __name__ == '__main__':
     unittest.main()
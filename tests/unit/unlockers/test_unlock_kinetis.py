@@ -110,6 +110,15 @@ class TestUnlockKinetis(unittest.TestCase):
         with self.assertRaisesRegexp(NotImplementedError, 'JTAG'):
             unlock.unlock_kinetis(mock_jlink)
 
+        # The options of the SWD unlock are accepted, but not unknown ones.
+        timings = {}
+        with self.assertRaisesRegexp(NotImplementedError, 'JTAG'):
+            unlock.unlock_kinetis(mock_jlink, timeout=1.0, timings=timings)
+        self.assertEqual({}, timings)
+
+        with self.assertRaises(TypeError):
+            unlock.unlock_kinetis(mock_jlink, hold=1.0)
+
     @mock.patch('time.sleep')
     def test_unlock_kinetis_identify_failed(self, mock_sleep):
         """Tests that unlock Kinetis fails if device fails to identify.
@@ -220,10 +229,90 @@ class TestUnlockKinetis(unittest.TestCase):
         res = unlock.unlock_kinetis(mock_jlink)
         self.assertTrue(res)
 
+        # The target is held around reset for a second by default.
+        mock_sleep.assert_any_call(1.0)
+        self.assertEqual(2, mock_sleep.call_args_list.count(mock.call(1.0)))
+
         self.assertEqual(1, mock_jlink.reset.call_count)
         self.assertEqual(1, mock_jlink.set_reset_pin_low.call_count)
         self.assertEqual(1, mock_jlink.set_reset_pin_high.call_count)
 
+    @mock.patch('time.sleep')
+    def test_unlock_kinetis_timings(self, mock_sleep):
+        """Tests that unlock Kinetis records the timing of each phase.
+
+        Args:
+          self (TestUnlockKinetis): the `TestUnlockKinetis` instance
+          mock_sleep (Mock): mocked `time.sleep()` function
+
+        Returns:
+          `None`
+        """
+        mock_jlink = mock.Mock()
+        mock_jlink.tif = enums.JLinkInterfaces.SWD
+
+        flags = (0x2 << 28) | (0xBA01 << 12) | 1
+        mock_jlink.coresight_read.side_effect = [flags, 0x0]
+
+        ack = swd.Response.STATUS_ACK
+        mock_jlink.swd_write.return_value = 0
+
+        # Each poll reads once to make the data valid, then reads the flags,
+        # and each ACK'd read is followed by its parity.
+        mock_jlink.swd_read8.side_effect = [
+            ack, ack,            # Error clearing and select write requests.
+            ack, 0x0, ack, 0x1,  # Flash ready.
+            ack,                 # Mass erase request.
+            ack, 0x0, ack, 0x1,  # Mass erase acknowledged.
+            ack, 0x0, ack, 0x0,  # Mass erase done.
+        ]
+        mock_jlink.swd_read32.side_effect = [0x0, 0x2, 0x0, 0x1, 0x0, 0x0]
+
+        timings = {}
+        res = unlock.unlock_kinetis(mock_jlink, reset_hold=0.25, release_hold=0.5, timings=timings)
+        self.assertTrue(res)
+
+        mock_sleep.assert_any_call(0.25)
+        mock_sleep.assert_any_call(0.5)
+
+        phases = ['configure', 'reset_hold', 'select', 'flash_ready', 'erase_request',
+                  'erase', 'release_hold', 'reset', 'total']
+        self.assertEqual(sorted(phases), sorted(timings))
+        self.assertTrue(all(timings[phase] >= 0 for phase in phases))
+        self.assertTrue(timings['total'] >= sum(timings[phase] for phase in phases[:-1]) - 1e-6)
+
+    @mock.patch('time.sleep')
+    def test_unlock_kinetis_timeout(self, mock_sleep):
+        """Tests that unlock Kinetis fails on a device that never responds.
+
+        Args:
+          self (TestUnlockKinetis): the `TestUnlockKinetis` instance
+          mock_sleep (Mock): mocked `time.sleep()` function
+
+        Returns:
+          `None`
+        """
+        mock_jlink = mock.Mock()
+        mock_jlink.tif = enums.JLinkInterfaces.SWD
+
+        flags = (0x2 << 28) | (0xBA01 << 12) | 1
+        mock_jlink.coresight_read.side_effect = [flags, 0x0]
+
+        # Every read request is answered with a wait.
+        mock_jlink.swd_write.return_value = 0
+        mock_jlink.swd_read8.return_value = swd.Response.STATUS_WAIT
+        mock_jlink.swd_read32.return_value = 0
+
+        timings = {}
+        res = unlock.unlock_kinetis(mock_jlink, timeout=0.01, timings=timings)
+        self.assertFalse(res)
+
+        self.assertEqual(1, mock_jlink.set_reset_pin_low.call_count)
+        self.assertEqual(1, mock_jlink.set_reset_pin_high.call_count)
+        self.assertEqual(0, mock_jlink.reset.call_count)
+        self.assertIn('total', timings)
+        self.assertNotIn('flash_ready', timings)
+
 
 if __name__ == '__main__':
     unittest.main()